@@ -0,0 +1,48 @@
+"""
+Compare repeated short lived sessions (e.g., CLI invocations or cron jobs) fetching the same
+catalogs and inventory with and without the shared SQLite cache.
+
+    python -m benchmarks.bench_cache
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import time
+
+from benchmarks.utils import CLUSTERS, LocalServer, servers
+
+LATENCY = 0.05
+RUNS = 20
+PATHS = [
+    "/api/v1/clusters/GetAll",
+    "/api/v1/servers/virtual/GetConfigurations",
+    "/api/v1/servers/images/GetOperatingSystemImages",
+    "/api/v1/servers/virtual/GetServers",
+]
+ROUTES = {
+    "/api/v1/clusters/GetAll": json.dumps(CLUSTERS).encode(),
+    "/api/v1/servers/virtual/GetConfigurations": b'{"items": []}',
+    "/api/v1/servers/images/GetOperatingSystemImages": b'{"items": []}',
+    "/api/v1/servers/virtual/GetServers": servers(5_000),
+}
+
+
+def main():
+    with LocalServer(ROUTES, latency=LATENCY) as server, tempfile.TemporaryDirectory() as tmp:
+        print(f"{'cache':>6} {'requests':>8} {'time/run (ms)':>14}")
+        for cache in [False, os.path.join(tmp, "cache.sqlite")]:
+            server.requests = 0
+            start = time.perf_counter()
+            for _ in range(RUNS):
+                session = server.session(cache=cache, retries=0)
+                for path in PATHS:
+                    session.request("get", path)
+            elapsed = (time.perf_counter() - start) / RUNS
+            print(f"{bool(cache)!s:>6} {server.requests:>8} {elapsed * 1000:>14.3f}")
+
+
+if __name__ == "__main__":
+    main()
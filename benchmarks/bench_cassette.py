@@ -0,0 +1,77 @@
+"""
+Record a reconcile cycle (creating VMs, polling them until they're ONLINE and listing them) against the
+fake Denvr API server with 5ms of latency, then time the same cycle replayed from the cassette with the
+original latencies and as fast as possible, and report the cassette size.
+
+    python -m benchmarks.bench_cassette
+"""
+
+from __future__ import annotations
+
+import os
+import tempfile
+import time
+
+from typing import Any
+
+from denvr import cassette
+from denvr.api.v1.servers import virtual
+from denvr.config import Config
+from denvr.session import Session
+from denvr.testing import FakeServer, State
+
+VMS = 20
+VM: dict[str, Any] = {
+    "rpool": "on-demand",
+    "vpc": "denvr",
+    "configuration": "A100_40GB_PCIe_1x",
+    "cluster": "Msc1",
+    "ssh_keys": ["ssh-ed25519 AAAA"],
+}
+
+
+def reconcile(session: Session) -> int:
+    client = virtual.Client(session)
+    for i in range(VMS):
+        client.create_server(name=f"vm-{i}", **VM)
+    pending = {f"vm-{i}" for i in range(VMS)}
+    while pending:
+        for id in sorted(pending):
+            if (
+                client.get_server(id=id, namespace="denvr", cluster="Msc1")["status"]
+                == "ONLINE"
+            ):
+                pending.discard(id)
+    return len(client.get_servers(cluster="Msc1")["items"])
+
+
+def timeit(session: Session) -> float:
+    start = time.perf_counter()
+    reconcile(session)
+    return time.perf_counter() - start
+
+
+def main():
+    state = State(durations={"planned": 0.1, "pending": 0.2})
+    state.populate(200, cluster="Msc1")
+
+    with tempfile.TemporaryDirectory() as tmp, FakeServer(state, latency=0.005) as server:
+        path = os.path.join(tmp, "cassette.jsonl")
+        session = server.session(record=path, retries=0)
+        print(f"{'recorded':>10} {timeit(session):>8.3f}s")
+        session.recorder.close()  # type: ignore[union-attr]
+
+        entries = cassette.load(path)
+        print(f"{'requests':>10} {len(entries):>8}")
+        print(f"{'cassette':>10} {os.path.getsize(path) / 1024:>7.0f}K")
+
+        config = Config(defaults={"server": "http://denvr.replay"}, auth=None)
+        for name, latency in [("original", 1.0), ("fastest", 0.0)]:
+            session = Session(config)
+            adapter = cassette.ReplayAdapter(entries, latency=latency, loop=False)
+            session.session.mount("http://denvr.replay", adapter)
+            print(f"{name:>10} {timeit(session):>8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
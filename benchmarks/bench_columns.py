@@ -0,0 +1,56 @@
+"""
+Compare accumulating streamed `iter_servers` items across clusters as a list of dicts
+versus directly into `denvr.columns.Columns`.
+
+    python -m benchmarks.bench_columns
+"""
+
+from __future__ import annotations
+
+import time
+import tracemalloc
+
+from denvr.api.v1.servers import virtual
+from denvr.columns import Columns
+from benchmarks.utils import CLUSTERS, LocalServer, servers
+
+N = 20_000
+
+
+def rows(client):
+    results = []
+    for cluster in CLUSTERS:
+        results.extend(client.iter_servers(cluster=cluster))
+    return {k: [row.get(k) for row in results] for k in results[0]}
+
+
+def columns(client):
+    results = Columns()
+    for cluster in CLUSTERS:
+        results.extend(client.iter_servers(cluster=cluster))
+    return results.to_columns()
+
+
+def main():
+    routes = {"/api/v1/servers/virtual/GetServers": servers(N)}
+    print(
+        f"{'format':>8} {'items':>7} {'retained (MiB)':>15} {'peak (MiB)':>11} {'time (s)':>9}"
+    )
+    with LocalServer(routes) as local:
+        client = virtual.Client(local.session())
+        for name, func in [("rows", rows), ("columns", columns)]:
+            tracemalloc.start()
+            start = time.perf_counter()
+            result = func(client)
+            elapsed = time.perf_counter() - start
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            n = len(result["id"])
+            del result
+            print(
+                f"{name:>8} {n:>7} {current / 2**20:>15.2f} {peak / 2**20:>11.2f} {elapsed:>9.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Compare fetching a 3 cluster inventory over a simulated 8 Mbit/s link with and without response
+compression, reporting the bytes on the wire and after decoding.
+
+    python -m benchmarks.bench_compression
+"""
+
+from __future__ import annotations
+
+import time
+
+from urllib.parse import parse_qs, urlsplit
+
+from benchmarks.utils import CLUSTERS, LocalServer, servers
+
+BANDWIDTH = 1_000_000
+N = 5_000
+PATH = "/api/v1/servers/virtual/GetServers"
+
+
+def items(path: str) -> bytes:
+    return servers(N, parse_qs(urlsplit(path).query)["Cluster"][0])
+
+
+def main():
+    with LocalServer({PATH: items}, bandwidth=BANDWIDTH, compress=True) as server:
+        print(f"{'compression':>11} {'wire (KiB)':>11} {'decoded (KiB)':>14} {'time (s)':>9}")
+        for compression in [False, True]:
+            session = server.session(compression=compression, revalidate=False, retries=0)
+            start = time.perf_counter()
+            for cluster in CLUSTERS:
+                session.request("get", PATH, params={"Cluster": cluster})
+            elapsed = time.perf_counter() - start
+            counters = session.counters
+            print(
+                f"{compression!s:>11} {counters['bytes_received_wire'] / 1024:>11.1f} "
+                f"{counters['bytes_received'] / 1024:>14.1f} {elapsed:>9.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Compare request latency when pinned to the first configured server against latency based
+selection across a slow and a fast server, and the cost of failing over when the fast one degrades.
+
+    python -m benchmarks.bench_endpoints
+"""
+
+from __future__ import annotations
+
+import time
+
+from denvr.config import Config
+from denvr.session import Session
+from benchmarks.utils import LocalServer, servers
+
+PATH = "/api/v1/servers/virtual/GetServers"
+REQUESTS = 20
+
+
+def timeit(session: Session) -> float:
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        session.request("get", PATH)
+    return (time.perf_counter() - start) / REQUESTS
+
+
+def main():
+    routes = {PATH: servers(100), "/": b"{}"}
+    with LocalServer(routes, latency=0.1) as slow, LocalServer(routes, latency=0.01) as fast:
+        print(f"{'routing':>10} {'time/request (ms)':>18}")
+
+        pinned = Session(Config(defaults={"server": slow.url, "retries": 0}, auth=None))
+        print(f"{'pinned':>10} {timeit(pinned) * 1000:>18.3f}")
+
+        defaults = {"servers": [slow.url, fast.url], "retries": 0, "revalidate": False}
+        session = Session(Config(defaults=defaults, auth=None))
+        print(f"{'latency':>10} {timeit(session) * 1000:>18.3f}")
+
+        fast.error = 503
+        print(f"{'failover':>10} {timeit(session) * 1000:>18.3f}")
+        print(session.endpoints.ordered())
+
+
+if __name__ == "__main__":
+    main()
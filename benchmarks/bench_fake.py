@@ -0,0 +1,81 @@
+"""
+Measure the throughput of the stateful fake Denvr API server (`denvr.testing`) and the spec driven mock
+(`denvr.testing.mock`) on their own, over HTTP with 1 and 8 client threads, and in process, for small
+(`get_server`) and large (`get_servers` with 1000 VMs for the fake) responses.
+
+    python -m benchmarks.bench_fake
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+
+from denvr.api.v1.servers import virtual
+from denvr.testing import FakeServer, State
+from denvr.testing.mock import MockServer
+
+SECONDS = 2.0
+GET_SERVER = "/api/v1/servers/virtual/GetServer"
+GET_SERVERS = "/api/v1/servers/virtual/GetServers"
+
+
+def throughput(server: FakeServer, call: str, threads: int) -> float:
+    clients = [
+        virtual.Client(server.session(retries=0, revalidate=False)) for _ in range(threads)
+    ]
+    vm = clients[0].get_servers(cluster="Msc1")["items"][0]
+    deadline = time.perf_counter() + SECONDS
+    counts = [0] * threads
+
+    def run(i: int):
+        client = clients[i]
+        while time.perf_counter() < deadline:
+            if call == "get_server":
+                client.get_server(id=vm["id"], namespace=vm["namespace"], cluster="Msc1")
+            else:
+                client.get_servers(cluster="Msc1")
+            counts[i] += 1
+
+    workers = [threading.Thread(target=run, args=(i,)) for i in range(threads)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return sum(counts) / SECONDS
+
+
+def handled(server: FakeServer, call: str) -> float:
+    # Requests/s of the server alone, without any client or HTTP overhead
+    vm = virtual.Client(server.session()).get_servers(cluster="Msc1")["items"][0]
+    if call == "get_server":
+        target = f"{GET_SERVER}?Id={vm['id']}&Namespace={vm['namespace']}&Cluster=Msc1"
+    else:
+        target = f"{GET_SERVERS}?Cluster=Msc1"
+    deadline = time.perf_counter() + SECONDS
+    count = 0
+    while time.perf_counter() < deadline:
+        server.handle("GET", target, {})
+        count += 1
+    return count / SECONDS
+
+
+def main():
+    state = State()
+    state.populate(1000, cluster="Msc1")
+
+    print(f"{'server':>6} {'transport':>12} {'threads':>8} {'call':>12} {'requests/s':>12}")
+    for name, server in [("fake", FakeServer(state)), ("mock", MockServer())]:
+        for call in ["get_server", "get_servers"]:
+            rps = handled(server, call)
+            print(f"{name:>6} {'server only':>12} {1:>8} {call:>12} {rps:>12.0f}")
+            rps = throughput(server, call, 1)
+            print(f"{name:>6} {'in process':>12} {1:>8} {call:>12} {rps:>12.0f}")
+            with server:
+                for threads in [1, 8]:
+                    rps = throughput(server, call, threads)
+                    print(f"{name:>6} {'http':>12} {threads:>8} {call:>12} {rps:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Measure how the SDK's retries (`denvr.utils.retry`) hold up under injected faults (429 storms, 503 bursts,
+slow responses with timeouts and connection resets), reporting the goodput (successful calls per second),
+p50 and p99 call latency and the total requests sent for each fault scenario and retry policy.
+
+    python -m benchmarks.bench_faults
+    python -m benchmarks.bench_faults --calls 500 --backoff 0.1 1 --seed 7
+
+Faults are drawn from a seeded `denvr.faults.Injector`, so every policy sees the same fault sequence
+for the same requests. Calls are `GetServer` requests to the fake Denvr API server with a read timeout.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import time
+
+from requests import RequestException
+
+from denvr import faults
+from denvr.testing import FakeServer, State
+from denvr.utils import retry
+
+GET_SERVER = "/api/v1/servers/virtual/GetServer"
+
+SCENARIOS = {
+    "baseline": [],
+    "429 storm": [faults.Rule(status=429, rate=0.02, burst=10)],
+    "503 bursts": [faults.Rule(status=503, rate=0.02, burst=5)],
+    "slow": [faults.Rule(latency="lognormal:0.005,1"), faults.Rule(latency=1.0, rate=0.01)],
+    "resets": [faults.Rule(reset=True, rate=0.05)],
+    "mixed": [
+        faults.Rule(status=503, rate=0.01, burst=3),
+        faults.Rule(status=429, rate=0.01),
+        faults.Rule(reset=True, rate=0.01),
+        faults.Rule(latency="exponential:0.002"),
+    ],
+}
+
+
+def percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(int(len(values) * q), len(values) - 1)] if values else 0.0
+
+
+def run(server: FakeServer, rules: list, retries: int, backoff: float, args) -> dict:
+    injector = faults.Injector(rules, seed=args.seed)
+    session = server.session(retries=0, revalidate=False)
+    vm = session.request("get", "/api/v1/servers/virtual/GetServers")["items"][0]
+    params = {"Id": vm["id"], "Namespace": vm["namespace"], "Cluster": vm["cluster"]}
+    max_retries = retry(retries=retries, backoff_factor=backoff) if retries else 0
+    session.session.mount(server.url, faults.FaultAdapter(injector, max_retries=max_retries))
+
+    latencies = []
+    failed = 0
+    start = time.perf_counter()
+    for _ in range(args.calls):
+        t = time.perf_counter()
+        try:
+            session.request("get", GET_SERVER, params=params, timeout=args.timeout)
+        except RequestException:
+            failed += 1
+        latencies.append(time.perf_counter() - t)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "ok": args.calls - failed,
+        "failed": failed,
+        "requests": injector.counts["attempts"],
+        "goodput": (args.calls - failed) / elapsed,
+        "p50": percentile(latencies, 0.5),
+        "p99": percentile(latencies, 0.99),
+    }
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_faults")
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--timeout", type=float, default=0.25, help="Read timeout in seconds")
+    parser.add_argument("--retries", type=int, nargs="+", default=[0, 3, 5])
+    parser.add_argument(
+        "--backoff", type=float, nargs="+", default=[0.05], help="Retry backoff factors"
+    )
+    parser.add_argument("-k", help="Only run scenarios containing this string")
+    args = parser.parse_args(argv)
+    # Don't log a warning for every retried connection reset
+    logging.getLogger("urllib3").setLevel(logging.ERROR)
+
+    state = State()
+    state.populate(10, cluster="Msc1")
+    policies = [(0, 0.0)] if 0 in args.retries else []
+    policies += [(r, b) for r in args.retries if r for b in args.backoff]
+
+    print(
+        f"{'scenario':<12} {'retries':>7} {'backoff':>7} {'ok':>5} {'failed':>6} {'requests':>8}"
+        f" {'goodput/s':>9} {'p50 ms':>8} {'p99 ms':>8}"
+    )
+    with FakeServer(state) as server:
+        for name, rules in SCENARIOS.items():
+            if args.k and args.k not in name:
+                continue
+            for retries, backoff in policies:
+                r = run(server, rules, retries, backoff, args)
+                print(
+                    f"{name:<12} {retries:>7} {backoff:>7.2f} {r['ok']:>5} {r['failed']:>6}"
+                    f" {r['requests']:>8} {r['goodput']:>9.0f} {r['p50'] * 1e3:>8.1f}"
+                    f" {r['p99'] * 1e3:>8.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Measure the per request overhead of the session hooks, with no hooks installed and with
+the `Metrics` collector recording latency histograms.
+
+    python -m benchmarks.bench_hooks
+"""
+
+from __future__ import annotations
+
+import time
+
+from denvr.metrics import Histogram, Metrics
+from benchmarks.utils import LocalServer, servers
+
+PATH = "/api/v1/servers/virtual/GetServers"
+REQUESTS = 1000
+
+
+def main():
+    with LocalServer({PATH: servers(10)}) as server:
+        session = server.session(retries=0, revalidate=False)
+        for _ in range(100):
+            session.request("get", PATH)
+
+        print(f"{'hooks':>10} {'time/request (us)':>18}")
+        start = time.perf_counter()
+        for _ in range(REQUESTS):
+            session.request("get", PATH)
+        baseline = (time.perf_counter() - start) / REQUESTS
+        print(f"{'none':>10} {baseline * 1e6:>18.1f}")
+
+        metrics = Metrics().install(session)
+        start = time.perf_counter()
+        for _ in range(REQUESTS):
+            session.request("get", PATH)
+        elapsed = (time.perf_counter() - start) / REQUESTS
+        print(f"{'metrics':>10} {elapsed * 1e6:>18.1f}")
+
+        latency = metrics.snapshot()[PATH]["latency"]
+        print(f"p50={latency['p50'] * 1e6:.0f}us p99={latency['p99'] * 1e6:.0f}us")
+
+    hist = Histogram()
+    start = time.perf_counter()
+    for i in range(100_000):
+        hist.record(i * 1e-6)
+    print(f"Histogram.record: {(time.perf_counter() - start) / 100_000 * 1e9:.0f}ns")
+
+
+if __name__ == "__main__":
+    main()
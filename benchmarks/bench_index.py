@@ -0,0 +1,55 @@
+"""
+Compare scanning a 50k VM inventory against querying an `Index`, and the cost of incrementally
+refreshing the index when a small fraction of VMs change.
+
+    python -m benchmarks.bench_index
+"""
+
+from __future__ import annotations
+
+import time
+
+from denvr.inventory import Index
+from benchmarks.utils import server
+
+N = 50_000
+QUERIES = 1_000
+
+
+def scan(items, **criteria):
+    return [i for i in items if all(i.get(k) == v for k, v in criteria.items())]
+
+
+def timeit(func, n: int = 1) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        func()
+    return (time.perf_counter() - start) / n
+
+
+def main():
+    items = [server(i) for i in range(N)]
+    criteria = {"cluster": "Hou1", "status": "ONLINE", "gpu_type": "nvidia.com/A100PCIE40GB"}
+
+    index = Index()
+    build = timeit(lambda: index.refresh(items))
+    assert len(index.query(**criteria)) == len(scan(items, **criteria))
+
+    print(f"{'operation':>20} {'time (ms)':>10}")
+    print(f"{'build index':>20} {build * 1000:>10.3f}")
+    print(f"{'scan query':>20} {timeit(lambda: scan(items, **criteria), 20) * 1000:>10.3f}")
+    print(
+        f"{'index query':>20} {timeit(lambda: index.query(**criteria), QUERIES) * 1000:>10.3f}"
+    )
+    print(
+        f"{'selective query':>20} {timeit(lambda: index.query(node_selector='node-007'), QUERIES) * 1000:>10.3f}"
+    )
+
+    # 1% of the fleet changes status between polls
+    changed = [dict(i, status="OFFLINE") if n % 100 == 0 else i for n, i in enumerate(items)]
+    refresh = timeit(lambda: index.refresh(changed))
+    print(f"{'refresh (1% changed)':>20} {refresh * 1000:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
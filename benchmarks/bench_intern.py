@@ -0,0 +1,38 @@
+"""
+Compare the retained memory of a 50k VM `get_servers` response with and without interning
+repeated categorical values (e.g., `cluster`, `status`, `gpu_type`).
+
+    python -m benchmarks.bench_intern
+"""
+
+from __future__ import annotations
+
+import time
+import tracemalloc
+
+from benchmarks.utils import LocalServer, servers
+
+N = 50_000
+PATH = "/api/v1/servers/virtual/GetServers"
+
+
+def main():
+    with LocalServer({PATH: servers(N)}) as server:
+        print(f"{'intern_size':>11} {'retained (MiB)':>15} {'peak (MiB)':>11} {'time (s)':>9}")
+        for intern_size in [0, 10000]:
+            session = server.session(intern_size=intern_size)
+            tracemalloc.start()
+            start = time.perf_counter()
+            result = session.request("get", PATH)
+            elapsed = time.perf_counter() - start
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            assert len(result["items"]) == N
+            del result
+            print(
+                f"{intern_size:>11} {current / 2**20:>15.2f} {peak / 2**20:>11.2f} {elapsed:>9.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
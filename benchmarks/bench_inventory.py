@@ -0,0 +1,52 @@
+"""
+Compare the wall time of a fleet inventory snapshot with sequential and concurrent fan-out
+against a local server which injects latency into every response.
+
+    python -m benchmarks.bench_inventory
+"""
+
+from __future__ import annotations
+
+import json
+import time
+
+from urllib.parse import parse_qs, urlsplit
+
+from denvr.inventory import snapshot
+from benchmarks.utils import CLUSTERS, LocalServer, servers
+
+LATENCY = 0.1
+WORKERS = [1, 4, 8, 16]
+
+
+def items(path: str) -> bytes:
+    cluster = parse_qs(urlsplit(path).query)["Cluster"][0]
+    return servers(500, cluster)
+
+
+ROUTES = {
+    "/api/v1/clusters/GetAll": json.dumps(CLUSTERS).encode(),
+    "/api/v1/servers/virtual/GetServers": items,
+    "/api/v1/servers/metal/GetHosts": b'{"items": []}',
+    "/api/v1/servers/snapshots/GetSnapshots": b'{"items": []}',
+    "/api/v1/servers/applications/GetApplications": b'{"items": []}',
+}
+
+
+def main():
+    with LocalServer(ROUTES, latency=LATENCY) as server:
+        session = server.session(retries=0)
+        print(f"{'workers':>7} {'requests':>8} {'servers':>7} {'time (s)':>9}")
+        for workers in WORKERS:
+            server.requests = 0
+            start = time.perf_counter()
+            inventory = snapshot(session, max_workers=workers)
+            elapsed = time.perf_counter() - start
+            assert inventory.complete
+            print(
+                f"{workers:>7} {server.requests:>8} {len(inventory.servers):>7} {elapsed:>9.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Measure the per request overhead of profiling mode and print the profile of a large list
+response, to show how the time splits between the SDK and the network.
+
+    python -m benchmarks.bench_profiling
+"""
+
+from __future__ import annotations
+
+import time
+
+from denvr import profiling
+from denvr.api.v1.servers import virtual
+from benchmarks.utils import LocalServer, servers
+
+PATH = "/api/v1/servers/virtual/GetServers"
+REQUESTS = 200
+
+
+def timeit(client) -> float:
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        client.get_servers(cluster="Msc1")
+    return (time.perf_counter() - start) / REQUESTS
+
+
+def main():
+    with LocalServer({PATH: servers(1000)}) as server:
+        client = virtual.Client(server.session(retries=0, revalidate=False))
+        timeit(client)
+
+        print(f"{'profiling':>10} {'time/request (us)':>18}")
+        print(f"{'disabled':>10} {timeit(client) * 1e6:>18.1f}")
+
+        profiler = profiling.enable(threshold=0.01, size=10)
+        print(f"{'enabled':>10} {timeit(client) * 1e6:>18.1f}")
+        profiling.disable()
+
+    print()
+    print(profiler.report())
+    slow = profiler.slow_calls()
+    if slow:
+        call = slow[-1]
+        print(
+            f"\nslowest recent call: {call['wall'] * 1000:.1f}ms, sdk {call['sdk'] * 1000:.1f}ms, "
+            f"network {call['network'] * 1000:.1f}ms, {call['response_size']} bytes"
+        )
+
+
+if __name__ == "__main__":
+    main()
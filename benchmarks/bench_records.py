@@ -0,0 +1,45 @@
+"""
+Compare the retained memory of 100k `get_servers` items as plain dicts and as slotted records.
+
+    python -m benchmarks.bench_records
+"""
+
+from __future__ import annotations
+
+import json
+import time
+import tracemalloc
+
+from denvr.api.v1.servers.virtual import GetServersResult
+from denvr.utils import snakecase
+from benchmarks.utils import servers
+
+N = 100_000
+
+
+def as_dicts(content: bytes):
+    result = json.loads(content)
+    return {snakecase(k): v for k, v in result.items()}
+
+
+def as_records(content: bytes):
+    return GetServersResult.from_json(json.loads(content))
+
+
+def main():
+    content = servers(N)
+    print(f"{'format':>8} {'retained (MiB)':>15} {'peak (MiB)':>11} {'time (s)':>9}")
+    for name, func in [("dict", as_dicts), ("record", as_records)]:
+        tracemalloc.start()
+        start = time.perf_counter()
+        result = func(content)
+        elapsed = time.perf_counter() - start
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        assert len(result["items"]) == N
+        del result
+        print(f"{name:>8} {current / 2**20:>15.2f} {peak / 2**20:>11.2f} {elapsed:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
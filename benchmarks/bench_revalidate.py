@@ -0,0 +1,38 @@
+"""
+Compare repeated polls of an unchanged 20k VM `get_servers` response without revalidation,
+with the body hash fallback and with `ETag` conditional requests.
+
+    python -m benchmarks.bench_revalidate
+"""
+
+from __future__ import annotations
+
+import time
+
+from benchmarks.utils import LocalServer, servers
+
+N = 20_000
+POLLS = 10
+PATH = "/api/v1/servers/virtual/GetServers"
+
+
+def main():
+    body = servers(N)
+    print(f"{'mode':>10} {'time/poll (ms)':>15}")
+    for mode, revalidate, etags in [
+        ("none", False, False),
+        ("body hash", True, False),
+        ("etag", True, True),
+    ]:
+        with LocalServer({PATH: body}, etags=etags) as server:
+            session = server.session(revalidate=revalidate, retries=0)
+            session.request("get", PATH)
+            start = time.perf_counter()
+            for _ in range(POLLS):
+                session.request("get", PATH)
+            elapsed = (time.perf_counter() - start) / POLLS
+            print(f"{mode:>10} {elapsed * 1000:>15.3f}")
+
+
+if __name__ == "__main__":
+    main()
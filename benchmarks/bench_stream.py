@@ -0,0 +1,52 @@
+"""
+Compare peak memory of `get_servers` against the streaming `iter_servers` as the fleet grows.
+
+    python -m benchmarks.bench_stream
+"""
+
+from __future__ import annotations
+
+import time
+import tracemalloc
+
+from denvr.api.v1.servers import virtual
+from benchmarks.utils import LocalServer, servers
+
+SIZES = [1_000, 10_000, 50_000]
+
+
+def measure(func) -> tuple[int, float]:
+    """
+    Returns the peak traced memory (bytes) and wall time (seconds) of calling `func`.
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak, elapsed
+
+
+def load(client):
+    result = client.get_servers(cluster="Hou1")
+    return sum(1 for _ in result["items"])
+
+
+def stream(client):
+    return sum(1 for _ in client.iter_servers(cluster="Hou1"))
+
+
+def main():
+    print(f"{'items':>8} {'method':>13} {'peak (MiB)':>11} {'time (s)':>9}")
+    for n in SIZES:
+        routes = {"/api/v1/servers/virtual/GetServers": servers(n, "Hou1")}
+        with LocalServer(routes) as local:
+            client = virtual.Client(local.session())
+            for name, func in [("get_servers", load), ("iter_servers", stream)]:
+                peak, elapsed = measure(lambda: func(client))  # noqa: B023
+                print(f"{n:>8} {name:>13} {peak / 2**20:>11.2f} {elapsed:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
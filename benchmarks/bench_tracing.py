@@ -0,0 +1,57 @@
+"""
+Measure the per request overhead of tracing (disabled, in memory and exported to JSONL),
+and print the phase breakdown of a traced request.
+
+    python -m benchmarks.bench_tracing
+"""
+
+from __future__ import annotations
+
+import os
+import tempfile
+import time
+
+from collections import defaultdict
+
+from denvr import tracing
+from benchmarks.utils import LocalServer, servers
+
+PATH = "/api/v1/servers/virtual/GetServers"
+REQUESTS = 500
+
+
+def timeit(session) -> float:
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        session.request("get", PATH)
+    return (time.perf_counter() - start) / REQUESTS
+
+
+def main():
+    with LocalServer({PATH: servers(100)}) as server, tempfile.TemporaryDirectory() as tmp:
+        session = server.session(retries=0, revalidate=False)
+        timeit(session)
+
+        print(f"{'tracing':>10} {'time/request (us)':>18}")
+        print(f"{'disabled':>10} {timeit(session) * 1e6:>18.1f}")
+
+        spans: list = []
+        tracing.enable(spans.append)
+        print(f"{'memory':>10} {timeit(session) * 1e6:>18.1f}")
+
+        exporter = tracing.JsonlExporter(os.path.join(tmp, "trace.jsonl"))
+        tracing.enable(exporter)
+        print(f"{'jsonl':>10} {timeit(session) * 1e6:>18.1f}")
+        exporter.close()
+        tracing.disable()
+
+    phases: dict = defaultdict(float)
+    for span in spans:
+        phases[span.name] += span.duration
+    print(f"\n{'phase':>16} {'mean (us)':>10}")
+    for name, total in sorted(phases.items(), key=lambda x: -x[1]):
+        print(f"{name:>16} {total / REQUESTS * 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Compare the cost of a watch poll over 50k VMs when items are skipped by `last_updated`,
+when every item is hashed, and when diffing full dicts against the previous response.
+
+    python -m benchmarks.bench_watch
+"""
+
+from __future__ import annotations
+
+import time
+
+from denvr.watch import Watcher
+from benchmarks.utils import server
+
+N = 50_000
+
+
+def timeit(func) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main():
+    items = [server(i) for i in range(N)]
+    # 1% of the fleet changes status and `last_updated` between polls
+    changed = [
+        dict(i, status="OFFLINE", last_updated="2025-04-09T02:00:00+00:00")
+        if n % 100 == 0
+        else i
+        for n, i in enumerate(items)
+    ]
+    # Without `last_updated` every item needs to be hashed
+    stripped = [{k: v for k, v in i.items() if k != "last_updated"} for i in changed]
+
+    print(f"{'poll':>20} {'events':>7} {'time (ms)':>10}")
+
+    watcher = Watcher(lambda: items)
+    watcher.poll()
+    watcher.list_items = lambda: changed
+    events = []
+    elapsed = timeit(lambda: events.extend(watcher.poll()))
+    print(f"{'last_updated':>20} {len(events):>7} {elapsed * 1000:>10.3f}")
+
+    watcher = Watcher(
+        lambda: [{k: v for k, v in i.items() if k != "last_updated"} for i in items]
+    )
+    watcher.poll()
+    watcher.list_items = lambda: stripped
+    events = []
+    elapsed = timeit(lambda: events.extend(watcher.poll()))
+    print(f"{'hashes':>20} {len(events):>7} {elapsed * 1000:>10.3f}")
+
+    def diff():
+        previous = {i["id"]: i for i in items}
+        return [i for i in changed if previous.get(i["id"]) != i]
+
+    elapsed = timeit(lambda: events.extend(diff()))
+    print(f"{'full dict diff':>20} {len(diff()):>7} {elapsed * 1000:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+"""
+Microbenchmarks for the client hot path (key conversion, kwarg validation, URL assembly,
+normalization, error handling, waiter polling and full generated client calls against an
+in-process fake server), with results saved as JSON and compared against the stored baseline.
+
+    python -m benchmarks.suite                       # compare against benchmarks/baseline.json
+    python -m benchmarks.suite -k client             # only benchmarks matching "client"
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.suite --save-baseline       # after an intentional change
+
+Timings are the fastest of several repeats, which is the most stable estimate on a noisy machine.
+Each repeat is followed by a pure Python reference workload, and the median ratios to the reference
+are compared, so the committed baseline is roughly comparable across machines (and load and CPU frequency
+changes mostly cancel out). Update it with `--save-baseline` in the same change as any intentional slowdown,
+so the difference is visible in review.
+The exit status is 1 if any benchmark is slower than the baseline by more than `--tolerance`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import timeit
+
+from typing import Any, Callable
+
+from requests import HTTPError, Response
+
+from denvr.__about__ import __version__
+from denvr.api.v1.servers import virtual
+from denvr.utils import raise_for_status, snakecase
+from denvr.validate import validate_kwargs
+from denvr.waiters import Waiter
+from benchmarks.utils import fake_session, server, servers
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+GET_SERVER = "/api/v1/servers/virtual/GetServer"
+GET_SERVERS = "/api/v1/servers/virtual/GetServers"
+ROUTES = {GET_SERVER: json.dumps({"result": server(0)}).encode(), GET_SERVERS: servers(100)}
+
+# Benchmark name -> setup function returning the callable to time
+BENCHMARKS: dict[str, Callable[[], Callable[[], Any]]] = {}
+
+
+def benchmark(setup: Callable[[], Callable[[], Any]]):
+    BENCHMARKS[setup.__name__] = setup
+    return setup
+
+
+def reference():
+    # Doesn't touch the SDK, so it only tracks the speed of the machine and interpreter
+    return sum(i * i for i in range(100))
+
+
+def camelcase_item() -> dict:
+    return {"".join(w.title() for w in k.split("_")): v for k, v in server(0).items()}
+
+
+@benchmark
+def snakecase_cached():
+    return lambda: snakecase("directAttachedStoragePersisted")
+
+
+@benchmark
+def snakecase_uncached():
+    convert = snakecase.__wrapped__  # type: ignore[attr-defined]
+    return lambda: convert("directAttachedStoragePersisted")
+
+
+@benchmark
+def validate_kwargs_get_server():
+    def run():
+        parameters = {"params": {"Id": "vm-1", "Namespace": "denvr", "Cluster": "Msc1"}}
+        return validate_kwargs("get", GET_SERVER, parameters, {"Id", "Namespace", "Cluster"})
+
+    return run
+
+
+@benchmark
+def validate_kwargs_create_server():
+    def run():
+        parameters = {
+            "json": {
+                "Name": "vm-1",
+                "Rpool": "on-demand",
+                "Vpc": "denvr",
+                "Configuration": "H100_80GB_SXM_8x",
+                "Cluster": "Msc1",
+                "SshKeys": ["ssh-ed25519 AAAA"],
+                "OperatingSystemImage": "Ubuntu_22.04.4_LTS",
+                "PersistStorage": False,
+                "PersonalStorageMountPath": None,
+                "TenantSharedAdditionalStorage": None,
+                "DirectStorageMountPath": None,
+                "RootDiskSize": 500,
+            }
+        }
+        return validate_kwargs(
+            "post", "/api/v1/servers/virtual/CreateServer", parameters, {"Name", "Cluster"}
+        )
+
+    return run
+
+
+@benchmark
+def session_url():
+    session = fake_session(ROUTES)
+    return lambda: session.url(GET_SERVER)
+
+
+@benchmark
+def normalize_dict():
+    session = fake_session(ROUTES)
+    item = camelcase_item()
+    return lambda: session.normalize(GET_SERVER, dict(item))
+
+
+@benchmark
+def normalize_record():
+    session = fake_session(ROUTES, records=True)
+    item = server(0)
+    return lambda: session.normalize(GET_SERVER, dict(item))
+
+
+def response(status: int, body: bytes) -> Response:
+    resp = Response()
+    resp.status_code = status
+    resp.reason = "OK" if status < 400 else "Bad Request"
+    resp.url = "http://denvr.invalid" + GET_SERVER
+    resp._content = body
+    return resp
+
+
+@benchmark
+def raise_for_status_ok():
+    resp = response(200, b"{}")
+    return lambda: raise_for_status(resp)
+
+
+@benchmark
+def raise_for_status_error():
+    resp = response(400, b'{"error": {"message": "Invalid cluster", "details": "Msc9"}}')
+
+    def run():
+        try:
+            raise_for_status(resp)
+        except HTTPError:
+            pass
+
+    return run
+
+
+@benchmark
+def waiter_10_polls():
+    def run():
+        polls = iter(range(10))
+        waiter = Waiter(action=lambda: {}, check=lambda resp: (next(polls) == 9, resp))
+        return waiter(interval=0, timeout=60)
+
+    return run
+
+
+@benchmark
+def client_get_server():
+    client = virtual.Client(fake_session(ROUTES))
+    return lambda: client.get_server(id="vm-00000000", namespace="denvr", cluster="Msc1")
+
+
+@benchmark
+def client_get_servers_100():
+    client = virtual.Client(fake_session(ROUTES, revalidate=False))
+    return lambda: client.get_servers(cluster="Msc1")
+
+
+@benchmark
+def client_iter_servers_100():
+    client = virtual.Client(fake_session(ROUTES))
+    return lambda: sum(1 for _ in client.iter_servers(cluster="Msc1"))
+
+
+def calibrate(fn: Callable[[], Any], min_time: float) -> tuple[timeit.Timer, int]:
+    timer = timeit.Timer(fn)
+    number, elapsed = timer.autorange()
+    # Scale up the loop count so each repeat takes at least `min_time`
+    number = max(number, int(number * min_time / elapsed)) if elapsed else number
+    return timer, number
+
+
+def measure(fn: Callable[[], Any], repeat: int, min_time: float) -> dict:
+    timer, number = calibrate(fn, min_time)
+    ref_timer, ref_number = calibrate(reference, min_time)
+    # Alternate with the reference, so each pair of repeats runs at (roughly) the same machine speed
+    times, ratios = [], []
+    for _ in range(repeat):
+        t = timer.timeit(number) / number * 1e9
+        times.append(t)
+        ratios.append(t / (ref_timer.timeit(ref_number) / ref_number * 1e9))
+    return {
+        "min": min(times),
+        "median": statistics.median(times),
+        "relative": statistics.median(ratios),
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def run(pattern: str | None = None, repeat: int = 5, min_time: float = 0.2) -> dict:
+    results = {}
+    for name, setup in BENCHMARKS.items():
+        if pattern and pattern not in name:
+            continue
+        results[name] = measure(setup(), repeat, min_time)
+        print(f"{name:<32} {results[name]['min']:>12.1f} ns", file=sys.stderr)
+
+    return {
+        "metadata": {
+            "denvr": __version__,
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+    Print the change of each benchmark against the baseline, returning the names of any regressions.
+    Changes are in the timings relative to the reference, when the baseline includes them.
+    """
+    regressions = []
+    print(f"{'benchmark':<32} {'baseline (ns)':>14} {'current (ns)':>14} {'change':>8}")
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            print(f"{name:<32} {'-':>14} {result['min']:>14.1f} {'new':>8}")
+            continue
+
+        if "relative" in base:
+            change = result["relative"] / base["relative"] - 1
+        else:
+            change = result["min"] / base["min"] - 1
+        flag = ""
+        if change > tolerance:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        elif change < -tolerance:
+            flag = "  improved"
+        print(f"{name:<32} {base['min']:>14.1f} {result['min']:>14.1f} {change:>+8.1%}{flag}")
+
+    meta = baseline.get("metadata", {})
+    if meta.get("python") != current["metadata"]["python"]:
+        print(f"NOTE: the baseline was recorded with Python {meta.get('python')}")
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite", description=__doc__)
+    parser.add_argument("-k", dest="pattern", help="Only run benchmarks containing this string")
+    parser.add_argument("--repeat", type=int, default=5, help="Repeats per benchmark")
+    parser.add_argument(
+        "--min-time", type=float, default=0.2, help="Minimum seconds per repeat"
+    )
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", default=BASELINE, help="Baseline results to compare with")
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="Overwrite the baseline with these results"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Fractional slowdown reported as a regression (default: 0.25)",
+    )
+    args = parser.parse_args(argv)
+
+    current = run(args.pattern, args.repeat, args.min_time)
+    if args.output:
+        with open(args.output, "w") as fobj:
+            json.dump(current, fobj, indent=2, sort_keys=True)
+
+    if args.save_baseline:
+        baseline = {"metadata": current["metadata"], "results": {}}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as fobj:
+                baseline["results"] = json.load(fobj)["results"]
+        # Merge so saving a subset (e.g., `-k client`) keeps the other baseline results
+        baseline["results"].update(current["results"])
+        with open(args.baseline, "w") as fobj:
+            json.dump(baseline, fobj, indent=2, sort_keys=True)
+            fobj.write("\n")
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}, run with --save-baseline to create one")
+        return 1
+
+    with open(args.baseline) as fobj:
+        baseline = json.load(fobj)
+    return 1 if compare(current, baseline, args.tolerance) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
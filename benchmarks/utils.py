@@ -0,0 +1,214 @@
+"""
+Shared helpers for the benchmark scripts in this directory.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import io
+import json
+import threading
+import time
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Mapping, Union
+from urllib.parse import urlsplit
+
+from requests import PreparedRequest, Response
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+from denvr.config import Config
+from denvr.session import Session
+
+CLUSTERS = ["Hou1", "Msc1", "Yyc1"]
+STATUSES = ["ONLINE", "OFFLINE", "PENDING", "PLANNED"]
+CONFIGURATIONS = ["A100_40GB_PCIe_1x", "A100_40GB_PCIe_2x", "H100_80GB_SXM_8x", "G2_8x"]
+GPU_TYPES = ["nvidia.com/A100PCIE40GB", "nvidia.com/H100SXM480GB", "intel/GAUDI2"]
+RPOOLS = ["on-demand", "reserved-denvr"]
+IMAGES = ["Ubuntu_22.04.4_LTS", "Ubuntu_20.04.6_LTS", "habana-1.16.2"]
+
+
+def server(i: int, cluster: str | None = None) -> dict:
+    """
+    A synthetic `get_servers` item which looks like a real VM.
+    """
+    return {
+        "username": f"user{i % 50}@denvrdata.com",
+        "tenancy_name": "denvr",
+        "rpool": RPOOLS[i % len(RPOOLS)],
+        "direct_attached_storage_persisted": False,
+        "id": f"vm-{i:08d}",
+        "namespace": "denvr",
+        "configuration": CONFIGURATIONS[i % len(CONFIGURATIONS)],
+        "storage": 1700,
+        "gpu_type": GPU_TYPES[i % len(GPU_TYPES)],
+        "gpus": 1 + i % 8,
+        "vcpus": 14,
+        "memory": 112,
+        "ip": f"130.250.{i // 256 % 256}.{i % 256}",
+        "private_ip": f"172.16.{i // 256 % 256}.{i % 256}",
+        "image": IMAGES[i % len(IMAGES)],
+        "cluster": cluster or CLUSTERS[i % len(CLUSTERS)],
+        "node_selector": f"node-{i % 64:03d}",
+        "status": STATUSES[i % len(STATUSES)],
+        "storage_type": "na",
+        "root_disk_size": "500",
+        "last_updated": "2025-04-09T01:15:35+00:00",
+    }
+
+
+def servers(n: int, cluster: str | None = None) -> bytes:
+    """
+    The encoded `get_servers` response body for `n` synthetic VMs.
+    """
+    return json.dumps({"items": [server(i, cluster) for i in range(n)]}).encode()
+
+
+Route = Union[bytes, Callable[[str], bytes]]
+
+
+class LocalServer:
+    """
+    A minimal threaded HTTP server which serves canned JSON bodies by path, with optional
+    injected latency, so benchmarks don't depend on external services.
+
+    Args:
+        routes (dict): Path -> response body, or a function from the request path (including the
+            query string) to a response body.
+        latency (float): Seconds to sleep before responding to each request.
+        etags (bool): Whether to send `ETag` headers and respond to matching `If-None-Match`
+            requests with `304 Not Modified`.
+        bandwidth (float): Simulated link bandwidth in bytes per second for response bodies
+            (0 for unlimited).
+        compress (bool): Whether to gzip response bodies for clients which accept it.
+    """
+
+    def __init__(
+        self,
+        routes: Mapping[str, Route],
+        latency: float = 0.0,
+        etags: bool = False,
+        bandwidth: float = 0.0,
+        compress: bool = False,
+    ):
+        self.routes = routes
+        self.latency = latency
+        self.etags = etags
+        self.bandwidth = bandwidth
+        self.compress = compress
+        self.requests = 0
+        # Respond to every request with this error status instead (e.g., 503 to simulate an outage)
+        self.error = 0
+
+        parent = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Buffer each response, so headers and body aren't split into packets stalled by Nagle
+            wbufsize = 1 << 16
+
+            def do_GET(self):  # noqa: N802
+                parent.requests += 1
+                if parent.latency:
+                    time.sleep(parent.latency)
+
+                path = self.path.split("?", 1)[0]
+                route = parent.routes.get(path)
+                if route is None or parent.error:
+                    self.send_response(parent.error or 404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                body = route(self.path) if callable(route) else route
+                etag = f'"{hashlib.md5(body).hexdigest()}"' if parent.etags else None  # noqa: S324
+                if etag and self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+
+                self.send_response(200)
+                if etag:
+                    self.send_header("ETag", etag)
+                if parent.compress and "gzip" in self.headers.get("Accept-Encoding", ""):
+                    body = gzip.compress(body, compresslevel=6)
+                    self.send_header("Content-Encoding", "gzip")
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if parent.bandwidth:
+                    time.sleep(len(body) / parent.bandwidth)
+                self.wfile.write(body)
+
+            do_POST = do_GET  # noqa: N815
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_port}"
+
+    def session(self, **defaults) -> Session:
+        return Session(Config(defaults={"server": self.url, **defaults}, auth=None))
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class FakeAdapter(BaseAdapter):
+    """
+    A `requests` transport adapter which serves canned JSON bodies by path without any sockets,
+    so benchmarks can measure the client's own overhead in isolation.
+
+    Example:
+
+        session = fake_session({"/api/v1/servers/virtual/GetServers": servers(100)})
+    """
+
+    def __init__(self, routes: Mapping[str, Route]):
+        super().__init__()
+        self.routes = routes
+
+    def send(self, request: PreparedRequest, *args, **kwargs) -> Response:
+        url = request.url or ""
+        route = self.routes.get(urlsplit(url).path)
+
+        resp = Response()
+        resp.url = url
+        resp.request = request
+        resp.encoding = "utf-8"
+        resp.headers = CaseInsensitiveDict({"Content-Type": "application/json"})
+        if route is None:
+            resp.status_code, resp.reason, body = 404, "Not Found", b""
+        else:
+            resp.status_code, resp.reason = 200, "OK"
+            body = route(url) if callable(route) else route
+        # Like a real adapter, the body is read from `raw` (on access or when streaming)
+        resp.raw = io.BytesIO(body)
+        return resp
+
+    def close(self):
+        pass
+
+
+def fake_session(routes: Mapping[str, Route], **defaults) -> Session:
+    """
+    A `Session` whose requests are served in process by a `FakeAdapter`.
+    """
+    url = "http://denvr.invalid"
+    session = Session(Config(defaults={"server": url, "retries": 0, **defaults}, auth=None))
+    session.session.mount(url, FakeAdapter(routes))
+    return session
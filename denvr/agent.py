@@ -0,0 +1,566 @@
+"""
+A long lived local agent, which holds authenticated sessions (with their connection pools,
+revalidation state and caches) and serves requests from thin clients over a Unix domain socket,
+so repeated CLI calls don't each pay for a login, TLS handshakes and importing the full SDK.
+
+    denvr agent start
+    denvr servers virtual get-servers --cluster Hou1   # served by the agent
+    denvr agent status
+    denvr agent stop
+
+When the agent is running, the `denvr` CLI and `denvr.client.client` use it transparently
+(set `DENVR_NO_AGENT=1` to bypass it). The socket is `DENVR_AGENT_SOCKET` or `~/.cache/denvr/agent.sock`
+and is only accessible by the current user.
+
+Messages are JSON lines. Each request is answered with a `{"value": ...}` line, or for streams any
+number of `{"item": ...}` lines followed by `{"end": true}`, or an `{"error": {...}}` line.
+Sessions are keyed by the client's config path, `DENVR_*` environment variables and server,
+and are rebuilt when the config file changes.
+
+NOTE: The thin client (`connect` and `Connection`) only uses the standard library, so the CLI
+doesn't import `requests` when the agent serves its commands.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Iterator
+
+if TYPE_CHECKING:
+    from denvr.session import Session
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOCKET_PATH = os.path.join(
+    os.getenv("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")),
+    "denvr",
+    "agent.sock",
+)
+
+# Exit after this many seconds without any requests
+DEFAULT_IDLE_TIMEOUT = 3600.0
+
+# Environment variables which don't affect the sessions served to a client
+_IGNORED_ENV = {"DENVR_AGENT_SOCKET", "DENVR_NO_AGENT"}
+
+
+def socket_path() -> str:
+    return os.getenv("DENVR_AGENT_SOCKET") or DEFAULT_SOCKET_PATH
+
+
+def _to_dict(value):
+    # Records (with the `records` setting) are sent as plain dicts
+    to_dict = getattr(value, "to_dict", None)
+    if to_dict is None:
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+    return to_dict()
+
+
+def _encode(message: dict) -> bytes:
+    return json.dumps(message, separators=(",", ":"), default=_to_dict).encode() + b"\n"
+
+
+class RemoteError(Exception):
+    """
+    An error raised by the agent while serving a request, with the original exception `type`
+    name, message and HTTP `status` (if any).
+    """
+
+    def __init__(
+        self,
+        type: str,
+        message: str,
+        status: int | None = None,
+        url: str | None = None,
+        headers: dict | None = None,
+        body: str | None = None,
+    ):
+        super().__init__(message)
+        self.type = type
+        self.status = status
+        self.url = url
+        self.headers = headers
+        self.body = body
+
+    def exception(self) -> Exception:
+        """
+        The equivalent local exception (e.g., a `requests.HTTPError` with the response status,
+        headers and body), so callers handle errors (e.g., `Retry-After`) the same way with or
+        without the agent.
+        """
+        if self.type == "TypeError":
+            return TypeError(str(self))
+
+        import requests
+
+        cls = getattr(requests.exceptions, self.type, None)
+        if not (isinstance(cls, type) and issubclass(cls, requests.RequestException)):
+            return self
+        response = None
+        if self.status is not None:
+            response = requests.Response()
+            response.status_code = self.status
+            response.url = self.url or ""
+            response.headers.update(self.headers or {})
+            response._content = (self.body or "").encode()
+        return cls(str(self), response=response)
+
+
+class Connection:
+    """
+    A thin client connection to the agent, which can send any number of requests.
+    """
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.rfile = sock.makefile("rb")
+
+    def send(self, message: dict) -> Iterator[Any]:
+        """
+        Send a request and yield the value (or each streamed item) of the response.
+
+        Raises:
+            RemoteError: If the agent failed to serve the request.
+        """
+        self.sock.sendall(_encode(message))
+        done = False
+        try:
+            while True:
+                response = self._receive()
+                done = "item" not in response
+                if "error" in response:
+                    raise RemoteError(**response["error"])
+                if "item" in response or "value" in response:
+                    yield response.get("item", response.get("value"))
+                if done:
+                    return
+        finally:
+            # Skip the rest of a stream the caller stopped reading, so the next response is in sync
+            while not done:
+                done = "item" not in self._receive()
+
+    def _receive(self) -> dict:
+        line = self.rfile.readline()
+        if not line:
+            raise ConnectionError("The denvr agent closed the connection")
+        return json.loads(line)
+
+    def call(
+        self,
+        module: str,
+        method: str,
+        kwargs: dict,
+        config: str | None = None,
+        server: str | None = None,
+    ) -> Iterator[Any]:
+        """
+        Call a client method (e.g., `call("servers/virtual", "iter_servers", {})`) with the client's
+        config and environment, yielding its result or each streamed item.
+        """
+        return self.send(
+            {
+                "op": "call",
+                **_context(config, server),
+                "module": module,
+                "method": method,
+                "kwargs": kwargs,
+            }
+        )
+
+    def close(self):
+        self.rfile.close()
+        self.sock.close()
+
+
+def connect(path: str | None = None) -> Connection | None:
+    """
+    Connect to the agent listening on `path`, or `None` if it isn't running.
+    Without a `path`, the default socket is used unless `DENVR_NO_AGENT` is set.
+    """
+    if path is None and os.getenv("DENVR_NO_AGENT"):
+        return None
+    path = path or socket_path()
+    if not os.path.exists(path):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except OSError:
+        # A stale socket left behind by an agent which didn't exit cleanly
+        sock.close()
+        return None
+    return Connection(sock)
+
+
+def _context(config: str | None, server: str | None = None) -> dict:
+    # Paths are resolved relative to the client's working directory rather than the agent's
+    env = {
+        k: v for k, v in os.environ.items() if k.startswith("DENVR_") and k not in _IGNORED_ENV
+    }
+    if env.get("DENVR_CONFIG"):
+        env["DENVR_CONFIG"] = os.path.abspath(env["DENVR_CONFIG"])
+    return {"config": os.path.abspath(config) if config else None, "env": env, "server": server}
+
+
+class AgentSession:
+    """
+    AgentSession(connection, config_path=None)
+
+    A stand in for `denvr.session.Session` in the generated clients, which sends their requests
+    to the agent. Only the config defaults are loaded locally, since the agent holds the auth.
+    With the `records` setting, responses are rebuilt as records, as a local session returns them.
+    """
+
+    def __init__(self, connection: Connection, config_path: str | None = None):
+        from denvr.config import Config, load
+
+        self.connection = connection
+        self.config_path = config_path
+        _, contents = load(config_path)
+        self.config = Config(defaults=contents.get("defaults", {}), auth=None)
+
+    def _send(self, message: dict) -> Iterator[Any]:
+        try:
+            yield from self.connection.send({**_context(self.config_path), **message})
+        except RemoteError as e:
+            raise e.exception() from None
+
+    def _record(self, path: str, key: str | None = None):
+        from denvr.records import lookup
+
+        record = lookup(path) if self.config.records else None
+        if record is not None and key is not None:
+            record = record._nested.get(key)
+        return record
+
+    def request(self, method, path, **kwargs):
+        result = next(
+            self._send({"op": "request", "method": method, "path": path, "kwargs": kwargs})
+        )
+        record = self._record(path)
+        return record.from_json(result) if record and isinstance(result, dict) else result
+
+    def stream(self, method, path, key="items", **kwargs):
+        message = {"op": "stream", "method": method, "path": path, "key": key, "kwargs": kwargs}
+        record = self._record(path, key)
+        for item in self._send(message):
+            yield record.from_json(item) if record and isinstance(item, dict) else item
+
+
+@contextmanager
+def _environ(env: dict[str, str]):
+    # Swap in a client's `DENVR_*` variables (e.g., credentials), since `config()` reads them
+    saved = {k: v for k, v in os.environ.items() if k.startswith("DENVR_")}
+    for k in saved:
+        del os.environ[k]
+    os.environ.update(env)
+    try:
+        yield
+    finally:
+        for k in env:
+            os.environ.pop(k, None)
+        os.environ.update(saved)
+
+
+class Agent:
+    """
+    Agent(path=None, idle_timeout=DEFAULT_IDLE_TIMEOUT)
+
+    Serves thin clients on the Unix socket at `path` from a thread per connection, sharing one
+    `Session` (and client instances) per client config.
+    """
+
+    def __init__(
+        self, path: str | None = None, idle_timeout: float | None = DEFAULT_IDLE_TIMEOUT
+    ):
+        self.path = path or socket_path()
+        self.idle_timeout = idle_timeout
+        self.sessions: dict[tuple, tuple[float, Session]] = {}
+        self.clients: dict[tuple, Any] = {}
+        self.counters = {"connections": 0, "requests": 0, "errors": 0}
+        self.started = time.time()
+        self.last_request = time.monotonic()
+        self.server: socketserver.UnixStreamServer | None = None
+        self.thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._watchdog: threading.Thread | None = None
+        self._stopped = threading.Event()
+
+    def session(self, message: dict) -> tuple[tuple, Session]:
+        """
+        The session for a client's config, environment and server, created (and authenticated) on first use.
+        """
+        from denvr.config import DEFAULT_CONFIG_PATH, config
+        from denvr.session import Session
+
+        env = message.get("env") or {}
+        server = message.get("server")
+        key = (message.get("config"), tuple(sorted(env.items())), server)
+        path = message.get("config") or env.get("DENVR_CONFIG", DEFAULT_CONFIG_PATH)
+        mtime = os.path.getmtime(path) if os.path.exists(path) else 0.0
+        cached = self.sessions.get(key)
+        if cached is not None and cached[0] == mtime:
+            return key, cached[1]
+
+        with self._lock, _environ(env):
+            cached = self.sessions.get(key)
+            if cached is not None and cached[0] == mtime:
+                return key, cached[1]
+
+            conf = config(path)
+            if server:
+                conf.defaults = {**conf.defaults, "server": server}
+            session = Session(conf)
+            self.sessions[key] = (mtime, session)
+            if cached is not None:
+                # The config file changed, so drop the stale session's clients and connections
+                for k in [k for k in self.clients if k[0] == key]:
+                    del self.clients[k]
+                cached[1].session.close()
+            return key, session
+
+    def client(self, message: dict):
+        import importlib
+
+        key, session = self.session(message)
+        module = message["module"]
+        client = self.clients.get((key, module))
+        if client is None:
+            name = ".".join(module.split("/"))
+            mod = importlib.import_module(f"denvr.api.{session.config.api}.{name}")
+            client = self.clients[(key, module)] = mod.Client(session)
+        return client
+
+    def status(self) -> dict:
+        return {
+            "pid": os.getpid(),
+            "socket": self.path,
+            "uptime": time.time() - self.started,
+            "sessions": len(self.sessions),
+            **self.counters,
+        }
+
+    def handle(self, message: dict, write):
+        """
+        Serve a request `message`, writing each response message with `write`.
+        """
+        op = message.get("op")
+        if op == "status":
+            write({"value": self.status()})
+            return
+        if op == "shutdown":
+            write({"value": True})
+            threading.Thread(target=self.stop, daemon=True).start()
+            return
+
+        self.counters["requests"] += 1
+        self.last_request = time.monotonic()
+        streamed = False
+        try:
+            if op == "call":
+                if message["method"].startswith("_"):
+                    raise ValueError(f"Unknown client method {message['method']!r}")
+                result = getattr(self.client(message), message["method"])(**message["kwargs"])
+                streamed = message["method"].startswith("iter_")
+            elif op == "request":
+                _, session = self.session(message)
+                result = session.request(
+                    message["method"], message["path"], **message["kwargs"]
+                )
+            elif op == "stream":
+                _, session = self.session(message)
+                result = session.stream(
+                    message["method"], message["path"], message["key"], **message["kwargs"]
+                )
+                streamed = True
+            else:
+                raise ValueError(f"Unknown agent operation {op!r}")
+
+            if not streamed:
+                write({"value": result})
+                return
+            for item in result:
+                write({"item": item})
+            write({"end": True})
+        except Exception as e:
+            self.counters["errors"] += 1
+            response = getattr(e, "response", None)
+            error: dict[str, Any] = {"type": type(e).__name__, "message": str(e)}
+            if response is not None:
+                error.update(
+                    status=response.status_code,
+                    url=response.url,
+                    headers=dict(response.headers),
+                    body=response.text,
+                )
+            write({"error": error})
+
+    def start(self) -> Agent:
+        """
+        Listen on the socket and serve clients on a background thread.
+
+        Raises:
+            RuntimeError: If another agent is already listening on the socket.
+        """
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+        if os.path.exists(self.path):
+            connection = connect(self.path)
+            if connection is not None:
+                connection.close()
+                raise RuntimeError(f"A denvr agent is already listening on {self.path}")
+            os.unlink(self.path)
+
+        umask = os.umask(0o177)
+        try:
+            self.server = socketserver.ThreadingUnixStreamServer(self.path, _handler(self))
+        finally:
+            os.umask(umask)
+        self.server.daemon_threads = True
+        self._stopped.clear()
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        if self.idle_timeout:
+            self._watchdog = threading.Thread(target=self._watch, daemon=True)
+            self._watchdog.start()
+        logger.info("Denvr agent listening on %s", self.path)
+        return self
+
+    def _watch(self):
+        while self.server is not None:
+            idle = time.monotonic() - self.last_request
+            if self.idle_timeout and idle >= self.idle_timeout:
+                logger.info("Stopping the idle denvr agent after %.0fs", idle)
+                self.stop()
+                return
+            time.sleep(min(self.idle_timeout - idle, 1.0) if self.idle_timeout else 1.0)
+
+    def stop(self):
+        with self._lock:
+            server, self.server = self.server, None
+        if server is None:
+            return
+        server.shutdown()
+        server.server_close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._stopped.set()
+
+    def wait(self):
+        """
+        Block until the agent is stopped (e.g., by `denvr agent stop` or the idle timeout).
+        """
+        # Wait in intervals, so a KeyboardInterrupt is raised promptly
+        while self.thread is not None and not self._stopped.wait(1.0):
+            pass
+
+    def __enter__(self) -> Agent:
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+
+def _handler(agent: Agent) -> type[socketserver.StreamRequestHandler]:
+    class Handler(socketserver.StreamRequestHandler):
+        # Buffer streamed items, which are flushed at the end of each response
+        wbufsize = 1 << 16
+
+        def handle(self):
+            agent.counters["connections"] += 1
+            for line in self.rfile:
+                try:
+                    message = json.loads(line)
+                except ValueError as e:
+                    message = {"op": None}
+                    logger.warning("Invalid agent request: %s", e)
+                try:
+                    agent.handle(message, lambda m: self.wfile.write(_encode(m)))
+                    self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    return
+
+    return Handler
+
+
+def spawn(
+    path: str | None = None, idle_timeout: float = DEFAULT_IDLE_TIMEOUT, timeout: float = 10.0
+) -> int:
+    """
+    Start the agent in a background process and wait for it to accept connections.
+
+    Returns:
+        The agent process ID.
+    """
+    import subprocess
+
+    path = path or socket_path()
+    log = os.path.join(os.path.dirname(path) or ".", "agent.log")
+    os.makedirs(os.path.dirname(log), mode=0o700, exist_ok=True)
+    with open(log, "ab") as out:
+        proc = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "denvr.agent",
+                "--socket",
+                path,
+                "--idle",
+                str(idle_timeout),
+            ],
+            stdin=subprocess.DEVNULL,
+            stdout=out,
+            stderr=out,
+            start_new_session=True,
+        )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        connection = connect(path)
+        if connection is not None:
+            connection.close()
+            return proc.pid
+        if proc.poll() is not None:
+            raise RuntimeError(
+                f"The denvr agent exited with status {proc.returncode} (see {log})"
+            )
+        time.sleep(0.02)
+    proc.kill()
+    raise RuntimeError(f"Timed out waiting for the denvr agent to listen on {path}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    p = argparse.ArgumentParser(
+        prog="python -m denvr.agent", description="Run the denvr agent in the foreground"
+    )
+    p.add_argument("--socket", help=f"The Unix socket path (default: {DEFAULT_SOCKET_PATH})")
+    p.add_argument(
+        "--idle",
+        type=float,
+        default=DEFAULT_IDLE_TIMEOUT,
+        help="Exit after this many idle seconds (0 to never exit)",
+    )
+    args = p.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    agent = Agent(args.socket, idle_timeout=args.idle).start()
+    try:
+        agent.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        agent.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
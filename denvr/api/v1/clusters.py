@@ -1,12 +1,16 @@
 from __future__ import annotations
 
+from denvr.records import Record
 from denvr.validate import validate_kwargs
 
-from typing import TYPE_CHECKING, Any  # noqa: F401
+from typing import TYPE_CHECKING, Any, Iterator  # noqa: F401
 
 if TYPE_CHECKING:
     from denvr.session import Session
 
+# Response record types for each path, see `denvr.records.lookup`.
+RECORDS: dict[str, type[Record]] = {}
+
 
 class Client:
     def __init__(self, session: Session):
@@ -1,13 +1,214 @@
 from __future__ import annotations
 
+from denvr.records import Record
 from denvr.validate import validate_kwargs
 
-from typing import TYPE_CHECKING, Any  # noqa: F401
+from typing import TYPE_CHECKING, Any, Iterator  # noqa: F401
 
 if TYPE_CHECKING:
     from denvr.session import Session
 
 
+class GetApplicationsItem(Record):
+    """
+    Record for each of the `items` in the `get_applications` response.
+    """
+
+    __slots__ = (
+        "id",
+        "cluster",
+        "status",
+        "tenant",
+        "created_by",
+        "private_ip",
+        "public_ip",
+        "resource_pool",
+        "dns",
+        "ssh_username",
+        "application_catalog_item_name",
+        "application_catalog_item_version_name",
+        "hardware_package_name",
+        "persisted_direct_attached_storage",
+        "personal_shared_storage",
+        "tenant_shared_storage",
+    )
+
+
+class GetApplicationsResult(Record):
+    """
+    Record for the `get_applications` response.
+    """
+
+    __slots__ = ("items_",)
+    _nested = {"items": GetApplicationsItem}
+
+
+class GetApplicationDetailsResult(Record):
+    """
+    Record for the `get_application_details` response.
+    """
+
+    __slots__ = ("instance_details", "application_catalog_item", "hardware_package")
+
+
+class GetConfigurationsItem(Record):
+    """
+    Record for each of the `items` in the `get_configurations` response.
+    """
+
+    __slots__ = (
+        "name",
+        "description",
+        "gpu_count",
+        "gpu_type",
+        "gpu_brand",
+        "gpu_name",
+        "vcpus_count",
+        "memory_gb",
+        "direct_attached_storage_gb",
+        "price_per_hour",
+    )
+
+
+class GetConfigurationsResult(Record):
+    """
+    Record for the `get_configurations` response.
+    """
+
+    __slots__ = ("items_",)
+    _nested = {"items": GetConfigurationsItem}
+
+
+class GetAvailabilityResult(Record):
+    """
+    Record for the `get_availability` response.
+    """
+
+    __slots__ = ("items_",)
+
+
+class GetApplicationCatalogItemsItemVersion(Record):
+    """
+    Record for each of the `versions` in each of the `items` in the `get_application_catalog_items` response.
+    """
+
+    __slots__ = (
+        "name",
+        "image_url",
+        "image_last_push_date",
+        "platform",
+        "launch_type",
+        "release_notes_url",
+    )
+
+
+class GetApplicationCatalogItemsItem(Record):
+    """
+    Record for each of the `items` in the `get_application_catalog_items` response.
+    """
+
+    __slots__ = ("name", "application_source_details_url", "versions")
+    _nested = {"versions": GetApplicationCatalogItemsItemVersion}
+
+
+class GetApplicationCatalogItemsResult(Record):
+    """
+    Record for the `get_application_catalog_items` response.
+    """
+
+    __slots__ = ("items_",)
+    _nested = {"items": GetApplicationCatalogItemsItem}
+
+
+class CreateCatalogApplicationResult(Record):
+    """
+    Record for the `create_catalog_application` response.
+    """
+
+    __slots__ = (
+        "id",
+        "cluster",
+        "status",
+        "tenant",
+        "created_by",
+        "private_ip",
+        "public_ip",
+        "resource_pool",
+        "dns",
+        "ssh_username",
+        "application_catalog_item_name",
+        "application_catalog_item_version_name",
+        "hardware_package_name",
+        "persisted_direct_attached_storage",
+        "personal_shared_storage",
+        "tenant_shared_storage",
+    )
+
+
+class CreateCustomApplicationResult(Record):
+    """
+    Record for the `create_custom_application` response.
+    """
+
+    __slots__ = (
+        "id",
+        "cluster",
+        "status",
+        "tenant",
+        "created_by",
+        "private_ip",
+        "public_ip",
+        "resource_pool",
+        "dns",
+        "ssh_username",
+        "application_catalog_item_name",
+        "application_catalog_item_version_name",
+        "hardware_package_name",
+        "persisted_direct_attached_storage",
+        "personal_shared_storage",
+        "tenant_shared_storage",
+    )
+
+
+class StartApplicationResult(Record):
+    """
+    Record for the `start_application` response.
+    """
+
+    __slots__ = ("id", "cluster")
+
+
+class StopApplicationResult(Record):
+    """
+    Record for the `stop_application` response.
+    """
+
+    __slots__ = ("id", "cluster")
+
+
+class DestroyApplicationResult(Record):
+    """
+    Record for the `destroy_application` response.
+    """
+
+    __slots__ = ("id", "cluster")
+
+
+# Response record types for each path, see `denvr.records.lookup`.
+RECORDS: dict[str, type[Record]] = {
+    "/api/v1/servers/applications/GetApplications": GetApplicationsResult,
+    "/api/v1/servers/applications/GetApplicationDetails": GetApplicationDetailsResult,
+    "/api/v1/servers/applications/GetConfigurations": GetConfigurationsResult,
+    "/api/v1/servers/applications/GetAvailability": GetAvailabilityResult,
+    "/api/v1/servers/applications/GetApplicationCatalogItems": GetApplicationCatalogItemsResult,
+    "/api/v1/servers/applications/CreateCatalogApplication": CreateCatalogApplicationResult,
+    "/api/v1/servers/applications/CreateCustomApplication": CreateCustomApplicationResult,
+    "/api/v1/servers/applications/StartApplication": StartApplicationResult,
+    "/api/v1/servers/applications/StopApplication": StopApplicationResult,
+    "/api/v1/servers/applications/DestroyApplication": DestroyApplicationResult,
+}
+
+
 class Client:
     def __init__(self, session: Session):
         self.session = session
@@ -34,6 +235,26 @@ class Client:
             "get", "/api/v1/servers/applications/GetApplications", **kwargs
         )
 
+    def iter_applications(self) -> Iterator[dict]:
+        """
+        Get a list of applications, yielding each item as it's parsed from the response ::
+
+            for item in client.iter_applications():
+                ...
+
+        """
+        config = self.session.config  # noqa: F841
+
+        parameters: dict[str, dict] = {}
+
+        kwargs = validate_kwargs(
+            "get", "/api/v1/servers/applications/GetApplications", parameters, {}
+        )
+
+        return self.session.stream(
+            "get", "/api/v1/servers/applications/GetApplications", **kwargs
+        )
+
     def get_application_details(
         self, id: str | None = None, cluster: str | None = None
     ) -> dict:
@@ -1,13 +1,28 @@
 from __future__ import annotations
 
+from denvr.records import Record
 from denvr.validate import validate_kwargs
 
-from typing import TYPE_CHECKING, Any  # noqa: F401
+from typing import TYPE_CHECKING, Any, Iterator  # noqa: F401
 
 if TYPE_CHECKING:
     from denvr.session import Session
 
 
+class GetOperatingSystemImagesResult(Record):
+    """
+    Record for the `get_operating_system_images` response.
+    """
+
+    __slots__ = ("items_",)
+
+
+# Response record types for each path, see `denvr.records.lookup`.
+RECORDS: dict[str, type[Record]] = {
+    "/api/v1/servers/images/GetOperatingSystemImages": GetOperatingSystemImagesResult
+}
+
+
 class Client:
     def __init__(self, session: Session):
         self.session = session
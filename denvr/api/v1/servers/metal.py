@@ -1,13 +1,112 @@
 from __future__ import annotations
 
+from denvr.records import Record
 from denvr.validate import validate_kwargs
 
-from typing import TYPE_CHECKING, Any  # noqa: F401
+from typing import TYPE_CHECKING, Any, Iterator  # noqa: F401
 
 if TYPE_CHECKING:
     from denvr.session import Session
 
 
+class GetHostResult(Record):
+    """
+    Record for the `get_host` response.
+    """
+
+    __slots__ = (
+        "id",
+        "cluster",
+        "tenancy_name",
+        "node_type",
+        "image",
+        "private_ip",
+        "public_ip",
+        "provisioned_hostname",
+        "operational_status",
+        "powered_on",
+        "provisioning_state",
+    )
+
+
+class GetHostsItem(Record):
+    """
+    Record for each of the `items` in the `get_hosts` response.
+    """
+
+    __slots__ = (
+        "id",
+        "cluster",
+        "tenancy_name",
+        "node_type",
+        "image",
+        "private_ip",
+        "public_ip",
+        "provisioned_hostname",
+        "operational_status",
+        "powered_on",
+        "provisioning_state",
+    )
+
+
+class GetHostsResult(Record):
+    """
+    Record for the `get_hosts` response.
+    """
+
+    __slots__ = ("items_",)
+    _nested = {"items": GetHostsItem}
+
+
+class RebootHostResult(Record):
+    """
+    Record for the `reboot_host` response.
+    """
+
+    __slots__ = (
+        "id",
+        "cluster",
+        "tenancy_name",
+        "node_type",
+        "image",
+        "private_ip",
+        "public_ip",
+        "provisioned_hostname",
+        "operational_status",
+        "powered_on",
+        "provisioning_state",
+    )
+
+
+class ReprovisionHostResult(Record):
+    """
+    Record for the `reprovision_host` response.
+    """
+
+    __slots__ = (
+        "id",
+        "cluster",
+        "tenancy_name",
+        "node_type",
+        "image",
+        "private_ip",
+        "public_ip",
+        "provisioned_hostname",
+        "operational_status",
+        "powered_on",
+        "provisioning_state",
+    )
+
+
+# Response record types for each path, see `denvr.records.lookup`.
+RECORDS: dict[str, type[Record]] = {
+    "/api/v1/servers/metal/GetHost": GetHostResult,
+    "/api/v1/servers/metal/GetHosts": GetHostsResult,
+    "/api/v1/servers/metal/RebootHost": RebootHostResult,
+    "/api/v1/servers/metal/ReprovisionHost": ReprovisionHostResult,
+}
+
+
 class Client:
     def __init__(self, session: Session):
         self.session = session
@@ -72,6 +171,26 @@ class Client:
 
         return self.session.request("get", "/api/v1/servers/metal/GetHosts", **kwargs)
 
+    def iter_hosts(self, cluster: str | None = None) -> Iterator[dict]:
+        """
+        Get a list of bare metal hosts in a cluster, yielding each item as it's parsed from the response ::
+
+            for item in client.iter_hosts(cluster="Hou1"):
+                ...
+
+        Keyword Arguments:
+            cluster (str):
+        """
+        config = self.session.config  # noqa: F841
+
+        parameters: dict[str, dict] = {
+            "params": {"Cluster": config.getkwarg("cluster", cluster)}
+        }
+
+        kwargs = validate_kwargs("get", "/api/v1/servers/metal/GetHosts", parameters, {})
+
+        return self.session.stream("get", "/api/v1/servers/metal/GetHosts", **kwargs)
+
     def reboot_host(self, id: str | None = None, cluster: str | None = None) -> dict:
         """
         Reboot the bare metal host ::
@@ -1,13 +1,97 @@
 from __future__ import annotations
 
+from denvr.records import Record
 from denvr.validate import validate_kwargs
 
-from typing import TYPE_CHECKING, Any  # noqa: F401
+from typing import TYPE_CHECKING, Any, Iterator  # noqa: F401
 
 if TYPE_CHECKING:
     from denvr.session import Session
 
 
+class GetSnapshotsItem(Record):
+    """
+    Record for each of the `items` in the `get_snapshots` response.
+    """
+
+    __slots__ = (
+        "id",
+        "namespace",
+        "source_name",
+        "os_image",
+        "custom_package",
+        "root_disk_size",
+        "creation_date",
+        "username",
+        "tenancy_name",
+        "ready_to_use",
+    )
+
+
+class GetSnapshotsResult(Record):
+    """
+    Record for the `get_snapshots` response.
+    """
+
+    __slots__ = ("items_",)
+    _nested = {"items": GetSnapshotsItem}
+
+
+class GetSnapshotResult(Record):
+    """
+    Record for the `get_snapshot` response.
+    """
+
+    __slots__ = (
+        "id",
+        "namespace",
+        "source_name",
+        "os_image",
+        "custom_package",
+        "root_disk_size",
+        "creation_date",
+        "username",
+        "tenancy_name",
+        "ready_to_use",
+    )
+
+
+class CreateSnapshotResult(Record):
+    """
+    Record for the `create_snapshot` response.
+    """
+
+    __slots__ = (
+        "id",
+        "namespace",
+        "source_name",
+        "os_image",
+        "custom_package",
+        "root_disk_size",
+        "creation_date",
+        "username",
+        "tenancy_name",
+        "ready_to_use",
+    )
+
+
+class DeleteSnapshotResult(Record):
+    """
+    Record for the `delete_snapshot` response.
+    """
+
+    __slots__ = ("id",)
+
+
+# Response record types for each path, see `denvr.records.lookup`.
+RECORDS: dict[str, type[Record]] = {
+    "/api/v1/servers/snapshots/GetSnapshots": GetSnapshotsResult,
+    "/api/v1/servers/snapshots/GetSnapshot": GetSnapshotResult,
+    "/api/v1/servers/snapshots/CreateSnapshot": CreateSnapshotResult,
+    "/api/v1/servers/snapshots/DeleteSnapshot": DeleteSnapshotResult,
+}
+
+
 class Client:
     def __init__(self, session: Session):
         self.session = session
@@ -36,6 +120,28 @@ class Client:
 
         return self.session.request("get", "/api/v1/servers/snapshots/GetSnapshots", **kwargs)
 
+    def iter_snapshots(self, cluster: str | None = None) -> Iterator[dict]:
+        """
+        Get list of snapshots, yielding each item as it's parsed from the response ::
+
+            for item in client.iter_snapshots(cluster="Cluster"):
+                ...
+
+        Keyword Arguments:
+            cluster (str):
+        """
+        config = self.session.config  # noqa: F841
+
+        parameters: dict[str, dict] = {
+            "params": {"Cluster": config.getkwarg("cluster", cluster)}
+        }
+
+        kwargs = validate_kwargs(
+            "get", "/api/v1/servers/snapshots/GetSnapshots", parameters, {}
+        )
+
+        return self.session.stream("get", "/api/v1/servers/snapshots/GetSnapshots", **kwargs)
+
     def get_snapshot(
         self, id: str | None = None, namespace: str | None = None, cluster: str | None = None
     ) -> dict:
@@ -1,13 +1,198 @@
 from __future__ import annotations
 
+from denvr.records import Record
 from denvr.validate import validate_kwargs
 
-from typing import TYPE_CHECKING, Any  # noqa: F401
+from typing import TYPE_CHECKING, Any, Iterator  # noqa: F401
 
 if TYPE_CHECKING:
     from denvr.session import Session
 
 
+class GetServersItem(Record):
+    """
+    Record for each of the `items` in the `get_servers` response.
+    """
+
+    __slots__ = (
+        "username",
+        "tenancy_name",
+        "rpool",
+        "direct_attached_storage_persisted",
+        "id",
+        "namespace",
+        "configuration",
+        "storage",
+        "gpu_type",
+        "gpus",
+        "vcpus",
+        "memory",
+        "ip",
+        "private_ip",
+        "image",
+        "cluster",
+        "node_selector",
+        "status",
+        "storage_type",
+        "root_disk_size",
+        "last_updated",
+    )
+
+
+class GetServersResult(Record):
+    """
+    Record for the `get_servers` response.
+    """
+
+    __slots__ = ("items_",)
+    _nested = {"items": GetServersItem}
+
+
+class GetServerResult(Record):
+    """
+    Record for the `get_server` response.
+    """
+
+    __slots__ = (
+        "username",
+        "tenancy_name",
+        "rpool",
+        "direct_attached_storage_persisted",
+        "id",
+        "namespace",
+        "configuration",
+        "storage",
+        "gpu_type",
+        "gpus",
+        "vcpus",
+        "memory",
+        "ip",
+        "private_ip",
+        "image",
+        "cluster",
+        "node_selector",
+        "status",
+        "storage_type",
+        "root_disk_size",
+        "last_updated",
+    )
+
+
+class CreateServerResult(Record):
+    """
+    Record for the `create_server` response.
+    """
+
+    __slots__ = (
+        "username",
+        "tenancy_name",
+        "rpool",
+        "direct_attached_storage_persisted",
+        "id",
+        "namespace",
+        "configuration",
+        "storage",
+        "gpu_type",
+        "gpus",
+        "vcpus",
+        "memory",
+        "ip",
+        "private_ip",
+        "image",
+        "cluster",
+        "node_selector",
+        "status",
+        "storage_type",
+        "root_disk_size",
+        "last_updated",
+    )
+
+
+class StartServerResult(Record):
+    """
+    Record for the `start_server` response.
+    """
+
+    __slots__ = ("id", "cluster", "status")
+
+
+class StopServerResult(Record):
+    """
+    Record for the `stop_server` response.
+    """
+
+    __slots__ = ("id", "cluster", "status")
+
+
+class DestroyServerResult(Record):
+    """
+    Record for the `destroy_server` response.
+    """
+
+    __slots__ = ("id", "cluster", "status")
+
+
+class GetConfigurationsItem(Record):
+    """
+    Record for each of the `items` in the `get_configurations` response.
+    """
+
+    __slots__ = (
+        "id",
+        "user_friendly_name",
+        "name",
+        "description",
+        "os_version",
+        "os_type",
+        "storage",
+        "gpu_type",
+        "gpu_family",
+        "gpu_brand",
+        "gpu_name",
+        "type",
+        "brand_family",
+        "brand",
+        "text_name",
+        "gpus",
+        "vcpus",
+        "memory",
+        "price",
+        "compute_network",
+        "is_gpu_platform",
+        "clusters",
+    )
+
+
+class GetConfigurationsResult(Record):
+    """
+    Record for the `get_configurations` response.
+    """
+
+    __slots__ = ("items_",)
+    _nested = {"items": GetConfigurationsItem}
+
+
+class GetAvailabilityResult(Record):
+    """
+    Record for the `get_availability` response.
+    """
+
+    __slots__ = ("items_",)
+
+
+# Response record types for each path, see `denvr.records.lookup`.
+RECORDS: dict[str, type[Record]] = {
+    "/api/v1/servers/virtual/GetServers": GetServersResult,
+    "/api/v1/servers/virtual/GetServer": GetServerResult,
+    "/api/v1/servers/virtual/CreateServer": CreateServerResult,
+    "/api/v1/servers/virtual/StartServer": StartServerResult,
+    "/api/v1/servers/virtual/StopServer": StopServerResult,
+    "/api/v1/servers/virtual/DestroyServer": DestroyServerResult,
+    "/api/v1/servers/virtual/GetConfigurations": GetConfigurationsResult,
+    "/api/v1/servers/virtual/GetAvailability": GetAvailabilityResult,
+}
+
+
 class Client:
     def __init__(self, session: Session):
         self.session = session
@@ -34,6 +219,26 @@ class Client:
 
         return self.session.request("get", "/api/v1/servers/virtual/GetServers", **kwargs)
 
+    def iter_servers(self, cluster: str | None = None) -> Iterator[dict]:
+        """
+        Get a list of virtual machines, yielding each item as it's parsed from the response ::
+
+            for item in client.iter_servers(cluster="Cluster"):
+                ...
+
+        Keyword Arguments:
+            cluster (str):
+        """
+        config = self.session.config  # noqa: F841
+
+        parameters: dict[str, dict] = {
+            "params": {"Cluster": config.getkwarg("cluster", cluster)}
+        }
+
+        kwargs = validate_kwargs("get", "/api/v1/servers/virtual/GetServers", parameters, {})
+
+        return self.session.stream("get", "/api/v1/servers/virtual/GetServers", **kwargs)
+
     def get_server(
         self, id: str | None = None, namespace: str | None = None, cluster: str | None = None
     ) -> dict:
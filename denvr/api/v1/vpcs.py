@@ -1,13 +1,100 @@
 from __future__ import annotations
 
+from denvr.records import Record
 from denvr.validate import validate_kwargs
 
-from typing import TYPE_CHECKING, Any  # noqa: F401
+from typing import TYPE_CHECKING, Any, Iterator  # noqa: F401
 
 if TYPE_CHECKING:
     from denvr.session import Session
 
 
+class GetVpcsItem(Record):
+    """
+    Record for each of the `items` in the `get_vpcs` response.
+    """
+
+    __slots__ = (
+        "id",
+        "name",
+        "cluster",
+        "tenancy_name",
+        "ip_range",
+        "created_at",
+        "block_intra_vpc_comms",
+        "is_default",
+    )
+
+
+class GetVpcsResult(Record):
+    """
+    Record for the `get_vpcs` response.
+    """
+
+    __slots__ = ("items_",)
+    _nested = {"items": GetVpcsItem}
+
+
+class GetVpcResult(Record):
+    """
+    Record for the `get_vpc` response.
+    """
+
+    __slots__ = (
+        "id",
+        "name",
+        "cluster",
+        "tenancy_name",
+        "ip_range",
+        "created_at",
+        "block_intra_vpc_comms",
+        "is_default",
+    )
+
+
+class CreateVpcResult(Record):
+    """
+    Record for the `create_vpc` response.
+    """
+
+    __slots__ = (
+        "id",
+        "name",
+        "cluster",
+        "tenancy_name",
+        "ip_range",
+        "created_at",
+        "block_intra_vpc_comms",
+        "is_default",
+    )
+
+
+class DestroyVpcResult(Record):
+    """
+    Record for the `destroy_vpc` response.
+    """
+
+    __slots__ = (
+        "id",
+        "name",
+        "cluster",
+        "tenancy_name",
+        "ip_range",
+        "created_at",
+        "block_intra_vpc_comms",
+        "is_default",
+    )
+
+
+# Response record types for each path, see `denvr.records.lookup`.
+RECORDS: dict[str, type[Record]] = {
+    "/api/v1/vpcs/GetVpcs": GetVpcsResult,
+    "/api/v1/vpcs/GetVpc": GetVpcResult,
+    "/api/v1/vpcs/CreateVpc": CreateVpcResult,
+    "/api/v1/vpcs/DestroyVpc": DestroyVpcResult,
+}
+
+
 class Client:
     def __init__(self, session: Session):
         self.session = session
@@ -34,6 +121,26 @@ class Client:
 
         return self.session.request("get", "/api/v1/vpcs/GetVpcs", **kwargs)
 
+    def iter_vpcs(self, cluster: str | None = None) -> Iterator[dict]:
+        """
+        Get a list of VPCs, yielding each item as it's parsed from the response ::
+
+            for item in client.iter_vpcs(cluster="cluster"):
+                ...
+
+        Keyword Arguments:
+            cluster (str):
+        """
+        config = self.session.config  # noqa: F841
+
+        parameters: dict[str, dict] = {
+            "params": {"cluster": config.getkwarg("cluster", cluster)}
+        }
+
+        kwargs = validate_kwargs("get", "/api/v1/vpcs/GetVpcs", parameters, {})
+
+        return self.session.stream("get", "/api/v1/vpcs/GetVpcs", **kwargs)
+
     def get_vpc(self, id: str | None = None, cluster: str | None = None) -> dict:
         """
         Get detailed information about a specific VPC ::
@@ -5,6 +5,7 @@ import requests
 from requests.adapters import HTTPAdapter
 from requests.auth import AuthBase
 
+from denvr import tracing
 from denvr.utils import retry
 
 
@@ -78,11 +79,12 @@ class Bearer(AuthBase):
 
         # Requests an initial authorization token
         # storing the username, password, token / refresh tokens and when they expire
-        resp = self._session.post(
-            f"{self._server}/api/TokenAuth/Authenticate",
-            json={"userNameOrEmailAddress": username, "password": password},
-        )
-        resp.raise_for_status()
+        with tracing.span("denvr.auth.authenticate", **{"server.address": self._server}):
+            resp = self._session.post(
+                f"{self._server}/api/TokenAuth/Authenticate",
+                json={"userNameOrEmailAddress": username, "password": password},
+            )
+            resp.raise_for_status()
         content = resp.json()["result"]
         self._access_token = content["accessToken"]
         self._refresh_token = content["refreshToken"]
@@ -95,11 +97,12 @@ class Bearer(AuthBase):
             raise Exception("Auth refresh token has expired. Unable to refresh access token.")
 
         if time.time() > self._access_expires:
-            resp = self._session.get(
-                f"{self._server}/api/TokenAuth/RefreshToken",
-                params={"refreshToken": self._refresh_token},
-            )
-            resp.raise_for_status()
+            with tracing.span("denvr.auth.refresh", **{"server.address": self._server}):
+                resp = self._session.get(
+                    f"{self._server}/api/TokenAuth/RefreshToken",
+                    params={"refreshToken": self._refresh_token},
+                )
+                resp.raise_for_status()
             content = resp.json()["result"]
             self._access_token = content["accessToken"]
             self._access_expires = time.time() + content["expireInSeconds"]
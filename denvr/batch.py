@@ -0,0 +1,298 @@
+"""
+Run a batch of client operations from a JSON lines manifest, e.g., a change set generated by a script:
+
+    {"service": "servers/virtual", "method": "stop_server", "kwargs": {"id": "vm-1", "namespace": "denvr"}, "wait": true}
+    {"service": "vpcs", "method": "destroy_vpc", "kwargs": {"id": "vpc-1", "cluster": "Hou1"}, "id": "vpc-1"}
+
+Operations run concurrently, with a limit on the operations in flight for each service, and their results
+are yielded (or written by `denvr batch`) as they complete. With `"wait": true`, the operation runs through
+its waiter (see `denvr.waiters.waiter`), e.g., until a stopped VM is OFFLINE.
+
+Completed operations are appended to a checkpoint file, so rerunning a manifest after a crash (or
+after fixing failed operations) skips them. Operations are identified by their `id`, if given, or
+by their contents (and occurrence), so the manifest can be regenerated in a different order.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import IO, Any, Iterable, Iterator
+
+from denvr.inventory import clients
+from denvr.session import Session
+from denvr.waiters import waiter
+
+logger = logging.getLogger(__name__)
+
+# Operations in flight for services without a limit
+DEFAULT_CONCURRENCY = 4
+
+
+class Operation:
+    """
+    Operation(service, method, kwargs=None, wait=False, id=None)
+
+    A client method call (e.g., `servers/virtual` `stop_server`) from a batch manifest.
+    """
+
+    __slots__ = ("service", "method", "kwargs", "wait", "id", "line", "key")
+
+    def __init__(
+        self,
+        service: str,
+        method: str,
+        kwargs: dict | None = None,
+        wait: bool = False,
+        id: str | None = None,
+        line: int | None = None,
+    ):
+        self.service = service
+        self.method = method
+        self.kwargs = kwargs or {}
+        self.wait = wait
+        self.id = id
+        self.line = line
+        self.key = id or self.digest()
+
+    def digest(self) -> str:
+        content = json.dumps(
+            [self.service, self.method, self.kwargs, self.wait], sort_keys=True, default=str
+        )
+        return hashlib.sha1(content.encode()).hexdigest()[:16]
+
+    @classmethod
+    def from_dict(cls, value: dict, line: int | None = None) -> Operation:
+        unknown = set(value) - {"service", "method", "kwargs", "wait", "id"}
+        if unknown:
+            raise ValueError(f"Unknown operation fields {sorted(unknown)}")
+        if not value.get("service") or not value.get("method"):
+            raise ValueError("Operations need a `service` and `method`")
+        return cls(
+            value["service"],
+            value["method"],
+            value.get("kwargs"),
+            bool(value.get("wait", False)),
+            value.get("id"),
+            line,
+        )
+
+    def __repr__(self) -> str:
+        return f"Operation({self.service!r}, {self.method!r}, key={self.key!r})"
+
+
+def load(lines: Iterable[str]) -> list[Operation]:
+    """
+    Parse the operations from the lines of a JSON lines manifest, skipping blank lines.
+    Operations with the same contents and no `id` are numbered by their occurrence, so each one runs.
+
+    Raises:
+        ValueError: For an invalid line, with its line number.
+    """
+    operations = []
+    seen: Counter = Counter()
+    for n, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            op = Operation.from_dict(json.loads(line), line=n)
+        except (ValueError, TypeError, AttributeError) as e:
+            raise ValueError(f"Invalid operation on line {n}: {e}") from None
+        seen[op.key] += 1
+        if seen[op.key] > 1:
+            op.key = f"{op.key}#{seen[op.key]}"
+        operations.append(op)
+    return operations
+
+
+class Checkpoint:
+    """
+    Checkpoint(path)
+
+    An append only file with the key of each completed operation, one per line.
+    Each key is flushed as it's added, so it survives the process crashing.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.done: set[str] = set()
+        if os.path.exists(path):
+            with open(path) as f:
+                self.done.update(line.strip() for line in f if line.strip())
+        self._file: IO[str] | None = None
+        self._lock = threading.Lock()
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.done
+
+    def __len__(self) -> int:
+        return len(self.done)
+
+    def add(self, key: str):
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "a")
+            self._file.write(key + "\n")
+            self._file.flush()
+            self.done.add(key)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class Batch:
+    """
+    Batch(session, limits=None, concurrency=DEFAULT_CONCURRENCY, checkpoint=None, interval=30, timeout=600)
+
+    Runs batches of operations with at most `limits[service]` (or `concurrency`) operations in flight
+    for each service.
+
+    Example:
+
+        batch = Batch(Session(config()), limits={"servers/virtual": 8}, checkpoint="changes.done")
+        with open("changes.jsonl") as f:
+            for result in batch.run(load(f)):
+                print(result["key"], result["ok"])
+
+    Args:
+        session: The session shared by all operations.
+        limits: The maximum operations in flight for each service (e.g., "servers/virtual").
+        concurrency: The maximum operations in flight for any other service.
+        checkpoint: A `Checkpoint` (or its path) of completed operations to skip.
+        interval: The poll interval in seconds for operations with `wait`.
+        timeout: The timeout in seconds for operations with `wait`.
+    """
+
+    def __init__(
+        self,
+        session: Session,
+        limits: dict[str, int] | None = None,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        checkpoint: Checkpoint | str | None = None,
+        interval: float = 30,
+        timeout: float = 600,
+    ):
+        self.session = session
+        self.limits = limits or {}
+        self.concurrency = concurrency
+        self.checkpoint = Checkpoint(checkpoint) if isinstance(checkpoint, str) else checkpoint
+        self.interval = interval
+        self.timeout = timeout
+        self.clients: dict[str, Any] = {}
+        self.counts: Counter = Counter()
+
+    def limit(self, service: str) -> int:
+        return max(self.limits.get(service, self.concurrency), 1)
+
+    def prepare(self, operations: Iterable[Operation]) -> list[Operation]:
+        """
+        Load the clients for the operations and check their methods (and waiters) exist,
+        so a typo fails the batch before any operations run.
+
+        Raises:
+            ValueError: For an unknown service, method or unsupported waiter.
+        """
+        operations = list(operations)
+        for op in operations:
+            where = f" on line {op.line}" if op.line else ""
+            if op.service not in self.clients:
+                try:
+                    self.clients.update(clients(self.session, [op.service]))
+                except ImportError:
+                    raise ValueError(f"Unknown service {op.service!r}{where}") from None
+            method = getattr(self.clients[op.service], op.method, None)
+            if op.method.startswith("_") or not callable(method):
+                raise ValueError(f"Unknown method {op.service}.{op.method}{where}")
+            if op.wait:
+                waiter(method)
+        return operations
+
+    def execute(self, op: Operation) -> dict:
+        """
+        Run an operation, returning its result (or error) and elapsed time.
+        """
+        result: dict[str, Any] = {
+            "key": op.key,
+            "line": op.line,
+            "service": op.service,
+            "method": op.method,
+        }
+        start = time.perf_counter()
+        try:
+            method = getattr(self.clients[op.service], op.method)
+            if op.wait:
+                value = waiter(method)(
+                    interval=self.interval, timeout=self.timeout, **op.kwargs
+                )
+            else:
+                value = method(**op.kwargs)
+            result.update(ok=True, result=value)
+        except Exception as e:
+            response = getattr(e, "response", None)
+            error = {"type": type(e).__name__, "message": str(e)}
+            if response is not None:
+                error["status"] = response.status_code
+            result.update(ok=False, error=error)
+        result["elapsed"] = time.perf_counter() - start
+        return result
+
+    def run(self, operations: Iterable[Operation]) -> Iterator[dict]:
+        """
+        Run the operations (skipping any in the checkpoint) and yield their results in completion order.
+        Successful operations are added to the checkpoint before their results are yielded,
+        while failed operations are run again by the next batch.
+        """
+        pending: dict[str, deque[Operation]] = {}
+        for op in self.prepare(operations):
+            if self.checkpoint is not None and op.key in self.checkpoint:
+                self.counts["skipped"] += 1
+                continue
+            pending.setdefault(op.service, deque()).append(op)
+        if not pending:
+            return
+
+        running: dict[Future, Operation] = {}
+        in_flight: Counter = Counter()
+        workers = sum(min(self.limit(service), len(ops)) for service, ops in pending.items())
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                while pending or running:
+                    # Start operations for each service up to its limit, in manifest order
+                    for service in list(pending):
+                        queue = pending[service]
+                        while queue and in_flight[service] < self.limit(service):
+                            op = queue.popleft()
+                            running[executor.submit(self.execute, op)] = op
+                            in_flight[service] += 1
+                        if not queue:
+                            del pending[service]
+
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        op = running.pop(future)
+                        in_flight[op.service] -= 1
+                        result = future.result()
+                        self.counts["ok" if result["ok"] else "failed"] += 1
+                        if result["ok"] and self.checkpoint is not None:
+                            self.checkpoint.add(op.key)
+                        if not result["ok"]:
+                            logger.warning(
+                                "Failed %s.%s (%s): %s",
+                                op.service,
+                                op.method,
+                                op.key,
+                                result["error"]["message"],
+                            )
+                        yield result
+        finally:
+            if self.checkpoint is not None:
+                self.checkpoint.close()
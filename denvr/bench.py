@@ -0,0 +1,357 @@
+"""
+Drive a weighted mix of client operations against a Denvr API server at a target request rate
+(open loop) or concurrency (closed loop), and report the throughput, latency percentiles, errors
+and SDK CPU time per HTTP request.
+
+    denvr-bench --duration 30 --concurrency 8
+    denvr-bench --rps 200 --mix get_server=70,get_servers=20,create_server=10
+    denvr-bench --server http://127.0.0.1:8080 --no-auth --json
+
+Without `--server`, a fake Denvr API server (`denvr.testing.FakeServer`) is started in process.
+
+With `--rps`, operations are scheduled at fixed intervals and their latency is measured from when they
+were scheduled, so time spent queued behind slow operations counts (avoiding coordinated omission).
+The `create_server` operation waits for the VM to come online. Each VM is then destroyed, which is timed
+and reported as a separate `destroy_server` operation.
+SDK CPU is the CPU time of the client threads, which excludes time waiting on the network.
+
+The SDK only has a synchronous client, so there's no async path to compare against yet. Each worker
+thread has its own `Session` instead, so compare runs at different `--concurrency` (and `--rps`).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+from collections import Counter, defaultdict
+from functools import partial
+from typing import Any, Callable
+
+from requests import HTTPError
+
+from denvr.api.v1.servers import virtual
+from denvr.auth import auth
+from denvr.config import Config, load
+from denvr.session import Session
+from denvr.waiters import waiter
+
+OPERATIONS = ("get_server", "get_servers", "create_server")
+
+DEFAULT_MIX = "get_server=70,get_servers=20,create_server=10"
+
+# Arguments for the VMs created by the `create_server` operation
+VM: dict[str, Any] = {
+    "rpool": "on-demand",
+    "vpc": "denvr",
+    "configuration": "A100_40GB_PCIe_1x",
+    "ssh_keys": ["ssh-ed25519 AAAA denvr-bench"],
+}
+
+
+def parse_mix(spec: str) -> dict[str, float]:
+    """
+    Parse an operation mix like "get_server=70,get_servers=30" into normalized weights.
+    """
+    mix = {}
+    for item in spec.split(","):
+        name, _, weight = item.strip().partition("=")
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation {name!r}, expected one of {list(OPERATIONS)}")
+        mix[name] = float(weight or 1)
+    total = sum(mix.values())
+    if total <= 0:
+        raise ValueError(f"Operation weights must be positive: {spec!r}")
+    return {name: weight / total for name, weight in mix.items()}
+
+
+def percentile(values: list[float], q: float) -> float:
+    return values[min(int(len(values) * q), len(values) - 1)] if values else 0.0
+
+
+class Worker:
+    """
+    A client thread with its own session, which records the latency and errors of each operation.
+    """
+
+    def __init__(self, bench: Bench, index: int):
+        self.bench = bench
+        self.index = index
+        self.session = Session(bench.config)
+        self.client = virtual.Client(self.session)
+        self.random = random.Random(bench.seed + index)
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: Counter = Counter()
+        self.cpu = 0.0
+        self.created = 0
+        self.destroy: list[dict] = []
+
+    def get_server(self):
+        vm = self.random.choice(self.bench.vms)
+        self.client.get_server(id=vm["id"], namespace=vm["namespace"], cluster=vm["cluster"])
+
+    def get_servers(self):
+        self.client.get_servers(cluster=self.bench.cluster)
+
+    def create_server(self):
+        self.created += 1
+        name = f"bench-{os.getpid()}-{self.index}-{self.created}"
+        create = waiter(self.client.create_server)
+        vm = create(
+            interval=self.bench.interval,
+            timeout=self.bench.wait_timeout,
+            name=name,
+            cluster=self.bench.cluster,
+            **VM,
+        )
+        # Destroyed after the create is timed, so long runs don't exhaust the capacity
+        self.destroy.append(vm)
+
+    def destroy_servers(self):
+        while self.destroy:
+            vm = self.destroy.pop()
+            destroy = partial(
+                self.client.destroy_server,
+                id=vm["id"],
+                namespace=vm["namespace"],
+                cluster=vm["cluster"],
+            )
+            self.run("destroy_server", destroy)
+
+    def run(self, name: str, operation: Callable[[], Any], scheduled: float | None = None):
+        start = time.perf_counter()
+        try:
+            operation()
+        except HTTPError as e:
+            status = e.response.status_code if e.response is not None else "HTTPError"
+            self.errors[(name, str(status))] += 1
+            return
+        except Exception as e:
+            self.errors[(name, type(e).__name__)] += 1
+            return
+        self.latencies[name].append(time.perf_counter() - (scheduled or start))
+
+    def __call__(self):
+        bench = self.bench
+        names = list(bench.mix)
+        weights = list(bench.mix.values())
+        cpu = time.thread_time()
+        while True:
+            scheduled = bench.next_slot()
+            if scheduled is None:
+                break
+            if scheduled:
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            name = self.random.choices(names, weights)[0]
+            self.run(name, getattr(self, name), scheduled)
+            self.destroy_servers()
+        self.cpu = time.thread_time() - cpu
+
+
+class Bench:
+    """
+    Bench(config, mix, duration=10.0, concurrency=4, rps=None, cluster="Msc1", interval=0.5, wait_timeout=300, seed=0)
+
+    Runs `concurrency` workers for `duration` seconds, each starting a new operation as soon as the last one
+    finishes or, with `rps`, at the next slot of a shared fixed rate schedule.
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        mix: dict[str, float],
+        duration: float = 10.0,
+        concurrency: int = 4,
+        rps: float | None = None,
+        cluster: str = "Msc1",
+        interval: float = 0.5,
+        wait_timeout: float = 300,
+        seed: int = 0,
+    ):
+        self.config = config
+        self.mix = mix
+        self.duration = duration
+        self.concurrency = concurrency
+        self.rps = rps
+        self.cluster = cluster
+        self.interval = interval
+        self.wait_timeout = wait_timeout
+        self.seed = seed
+        self.vms: list[dict] = []
+        self._lock = threading.Lock()
+        self._slot = 0.0
+        self._deadline = 0.0
+
+    def next_slot(self) -> float | None:
+        """
+        When to start the next operation (0 for now), or `None` once the duration has passed.
+        """
+        now = time.perf_counter()
+        if now >= self._deadline:
+            return None
+        if not self.rps:
+            return 0.0
+        with self._lock:
+            slot = self._slot
+            self._slot += 1 / self.rps
+        return slot if slot < self._deadline else None
+
+    def run(self) -> dict:
+        if "get_server" in self.mix:
+            self.vms = virtual.Client(Session(self.config)).get_servers(cluster=self.cluster)[
+                "items"
+            ]
+            if not self.vms:
+                raise ValueError(f"get_server needs existing VMs in {self.cluster}")
+
+        workers = [Worker(self, i) for i in range(self.concurrency)]
+        threads = [threading.Thread(target=w, daemon=True) for w in workers]
+        start = time.perf_counter()
+        self._slot = start
+        self._deadline = start + self.duration
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return self.report(workers, time.perf_counter() - start)
+
+    def report(self, workers: list[Worker], elapsed: float) -> dict:
+        latencies: dict[str, list[float]] = defaultdict(list)
+        errors: Counter = Counter()
+        for w in workers:
+            for name, values in w.latencies.items():
+                latencies[name].extend(values)
+            errors.update(w.errors)
+        requests = sum(w.session.counters["requests"] for w in workers)
+        cpu = sum(w.cpu for w in workers)
+        ok = sum(len(v) for v in latencies.values())
+
+        operations = {}
+        for name in sorted(set(latencies) | {name for name, _ in errors}):
+            values = sorted(latencies[name])
+            operations[name] = {
+                "ok": len(values),
+                "errors": sum(n for (op, _), n in errors.items() if op == name),
+                "p50": percentile(values, 0.5),
+                "p90": percentile(values, 0.9),
+                "p99": percentile(values, 0.99),
+                "max": values[-1] if values else 0.0,
+            }
+        return {
+            "elapsed": elapsed,
+            "concurrency": self.concurrency,
+            "target_rps": self.rps,
+            "operations": operations,
+            "errors": {f"{op} {error}": n for (op, error), n in sorted(errors.items())},
+            "throughput": ok / elapsed,
+            "requests": requests,
+            "requests_per_second": requests / elapsed,
+            "cpu_per_request": cpu / requests if requests else 0.0,
+        }
+
+
+def format_report(report: dict) -> str:
+    mode = f"{report['target_rps']:g} rps" if report["target_rps"] else "closed loop"
+    lines = [
+        f"{report['elapsed']:.1f}s, concurrency {report['concurrency']}, {mode}",
+        f"{'operation':<16} {'ok':>7} {'errors':>7} {'p50 ms':>8} {'p90 ms':>8} "
+        f"{'p99 ms':>8} {'max ms':>8}",
+    ]
+    for name, op in report["operations"].items():
+        lines.append(
+            f"{name:<16} {op['ok']:>7} {op['errors']:>7} {op['p50'] * 1e3:>8.1f} "
+            f"{op['p90'] * 1e3:>8.1f} {op['p99'] * 1e3:>8.1f} {op['max'] * 1e3:>8.1f}"
+        )
+    lines.append(
+        f"throughput {report['throughput']:.1f} ops/s, {report['requests']} requests "
+        f"({report['requests_per_second']:.1f}/s), "
+        f"SDK CPU {report['cpu_per_request'] * 1e6:.0f}us/request"
+    )
+    for error, n in report["errors"].items():
+        lines.append(f"error {error}: {n}")
+    return "\n".join(lines)
+
+
+def parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(
+        prog="denvr-bench",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    p.add_argument("--server", help="The API server (default: an in process fake server)")
+    p.add_argument("--config", help="Path to the denvr.toml config file for credentials")
+    p.add_argument("--no-auth", action="store_true", help="Don't authenticate with --server")
+    p.add_argument(
+        "--mix", default=DEFAULT_MIX, help=f"Operation weights (default: {DEFAULT_MIX})"
+    )
+    p.add_argument("--duration", type=float, default=10.0, help="Seconds to run for")
+    p.add_argument("--concurrency", type=int, default=4, help="Client threads")
+    p.add_argument(
+        "--rps", type=float, help="Target operations per second (default: closed loop)"
+    )
+    p.add_argument("--cluster", default="Msc1")
+    p.add_argument(
+        "--interval", type=float, default=0.5, help="Waiter poll interval in seconds"
+    )
+    p.add_argument("--retries", type=int, default=0, help="Retries for each request")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--fake-servers", type=int, default=100, help="VMs in the fake server")
+    p.add_argument("--json", action="store_true", help="Output the report as JSON")
+    return p
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parser().parse_args(argv)
+    mix = parse_mix(args.mix)
+    defaults = {"retries": args.retries, "cluster": args.cluster, "revalidate": False}
+
+    fake = None
+    if args.server:
+        credentials = None
+        if not args.no_auth:
+            config_path, contents = load(args.config)
+            credentials = auth(
+                config_path, contents.get("credentials", {}), args.server, args.retries
+            )
+        config = Config(defaults={"server": args.server, **defaults}, auth=credentials)
+    else:
+        from denvr.testing import FakeServer, State
+
+        # Fast lifecycles and unlimited capacity, so the waiter and create rate are what's measured
+        state = State(
+            durations={"planned": 0.1, "pending": 0.2, "destroy": 0.1},
+            capacity={(args.cluster, VM["configuration"]): sys.maxsize},
+        )
+        state.populate(args.fake_servers, cluster=args.cluster)
+        fake = FakeServer(state).start()
+        config = Config(defaults={"server": fake.url, **defaults}, auth=None)
+
+    try:
+        bench = Bench(
+            config,
+            mix,
+            duration=args.duration,
+            concurrency=args.concurrency,
+            rps=args.rps,
+            cluster=args.cluster,
+            interval=args.interval,
+            seed=args.seed,
+        )
+        report = bench.run()
+    finally:
+        if fake is not None:
+            fake.stop()
+
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+import weakref
+
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    import sqlite3
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.join(
+    os.getenv("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")),
+    "denvr",
+    "cache.sqlite",
+)
+
+# Seconds to cache GET responses for by path.
+# Paths without a TTL (or with a TTL of 0) aren't cached.
+DEFAULT_TTLS = {
+    "/api/v1/clusters/GetAll": 3600,
+    "/api/v1/servers/applications/GetConfigurations": 3600,
+    "/api/v1/servers/applications/GetApplicationCatalogItems": 3600,
+    "/api/v1/servers/applications/GetApplications": 30,
+    "/api/v1/servers/images/GetOperatingSystemImages": 3600,
+    "/api/v1/servers/metal/GetHosts": 30,
+    "/api/v1/servers/snapshots/GetSnapshots": 30,
+    "/api/v1/servers/virtual/GetConfigurations": 3600,
+    "/api/v1/servers/virtual/GetServers": 30,
+    "/api/v1/vpcs/GetVpcs": 300,
+}
+
+# Hit and miss counts are kept in memory and written after this many lookups or seconds (and at exit),
+# so cache hits don't take the database's write lock
+FLUSH_LOOKUPS = 100
+FLUSH_INTERVAL = 10.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    body TEXT NOT NULL,
+    created REAL NOT NULL,
+    expires REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_path ON entries (path);
+CREATE TABLE IF NOT EXISTS counters (
+    path TEXT PRIMARY KEY,
+    hits INTEGER NOT NULL DEFAULT 0,
+    misses INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+class Cache:
+    """
+    Cache(path=DEFAULT_CACHE_PATH, ttls=None)
+
+    A local SQLite store of GET responses shared by all processes on a host (e.g., CLI invocations and cron jobs).
+    The database uses WAL mode, so readers don't block on a concurrent writer.
+
+    Responses are keyed by a scope (e.g., the server and tenant), path and query parameters, and expire
+    after the TTL for their path.
+    Any mutating request (e.g., `create_server`) invalidates the cached responses of the same service and scope.
+
+    Args:
+        path (str): The SQLite database file.
+        ttls (dict): Per path TTL overrides in seconds (e.g., `{"/api/v1/servers/virtual/GetServers": 60}`).
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttls: dict[str, float] | None = None):
+        self.path = path
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self._local = threading.local()
+        # Path -> [hits, misses] since the last flush
+        self._counts: dict[str, list[int]] = {}
+        self._lookups = 0
+        self._flushed = time.monotonic()
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.connection.executescript(SCHEMA)
+        atexit.register(_flush, weakref.ref(self))
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        # SQLite connections can't be shared between threads (e.g., `inventory.snapshot`)
+        conn = getattr(self._local, "connection", None)
+        if conn is None:
+            # Imported on first use, so the CLI doesn't pay for it unless the cache is enabled
+            import sqlite3
+
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = conn
+        return conn
+
+    @staticmethod
+    def key(scope: str, path: str, params: dict | None = None) -> str:
+        query = json.dumps(params or {}, sort_keys=True, separators=(",", ":"), default=str)
+        return f"{scope}{path}?{query}"
+
+    def ttl(self, path: str) -> float:
+        return self.ttls.get(path, 0)
+
+    def get(self, scope: str, path: str, params: dict | None = None) -> Any | None:
+        """
+        Returns the cached response or `None` if it's missing or expired.
+        """
+        if not self.ttl(path):
+            return None
+
+        row = self.connection.execute(
+            "SELECT body FROM entries WHERE key = ? AND expires > ?",
+            (self.key(scope, path, params), time.time()),
+        ).fetchone()
+        self._count(path, 0 if row else 1)
+        return json.loads(row[0]) if row else None
+
+    def set(self, scope: str, path: str, params: dict | None, value: Any):
+        """
+        Store a response if its path has a TTL.
+        """
+        ttl = self.ttl(path)
+        if not ttl:
+            return
+
+        now = time.time()
+        self.connection.execute(
+            "INSERT OR REPLACE INTO entries (key, path, body, created, expires) VALUES (?, ?, ?, ?, ?)",
+            (self.key(scope, path, params), path, json.dumps(value), now, now + ttl),
+        )
+
+    def invalidate(self, scope: str, path: str):
+        """
+        Remove the cached responses of a scope for the service of a path
+        (e.g., `/api/v1/servers/virtual/CreateServer` invalidates `/api/v1/servers/virtual/GetServers`).
+        """
+        # Keys start with the scope and path (see `key`)
+        prefix = f"{scope}{path.rsplit('/', 1)[0]}/"
+        cur = self.connection.execute(
+            "DELETE FROM entries WHERE substr(key, 1, ?) = ?", (len(prefix), prefix)
+        )
+        logger.debug("Invalidated %d cached responses under %s", cur.rowcount, prefix)
+
+    def clear(self) -> int:
+        """
+        Remove all cached responses and counters, returning the number of responses removed.
+        """
+        with self._lock:
+            self._counts.clear()
+        count = self.connection.execute("DELETE FROM entries").rowcount
+        self.connection.execute("DELETE FROM counters")
+        return count
+
+    def stats(self) -> dict:
+        """
+        Returns the cache size along with the cached responses, hits and misses for each path.
+        """
+        self.flush()
+        now = time.time()
+        paths: dict[str, dict] = {}
+        rows = self.connection.execute(
+            "SELECT path, COUNT(*), SUM(expires <= ?), SUM(LENGTH(body)) FROM entries GROUP BY path",
+            (now,),
+        )
+        for path, entries, expired, size in rows:
+            paths[path] = {"entries": entries, "expired": expired, "bytes": size}
+
+        for path, hits, misses in self.connection.execute(
+            "SELECT path, hits, misses FROM counters"
+        ):
+            paths.setdefault(path, {"entries": 0, "expired": 0, "bytes": 0})
+            paths[path].update(hits=hits, misses=misses)
+
+        return {
+            "path": self.path,
+            "size": os.path.getsize(self.path) if os.path.exists(self.path) else 0,
+            "paths": {
+                path: {"hits": 0, "misses": 0, **values}
+                for path, values in sorted(paths.items())
+            },
+        }
+
+    def _count(self, path: str, index: int):
+        with self._lock:
+            self._counts.setdefault(path, [0, 0])[index] += 1
+            self._lookups += 1
+            due = (
+                self._lookups >= FLUSH_LOOKUPS
+                or time.monotonic() - self._flushed >= FLUSH_INTERVAL
+            )
+        if due:
+            self.flush()
+
+    def flush(self):
+        """
+        Write the hit and miss counts since the last flush to the database.
+        """
+        with self._lock:
+            counts, self._counts = self._counts, {}
+            self._lookups = 0
+            self._flushed = time.monotonic()
+        if not counts:
+            return
+
+        conn = self.connection
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "INSERT INTO counters (path, hits, misses) VALUES (?, ?, ?) "
+                "ON CONFLICT (path) DO UPDATE "
+                "SET hits = hits + excluded.hits, misses = misses + excluded.misses",
+                [(path, hits, misses) for path, (hits, misses) in counts.items()],
+            )
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+
+def _flush(ref: weakref.ref[Cache]):
+    # Counts are best effort, so a locked (or removed) database doesn't fail the process at exit
+    cache = ref()
+    if cache is None:
+        return
+    try:
+        cache.flush()
+    except Exception as e:
+        logger.debug("Failed to flush the cache counters: %s", e)
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import base64
+import datetime
+import gzip
+import http.client
+import io
+import json
+import os
+import threading
+import time
+import zlib
+
+from collections import defaultdict
+from typing import Any, Iterable, Iterator
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+# Response bodies at least this large are compressed when recording with `compress=True`
+COMPRESS_MIN = 1024
+
+# Response headers which are recorded (bodies are stored decoded, so encoding headers are dropped)
+RECORDED_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Retry-After", "Cache-Control")
+
+
+class Recorder:
+    """
+    Recorder(path, compress=True)
+
+    A `requests` response hook which appends each request and response to a cassette file
+    as a line of JSON, along with when the request was sent and how long the response took.
+
+    Each line has the `method`, `path`, `query` and `json` body of the request and the `status`,
+    `headers` and `body` of the response, where bodies of at least `COMPRESS_MIN` bytes are stored
+    zlib compressed and base64 encoded in `body_z` when `compress` is set.
+
+    Streamed responses are read in full when they're recorded.
+
+    Args:
+        path (str): The cassette file, which is appended to if it exists.
+        compress (bool): Whether to compress large response bodies.
+    """
+
+    def __init__(self, path: str, compress: bool = True):
+        self.path = os.path.expanduser(path)
+        self.compress = compress
+        self.start = time.time()
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._file = open(self.path, "a", buffering=1, encoding="utf-8")  # noqa: SIM115
+
+    def __call__(self, resp: requests.Response, *args, **kwargs):
+        request = resp.request
+        url = urlsplit(request.url or "")
+        body = request.body or b""
+        if isinstance(body, str):
+            body = body.encode()
+        if body and request.headers.get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+
+        entry: dict[str, Any] = {
+            "t": round(time.time() - resp.elapsed.total_seconds() - self.start, 6),
+            "elapsed": round(resp.elapsed.total_seconds(), 6),
+            "method": (request.method or "GET").upper(),
+            "path": url.path,
+            "query": url.query,
+            "json": json.loads(body) if body else None,
+            "status": resp.status_code,
+            "headers": {k: resp.headers[k] for k in RECORDED_HEADERS if k in resp.headers},
+        }
+        content = resp.content or b""
+        if self.compress and len(content) >= COMPRESS_MIN:
+            entry["body_z"] = base64.b64encode(zlib.compress(content)).decode()
+        else:
+            entry["body"] = content.decode("utf-8", "replace")
+
+        line = json.dumps(entry, separators=(",", ":"))
+        with self._lock:
+            self._file.write(line + "\n")
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def load(path: str) -> list[dict]:
+    """
+    Load the recorded entries of a cassette file, in the order they were recorded.
+    """
+    with open(os.path.expanduser(path), encoding="utf-8") as fobj:
+        return [json.loads(line) for line in fobj if line.strip()]
+
+
+def body(entry: dict) -> bytes:
+    """
+    The decoded response body of a recorded entry.
+    """
+    if "body_z" in entry:
+        return zlib.decompress(base64.b64decode(entry["body_z"]))
+    return entry.get("body", "").encode()
+
+
+class ReplayAdapter(BaseAdapter):
+    """
+    ReplayAdapter(cassette, latency=0.0, loop=True)
+
+    A `requests` transport adapter which serves the responses recorded in a cassette, without any network access.
+
+    Requests are matched by method, path and query string (ignoring the server), and then by JSON body,
+    with repeated requests served the recorded responses in order. When they run out, matching responses
+    are served again from the start if `loop` is set, otherwise a `requests.ConnectionError` is raised
+    (as for requests which were never recorded).
+
+    Args:
+        cassette (str or list): The cassette file or its loaded entries (see `load`).
+        latency (float): Multiplier for the recorded response times, where 1 preserves the original
+            latencies and 0 replays as fast as possible.
+        loop (bool): Whether to replay the responses for a request again once they've all been served.
+    """
+
+    def __init__(self, cassette: str | list[dict], latency: float = 0.0, loop: bool = True):
+        super().__init__()
+        self.latency = latency
+        self.loop = loop
+        self.entries: dict[tuple[str, str, str], list[dict]] = defaultdict(list)
+        for entry in load(cassette) if isinstance(cassette, str) else cassette:
+            self.entries[(entry["method"], entry["path"], entry["query"])].append(entry)
+        self._served: dict[tuple[str, str, str], int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def _match(self, request: requests.PreparedRequest) -> dict:
+        url = urlsplit(request.url or "")
+        key = ((request.method or "GET").upper(), url.path, url.query)
+        entries = self.entries.get(key)
+        if not entries:
+            raise requests.ConnectionError(f"No recorded response for {key[0]} {request.url}")
+
+        payload = request.body or b""
+        if payload and request.headers.get("Content-Encoding") == "gzip":
+            payload = gzip.decompress(payload)  # type: ignore[arg-type]
+        data = json.loads(payload) if payload else None
+
+        with self._lock:
+            served = self._served[key]
+            if served >= len(entries) and not self.loop:
+                raise requests.ConnectionError(
+                    f"All recorded responses for {key[0]} {request.url} were served"
+                )
+            # Prefer the next entry with the same body, e.g., when creating several resources in a row
+            order = [entries[(served + i) % len(entries)] for i in range(len(entries))]
+            entry = next((e for e in order if e["json"] == data), order[0])
+            self._served[key] = served + 1
+        return entry
+
+    def send(self, request: requests.PreparedRequest, *args, **kwargs) -> requests.Response:
+        entry = self._match(request)
+        if self.latency:
+            time.sleep(entry["elapsed"] * self.latency)
+
+        resp = requests.Response()
+        resp.url = request.url or ""
+        resp.request = request
+        resp.status_code = entry["status"]
+        resp.reason = http.client.responses.get(entry["status"], "")
+        resp.headers = CaseInsensitiveDict(entry["headers"])
+        resp.encoding = "utf-8"
+        resp.raw = io.BytesIO(body(entry))
+        resp.elapsed = datetime.timedelta(seconds=entry["elapsed"])
+        return resp
+
+    def close(self):
+        pass
+
+
+def play(session, cassette: str | Iterable[dict], pace: float = 0.0) -> Iterator[Any]:
+    """
+    Send the requests recorded in a cassette through `session` (e.g., one replaying the same cassette),
+    yielding each result or the `requests.HTTPError` it raised.
+    This reproduces a recorded call pattern (e.g., a reconcile cycle) without the code that made it.
+
+    Args:
+        session (Session): The session to send requests with.
+        cassette (str or list): The cassette file or its loaded entries.
+        pace (float): Multiplier for the recorded time between requests, where 0 sends them back to back.
+    """
+    start = time.perf_counter()
+    for entry in load(cassette) if isinstance(cassette, str) else cassette:
+        if pace:
+            delay = entry["t"] * pace - (time.perf_counter() - start)
+            if delay > 0:
+                time.sleep(delay)
+
+        kwargs: dict[str, Any] = {}
+        if entry["query"]:
+            kwargs["params"] = dict(parse_qsl(entry["query"]))
+        if entry["json"] is not None:
+            kwargs["json"] = entry["json"]
+        try:
+            yield session.request(entry["method"].lower(), entry["path"], **kwargs)
+        except requests.HTTPError as e:
+            yield e
@@ -0,0 +1,446 @@
+"""
+The `denvr` command line interface.
+
+    denvr servers virtual get-servers --cluster Hou1 | jq .id
+    denvr servers virtual get-server --id vm-1 --namespace denvr --cluster Hou1
+    denvr cache stats
+    denvr cache clear
+    denvr agent start
+    denvr batch changes.jsonl --limit servers/virtual=8
+    denvr reconcile fleet.toml --dry-run
+
+Every client method is a command (see `denvr.commands`), where results are written as JSON lines
+(NDJSON), and list responses are streamed one item per line as they're parsed.
+Only the client module for the command is imported, so the CLI starts quickly, and when the local agent
+is running (see `denvr.agent`) commands are sent to it without importing any client modules or `requests`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+
+from denvr.commands import COMMANDS
+
+
+def _cache(args):
+    from denvr.cache import DEFAULT_CACHE_PATH, Cache
+    from denvr.config import Config, load
+
+    _, contents = load(args.config)
+    conf = Config(defaults=contents.get("defaults", {}), auth=None)
+    return Cache(args.path or conf.cache or DEFAULT_CACHE_PATH, conf.cache_ttls)
+
+
+def cache_stats(args) -> int:
+    stats = _cache(args).stats()
+    if args.json:
+        print(json.dumps(stats, indent=2))
+        return 0
+
+    print(f"{stats['path']} ({stats['size']} bytes)")
+    print(f"{'path':<56} {'entries':>7} {'expired':>7} {'bytes':>10} {'hits':>7} {'misses':>7}")
+    for path, s in stats["paths"].items():
+        print(
+            f"{path:<56} {s['entries']:>7} {s['expired']:>7} {s['bytes']:>10} "
+            f"{s['hits']:>7} {s['misses']:>7}"
+        )
+    return 0
+
+
+def cache_clear(args) -> int:
+    count = _cache(args).clear()
+    print(f"Removed {count} cached responses")
+    return 0
+
+
+def _bool(value: str) -> bool:
+    value = value.strip().lower()
+    if value in ("1", "true", "yes", "on"):
+        return True
+    if value in ("0", "false", "no", "off"):
+        return False
+    raise argparse.ArgumentTypeError(f"invalid boolean value: {value!r}")
+
+
+def _json(value: str):
+    try:
+        return json.loads(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(f"invalid JSON value: {e}") from None
+
+
+# Argument type -> the `add_argument` keywords to parse it
+ARGUMENT_TYPES: dict[str, dict] = {
+    "str": {},
+    "int": {"type": int},
+    "bool": {"type": _bool, "metavar": "{true,false}"},
+    "list": {"action": "append", "metavar": "ITEM"},
+    "dict": {"type": _json, "metavar": "JSON"},
+    "Any": {"type": _json, "metavar": "JSON"},
+}
+
+
+def _default(value):
+    # Records (with the `records` setting) are written as plain dicts
+    to_dict = getattr(value, "to_dict", None)
+    if to_dict is None:
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+    return to_dict()
+
+
+def write(value, out=None):
+    """
+    Write a value as a line of JSON and flush it, so it can be piped (e.g., to `jq`) without buffering.
+    """
+    out = out or sys.stdout
+    out.write(json.dumps(value, separators=(",", ":"), default=_default) + "\n")
+    out.flush()
+
+
+def agent_start(args) -> int:
+    from denvr import agent
+
+    connection = agent.connect(args.socket)
+    if connection is not None:
+        connection.close()
+        print(f"The denvr agent is already running on {args.socket or agent.socket_path()}")
+        return 0
+    try:
+        pid = agent.spawn(args.socket, idle_timeout=args.idle)
+    except RuntimeError as e:
+        print(f"denvr: error: {e}", file=sys.stderr)
+        return 1
+    print(f"Started the denvr agent (pid {pid}) on {args.socket or agent.socket_path()}")
+    return 0
+
+
+def agent_stop(args) -> int:
+    from denvr import agent
+
+    connection = agent.connect(args.socket)
+    if connection is None:
+        print("The denvr agent isn't running", file=sys.stderr)
+        return 1
+    list(connection.send({"op": "shutdown"}))
+    connection.close()
+    print("Stopped the denvr agent")
+    return 0
+
+
+def agent_status(args) -> int:
+    from denvr import agent
+
+    connection = agent.connect(args.socket)
+    if connection is None:
+        print("The denvr agent isn't running", file=sys.stderr)
+        return 1
+    status = next(connection.send({"op": "status"}))
+    connection.close()
+    if args.json:
+        print(json.dumps(status, indent=2))
+        return 0
+
+    print(f"pid {status['pid']} on {status['socket']}, up {status['uptime']:.0f}s")
+    print(
+        f"{status['sessions']} sessions, {status['connections']} connections, "
+        f"{status['requests']} requests ({status['errors']} errors)"
+    )
+    return 0
+
+
+def call_agent(connection, args, kwargs: dict) -> int:
+    """
+    Call the command on the running agent, so neither the client modules nor `requests` are imported.
+    """
+    from denvr.agent import RemoteError
+
+    command = args.command_spec
+    stream = command["stream"] and not args.no_stream
+    try:
+        results = connection.call(
+            command["module"].replace(".", "/"),
+            command["stream"] if stream else command["method"],
+            kwargs,
+            config=args.config,
+            server=args.server,
+        )
+        for result in results:
+            for item in result if isinstance(result, list) and not stream else [result]:
+                write(item)
+    except RemoteError as e:
+        print(f"denvr: error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        connection.close()
+    return 0
+
+
+def call(args) -> int:
+    from denvr import agent
+
+    command = args.command_spec
+    kwargs = {
+        name: getattr(args, name)
+        for name, *_ in command["args"]
+        if getattr(args, name) is not None
+    }
+    connection = agent.connect()
+    if connection is not None:
+        return call_agent(connection, args, kwargs)
+
+    from requests import RequestException
+
+    from denvr.client import client
+    from denvr.config import config
+
+    try:
+        conf = config(args.config)
+        if args.server:
+            conf.defaults = {**conf.defaults, "server": args.server}
+        api = client(command["module"].replace(".", "/"), conf)
+
+        if command["stream"] and not args.no_stream:
+            for item in getattr(api, command["stream"])(**kwargs):
+                write(item)
+            return 0
+
+        result = getattr(api, command["method"])(**kwargs)
+    except (RequestException, TypeError) as e:
+        # Request errors and missing required arguments (see `denvr.validate`)
+        print(f"denvr: error: {e}", file=sys.stderr)
+        return 1
+
+    for item in result if isinstance(result, list) else [result]:
+        write(item)
+    return 0
+
+
+def _limit(value: str) -> tuple[str, int]:
+    service, _, limit = value.partition("=")
+    try:
+        return service.strip(), int(limit)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"invalid limit {value!r}, expected SERVICE=N"
+        ) from None
+
+
+def batch(args) -> int:
+    from denvr.batch import Batch, load
+    from denvr.config import config
+    from denvr.session import Session
+
+    try:
+        if args.manifest == "-":
+            operations = load(sys.stdin)
+        else:
+            with open(args.manifest) as f:
+                operations = load(f)
+    except (OSError, ValueError) as e:
+        print(f"denvr: error: {e}", file=sys.stderr)
+        return 1
+
+    checkpoint = args.checkpoint
+    if checkpoint is None and args.manifest != "-":
+        checkpoint = f"{args.manifest}.done"
+    runner = Batch(
+        Session(config(args.config)),
+        limits=dict(args.limit or []),
+        concurrency=args.concurrency,
+        checkpoint=None if args.no_checkpoint else checkpoint,
+        interval=args.interval,
+        timeout=args.timeout,
+    )
+    try:
+        for result in runner.run(operations):
+            write(result)
+    except ValueError as e:
+        print(f"denvr: error: {e}", file=sys.stderr)
+        return 1
+
+    counts = runner.counts
+    print(
+        f"{counts['ok']} ok, {counts['failed']} failed, {counts['skipped']} skipped",
+        file=sys.stderr,
+    )
+    return 1 if counts["failed"] else 0
+
+
+def reconcile(args) -> int:
+    from denvr.config import config
+    from denvr.reconcile import Reconciler, load
+    from denvr.session import Session
+
+    try:
+        reconciler = Reconciler(
+            Session(config(args.config)),
+            load(args.spec),
+            concurrency=args.concurrency,
+            interval=args.interval,
+            timeout=args.timeout,
+        )
+    except (OSError, ValueError) as e:
+        print(f"denvr: error: {e}", file=sys.stderr)
+        return 1
+
+    report = reconciler.reconcile(dry_run=args.dry_run)
+    for conflict in report.conflicts:
+        print(f"denvr: conflict: {conflict}", file=sys.stderr)
+    if args.dry_run:
+        for change in report.changes:
+            write(change.to_dict())
+    else:
+        for result in report.results:
+            write(result)
+    for change in report.pending:
+        print(f"denvr: timed out: {change}", file=sys.stderr)
+    print(
+        f"{len(report.changes)} changes, {len(report.failed)} failed, "
+        f"{len(report.conflicts)} conflicts in {report.elapsed:.1f}s",
+        file=sys.stderr,
+    )
+    return 0 if report.ok else 1
+
+
+def add_command(commands, name: str, spec: dict):
+    p = commands.add_parser(name, help=spec["help"], description=spec["help"])
+    for kwarg, typ, required, desc in spec["args"]:
+        p.add_argument(
+            f"--{kwarg.replace('_', '-')}",
+            dest=kwarg,
+            help=f"{desc} (required)" if required else desc or None,
+            **ARGUMENT_TYPES[typ],
+        )
+    if spec["stream"]:
+        p.add_argument(
+            "--no-stream",
+            action="store_true",
+            help="Decode the full response and write it as a single line",
+        )
+    p.add_argument("--server", help="The API server (default: from the config)")
+    p.set_defaults(func=call, command_spec=spec, no_stream=False)
+
+
+def parser(argv: list[str] | None = None) -> argparse.ArgumentParser:
+    """
+    The CLI parser, where only the arguments of the command in `argv` are added (if given),
+    since the other commands' arguments aren't needed to parse it.
+    """
+    root = argparse.ArgumentParser(
+        prog="denvr", description="Denvr Cloud command line interface"
+    )
+    root.add_argument("--config", help="Path to the denvr.toml config file")
+    commands = root.add_subparsers(dest="command", required=True)
+
+    cache = commands.add_parser("cache", help="Manage the local response cache")
+    cache_commands = cache.add_subparsers(dest="subcommand", required=True)
+    stats = cache_commands.add_parser("stats", help="Show cached responses, hits and misses")
+    stats.add_argument("--json", action="store_true", help="Output the stats as JSON")
+    stats.set_defaults(func=cache_stats)
+    clear = cache_commands.add_parser("clear", help="Remove all cached responses")
+    clear.set_defaults(func=cache_clear)
+    for p in (stats, clear):
+        p.add_argument("--path", help="The cache database (default: from the config)")
+
+    agent = commands.add_parser("agent", help="Manage the local agent which serves CLI calls")
+    agent_commands = agent.add_subparsers(dest="subcommand", required=True)
+    start = agent_commands.add_parser("start", help="Start the agent in the background")
+    start.add_argument(
+        "--idle", type=float, default=3600.0, help="Exit after this many idle seconds"
+    )
+    start.set_defaults(func=agent_start)
+    stop = agent_commands.add_parser("stop", help="Stop the running agent")
+    stop.set_defaults(func=agent_stop)
+    status = agent_commands.add_parser("status", help="Show the agent's sessions and requests")
+    status.add_argument("--json", action="store_true", help="Output the status as JSON")
+    status.set_defaults(func=agent_status)
+    for p in (start, stop, status):
+        p.add_argument("--socket", help="The agent's Unix socket (default: DENVR_AGENT_SOCKET)")
+
+    run = commands.add_parser(
+        "batch",
+        help="Run the operations in a JSON lines manifest",
+        description="Run the operations in a JSON lines manifest (see `denvr.batch`), writing "
+        "their results as they complete. Completed operations are skipped when rerun.",
+    )
+    run.add_argument("manifest", help="The manifest file, or - for stdin")
+    run.add_argument(
+        "--concurrency", type=int, default=4, help="Operations in flight for each service"
+    )
+    run.add_argument(
+        "--limit",
+        type=_limit,
+        action="append",
+        metavar="SERVICE=N",
+        help="Operations in flight for a service (e.g., servers/virtual=8)",
+    )
+    run.add_argument(
+        "--checkpoint", help="The checkpoint of completed operations (default: MANIFEST.done)"
+    )
+    run.add_argument(
+        "--no-checkpoint", action="store_true", help="Don't skip or record operations"
+    )
+    run.add_argument(
+        "--interval", type=float, default=30, help="Waiter poll interval in seconds"
+    )
+    run.add_argument("--timeout", type=float, default=600, help="Waiter timeout in seconds")
+    run.set_defaults(func=batch)
+
+    fleet = commands.add_parser(
+        "reconcile",
+        help="Reconcile VPCs, VMs and applications with a desired state spec",
+        description="Create, start, stop or destroy the VPCs, VMs and applications which differ from "
+        "a desired state spec (see `denvr.reconcile`), writing the result of each change.",
+    )
+    fleet.add_argument("spec", help="The spec file (TOML, or JSON for .json files)")
+    fleet.add_argument(
+        "--dry-run", action="store_true", help="Write the changes without applying them"
+    )
+    fleet.add_argument(
+        "--concurrency", type=int, default=8, help="Changes in flight for each kind of resource"
+    )
+    fleet.add_argument(
+        "--interval", type=float, default=10, help="Seconds between polls for changes to settle"
+    )
+    fleet.add_argument(
+        "--timeout", type=float, default=900, help="Seconds to wait for changes to settle"
+    )
+    fleet.set_defaults(func=reconcile)
+
+    # Nest the command groups (e.g., "servers virtual") as subcommands
+    groups: dict[tuple[str, ...], argparse._SubParsersAction] = {(): commands}
+    words = set(argv) if argv is not None else None
+    for group, specs in COMMANDS.items():
+        path: tuple[str, ...] = ()
+        for word in group.split():
+            if path + (word,) not in groups:
+                p = groups[path].add_parser(word, help=f"{word.title()} commands")
+                groups[path + (word,)] = p.add_subparsers(
+                    dest=f"{'_'.join(path + (word,))}_command", required=True
+                )
+            path += (word,)
+
+        for name, spec in specs.items():
+            if words is None or name in words:
+                add_command(groups[path], name, spec)
+            else:
+                groups[path].add_parser(name, help=spec["help"])
+    return root
+
+
+def main(argv: list[str] | None = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    args = parser(argv).parse_args(argv)
+    try:
+        return args.func(args)
+    except BrokenPipeError:
+        # The reader exited early (e.g., `| head`), so silence the error flushing stdout at exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
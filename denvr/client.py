@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import importlib
 
+from denvr import agent
 from denvr.config import Config, config
 from denvr.session import Session
 
@@ -12,12 +13,17 @@ def client(name: str, conf: Config | None = None):
 
     A shorthand for loading a specific client with a default session/config.
     Optionally, a Config object can be supplied as a keyword.
+
+    Without a Config, requests are sent through the local agent (see `denvr.agent`) when it's running,
+    which holds the authenticated session.
     """
-    _config = conf if conf else config()
+    connection = agent.connect() if conf is None else None
+    session = agent.AgentSession(connection) if connection is not None else None
+    _config = session.config if session else conf if conf else config()
 
     # TODO: Better vetting of `name` for cross-platform paths
     mod = importlib.import_module(
         "denvr.api.{}.{}".format(_config.api, ".".join(name.split("/")))
     )
 
-    return mod.Client(Session(_config))
+    return mod.Client(session or Session(_config))
@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+from array import array
+from typing import Any, Iterable
+
+from denvr.utils import Interner, snakecase
+
+# Storage for each column kind. Kinds without a typecode are stored in lists.
+TYPECODES = {"bool": "b", "int": "q", "float": "d"}
+KINDS = {bool: "bool", int: "int", float: "float", str: "str"}
+ARROW_TYPES = {
+    None: "null",
+    "bool": "bool",
+    "int": "int64",
+    "float": "float64",
+    "str": "string",
+    "object": "object",
+}
+
+
+class Column:
+    """
+    A single column of values stored as a typed `array` when the values are homogeneous bools,
+    ints or floats, or a list otherwise.
+    Missing values are tracked with a validity mask which is only allocated once a value is missing.
+    """
+
+    __slots__ = ("kind", "data", "validity", "_strings")
+
+    def __init__(self, strings: Interner, nulls: int = 0):
+        self.kind: str | None = None
+        self.data: array | list = []
+        self.validity: bytearray | None = None
+        self._strings = strings
+        for _ in range(nulls):
+            self.append(None)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def append(self, value: Any):
+        if value is None:
+            if self.validity is None:
+                self.validity = bytearray(b"\x01") * len(self.data)
+            self.validity.append(0)
+            self.data.append(0 if self.kind in TYPECODES else None)
+            return
+
+        kind = KINDS.get(type(value), "object")
+        if kind != self.kind and self.kind != "object":
+            if self.kind == "float" and kind == "int":
+                value = float(value)
+            else:
+                self._convert("float" if {kind, self.kind} == {"int", "float"} else kind)
+
+        if self.kind == "str":
+            value = self._strings(value)
+
+        self.data.append(value)
+        if self.validity is not None:
+            self.validity.append(1)
+
+    def _convert(self, kind: str):
+        # Only null values have been seen so far, so we can switch to any kind.
+        if self.kind is None:
+            nulls = len(self.data)
+            self.kind = kind
+            self.data = (
+                array(TYPECODES[kind], [0] * nulls) if kind in TYPECODES else [None] * nulls
+            )
+        elif self.kind == "int" and kind == "float":
+            self.kind = "float"
+            self.data = array("d", self.data)
+        else:
+            self.kind = "object"
+            self.data = self.values()
+
+    def values(self) -> list:
+        """
+        The column values as a list, with `None` for missing values.
+        """
+        values: list
+        if self.kind == "bool":
+            values = [bool(v) for v in self.data]
+        else:
+            values = list(self.data)
+
+        if self.validity is not None:
+            for i, valid in enumerate(self.validity):
+                if not valid:
+                    values[i] = None
+
+        return values
+
+
+class Columns:
+    """
+    Columns(intern_size=10000)
+
+    Accumulates list response items (e.g., from `get_servers` or `iter_servers`) directly into
+    per-field columns for analytics (e.g., `pandas.DataFrame(columns.to_numpy())`).
+
+    Bools, ints and floats are stored in typed `array`s, repeated strings are interned (up to
+    `intern_size` distinct values) and no intermediate per-row dicts are created.
+    Field names are standardized to snakecase and fields missing from some items are filled
+    with missing values.
+
+    Example:
+
+        columns = Columns()
+        for cluster in ["Hou1", "Msc1"]:
+            columns.extend(virtual.iter_servers(cluster=cluster))
+            columns.extend(metal.iter_hosts(cluster=cluster), kind="host")
+
+        df = pandas.DataFrame(columns.to_numpy())
+    """
+
+    def __init__(self, intern_size: int = 10000):
+        self.columns: dict[str, Column] = {}
+        self.rows = 0
+        self._strings = Interner(intern_size)
+
+    def __len__(self) -> int:
+        return self.rows
+
+    @property
+    def fields(self) -> list[str]:
+        return list(self.columns)
+
+    def append(self, item, **constants):
+        """
+        Append a single item (e.g., a `dict` or `Record`) and any constant fields (e.g., `cluster="Hou1"`).
+        Fields in the item take precedence over constants of the same name.
+        """
+        columns = self.columns
+        touched = 0
+        for fields in (item.items(), constants.items()):
+            for k, v in fields:
+                name = snakecase(k)
+                column = columns.get(name)
+                if column is None:
+                    column = columns[name] = Column(self._strings, nulls=self.rows)
+                elif len(column) > self.rows:
+                    # Item values take precedence over constants with the same name
+                    continue
+                column.append(v)
+                touched += 1
+
+        self.rows += 1
+
+        # Fill in any fields missing from this item
+        if touched < len(columns):
+            for column in columns.values():
+                if len(column) < self.rows:
+                    column.append(None)
+
+    def extend(self, items: Iterable, **constants):
+        """
+        Append each of the items with any constant fields (e.g., `cluster="Hou1"`).
+        A list response (i.e., `{"items": [...]}` or a list result record) may also be passed directly.
+        """
+        if hasattr(items, "get") and not isinstance(items, list):
+            items = items.get("items", [])
+
+        for item in items:
+            self.append(item, **constants)
+
+    def to_columns(self) -> dict:
+        """
+        Returns a dict of field name to values.
+        Columns with homogeneous bools, ints or floats and no missing values are returned as `array`s,
+        otherwise as lists with `None` for missing values.
+        """
+        return {
+            name: column.data
+            if column.kind in TYPECODES and column.kind != "bool" and column.validity is None
+            else column.values()
+            for name, column in self.columns.items()
+        }
+
+    def to_numpy(self) -> dict:
+        """
+        Returns a dict of field name to numpy arrays.
+        Ints and floats with missing values are returned as float arrays with `nan`.
+        Strings, mixed types and bools with missing values are returned as object arrays.
+
+        Raises:
+            ImportError: If numpy isn't installed.
+        """
+        try:
+            import numpy as np
+        except ImportError as e:
+            raise ImportError("Columns.to_numpy requires numpy (`pip install numpy`)") from e
+
+        results = {}
+        for name, column in self.columns.items():
+            if column.kind in TYPECODES and column.validity is None:
+                results[name] = np.array(column.data, dtype=TYPECODES[column.kind])
+                if column.kind == "bool":
+                    results[name] = results[name].astype(bool)
+            elif column.kind in ("int", "float") and column.validity is not None:
+                values = np.array(column.data, dtype="d")
+                values[np.frombuffer(column.validity, dtype="u1") == 0] = np.nan
+                results[name] = values
+            else:
+                results[name] = np.array(column.values(), dtype=object)
+
+        return results
+
+    def to_arrow_like_dict(self) -> dict:
+        """
+        Returns an Arrow style description of the columns:
+        `{"num_rows": n, "schema": {name: type}, "columns": {name: {"data": values, "validity": mask}}}`,
+        where missing values have a 0 in the `validity` bytes (`None` if no values are missing).
+        """
+        return {
+            "num_rows": self.rows,
+            "schema": {name: ARROW_TYPES[column.kind] for name, column in self.columns.items()},
+            "columns": {
+                name: {
+                    "data": column.data if column.kind in TYPECODES else column.values(),
+                    "validity": bytes(column.validity) if column.validity is not None else None,
+                }
+                for name, column in self.columns.items()
+            },
+        }
@@ -0,0 +1,595 @@
+"""
+The client methods exposed by the `denvr` command line interface, so it can build its parser
+without importing every client module.
+
+NOTE: This module is generated by `scripts/apigen.py`, so don't edit it by hand.
+"""
+
+from __future__ import annotations
+
+# Command group (e.g., "servers virtual") -> command -> the client module (relative to `denvr.api.<version>`),
+# method name, streaming `iter_*` method (if any), summary and arguments as (kwarg, type, required, description)
+COMMANDS: dict[str, dict[str, dict]] = {
+    "clusters": {
+        "get-all": {
+            "module": "clusters",
+            "method": "get_all",
+            "stream": None,
+            "help": "Get a list of allocated clusters",
+            "args": [],
+        }
+    },
+    "servers images": {
+        "get-operating-system-images": {
+            "module": "servers.images",
+            "method": "get_operating_system_images",
+            "stream": None,
+            "help": "Get a list of operating sytem images available for the tenant",
+            "args": [],
+        }
+    },
+    "servers applications": {
+        "get-applications": {
+            "module": "servers.applications",
+            "method": "get_applications",
+            "stream": "iter_applications",
+            "help": "Get a list of applications",
+            "args": [],
+        },
+        "get-application-details": {
+            "module": "servers.applications",
+            "method": "get_application_details",
+            "stream": None,
+            "help": "Get detailed information about a specific application",
+            "args": [
+                ("id", "str", True, "The application name"),
+                ("cluster", "str", True, "The cluster you're operating on"),
+            ],
+        },
+        "get-configurations": {
+            "module": "servers.applications",
+            "method": "get_configurations",
+            "stream": None,
+            "help": "Get a list of application configurations",
+            "args": [],
+        },
+        "get-availability": {
+            "module": "servers.applications",
+            "method": "get_availability",
+            "stream": None,
+            "help": "Get detailed information on available configurations for applications",
+            "args": [("cluster", "str", True, ""), ("resource_pool", "str", True, "")],
+        },
+        "get-application-catalog-items": {
+            "module": "servers.applications",
+            "method": "get_application_catalog_items",
+            "stream": None,
+            "help": "Get a list of application catalog items",
+            "args": [],
+        },
+        "create-catalog-application": {
+            "module": "servers.applications",
+            "method": "create_catalog_application",
+            "stream": None,
+            "help": "Create a new application using a pre-defined configuration and application catalog item",
+            "args": [
+                ("name", "str", True, "The application name"),
+                ("cluster", "str", True, "The cluster you're operating on"),
+                (
+                    "hardware_package_name",
+                    "str",
+                    True,
+                    "The name or unique identifier of the application hardware configuration to use for the application.",
+                ),
+                (
+                    "application_catalog_item_name",
+                    "str",
+                    True,
+                    "The name of the application catalog item.",
+                ),
+                (
+                    "application_catalog_item_version",
+                    "str",
+                    True,
+                    "The version name of the application catalog item.",
+                ),
+                ("resource_pool", "str", False, "The resource pool to use for the application"),
+                ("ssh_keys", "list", False, "The SSH keys for accessing the application"),
+                (
+                    "persist_direct_attached_storage",
+                    "bool",
+                    False,
+                    "Indicates whether to persist direct attached storage (if resource pool is reserved)",
+                ),
+                (
+                    "personal_shared_storage",
+                    "bool",
+                    False,
+                    "Enable personal shared storage for the application",
+                ),
+                (
+                    "tenant_shared_storage",
+                    "bool",
+                    False,
+                    "Enable tenant shared storage for the application",
+                ),
+                (
+                    "selected_node",
+                    "str",
+                    False,
+                    "Specific node name to target for application deployment. Used for non-on-demand resource pools...",
+                ),
+                (
+                    "jupyter_token",
+                    "str",
+                    False,
+                    "An authentication token for accessing Jupyter Notebook enabled applications",
+                ),
+                (
+                    "startup_commands",
+                    "list",
+                    False,
+                    "List of startup commands to be executed during container initialization. Commands are executed...",
+                ),
+                (
+                    "environment_variables",
+                    "dict",
+                    False,
+                    "Custom environment variables for the application. Key-value pairs that will be set in the...",
+                ),
+                (
+                    "proxy_port",
+                    "str",
+                    False,
+                    "The port number for the application proxy service. Required to setup the proxy Used in...",
+                ),
+                (
+                    "proxy_api_keys",
+                    "list",
+                    False,
+                    "Optional API keys for authenticating with the application proxy service. Multiple keys can be...",
+                ),
+            ],
+        },
+        "create-custom-application": {
+            "module": "servers.applications",
+            "method": "create_custom_application",
+            "stream": None,
+            "help": "Create a new custom application using a pre-defined configuration and user-defined container image.",
+            "args": [
+                ("name", "str", True, "The application name"),
+                ("cluster", "str", True, "The cluster you're operating on"),
+                (
+                    "hardware_package_name",
+                    "str",
+                    True,
+                    "The name or unique identifier of the application hardware configuration to use for the application.",
+                ),
+                ("image_url", "str", True, "Image URL for the custom application."),
+                (
+                    "image_cmd_override",
+                    "list",
+                    False,
+                    "Optional Image CMD override allows users to specify a custom command to run in the container....",
+                ),
+                (
+                    "environment_variables",
+                    "dict",
+                    False,
+                    "Environment variables for the application. Names must start with a letter or underscore and...",
+                ),
+                ("image_repository", "dict", False, ""),
+                ("resource_pool", "str", False, "The resource pool to use for the application"),
+                (
+                    "readiness_watcher_port",
+                    "int",
+                    False,
+                    "The port used for monitoring application readiness and status. Common examples:  - 443...",
+                ),
+                (
+                    "proxy_port",
+                    "int",
+                    False,
+                    "The port your application uses to receive HTTPS traffic. When set, a reverse proxy will be...",
+                ),
+                (
+                    "proxy_api_keys",
+                    "list",
+                    False,
+                    "API keys for authenticating with the reverse proxy service. Optional, but requires proxyPort to...",
+                ),
+                (
+                    "persist_direct_attached_storage",
+                    "bool",
+                    False,
+                    "Indicates whether to persist direct attached storage (if resource pool is reserved)",
+                ),
+                (
+                    "personal_shared_storage",
+                    "bool",
+                    False,
+                    "Enable personal shared storage for the application",
+                ),
+                (
+                    "tenant_shared_storage",
+                    "bool",
+                    False,
+                    "Enable tenant shared storage for the application",
+                ),
+                (
+                    "selected_node",
+                    "str",
+                    False,
+                    "Specific node name to target for application deployment. Used for non-on-demand resource pools...",
+                ),
+                (
+                    "user_scripts",
+                    "dict",
+                    False,
+                    "Dictionary of script filenames to script content. Each scripts to be mounted at...",
+                ),
+                ("security_context", "dict", False, ""),
+            ],
+        },
+        "start-application": {
+            "module": "servers.applications",
+            "method": "start_application",
+            "stream": None,
+            "help": "Start an application that has been previously set up and provisioned, but is currently OFFLINE",
+            "args": [
+                ("id", "str", True, "The application name"),
+                ("cluster", "str", True, "The cluster you're operating on"),
+            ],
+        },
+        "stop-application": {
+            "module": "servers.applications",
+            "method": "stop_application",
+            "stream": None,
+            "help": "Stop an application that has been previously set up and provisioned, but is currently ONLINE",
+            "args": [
+                ("id", "str", True, "The application name"),
+                ("cluster", "str", True, "The cluster you're operating on"),
+            ],
+        },
+        "destroy-application": {
+            "module": "servers.applications",
+            "method": "destroy_application",
+            "stream": None,
+            "help": "Permanently delete a specified application, effectively wiping all its data and freeing up resources for other uses",
+            "args": [
+                ("id", "str", True, "The application name"),
+                ("cluster", "str", True, "The cluster you're operating on"),
+            ],
+        },
+    },
+    "servers metal": {
+        "get-hosts": {
+            "module": "servers.metal",
+            "method": "get_hosts",
+            "stream": "iter_hosts",
+            "help": "Get a list of bare metal hosts in a cluster",
+            "args": [("cluster", "str", False, "")],
+        },
+        "get-host": {
+            "module": "servers.metal",
+            "method": "get_host",
+            "stream": None,
+            "help": "Get detailed information about a specific metal host",
+            "args": [
+                ("id", "str", True, "Unique identifier for a resource within the cluster"),
+                ("cluster", "str", True, "The cluster you're operating on"),
+            ],
+        },
+        "reboot-host": {
+            "module": "servers.metal",
+            "method": "reboot_host",
+            "stream": None,
+            "help": "Reboot the bare metal host",
+            "args": [
+                ("id", "str", True, "Unique identifier for a resource within the cluster"),
+                ("cluster", "str", True, "The cluster you're operating on"),
+            ],
+        },
+        "reprovision-host": {
+            "module": "servers.metal",
+            "method": "reprovision_host",
+            "stream": None,
+            "help": "Reprovision the bare metal host",
+            "args": [
+                ("image_url", "str", False, "The URL to the image to use for the host"),
+                (
+                    "image_checksum",
+                    "str",
+                    False,
+                    "The checksum url of the image to use for the host",
+                ),
+                (
+                    "cloud_init_base64",
+                    "str",
+                    False,
+                    "Base64 encoded cloud-init data yaml file to use for the host",
+                ),
+                ("id", "str", True, "Unique identifier for a resource within the cluster"),
+                ("cluster", "str", True, "The cluster you're operating on"),
+            ],
+        },
+    },
+    "servers virtual": {
+        "get-servers": {
+            "module": "servers.virtual",
+            "method": "get_servers",
+            "stream": "iter_servers",
+            "help": "Get a list of virtual machines",
+            "args": [("cluster", "str", False, "")],
+        },
+        "get-server": {
+            "module": "servers.virtual",
+            "method": "get_server",
+            "stream": None,
+            "help": "Get detailed information about a specific virtual machine",
+            "args": [
+                ("id", "str", True, "The virtual machine id"),
+                (
+                    "namespace",
+                    "str",
+                    True,
+                    "The namespace/vpc where the virtual machine lives. Default one is same as tenant name.",
+                ),
+                ("cluster", "str", True, "The cluster you're operating on"),
+            ],
+        },
+        "create-server": {
+            "module": "servers.virtual",
+            "method": "create_server",
+            "stream": None,
+            "help": "Create a new virtual machine using a pre-defined configuration",
+            "args": [
+                (
+                    "name",
+                    "str",
+                    False,
+                    "Name of virtual server to be created. If not provided, name will be auto-generated.",
+                ),
+                (
+                    "rpool",
+                    "str",
+                    False,
+                    "Name of the pool to be used. If not provided, first pool assigned to a tenant will be used. In...",
+                ),
+                (
+                    "vpc",
+                    "str",
+                    True,
+                    "Name of the VPC to be used. Usually this will match the tenant name.",
+                ),
+                (
+                    "configuration",
+                    "str",
+                    True,
+                    "Name of the configuration to be used. For possible values, refer to the otput of...",
+                ),
+                (
+                    "cluster",
+                    "str",
+                    True,
+                    'Cluster to be used. For possible values, refer to the otput of api/v1/clusters/GetAll"/>',
+                ),
+                ("ssh_keys", "list", True, ""),
+                ("snapshot_name", "str", False, "Snapshot name."),
+                (
+                    "operating_system_image",
+                    "str",
+                    False,
+                    "Name of the Operating System image to be used.",
+                ),
+                (
+                    "personal_storage_mount_path",
+                    "str",
+                    False,
+                    "Personal storage file system mount path.",
+                ),
+                (
+                    "tenant_shared_additional_storage",
+                    "str",
+                    False,
+                    "Tenant shared storage file system mount path.",
+                ),
+                (
+                    "persist_storage",
+                    "bool",
+                    False,
+                    "Whether direct attached storage should be persistant or ephemeral.",
+                ),
+                (
+                    "direct_storage_mount_path",
+                    "str",
+                    False,
+                    "Direct attached storage mount path.",
+                ),
+                ("root_disk_size", "int", False, "Size of root disk to be created (Gi)."),
+                (
+                    "selected_node",
+                    "str",
+                    False,
+                    "Specific node name to target for VM deployment.  Used for non-on-demand resource pools to allow...",
+                ),
+            ],
+        },
+        "start-server": {
+            "module": "servers.virtual",
+            "method": "start_server",
+            "stream": None,
+            "help": "Start a virtual machine that has been previously set up and provisioned, but is currently OFFLINE",
+            "args": [
+                ("id", "str", True, "The virtual machine id"),
+                (
+                    "namespace",
+                    "str",
+                    True,
+                    "The namespace/vpc where the virtual machine lives. Default one is same as tenant name.",
+                ),
+                ("cluster", "str", True, "The cluster you're operating on"),
+            ],
+        },
+        "stop-server": {
+            "module": "servers.virtual",
+            "method": "stop_server",
+            "stream": None,
+            "help": "Stop a virtual machine, ensuring a secure and orderly shutdown of its operations within the cloud environment",
+            "args": [
+                ("id", "str", True, "The virtual machine id"),
+                (
+                    "namespace",
+                    "str",
+                    True,
+                    "The namespace/vpc where the virtual machine lives. Default one is same as tenant name.",
+                ),
+                ("cluster", "str", True, "The cluster you're operating on"),
+            ],
+        },
+        "destroy-server": {
+            "module": "servers.virtual",
+            "method": "destroy_server",
+            "stream": None,
+            "help": "Permanently delete a specified virtual machine, effectively wiping all its data and freeing up resources for other uses",
+            "args": [
+                (
+                    "delete_snapshots",
+                    "bool",
+                    False,
+                    "Should also delete snapshots with virtual machine.",
+                ),
+                ("id", "str", True, "The virtual machine id"),
+                (
+                    "namespace",
+                    "str",
+                    True,
+                    "The namespace/vpc where the virtual machine lives. Default one is same as tenant name.",
+                ),
+                ("cluster", "str", True, "The cluster you're operating on"),
+            ],
+        },
+        "get-configurations": {
+            "module": "servers.virtual",
+            "method": "get_configurations",
+            "stream": None,
+            "help": "Get detailed information on available configurations for virtual machines",
+            "args": [],
+        },
+        "get-availability": {
+            "module": "servers.virtual",
+            "method": "get_availability",
+            "stream": None,
+            "help": "Get information about the current availability of different virtual machine configurations",
+            "args": [
+                ("cluster", "str", True, ""),
+                ("resource_pool", "str", False, ""),
+                (
+                    "report_nodes",
+                    "bool",
+                    False,
+                    "controls if Count and MaxCount is calculated and returned in the response. If they are not...",
+                ),
+            ],
+        },
+    },
+    "vpcs": {
+        "get-vpcs": {
+            "module": "vpcs",
+            "method": "get_vpcs",
+            "stream": "iter_vpcs",
+            "help": "Get a list of VPCs",
+            "args": [("cluster", "str", False, "")],
+        },
+        "get-vpc": {
+            "module": "vpcs",
+            "method": "get_vpc",
+            "stream": None,
+            "help": "Get detailed information about a specific VPC",
+            "args": [
+                ("id", "str", True, "Unique identifier for a resource within the cluster"),
+                ("cluster", "str", True, "The cluster you're operating on"),
+            ],
+        },
+        "create-vpc": {
+            "module": "vpcs",
+            "method": "create_vpc",
+            "stream": None,
+            "help": "Create a new VPC",
+            "args": [
+                (
+                    "name",
+                    "str",
+                    True,
+                    "name of the VPC. should start with {tenancyName}-  in case of creating default VPC, name should...",
+                ),
+                (
+                    "block_intra_vpc_comms",
+                    "bool",
+                    False,
+                    "if set to true, this VPC will block any intra-VPC communications if ommited, default is false",
+                ),
+                (
+                    "is_default",
+                    "bool",
+                    False,
+                    "if set to true, this VPC will be the default VPC for the cluster only one VPC can be default per...",
+                ),
+                ("cluster", "str", True, "The cluster you're operating on"),
+            ],
+        },
+        "destroy-vpc": {
+            "module": "vpcs",
+            "method": "destroy_vpc",
+            "stream": None,
+            "help": "Destroy a VPC",
+            "args": [
+                ("id", "str", True, "Unique identifier for a resource within the cluster"),
+                ("cluster", "str", True, "The cluster you're operating on"),
+            ],
+        },
+    },
+    "servers snapshots": {
+        "get-snapshots": {
+            "module": "servers.snapshots",
+            "method": "get_snapshots",
+            "stream": "iter_snapshots",
+            "help": "Get list of snapshots.",
+            "args": [("cluster", "str", False, "")],
+        },
+        "get-snapshot": {
+            "module": "servers.snapshots",
+            "method": "get_snapshot",
+            "stream": None,
+            "help": "Get detailed information on specific snapshot.",
+            "args": [
+                ("id", "str", True, "Name of snapshot"),
+                ("namespace", "str", True, "The namespace/vpc."),
+                ("cluster", "str", True, "The cluster you're operating on"),
+            ],
+        },
+        "create-snapshot": {
+            "module": "servers.snapshots",
+            "method": "create_snapshot",
+            "stream": None,
+            "help": "Create a new snapshot from an existing virtual machine.",
+            "args": [
+                ("name", "str", False, ""),
+                ("namespace", "str", True, ""),
+                ("cluster", "str", True, ""),
+                ("source_v_m_name", "str", False, ""),
+            ],
+        },
+        "delete-snapshot": {
+            "module": "servers.snapshots",
+            "method": "delete_snapshot",
+            "stream": None,
+            "help": "Delete snapshot.",
+            "args": [
+                ("id", "str", True, "Name of snapshot"),
+                ("namespace", "str", True, "The namespace/vpc."),
+                ("cluster", "str", True, "The cluster you're operating on"),
+            ],
+        },
+    },
+}
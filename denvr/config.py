@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import logging
 import os
 
 import toml
@@ -7,22 +8,42 @@ import toml
 from requests.auth import AuthBase
 
 from denvr.auth import auth
+from denvr.cache import DEFAULT_CACHE_PATH
 
+logger = logging.getLogger(__name__)
+
+DEFAULT_SERVER = "https://api.cloud.denvrdata.com"
 DEFAULT_CONFIG_PATH = os.path.join(os.path.expanduser("~"), ".config", "denvr.toml")
 
 
 class Config:
     """
-    Stores the auth and defaults.
+    Stores the auth and defaults, along with any per server auth when multiple `servers` are configured.
     """
 
-    def __init__(self, defaults: dict, auth: AuthBase | None):
+    def __init__(
+        self, defaults: dict, auth: AuthBase | None, auths: dict[str, AuthBase] | None = None
+    ):
         self.defaults = defaults
         self.auth = auth
+        self.auths = auths or {}
 
     @property
     def server(self):
-        return self.defaults.get("server", "https://api.cloud.denvrdata.com")
+        return self.defaults.get("server", self.servers[0])
+
+    @property
+    def servers(self):
+        servers = self.defaults.get("servers")
+        if not servers:
+            return [self.defaults.get("server", DEFAULT_SERVER)]
+        return servers
+
+    def auth_for(self, server: str) -> AuthBase | None:
+        """
+        The auth to use for a specific server (e.g., a Bearer token issued by that server).
+        """
+        return self.auths.get(server, self.auth)
 
     @property
     def api(self):
@@ -48,6 +69,88 @@ class Config:
     def retries(self):
         return self.defaults.get("retries", 3)
 
+    @property
+    def records(self):
+        return self.defaults.get("records", False)
+
+    @property
+    def intern_size(self):
+        return self.defaults.get("intern_size", 0)
+
+    @property
+    def revalidate(self):
+        return self.defaults.get("revalidate", False)
+
+    @property
+    def compression(self):
+        return self.defaults.get("compression", True)
+
+    @property
+    def compress_requests(self):
+        return self.defaults.get("compress_requests", 0)
+
+    @property
+    def cache(self):
+        """
+        The local response cache path or `None` if caching is disabled.
+        """
+        value = self.defaults.get("cache", False)
+        if value is True:
+            return DEFAULT_CACHE_PATH
+        return os.path.expanduser(value) if value else None
+
+    @property
+    def cache_ttls(self):
+        return self.defaults.get("cache_ttls", {})
+
+    @property
+    def profile(self):
+        """
+        The threshold in seconds for capturing slow calls when profiling is enabled (`DENVR_PROFILE`),
+        or `None` if profiling is disabled. A value of `true` uses a threshold of 1 second.
+        """
+        value = os.getenv("DENVR_PROFILE", self.defaults.get("profile", False))
+        if isinstance(value, str):
+            value = value.strip().lower()
+            if value in ("", "0", "false", "no", "off"):
+                return None
+            if value in ("1", "true", "yes", "on"):
+                return 1.0
+        if value is True:
+            return 1.0
+        return float(value) if value else None
+
+    @property
+    def trace(self):
+        """
+        The file to export tracing spans to as JSON lines (`DENVR_TRACE`), or `None` if tracing is disabled.
+        """
+        value = os.getenv("DENVR_TRACE", self.defaults.get("trace"))
+        return os.path.expanduser(value) if value else None
+
+    @property
+    def record(self):
+        """
+        The cassette file to record requests and responses to (`DENVR_RECORD`), or `None`.
+        """
+        value = os.getenv("DENVR_RECORD", self.defaults.get("record"))
+        return os.path.expanduser(value) if value else None
+
+    @property
+    def replay(self):
+        """
+        The cassette file to serve recorded responses from instead of the servers (`DENVR_REPLAY`), or `None`.
+        """
+        value = os.getenv("DENVR_REPLAY", self.defaults.get("replay"))
+        return os.path.expanduser(value) if value else None
+
+    @property
+    def faults(self):
+        """
+        The fault injection rules for resilience testing (see `denvr.faults.Injector.from_config`), or `None`.
+        """
+        return self.defaults.get("faults")
+
     def getkwarg(self, name, val):
         """
         Uses default value for the provided `name` if `val` is `None`.
@@ -58,18 +161,45 @@ class Config:
         return val
 
 
+def load(path=None) -> tuple[str, dict]:
+    """
+    Load the raw config file contents, without constructing any auth.
+
+    Returns:
+        The resolved config path and its contents (empty if the file doesn't exist).
+    """
+    config_path = path if path else os.getenv("DENVR_CONFIG", DEFAULT_CONFIG_PATH)
+    return config_path, toml.load(config_path) if os.path.exists(config_path) else {}
+
+
 def config(path=None):
     """
     Construct a Config object from the provide config file path.
     """
-    config_path = path if path else os.getenv("DENVR_CONFIG", DEFAULT_CONFIG_PATH)
-    config = toml.load(config_path) if os.path.exists(config_path) else {}
+    config_path, config = load(path)
     defaults = config.get("defaults", {})
-    server = defaults.get("server", "https://api.cloud.denvrdata.com")
-
-    return Config(
-        defaults=defaults,
-        auth=auth(
-            config_path, config.get("credentials", {}), server, defaults.get("retries", 3)
-        ),
-    )
+    credentials = config.get("credentials", {})
+    retries = defaults.get("retries", 3)
+    servers = Config(defaults, None).servers
+    if Config(defaults, None).replay:
+        # Replayed responses were recorded with credentials, so no auth is needed
+        return Config(defaults=defaults, auth=None)
+    if len(servers) == 1:
+        return Config(
+            defaults=defaults, auth=auth(config_path, credentials, servers[0], retries)
+        )
+
+    # Tokens are issued per server, so authenticate against each one we can reach
+    auths = {}
+    error = None
+    for server in servers:
+        try:
+            auths[server] = auth(config_path, credentials, server, retries)
+        except Exception as e:
+            logger.warning("Failed to authenticate with %s: %s", server, e)
+            error = e
+
+    if not auths:
+        raise Exception(f"Failed to authenticate with any of {servers}") from error
+
+    return Config(defaults=defaults, auth=next(iter(auths.values())), auths=auths)
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# Methods which are safe to retry against another endpoint
+IDEMPOTENT_METHODS = {"GET", "HEAD", "PUT", "DELETE", "OPTIONS", "TRACE"}
+
+
+class Endpoint:
+    """
+    The health of a single API server, tracked as moving averages of its round trip time and error rate.
+
+    Attributes:
+        url (str): The server URL (e.g., "https://api.cloud.denvrdata.com").
+        rtt (float): The average round trip time in seconds, or `None` if it hasn't been measured.
+        error_rate (float): The average fraction of failed requests.
+        failures (int): The number of consecutive failures.
+        down_until (float): When a degraded endpoint can be retried (see `time.monotonic`).
+    """
+
+    __slots__ = ("url", "rtt", "error_rate", "failures", "down_until")
+
+    def __init__(self, url: str):
+        self.url = url
+        self.rtt: float | None = None
+        self.error_rate = 0.0
+        self.failures = 0
+        self.down_until = 0.0
+
+    def healthy(self, now: float | None = None) -> bool:
+        return (now if now is not None else time.monotonic()) >= self.down_until
+
+    def score(self) -> float:
+        # Penalize endpoints with recent errors, so a slightly slower but reliable endpoint is preferred.
+        rtt = self.rtt if self.rtt is not None else float("inf")
+        return rtt * (1 + 10 * self.error_rate)
+
+    def __repr__(self) -> str:
+        rtt = f"{self.rtt * 1000:.1f}ms" if self.rtt is not None else None
+        return f"Endpoint(url={self.url!r}, rtt={rtt}, error_rate={self.error_rate:.2f})"
+
+
+class Endpoints:
+    """
+    Endpoints(urls, alpha=0.2, max_failures=3, cooldown=30)
+
+    Selects the fastest healthy API server from a list, based on probed and observed round trip times.
+
+    Endpoints with `max_failures` consecutive failures are considered down for `cooldown` seconds
+    (doubling with each further failure, up to 10 minutes), after which they're tried again.
+
+    Args:
+        urls (list): The server URLs in order of preference when no measurements are available.
+        alpha (float): The weight of new measurements in the moving averages.
+        max_failures (int): Consecutive failures before an endpoint is considered down.
+        cooldown (float): Seconds before a down endpoint is tried again.
+    """
+
+    def __init__(
+        self, urls: list[str], alpha: float = 0.2, max_failures: int = 3, cooldown: float = 30
+    ):
+        self.endpoints = [Endpoint(url.rstrip("/")) for url in urls]
+        self.alpha = alpha
+        self.max_failures = max_failures
+        self.cooldown = cooldown
+        self.probed = False
+        self._lock = threading.Lock()
+
+    def __iter__(self):
+        return iter(self.endpoints)
+
+    def __len__(self) -> int:
+        return len(self.endpoints)
+
+    def probe(
+        self, session: requests.Session | None = None, timeout: float = 2.0, force: bool = False
+    ):
+        """
+        Measure the round trip time of each endpoint concurrently, unless they've already been probed
+        (or `force` is set).
+        Any HTTP response counts as reachable, while connection errors and timeouts are failures.
+        Without a `session`, a temporary one is used and closed afterwards.
+        """
+        with self._lock:
+            if self.probed and not force:
+                return
+            # Claimed before measuring, so concurrent first requests don't each probe
+            self.probed = True
+
+        if session is None:
+            with requests.Session() as session:
+                self._measure(session, timeout)
+        else:
+            self._measure(session, timeout)
+
+    def _measure(self, session: requests.Session, timeout: float):
+        def measure(endpoint: Endpoint):
+            start = time.perf_counter()
+            try:
+                session.head(endpoint.url, timeout=timeout, allow_redirects=False)
+            except requests.RequestException as e:
+                logger.debug("Probe failed for %s: %s", endpoint.url, e)
+                self.failure(endpoint)
+            else:
+                self.success(endpoint, time.perf_counter() - start)
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=len(self.endpoints)) as executor:
+            list(executor.map(measure, self.endpoints))
+
+    def ordered(self) -> list[Endpoint]:
+        """
+        The endpoints in order of preference: healthy endpoints by score, followed by any down
+        endpoints by when they can be retried.
+        """
+        now = time.monotonic()
+        healthy = [e for e in self.endpoints if e.healthy(now)]
+        down = [e for e in self.endpoints if not e.healthy(now)]
+        # Sorting is stable, so unmeasured endpoints keep their configured order
+        return sorted(healthy, key=Endpoint.score) + sorted(down, key=lambda e: e.down_until)
+
+    def select(self) -> Endpoint:
+        """
+        The preferred endpoint.
+        """
+        return self.ordered()[0]
+
+    def success(self, endpoint: Endpoint, elapsed: float):
+        with self._lock:
+            a = self.alpha
+            endpoint.rtt = (
+                elapsed if endpoint.rtt is None else (1 - a) * endpoint.rtt + a * elapsed
+            )
+            endpoint.error_rate *= 1 - a
+            endpoint.failures = 0
+            endpoint.down_until = 0.0
+
+    def failure(self, endpoint: Endpoint):
+        with self._lock:
+            endpoint.error_rate = (1 - self.alpha) * endpoint.error_rate + self.alpha
+            endpoint.failures += 1
+            if endpoint.failures >= self.max_failures:
+                backoff = self.cooldown * 2 ** (endpoint.failures - self.max_failures)
+                endpoint.down_until = time.monotonic() + min(backoff, 600)
+                logger.warning("Endpoint %s is degraded, failing over", endpoint.url)
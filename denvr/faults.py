@@ -0,0 +1,331 @@
+from __future__ import annotations
+
+import errno
+import fnmatch
+import http.client
+import io
+import json
+import math
+import random
+import threading
+import time
+
+from collections import Counter
+from typing import Any, Callable
+
+from urllib3.exceptions import ReadTimeoutError
+from urllib3.response import HTTPResponse
+
+from denvr.tracing import TracedHTTPConnectionPool, TracedHTTPSConnectionPool, TracingAdapter
+
+# A latency distribution, which samples a delay in seconds from a random number generator
+Distribution = Callable[[random.Random], float]
+
+
+def fixed(seconds: float) -> Distribution:
+    return lambda rng: seconds
+
+
+def uniform(low: float, high: float) -> Distribution:
+    return lambda rng: rng.uniform(low, high)
+
+
+def exponential(mean: float) -> Distribution:
+    return lambda rng: rng.expovariate(1 / mean)
+
+
+def lognormal(median: float, sigma: float) -> Distribution:
+    """
+    A long tailed distribution, where `sigma` of 1 puts the p99 at about 10x the `median`.
+    """
+    mu = math.log(median)
+    return lambda rng: rng.lognormvariate(mu, sigma)
+
+
+DISTRIBUTIONS: dict[str, Callable[..., Distribution]] = {
+    "fixed": fixed,
+    "uniform": uniform,
+    "exponential": exponential,
+    "lognormal": lognormal,
+}
+
+
+def distribution(spec: float | str | Distribution) -> Distribution:
+    """
+    Parse a latency distribution from a number of seconds or a "<name>:<args>" string
+    (e.g., "uniform:0.01,0.1", "exponential:0.05" or "lognormal:0.02,1.0"), see `DISTRIBUTIONS`.
+    """
+    if callable(spec):
+        return spec
+    if isinstance(spec, (int, float)):
+        return fixed(float(spec))
+
+    name, _, args = spec.partition(":")
+    if name not in DISTRIBUTIONS:
+        try:
+            return fixed(float(spec))
+        except ValueError:
+            raise ValueError(
+                f"Unknown latency distribution {spec!r}, expected one of {list(DISTRIBUTIONS)}"
+            ) from None
+    return DISTRIBUTIONS[name](*(float(a) for a in args.split(",") if a))
+
+
+class Rule:
+    """
+    Rule(path="*", method=None, rate=1.0, status=None, retry_after=None, reset=False, latency=None, burst=1, limit=None)
+
+    A fault injected into the requests matching `method` and the `path` glob with probability `rate`.
+
+    Args:
+        path (str): A glob for the request path (e.g., "/api/v1/servers/virtual/*").
+        method (str): The request method to match, or `None` for any method.
+        rate (float): The probability that a matching request triggers the fault.
+        status (int): Respond with this error status (e.g., 429 or 503) instead of sending the request.
+        retry_after (int): The `Retry-After` header in seconds for `status` responses, if any.
+        reset (bool): Fail with a connection reset instead of sending the request.
+        latency (float, str or callable): Delay the request by a sample from this distribution
+            (see `distribution`), timing out if it exceeds the read timeout.
+        burst (int): Once triggered, the fault also applies to the next `burst - 1` matching requests
+            (e.g., a 503 outage rather than independent failures).
+        limit (int): The maximum number of requests to inject the fault into, or `None` for no limit.
+    """
+
+    def __init__(
+        self,
+        path: str = "*",
+        method: str | None = None,
+        rate: float = 1.0,
+        status: int | None = None,
+        retry_after: int | None = None,
+        reset: bool = False,
+        latency: float | str | Distribution | None = None,
+        burst: int = 1,
+        limit: int | None = None,
+    ):
+        self.path = path
+        self.method = method.upper() if method else None
+        self.rate = rate
+        self.status = status
+        self.retry_after = retry_after
+        self.reset = reset
+        self.latency = distribution(latency) if latency is not None else None
+        self.burst = burst
+        self.limit = limit
+
+    def matches(self, method: str, path: str) -> bool:
+        return (self.method is None or self.method == method) and fnmatch.fnmatchcase(
+            path, self.path
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"Rule(path={self.path!r}, method={self.method!r}, rate={self.rate}, "
+            f"status={self.status}, reset={self.reset}, burst={self.burst})"
+        )
+
+
+class Fault:
+    """
+    The faults drawn for a single request attempt.
+    """
+
+    __slots__ = ("delay", "status", "retry_after", "reset")
+
+    def __init__(self):
+        self.delay = 0.0
+        self.status: int | None = None
+        self.retry_after: int | None = None
+        self.reset = False
+
+
+class Injector:
+    """
+    Injector(rules, seed=None)
+
+    Draws the faults for each request attempt from a list of `Rule`s, using a random number generator
+    seeded with `seed` so scenarios are reproducible (for a given order of requests).
+
+    Every matching rule adds its latency, while the first matching error (status or reset) wins.
+    Each attempt is drawn separately, so retries of a failed request can succeed or fail again.
+
+    `counts` tracks the attempts and the faults injected (e.g., "status.503", "reset", "delayed"
+    and "timeout").
+
+    Example:
+
+        injector = faults.Injector(
+            [faults.Rule(status=503, rate=0.01, burst=5), faults.Rule(latency="lognormal:0.02,1")],
+            seed=42,
+        )
+        faults.install(session, injector)
+    """
+
+    def __init__(self, rules: list[Rule], seed: int | None = None):
+        self.rules = rules
+        self.seed = seed
+        self.random = random.Random(seed)
+        self.counts: Counter = Counter()
+        # The remaining requests of each rule's current burst, and the requests it was injected into
+        self._remaining = [0] * len(rules)
+        self._injected = [0] * len(rules)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: dict) -> Injector:
+        """
+        Construct an injector from the `faults` config table, with a `seed` and a `rules` list of `Rule` arguments.
+        """
+        return cls([Rule(**rule) for rule in config.get("rules", [])], config.get("seed"))
+
+    def draw(self, method: str, path: str) -> Fault | None:
+        """
+        The faults to inject into a request attempt, or `None` to send it unchanged.
+        """
+        fault = None
+        with self._lock:
+            self.counts["attempts"] += 1
+            for i, rule in enumerate(self.rules):
+                if not rule.matches(method, path) or self._injected[i] == rule.limit:
+                    continue
+                if self._remaining[i]:
+                    self._remaining[i] -= 1
+                elif self.random.random() < rule.rate:
+                    self._remaining[i] = rule.burst - 1
+                else:
+                    continue
+
+                self._injected[i] += 1
+                fault = fault or Fault()
+                if rule.latency is not None:
+                    fault.delay += rule.latency(self.random)
+                if fault.status is None and not fault.reset:
+                    fault.status = rule.status
+                    fault.retry_after = rule.retry_after
+                    fault.reset = rule.reset
+
+            if fault is not None:
+                if fault.delay:
+                    self.counts["delayed"] += 1
+                if fault.reset:
+                    self.counts["reset"] += 1
+                elif fault.status is not None:
+                    self.counts[f"status.{fault.status}"] += 1
+        return fault
+
+    def inject(self, pool, make_request, conn, method: str, url: str, **kwargs) -> HTTPResponse:
+        """
+        Send a request attempt through `make_request` (urllib3's `_make_request`) with any drawn faults,
+        below urllib3's retries so they handle injected faults like real ones.
+        """
+        fault = self.draw(method, url.split("?", 1)[0])
+        if fault is None:
+            return make_request(conn, method, url, **kwargs)
+
+        if fault.delay:
+            timeout = kwargs.get("timeout")
+            read_timeout = getattr(timeout, "read_timeout", None)
+            if isinstance(read_timeout, (int, float)) and fault.delay >= read_timeout:
+                with self._lock:
+                    self.counts["timeout"] += 1
+                time.sleep(read_timeout)
+                raise ReadTimeoutError(
+                    pool, url, f"Read timed out. (read timeout={read_timeout}, injected)"
+                )
+            time.sleep(fault.delay)
+
+        if fault.reset:
+            raise ConnectionResetError(errno.ECONNRESET, "Connection reset by peer (injected)")
+
+        if fault.status is None:
+            return make_request(conn, method, url, **kwargs)
+
+        return self.response(pool, fault, method, url, **kwargs)
+
+    def response(self, pool, fault: Fault, method: str, url: str, **kwargs) -> HTTPResponse:
+        body = json.dumps(
+            {
+                "result": None,
+                "success": False,
+                "error": {"code": 0, "message": "Injected fault.", "details": None},
+                "unAuthorizedRequest": False,
+            }
+        ).encode()
+        headers = {"Content-Type": "application/json", "Content-Length": str(len(body))}
+        if fault.retry_after is not None:
+            headers["Retry-After"] = str(fault.retry_after)
+
+        # The unused connection is returned to the pool along with the response (e.g., when it's drained)
+        return HTTPResponse(
+            body=io.BytesIO(body),
+            headers=headers,
+            status=fault.status,  # type: ignore[arg-type]
+            reason=http.client.responses.get(fault.status, ""),  # type: ignore[arg-type]
+            preload_content=kwargs.get("preload_content", True),
+            decode_content=kwargs.get("decode_content", True),
+            original_response=None,
+            pool=pool,
+            connection=kwargs.get("response_conn"),
+            retries=kwargs.get("retries"),
+            request_method=method,
+            request_url=url,
+        )
+
+
+class FaultInjectionMixin:
+    """
+    Sends each request attempt through the pool's `injector`.
+    """
+
+    injector: Injector
+
+    def _make_request(self, conn, method, url, *args, **kwargs) -> Any:
+        if args:
+            # `_make_request` is always called with keyword arguments, but stay correct if it isn't
+            return super()._make_request(conn, method, url, *args, **kwargs)  # type: ignore[misc]
+        return self.injector.inject(
+            self,
+            super()._make_request,  # type: ignore[misc]
+            conn,
+            method,
+            url,
+            **kwargs,
+        )
+
+
+class FaultAdapter(TracingAdapter):
+    """
+    FaultAdapter(injector, **kwargs)
+
+    A `TracingAdapter` which injects the `injector`'s faults into each request attempt, including retries.
+    """
+
+    def __init__(self, injector: Injector, **kwargs):
+        self.injector = injector
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        attrs = {"injector": self.injector}
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": type(
+                "FaultHTTPConnectionPool",
+                (FaultInjectionMixin, TracedHTTPConnectionPool),
+                attrs,
+            ),
+            "https": type(
+                "FaultHTTPSConnectionPool",
+                (FaultInjectionMixin, TracedHTTPSConnectionPool),
+                attrs,
+            ),
+        }
+
+
+def install(session, injector: Injector) -> Injector:
+    """
+    Inject faults into every request a `Session` sends, keeping its retry strategy.
+    """
+    for server in session.config.servers:
+        adapter = session.session.get_adapter(server)
+        session.session.mount(server, FaultAdapter(injector, max_retries=adapter.max_retries))
+    return injector
@@ -0,0 +1,392 @@
+from __future__ import annotations
+
+import importlib
+import logging
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Iterable, Optional, Tuple
+
+from denvr.session import Session
+
+logger = logging.getLogger(__name__)
+
+# Inventory sources fetched for each cluster, as name -> (client, method).
+CLUSTER_SOURCES = {
+    "servers": ("servers/virtual", "get_servers"),
+    "hosts": ("servers/metal", "get_hosts"),
+    "snapshots": ("servers/snapshots", "get_snapshots"),
+}
+
+# Inventory sources which aren't scoped to a cluster (e.g., `get_applications` has no cluster filter).
+FLEET_SOURCES = {"applications": ("servers/applications", "get_applications")}
+
+# Fields with secondary indexes by default
+INDEXED_FIELDS = ("status", "gpu_type", "configuration", "rpool", "node_selector")
+
+# Inventory items are identified by (cluster, namespace, id), where namespace is `None` for hosts.
+Key = Tuple[Optional[str], Optional[str], Any]
+
+
+def clients(session: Session, names: Iterable[str]) -> dict:
+    """
+    Returns a dict of client name (e.g., "servers/virtual") to `Client` sharing the same session.
+    """
+    results = {}
+    for name in names:
+        mod = importlib.import_module(
+            "denvr.api.{}.{}".format(session.config.api, ".".join(name.split("/")))
+        )
+        results[name] = mod.Client(session)
+
+    return results
+
+
+class Source:
+    """
+    The result of fetching a single inventory source (e.g., "servers") for a cluster.
+
+    Attributes:
+        name (str): The source name (e.g., "servers").
+        cluster (str): The cluster or `None` for fleet-wide sources (e.g., "applications").
+        items (list): The returned items, which is empty if the request failed.
+        error (Exception): The error raised by the request, if any.
+        timestamp (datetime): When the response was received (UTC).
+        elapsed (float): Seconds spent on the request.
+    """
+
+    __slots__ = ("name", "cluster", "items", "error", "timestamp", "elapsed")
+
+    def __init__(
+        self,
+        name: str,
+        cluster: str | None,
+        items: list | None = None,
+        error: Exception | None = None,
+        timestamp: datetime | None = None,
+        elapsed: float = 0.0,
+    ):
+        self.name = name
+        self.cluster = cluster
+        self.items = items if items is not None else []
+        self.error = error
+        self.timestamp = timestamp or datetime.now(timezone.utc)
+        self.elapsed = elapsed
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __repr__(self) -> str:
+        status = f"error={self.error!r}" if self.error else f"items={len(self.items)}"
+        return f"Source(name={self.name!r}, cluster={self.cluster!r}, {status})"
+
+
+class Snapshot:
+    """
+    A point in time view of the inventory across clusters, merged from each `Source`.
+
+    Attributes:
+        clusters (list): The clusters included in the snapshot.
+        sources (dict): (source name, cluster) -> `Source`, where fleet-wide sources have a `None` cluster.
+        started (datetime): When the snapshot was started (UTC).
+        finished (datetime): When the last source completed (UTC).
+    """
+
+    def __init__(self, clusters: list[str], sources: Iterable[Source], started: datetime):
+        self.clusters = clusters
+        self.sources: dict[tuple[str, str | None], Source] = {
+            (s.name, s.cluster): s for s in sources
+        }
+        self.started = started
+        self.finished = max((s.timestamp for s in self.sources.values()), default=started)
+
+    def items(self, name: str, cluster: str | None = None) -> list:
+        """
+        Returns the items of a source (e.g., "servers") across all clusters, or for a single cluster.
+        Items from fleet-wide sources are filtered on their `cluster` field.
+        """
+        results: list = []
+        for (source, source_cluster), s in self.sources.items():
+            if source != name:
+                continue
+            if source_cluster is None and cluster is not None:
+                results.extend(i for i in s.items if i.get("cluster") == cluster)
+            elif cluster is None or source_cluster == cluster:
+                results.extend(s.items)
+
+        return results
+
+    @property
+    def servers(self) -> list:
+        return self.items("servers")
+
+    @property
+    def hosts(self) -> list:
+        return self.items("hosts")
+
+    @property
+    def snapshots(self) -> list:
+        return self.items("snapshots")
+
+    @property
+    def applications(self) -> list:
+        return self.items("applications")
+
+    def timestamps(self) -> dict[tuple[str, str | None], datetime]:
+        """
+        Returns (source name, cluster) -> when that source's response was received.
+        """
+        return {k: s.timestamp for k, s in self.sources.items()}
+
+    @property
+    def errors(self) -> dict[str | None, dict[str, Exception]]:
+        """
+        Failed sources grouped by cluster as `{cluster: {source name: error}}`.
+        Fleet-wide source failures are reported under the `None` cluster.
+        """
+        results: dict[str | None, dict[str, Exception]] = {}
+        for s in self.sources.values():
+            if s.error is not None:
+                results.setdefault(s.cluster, {})[s.name] = s.error
+
+        return results
+
+    @property
+    def complete(self) -> bool:
+        """
+        Whether every source was fetched successfully.
+        """
+        return all(s.ok for s in self.sources.values())
+
+    def __repr__(self) -> str:
+        return (
+            f"Snapshot(clusters={self.clusters!r}, servers={len(self.servers)}, "
+            f"hosts={len(self.hosts)}, snapshots={len(self.snapshots)}, "
+            f"applications={len(self.applications)}, errors={len(self.errors)})"
+        )
+
+
+def _fetch(name: str, cluster: str | None, func: Callable[..., Any]) -> Source:
+    start = time.perf_counter()
+    try:
+        result = func(cluster=cluster) if cluster is not None else func()
+    except Exception as e:
+        logger.debug("Failed to fetch %s for cluster %s: %s", name, cluster, e)
+        return Source(name, cluster, error=e, elapsed=time.perf_counter() - start)
+
+    items = result.get("items", []) if hasattr(result, "get") else result
+    return Source(name, cluster, items=list(items), elapsed=time.perf_counter() - start)
+
+
+def cluster_names(result: list) -> list[str]:
+    """
+    Extract the cluster names from a `clusters.get_all` response.
+    """
+    return [c if isinstance(c, str) else c["name"] for c in result]
+
+
+def snapshot(
+    session: Session, clusters: list[str] | None = None, max_workers: int = 8
+) -> Snapshot:
+    """
+    Fetch the servers, hosts, snapshots and applications across clusters concurrently and
+    merge them into a single `Snapshot`.
+
+    Failures of individual sources are recorded on the snapshot (see `Snapshot.errors`) rather than
+    raised, so a single unavailable cluster doesn't prevent reporting on the rest of the fleet.
+
+    Example:
+
+        inventory = snapshot(Session(config()))
+        for server in inventory.servers:
+            print(server["cluster"], server["id"], server["status"])
+
+    Args:
+        session: The session used for all requests.
+        clusters: The clusters to include, defaulting to all clusters from `clusters.get_all`.
+        max_workers: The maximum number of concurrent requests.
+
+    Returns:
+        A Snapshot of the inventory.
+    """
+    started = datetime.now(timezone.utc)
+    names = {client for client, _ in [*CLUSTER_SOURCES.values(), *FLEET_SOURCES.values()]}
+    _clients = clients(session, ["clusters", *names])
+    if clusters is None:
+        clusters = cluster_names(_clients["clusters"].get_all())
+
+    tasks: list[tuple[str, str | None, Callable]] = [
+        (name, None, getattr(_clients[client], method))
+        for name, (client, method) in FLEET_SOURCES.items()
+    ]
+    tasks.extend(
+        (name, cluster, getattr(_clients[client], method))
+        for cluster in clusters
+        for name, (client, method) in CLUSTER_SOURCES.items()
+    )
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        sources = list(executor.map(lambda task: _fetch(*task), tasks))
+
+    return Snapshot(clusters, sources, started)
+
+
+class Index:
+    """
+    Index(fields=INDEXED_FIELDS)
+
+    An in-memory index of inventory items (e.g., from `get_servers`) keyed by (cluster, namespace, id),
+    with secondary hash indexes on `fields` and the cluster, so queries like
+    "all ONLINE A100 VMs in Hou1" only touch the matching items rather than the whole fleet.
+
+    The index is refreshed by diffing each new list response against the items from the last one,
+    so only added, modified or deleted items update the secondary indexes.
+
+    Example:
+
+        index = Index()
+        index.refresh(virtual.get_servers(cluster="Hou1"), cluster="Hou1")
+        index.query(cluster="Hou1", status="ONLINE", gpu_type="nvidia.com/A100PCIE40GB")
+
+        hosts = Index(fields=["powered_on", "operational_status"])
+        hosts.update(snapshot(session), "hosts")
+        hosts.query(powered_on=False)
+
+    Args:
+        fields (list): The item fields to maintain secondary indexes for.
+    """
+
+    def __init__(self, fields: Iterable[str] = INDEXED_FIELDS):
+        self.fields = tuple(fields)
+        self.items: dict[Key, Any] = {}
+        self.indexes: dict[str, dict[Any, set[Key]]] = {field: {} for field in self.fields}
+        self.clusters: dict[str | None, set[Key]] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.items
+
+    @staticmethod
+    def key(item) -> Key:
+        return (item.get("cluster"), item.get("namespace"), item.get("id"))
+
+    def get(self, cluster: str | None, namespace: str | None, id: Any, default=None):
+        return self.items.get((cluster, namespace, id), default)
+
+    def _insert(self, key: Key, item):
+        self.items[key] = item
+        self.clusters.setdefault(key[0], set()).add(key)
+        for field in self.fields:
+            self.indexes[field].setdefault(item.get(field), set()).add(key)
+
+    def _remove(self, key: Key):
+        item = self.items.pop(key)
+        _discard(self.clusters, key[0], key)
+        for field in self.fields:
+            _discard(self.indexes[field], item.get(field), key)
+
+    def refresh(self, items, cluster: str | None = None) -> dict[str, list[Key]]:
+        """
+        Update the index from a new list response (or list of items).
+
+        Items for `cluster` (or the whole fleet if `None`) which are no longer present are deleted,
+        so a response for one cluster doesn't affect the items of any others.
+
+        Returns:
+            The keys which were `"added"`, `"modified"` and `"deleted"`.
+        """
+        if hasattr(items, "get") and not isinstance(items, list):
+            items = items.get("items", [])
+
+        changes: dict[str, list[Key]] = {"added": [], "modified": [], "deleted": []}
+        with self._lock:
+            seen = set()
+            for item in items:
+                key = self.key(item)
+                seen.add(key)
+                current = self.items.get(key)
+                if current is None:
+                    self._insert(key, item)
+                    changes["added"].append(key)
+                elif current != item:
+                    self._remove(key)
+                    self._insert(key, item)
+                    changes["modified"].append(key)
+
+            if cluster is None:
+                scope: Iterable[Key] = list(self.items)
+            else:
+                scope = list(self.clusters.get(cluster, ()))
+
+            for key in scope:
+                if key not in seen:
+                    self._remove(key)
+                    changes["deleted"].append(key)
+
+        return changes
+
+    def update(self, inventory: Snapshot, name: str = "servers") -> dict[str, list[Key]]:
+        """
+        Refresh the index from a source (e.g., "servers") of an inventory `Snapshot`.
+        Sources which failed are skipped, so their items aren't dropped from the index.
+        """
+        changes: dict[str, list[Key]] = {"added": [], "modified": [], "deleted": []}
+        for (source, cluster), s in inventory.sources.items():
+            if source == name and s.ok:
+                for k, v in self.refresh(s.items, cluster=cluster).items():
+                    changes[k].extend(v)
+
+        return changes
+
+    def query(self, cluster: str | None = None, **criteria) -> list:
+        """
+        Returns the items matching all of the criteria (e.g., `status="ONLINE"`), optionally within a cluster.
+
+        Indexed fields are matched by intersecting the secondary indexes, starting from the smallest,
+        and any other fields are checked on the remaining candidates.
+        """
+        with self._lock:
+            candidates = []
+            if cluster is not None:
+                candidates.append(self.clusters.get(cluster, set()))
+
+            remaining = {}
+            for field, value in criteria.items():
+                if field in self.indexes:
+                    candidates.append(self.indexes[field].get(value, set()))
+                else:
+                    remaining[field] = value
+
+            if candidates:
+                candidates.sort(key=len)
+                first, *rest = candidates
+                keys: Iterable[Key] = (k for k in first if all(k in c for c in rest))
+            else:
+                keys = self.items
+
+            return [
+                self.items[k]
+                for k in keys
+                if all(self.items[k].get(f) == v for f, v in remaining.items())
+            ]
+
+    def count(self, field: str) -> dict[Any, int]:
+        """
+        Returns the number of items for each value of an indexed field (e.g., `{"ONLINE": 10, ...}`).
+        """
+        with self._lock:
+            return {value: len(keys) for value, keys in self.indexes[field].items()}
+
+
+def _discard(index: dict, value: Any, key: Key):
+    keys = index.get(value)
+    if keys is not None:
+        keys.discard(key)
+        if not keys:
+            del index[value]
@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+import threading
+
+from collections import Counter
+from typing import Iterator
+
+# Quantiles reported in snapshots and rendered for Prometheus
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+class Histogram:
+    """
+    Histogram(precision=6)
+
+    An HDR style histogram of latencies recorded with microsecond resolution.
+
+    Values are counted in log-linear buckets: exact below `2**precision` microseconds and
+    with `2**(precision - 1)` buckets per power of two above that, so any recorded value is
+    reported within a relative error of `2**(1 - precision)` (~3% by default) using
+    a small fixed amount of memory regardless of the number of values.
+    """
+
+    __slots__ = ("precision", "half", "counts", "count", "total", "min", "max")
+
+    def __init__(self, precision: int = 6):
+        self.precision = precision
+        self.half = 1 << (precision - 1)
+        self.counts: dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def _index(self, us: int) -> int:
+        if us < 2 * self.half:
+            return us
+        exponent = us.bit_length() - self.precision
+        return exponent * self.half + (us >> exponent)
+
+    def _bounds(self, index: int) -> tuple[int, int]:
+        # The lowest and highest microsecond values counted in a bucket
+        if index < 2 * self.half:
+            return index, index
+        exponent = index // self.half - 1
+        mantissa = index - exponent * self.half
+        return mantissa << exponent, ((mantissa + 1) << exponent) - 1
+
+    def record(self, seconds: float):
+        us = max(int(seconds * 1_000_000), 0)
+        index = self._index(us)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += seconds
+        if seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def merge(self, other: Histogram):
+        assert self.precision == other.precision
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def buckets(self) -> Iterator[tuple[float, int]]:
+        """
+        Yields the (upper bound in seconds, count) of each non-empty bucket in increasing order.
+        """
+        for index in sorted(self.counts):
+            yield self._bounds(index)[1] / 1_000_000, self.counts[index]
+
+    def percentile(self, q: float) -> float:
+        """
+        The value (in seconds) at quantile `q` (e.g., `0.99`), or 0 if nothing has been recorded.
+        """
+        if not self.count:
+            return 0.0
+
+        rank = max(q * self.count, 1)
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                low, high = self._bounds(index)
+                # Report the bucket midpoint, clamped to the observed range
+                return min(max((low + high) / 2 / 1_000_000, self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+class EndpointMetrics:
+    """
+    The metrics collected for a single API path.
+    """
+
+    __slots__ = (
+        "latency",
+        "requests",
+        "errors",
+        "retries",
+        "statuses",
+        "bytes_sent",
+        "bytes_received",
+    )
+
+    def __init__(self, precision: int = 6):
+        self.latency = Histogram(precision)
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.statuses: Counter = Counter()
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    def snapshot(self) -> dict:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "retries": self.retries,
+            "statuses": dict(self.statuses),
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "latency": {
+                "count": self.latency.count,
+                "mean": self.latency.mean,
+                "max": self.latency.max,
+                **{f"p{int(q * 100)}": self.latency.percentile(q) for q in QUANTILES},
+            },
+        }
+
+
+class Metrics:
+    """
+    Metrics(precision=6)
+
+    A metrics collector which uses the `Session` hooks to record per path latency histograms,
+    request and response byte counts, retries and status codes.
+
+    Example:
+
+        metrics = Metrics()
+        metrics.install(session)
+        ...
+        metrics.snapshot()["/api/v1/servers/virtual/GetServers"]["latency"]["p99"]
+        print(metrics.render())  # Prometheus text format
+    """
+
+    def __init__(self, precision: int = 6):
+        self.precision = precision
+        self.endpoints: dict[str, EndpointMetrics] = {}
+        self._lock = threading.Lock()
+
+    def _endpoint(self, path: str) -> EndpointMetrics:
+        endpoint = self.endpoints.get(path)
+        if endpoint is None:
+            endpoint = self.endpoints.setdefault(path, EndpointMetrics(self.precision))
+        return endpoint
+
+    def install(self, session) -> Metrics:
+        """
+        Add the collector's hooks to a `Session`.
+        """
+        session.add_hook("post_response", self.on_response)
+        session.add_hook("on_retry", self.on_retry)
+        session.add_hook("on_error", self.on_error)
+        return self
+
+    def uninstall(self, session):
+        session.remove_hook("post_response", self.on_response)
+        session.remove_hook("on_retry", self.on_retry)
+        session.remove_hook("on_error", self.on_error)
+
+    def on_response(self, path: str, response, elapsed: float, sent: int, received: int, **_):
+        with self._lock:
+            endpoint = self._endpoint(path)
+            endpoint.requests += 1
+            endpoint.latency.record(elapsed)
+            endpoint.statuses[response.status_code] += 1
+            endpoint.bytes_sent += sent
+            endpoint.bytes_received += received
+
+    def on_retry(self, path: str, **_):
+        with self._lock:
+            self._endpoint(path).retries += 1
+
+    def on_error(self, path: str, **_):
+        with self._lock:
+            self._endpoint(path).errors += 1
+
+    def reset(self):
+        with self._lock:
+            self.endpoints = {}
+
+    def snapshot(self) -> dict[str, dict]:
+        """
+        Returns the metrics for each path, with latencies in seconds.
+        """
+        with self._lock:
+            return {path: m.snapshot() for path, m in sorted(self.endpoints.items())}
+
+    def render(self, prefix: str = "denvr") -> str:
+        """
+        Render the metrics in the Prometheus text exposition format.
+        """
+        lines: list[str] = []
+
+        def metric(
+            name: str, kind: str, help: str, samples: list[tuple[str, dict | None, float]]
+        ):
+            lines.append(f"# HELP {prefix}_{name} {help}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            for suffix, labels, value in samples:
+                label = ",".join(f'{k}="{_escape(str(v))}"' for k, v in (labels or {}).items())
+                label = f"{{{label}}}" if label else ""
+                lines.append(f"{prefix}_{name}{suffix}{label} {_number(value)}")
+
+        with self._lock:
+            endpoints = sorted(self.endpoints.items())
+            metric(
+                "requests_total",
+                "counter",
+                "API requests by path and status code.",
+                [
+                    ("", {"path": path, "code": code}, count)
+                    for path, m in endpoints
+                    for code, count in sorted(m.statuses.items())
+                ],
+            )
+            for name, help in [
+                ("errors", "API requests which raised an error."),
+                ("retries", "API request retries."),
+                ("bytes_sent", "API request body bytes."),
+                ("bytes_received", "API response body bytes."),
+            ]:
+                metric(
+                    f"{name}_total",
+                    "counter",
+                    help,
+                    [("", {"path": path}, getattr(m, name)) for path, m in endpoints],
+                )
+
+            samples: list[tuple[str, dict | None, float]] = []
+            for path, m in endpoints:
+                for q in QUANTILES:
+                    samples.append(("", {"path": path, "quantile": q}, m.latency.percentile(q)))
+                samples.append(("_sum", {"path": path}, m.latency.total))
+                samples.append(("_count", {"path": path}, m.latency.count))
+            metric(
+                "request_duration_seconds",
+                "summary",
+                "API request latency in seconds.",
+                samples,
+            )
+
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
@@ -0,0 +1,568 @@
+"""
+Run multi-step provisioning plans, where steps declare their dependencies on the outputs of other steps
+(e.g., the VPC a VM is created in), independent steps run concurrently, and a failure cleans up
+the resources created by the completed steps.
+
+    plan = Plan(session)
+    vpc = plan.add("vpc", "vpcs", "create_vpc", {"name": "train-vpc", "cluster": "Hou1"})
+    for i in range(4):
+        plan.add(
+            f"vm{i}",
+            "servers/virtual",
+            "create_server",
+            {"name": f"train-{i}", "vpc": vpc["id"], "configuration": "A100_40GB_PCIe_1x", ...},
+            wait=True,
+            retries=2,
+        )
+    plan.add("snapshot", "servers/snapshots", "create_snapshot", {"source_v_m_name": Ref("vm0", "id"), ...})
+    results = plan.run()
+
+References to step outputs (`step["id"]` or `Ref("vm0", "id")`) are resolved from the step's result before it
+runs and imply a dependency, along with any step names in `after`. Plans loaded from data (see `Plan.from_dict`)
+can use `"${vm0.id}"` strings as references.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import time
+
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Iterable, Iterator
+
+from requests import ConnectionError, ConnectTimeout, HTTPError
+from urllib3.exceptions import NewConnectionError
+
+from denvr import tracing
+from denvr.inventory import clients
+from denvr.session import Session
+from denvr.waiters import waiter
+
+logger = logging.getLogger(__name__)
+
+# (service, create method) -> (cleanup method, the cleanup kwargs taken from the step's kwargs and result)
+CLEANUPS: dict[tuple[str, str], tuple[str, tuple[str, ...]]] = {
+    ("vpcs", "create_vpc"): ("destroy_vpc", ("id", "cluster")),
+    ("servers/virtual", "create_server"): ("destroy_server", ("id", "namespace", "cluster")),
+    ("servers/snapshots", "create_snapshot"): (
+        "delete_snapshot",
+        ("id", "namespace", "cluster"),
+    ),
+    ("servers/applications", "create_catalog_application"): (
+        "destroy_application",
+        ("id", "cluster"),
+    ),
+    ("servers/applications", "create_custom_application"): (
+        "destroy_application",
+        ("id", "cluster"),
+    ),
+}
+
+# (service, create method) -> (list method, the list kwargs taken from the step's kwargs), used to find
+# a resource by name before retrying its create
+LOOKUPS: dict[tuple[str, str], tuple[str, tuple[str, ...]]] = {
+    ("vpcs", "create_vpc"): ("get_vpcs", ("cluster",)),
+    ("servers/virtual", "create_server"): ("get_servers", ("cluster",)),
+    ("servers/applications", "create_catalog_application"): ("get_applications", ()),
+    ("servers/applications", "create_custom_application"): ("get_applications", ()),
+}
+
+# Error statuses which are returned before a request is processed, when they include `Retry-After`
+# (other errors, like a 504 or a read timeout, may have happened after a resource was created)
+RETRY_STATUSES = frozenset({429, 503})
+
+_TEMPLATE = re.compile(r"^\$\{([\w-]+)((?:\.[\w-]+)*)\}$")
+
+
+class Ref:
+    """
+    Ref(step, *path)
+
+    A reference to a step's output (e.g., `Ref("vpc", "id")`), resolved from its result when a dependent step runs.
+    """
+
+    __slots__ = ("step", "path")
+
+    def __init__(self, step: str, *path: str | int):
+        self.step = step
+        self.path = path
+
+    def __getitem__(self, key: str | int) -> Ref:
+        return Ref(self.step, *self.path, key)
+
+    def resolve(self, results: dict[str, Any]) -> Any:
+        value = results[self.step]
+        for key in self.path:
+            value = value[key]
+        return value
+
+    @classmethod
+    def parse(cls, value: str) -> Ref | None:
+        """
+        Parse a `"${step.key.0}"` reference, or `None` if the string isn't one.
+        """
+        match = _TEMPLATE.match(value)
+        if match is None:
+            return None
+        path = [int(k) if k.isdigit() else k for k in match.group(2).split(".")[1:]]
+        return cls(match.group(1), *path)
+
+    def __repr__(self) -> str:
+        return f"Ref({', '.join(repr(v) for v in (self.step, *self.path))})"
+
+
+def _refs(value) -> Iterator[Ref]:
+    if isinstance(value, Ref):
+        yield value
+    elif isinstance(value, dict):
+        for v in value.values():
+            yield from _refs(v)
+    elif isinstance(value, (list, tuple)):
+        for v in value:
+            yield from _refs(v)
+
+
+def _resolve(value, results: dict[str, Any]):
+    if isinstance(value, Ref):
+        return value.resolve(results)
+    if isinstance(value, dict):
+        return {k: _resolve(v, results) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_resolve(v, results) for v in value]
+    return value
+
+
+def _parse(value):
+    # Replace `"${step.key}"` strings with references
+    if isinstance(value, str):
+        return Ref.parse(value) or value
+    if isinstance(value, dict):
+        return {k: _parse(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_parse(v) for v in value]
+    return value
+
+
+def _retryable(e: Exception) -> bool:
+    # Only errors known to happen before the request reached the server, so a retry can't duplicate it
+    if isinstance(e, HTTPError):
+        resp = e.response
+        return (
+            resp is not None
+            and resp.status_code in RETRY_STATUSES
+            and "Retry-After" in resp.headers
+        )
+    if isinstance(e, ConnectTimeout):
+        return True
+    if isinstance(e, ConnectionError):
+        reason = getattr(e.args[0], "reason", None) if e.args else None
+        return isinstance(reason, NewConnectionError)
+    return False
+
+
+def _retry_after(e: Exception) -> float:
+    resp = e.response if isinstance(e, HTTPError) else None
+    try:
+        return float(resp.headers["Retry-After"]) if resp is not None else 0.0
+    except (KeyError, ValueError):
+        # HTTP dates are ignored in favour of the backoff
+        return 0.0
+
+
+class Step:
+    """
+    Step(name, service, method, kwargs=None, after=(), wait=False, retries=0, cleanup=True)
+
+    A client method call in a plan, which runs once the steps in `after` and any steps referenced
+    in `kwargs` have completed.
+
+    Args:
+        name: The step name, used to reference its outputs.
+        service: The client (e.g., "servers/virtual").
+        method: The client method (e.g., "create_server").
+        kwargs: The method kwargs, which may include `Ref`s to the outputs of other steps.
+        after: The names of other steps to run after.
+        wait: Whether to wait for the resource with its waiter (see `denvr.waiters.waiter`).
+        retries: The number of times to retry the step after an error which happened before the request
+            reached the server (e.g., a connection error, or a 429 or 503 with `Retry-After`).
+        cleanup: Whether to clean up the created resource if the plan fails (see `CLEANUPS`).
+    """
+
+    __slots__ = ("name", "service", "method", "kwargs", "after", "wait", "retries", "cleanup")
+
+    def __init__(
+        self,
+        name: str,
+        service: str,
+        method: str,
+        kwargs: dict | None = None,
+        after: Iterable[str] = (),
+        wait: bool = False,
+        retries: int = 0,
+        cleanup: bool = True,
+    ):
+        self.name = name
+        self.service = service
+        self.method = method
+        self.kwargs = kwargs or {}
+        self.after = tuple(after)
+        self.wait = wait
+        self.retries = retries
+        self.cleanup = cleanup
+
+    @property
+    def dependencies(self) -> set[str]:
+        return set(self.after) | {ref.step for ref in _refs(self.kwargs)}
+
+    def __getitem__(self, key: str | int) -> Ref:
+        return Ref(self.name, key)
+
+    def __repr__(self) -> str:
+        return f"Step({self.name!r}, {self.service!r}, {self.method!r})"
+
+
+class PlanError(Exception):
+    """
+    Raised when steps of a plan fail, after the completed steps have been cleaned up.
+
+    Attributes:
+        errors (dict): Step name to the exception it failed with.
+        results (dict): Step name to the result of each completed step.
+        skipped (list): The steps which didn't run, since they depended on a failed step.
+        cleaned (list): The completed steps which were cleaned up.
+        cleanup_errors (dict): Step name to the exception its cleanup failed with.
+    """
+
+    def __init__(
+        self,
+        errors: dict[str, Exception],
+        results: dict[str, Any],
+        skipped: list[str],
+        cleaned: list[str],
+        cleanup_errors: dict[str, Exception],
+    ):
+        failed = ", ".join(f"{name} ({type(e).__name__}: {e})" for name, e in errors.items())
+        message = f"Plan failed at {failed}"
+        if cleaned:
+            message += f"; cleaned up {', '.join(cleaned)}"
+        if cleanup_errors:
+            message += f"; failed to clean up {', '.join(cleanup_errors)}"
+        super().__init__(message)
+        self.errors = errors
+        self.results = results
+        self.skipped = skipped
+        self.cleaned = cleaned
+        self.cleanup_errors = cleanup_errors
+
+
+class Plan:
+    """
+    Plan(session, max_workers=8, interval=30, timeout=600, backoff=1.0)
+
+    A set of steps run in dependency order, with independent steps running concurrently.
+
+    Args:
+        session: The session shared by all steps.
+        max_workers: The maximum number of steps running at once.
+        interval: The poll interval in seconds for steps with `wait`.
+        timeout: The timeout in seconds for steps with `wait`.
+        backoff: The delay in seconds before the first retry of a step, doubling for each retry
+            (or the response's `Retry-After`, if longer).
+    """
+
+    def __init__(
+        self,
+        session: Session,
+        max_workers: int = 8,
+        interval: float = 30,
+        timeout: float = 600,
+        backoff: float = 1.0,
+    ):
+        self.session = session
+        self.max_workers = max_workers
+        self.interval = interval
+        self.timeout = timeout
+        self.backoff = backoff
+        self.steps: dict[str, Step] = {}
+        self.clients: dict[str, Any] = {}
+        # Step name -> (start, end) times from `time.perf_counter`
+        self.timings: dict[str, tuple[float, float]] = {}
+        # VMs destroyed by cleanups, which are deleted asynchronously
+        self.destroyed: list[dict] = []
+        # The (cluster, id) of every resource cleaned up, which `find` mustn't adopt
+        self.deleting: set[tuple[Any, Any]] = set()
+
+    def add(
+        self, name: str, service: str, method: str, kwargs: dict | None = None, **options
+    ) -> Step:
+        """
+        Add a step (see `Step` for the `after`, `wait`, `retries` and `cleanup` options).
+
+        Returns:
+            The step, which can be indexed to reference its outputs (e.g., `vpc["id"]`).
+        """
+        if name in self.steps:
+            raise ValueError(f"Duplicate step {name!r}")
+        step = self.steps[name] = Step(name, service, method, kwargs, **options)
+        return step
+
+    @classmethod
+    def from_dict(cls, session: Session, steps: dict[str, dict], **kwargs) -> Plan:
+        """
+        Construct a plan from step name to `Step` fields (e.g., loaded from JSON or TOML),
+        where `"${step.key}"` strings reference the outputs of other steps.
+        """
+        plan = cls(session, **kwargs)
+        for name, spec in steps.items():
+            spec = dict(spec)
+            try:
+                service, method = spec.pop("service"), spec.pop("method")
+            except KeyError as e:
+                raise ValueError(f"Step {name!r} is missing {e}") from None
+            plan.add(name, service, method, _parse(spec.pop("kwargs", {})), **spec)
+        return plan
+
+    def order(self) -> list[str]:
+        """
+        The steps in a dependency order.
+
+        Raises:
+            ValueError: For dependencies on unknown steps or dependency cycles.
+        """
+        for step in self.steps.values():
+            unknown = step.dependencies - set(self.steps)
+            if unknown:
+                raise ValueError(
+                    f"Step {step.name!r} depends on unknown steps {sorted(unknown)}"
+                )
+
+        order: list[str] = []
+        remaining = {name: step.dependencies for name, step in self.steps.items()}
+        while remaining:
+            ready = [name for name, deps in remaining.items() if deps.issubset(order)]
+            if not ready:
+                raise ValueError(f"Steps have a dependency cycle: {sorted(remaining)}")
+            for name in ready:
+                order.append(name)
+                del remaining[name]
+        return order
+
+    def prepare(self):
+        """
+        Check the plan before running anything: its dependencies, clients, methods and waiters.
+
+        Raises:
+            ValueError: For an invalid plan.
+        """
+        self.order()
+        for step in self.steps.values():
+            if step.service not in self.clients:
+                try:
+                    self.clients.update(clients(self.session, [step.service]))
+                except ImportError:
+                    raise ValueError(
+                        f"Unknown service {step.service!r} in step {step.name!r}"
+                    ) from None
+            method = getattr(self.clients[step.service], step.method, None)
+            if step.method.startswith("_") or not callable(method):
+                raise ValueError(
+                    f"Unknown method {step.service}.{step.method} in step {step.name!r}"
+                )
+            if step.wait:
+                waiter(method)
+
+    def cleaner(self, step: Step, kwargs: dict) -> Callable[[Any], Any] | None:
+        """
+        A function which cleans up the resource created by the step (from its response), if any.
+        """
+        cleanup = CLEANUPS.get((step.service, step.method)) if step.cleanup else None
+        if cleanup is None:
+            return None
+        method, keys = cleanup
+        client = self.clients[step.service]
+
+        def clean(resp):
+            # Responses may omit identifiers from the request (e.g., the cluster of a snapshot)
+            target = {**kwargs, **resp} if hasattr(resp, "keys") else kwargs
+            logger.info("Cleaning up step %s with %s", step.name, method)
+            result = getattr(client, method)(**{k: target.get(k) for k in keys})
+            self.deleting.add((target.get("cluster"), target.get("id")))
+            if method == "destroy_server":
+                self.destroyed.append(target)
+            return result
+
+        return clean
+
+    def find(self, step: Step, kwargs: dict) -> Any:
+        """
+        The resource a create step would make (by its `name`), if it already exists, e.g., because a
+        previous attempt reached the server. Returns `None` if it doesn't exist or can't be looked up.
+        """
+        lookup = LOOKUPS.get((step.service, step.method))
+        name = kwargs.get("name")
+        if lookup is None or not name:
+            return None
+        method, keys = lookup
+        client = self.clients[step.service]
+        items = getattr(client, method)(**{k: kwargs[k] for k in keys if k in kwargs})["items"]
+        cluster = kwargs.get("cluster")
+        for item in items:
+            if (item.get("cluster"), item.get("id")) in self.deleting:
+                # e.g., a VM destroyed by a failed attempt, which is listed until it's deleted
+                continue
+            if name in (item.get("name"), item.get("id")) and cluster in (
+                None,
+                item.get("cluster"),
+            ):
+                return item
+        return None
+
+    def execute(self, step: Step, results: dict[str, Any]) -> Any:
+        """
+        Run a step with its resolved kwargs, retrying errors which happened before the request reached
+        the server with exponential backoff. Before retrying a create, the resource is looked up by name
+        (see `find`), so a create which did reach the server isn't duplicated. Errors while waiting for a
+        created resource only retry the wait, while other failures clean the resource up.
+        """
+        kwargs = _resolve(step.kwargs, results)
+        method = getattr(self.clients[step.service], step.method)
+        start = time.perf_counter()
+        with tracing.span("denvr.plan.step", **{"plan.step": step.name}) as span:
+            attempt = 0
+            created = None
+            while True:
+                try:
+                    if created is None:
+                        existing = self.find(step, kwargs) if attempt else None
+                        if existing is not None:
+                            logger.info(
+                                "Step %s found its resource from a previous attempt", step.name
+                            )
+                            created = existing
+                        else:
+                            created = method(**kwargs)
+                    result = created
+                    if step.wait:
+                        # Responses may omit identifiers from the request (e.g., the namespace)
+                        target = {**kwargs, **created} if hasattr(created, "keys") else created
+                        result = waiter(method).wait(target, self.interval, self.timeout)
+                    break
+                except Exception as e:
+                    if attempt >= step.retries or not _retryable(e):
+                        # A resource which fails to become ready is cleaned up
+                        clean = self.cleaner(step, kwargs) if step.wait else None
+                        if clean is not None and created is not None:
+                            clean(created)
+                        raise
+                    delay = max(self.backoff * 2**attempt, _retry_after(e))
+                    attempt += 1
+                    span.set(**{"plan.retries": attempt})
+                    logger.warning(
+                        "Retrying step %s in %.1fs (%d/%d): %s",
+                        step.name,
+                        delay,
+                        attempt,
+                        step.retries,
+                        e,
+                    )
+                    time.sleep(delay)
+        self.timings[step.name] = (start, time.perf_counter())
+        return result
+
+    def run(self) -> dict[str, Any]:
+        """
+        Run the steps as their dependencies complete, returning step name to result.
+        If any step fails, no more steps are started, and once the running steps finish the completed
+        steps are cleaned up in the reverse order they completed.
+
+        Raises:
+            ValueError: For an invalid plan, before any steps run.
+            PlanError: If any steps failed.
+        """
+        self.prepare()
+        results: dict[str, Any] = {}
+        completed: list[str] = []
+        errors: dict[str, Exception] = {}
+        remaining = {name: step.dependencies for name, step in self.steps.items()}
+        running: dict[Future, str] = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while True:
+                if not errors:
+                    for name in [n for n, deps in remaining.items() if deps.issubset(results)]:
+                        del remaining[name]
+                        running[executor.submit(self.execute, self.steps[name], results)] = name
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                        completed.append(name)
+                    except Exception as e:
+                        logger.error("Step %s failed: %s", name, e)
+                        errors[name] = e
+
+        if not errors:
+            return results
+
+        cleaned, cleanup_errors = self.cleanup(completed, results)
+        raise PlanError(errors, results, sorted(remaining), cleaned, cleanup_errors)
+
+    def cleanup(
+        self, completed: list[str], results: dict[str, Any]
+    ) -> tuple[list[str], dict[str, Exception]]:
+        """
+        Clean up the resources created by the `completed` steps, in reverse order so dependent resources
+        (e.g., VMs) are removed before the resources they depend on (e.g., their VPC).
+        Since VMs are destroyed asynchronously, VPCs are only destroyed once the VMs are gone.
+
+        Returns:
+            The steps cleaned up, and the errors of any cleanups which failed.
+        """
+        cleaned = []
+        errors: dict[str, Exception] = {}
+        for name in reversed(completed):
+            step = self.steps[name]
+            clean = self.cleaner(step, _resolve(step.kwargs, results))
+            if clean is None:
+                continue
+            try:
+                if (step.service, step.method) == ("vpcs", "create_vpc") and self.destroyed:
+                    self.wait_deleted(self.destroyed)
+                    self.destroyed = []
+                clean(results[name])
+                cleaned.append(name)
+            except Exception as e:
+                logger.error("Failed to clean up step %s: %s", name, e)
+                errors[name] = e
+        return cleaned, errors
+
+    def wait_deleted(self, vms: list[dict]):
+        """
+        Wait for destroyed VMs to be removed from `get_servers`.
+
+        Raises:
+            TimeoutError: If any VMs remain after the timeout.
+        """
+        client = self.clients["servers/virtual"]
+        pending = {(vm["cluster"], vm["id"]) for vm in vms}
+        deadline = time.monotonic() + self.timeout
+        while True:
+            live: set[tuple[str, str]] = set()
+            for cluster in {c for c, _ in pending}:
+                live.update(
+                    (cluster, vm["id"]) for vm in client.get_servers(cluster=cluster)["items"]
+                )
+            pending &= live
+            if not pending:
+                return
+            if time.monotonic() >= deadline:
+                raise TimeoutError(
+                    f"Timed out waiting for VMs {sorted(i for _, i in pending)} to be deleted"
+                )
+            logger.debug("Waiting for %d VMs to be deleted", len(pending))
+            time.sleep(self.interval)
@@ -0,0 +1,353 @@
+from __future__ import annotations
+
+import contextvars
+import json
+import logging
+import sys
+import threading
+import time
+
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# Phases measured on the client which aren't SDK work (i.e., waiting on the network and server)
+NETWORK_PHASES = frozenset({"http"})
+
+# The API call being profiled in the current thread (or task)
+_call: contextvars.ContextVar[Call | None] = contextvars.ContextVar("denvr_call", default=None)
+
+# Phases measured before a call starts (e.g., `validate_kwargs`), which are added to the next call
+_pending: contextvars.ContextVar[dict[str, list[float]] | None] = contextvars.ContextVar(
+    "denvr_pending", default=None
+)
+
+# The global profiler, or `None` when profiling is disabled
+_profiler: Profiler | None = None
+
+
+class Call:
+    """
+    The profile of a single `Session.request` call.
+
+    Attributes:
+        method (str): The HTTP method.
+        path (str): The API path.
+        started (float): When the call started (see `time.time`).
+        params_size (int): The size of the query parameters as JSON.
+        request_size (int): The request body size.
+        response_size (int): The response body size.
+        status (int): The response status code.
+        wall (float): Wall time in seconds.
+        cpu (float): CPU time of the calling thread in seconds.
+        allocations (int): Net memory blocks allocated during the call.
+        phases (dict): The [wall, cpu, allocations, count] of each phase (e.g., "decode").
+        retries (list): A (method, url, status or error) tuple for each retry or failover.
+        error (str): The exception raised by the call, if any.
+    """
+
+    __slots__ = (
+        "method",
+        "path",
+        "started",
+        "params_size",
+        "request_size",
+        "response_size",
+        "status",
+        "wall",
+        "cpu",
+        "allocations",
+        "phases",
+        "retries",
+        "error",
+        "_start",
+        "_cpu",
+        "_blocks",
+        "_token",
+    )
+
+    def __init__(self, method: str, path: str, params_size: int = 0):
+        self.method = method.upper()
+        self.path = path
+        self.started = time.time()
+        self.params_size = params_size
+        self.request_size = 0
+        self.response_size = 0
+        self.status: int | None = None
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.allocations = 0
+        self.phases: dict[str, list[float]] = _pending.get() or {}
+        self.retries: list[tuple] = []
+        self.error: str | None = None
+        self._token: contextvars.Token | None = None
+
+    @property
+    def network(self) -> float:
+        """
+        Seconds spent waiting on the network and server.
+        """
+        return sum(v[0] for k, v in self.phases.items() if k in NETWORK_PHASES)
+
+    @property
+    def sdk(self) -> float:
+        """
+        Seconds spent in the SDK (i.e., not waiting on the network).
+        """
+        return self.wall - self.network
+
+    def add(self, phase: str, wall: float, cpu: float, allocations: int):
+        _add(self.phases, phase, wall, cpu, allocations)
+
+    def to_dict(self) -> dict:
+        return {
+            "method": self.method,
+            "path": self.path,
+            "started": self.started,
+            "params_size": self.params_size,
+            "request_size": self.request_size,
+            "response_size": self.response_size,
+            "status": self.status,
+            "wall": self.wall,
+            "cpu": self.cpu,
+            "sdk": self.sdk,
+            "network": self.network,
+            "allocations": self.allocations,
+            "phases": {
+                k: {"wall": v[0], "cpu": v[1], "allocations": int(v[2]), "count": int(v[3])}
+                for k, v in self.phases.items()
+            },
+            "retries": [list(r) for r in self.retries],
+            "error": self.error,
+        }
+
+    def __enter__(self) -> Call:
+        _pending.set(None)
+        self._token = _call.set(self)
+        self._start = time.perf_counter()
+        self._cpu = time.thread_time()
+        self._blocks = sys.getallocatedblocks()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.wall = time.perf_counter() - self._start
+        self.cpu = time.thread_time() - self._cpu
+        self.allocations = sys.getallocatedblocks() - self._blocks
+        if exc is not None:
+            self.error = f"{type(exc).__name__}: {exc}"
+        if self._token is not None:
+            _call.reset(self._token)
+            self._token = None
+        if _profiler is not None:
+            _profiler.finish(self)
+
+    def __repr__(self) -> str:
+        return (
+            f"Call({self.method} {self.path}, wall={self.wall:.6f}, sdk={self.sdk:.6f}, "
+            f"retries={len(self.retries)})"
+        )
+
+
+class _Phase:
+    __slots__ = ("name", "_start", "_cpu", "_blocks")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self) -> _Phase:
+        self._start = time.perf_counter()
+        self._cpu = time.thread_time()
+        self._blocks = sys.getallocatedblocks()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self._start
+        cpu = time.thread_time() - self._cpu
+        allocations = sys.getallocatedblocks() - self._blocks
+        if _profiler is not None:
+            _profiler.add(self.name, wall, cpu, allocations)
+
+
+class _Noop:
+    __slots__ = ()
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, exc_type, exc, tb):
+        pass
+
+
+NOOP = _Noop()
+
+
+class Profiler:
+    """
+    Profiler(threshold=1.0, size=100)
+
+    Aggregates the wall time, CPU time and allocations of each SDK phase (e.g., `validate_kwargs`,
+    `decode`, `normalize`) and keeps the most recent calls slower than `threshold` in a ring buffer.
+
+    CPU time is measured for the calling thread, while allocations are the net change in
+    allocated memory blocks for the whole process (`sys.getallocatedblocks`), so they're
+    approximate when other threads are busy.
+
+    Args:
+        threshold (float): Seconds after which a call is captured as slow.
+        size (int): The number of slow calls to keep.
+    """
+
+    def __init__(self, threshold: float = 1.0, size: int = 100):
+        self.threshold = threshold
+        self.slow: deque[Call] = deque(maxlen=size)
+        self.calls = 0
+        self.phases: dict[str, list[float]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, phase: str, wall: float, cpu: float, allocations: int):
+        with self._lock:
+            _add(self.phases, phase, wall, cpu, allocations)
+
+        call = _call.get()
+        if call is not None:
+            call.add(phase, wall, cpu, allocations)
+        else:
+            pending = _pending.get()
+            if pending is None:
+                pending = {}
+                _pending.set(pending)
+            _add(pending, phase, wall, cpu, allocations)
+
+    def finish(self, call: Call):
+        with self._lock:
+            self.calls += 1
+            _add(self.phases, "request", call.wall, call.cpu, call.allocations)
+            if call.wall >= self.threshold:
+                self.slow.append(call)
+                logger.info(
+                    "Slow call %s %s took %.3fs (sdk %.3fs, %d retries)",
+                    call.method,
+                    call.path,
+                    call.wall,
+                    call.sdk,
+                    len(call.retries),
+                )
+
+    def slow_calls(self) -> list[dict]:
+        """
+        The captured slow calls, oldest first.
+        """
+        with self._lock:
+            return [c.to_dict() for c in self.slow]
+
+    def stats(self) -> dict[str, dict]:
+        """
+        The total and mean wall time, CPU time and allocations for each phase.
+        """
+        with self._lock:
+            return {
+                name: {
+                    "count": int(count),
+                    "wall": wall,
+                    "cpu": cpu,
+                    "allocations": int(allocations),
+                    "mean_wall": wall / count,
+                    "mean_cpu": cpu / count,
+                    "mean_allocations": allocations / count,
+                }
+                for name, (wall, cpu, allocations, count) in sorted(self.phases.items())
+            }
+
+    def report(self) -> str:
+        """
+        A table of the mean cost of each phase.
+        """
+        lines = [f"{'phase':<16} {'count':>8} {'wall (ms)':>10} {'cpu (ms)':>10} {'allocs':>8}"]
+        for name, s in self.stats().items():
+            lines.append(
+                f"{name:<16} {s['count']:>8} {s['mean_wall'] * 1000:>10.3f} "
+                f"{s['mean_cpu'] * 1000:>10.3f} {s['mean_allocations']:>8.0f}"
+            )
+        return "\n".join(lines)
+
+    def reset(self):
+        with self._lock:
+            self.slow.clear()
+            self.calls = 0
+            self.phases = {}
+
+
+def enable(threshold: float = 1.0, size: int = 100) -> Profiler:
+    """
+    Enable profiling for all sessions.
+
+    Example:
+
+        profiler = profiling.enable(threshold=0.5)
+        ...
+        print(profiler.report())
+        profiler.slow_calls()
+    """
+    global _profiler
+    _profiler = Profiler(threshold, size)
+    return _profiler
+
+
+def disable():
+    global _profiler
+    _profiler = None
+
+
+def profiler() -> Profiler | None:
+    return _profiler
+
+
+def call(method: str, path: str, kwargs: dict):
+    """
+    A context manager profiling an API call, or a no-op when profiling is disabled.
+    """
+    if _profiler is None:
+        return NOOP
+
+    params = kwargs.get("params")
+    size = len(json.dumps(params, default=str)) if params else 0
+    return Call(method, path, size)
+
+
+def phase(name: str):
+    """
+    A context manager measuring an SDK phase, or a no-op when profiling is disabled.
+    """
+    if _profiler is None:
+        return NOOP
+    return _Phase(name)
+
+
+def update(**fields):
+    """
+    Set fields of the call being profiled (e.g., `response_size`).
+    """
+    current = _call.get()
+    if current is not None:
+        for k, v in fields.items():
+            setattr(current, k, v)
+
+
+def retried(method: str, url: str, outcome):
+    """
+    Add a retry to the history of the call being profiled.
+    """
+    current = _call.get()
+    if current is not None:
+        current.retries.append((method, url, outcome))
+
+
+def _add(phases: dict[str, list[float]], phase: str, wall: float, cpu: float, allocations: int):
+    values = phases.get(phase)
+    if values is None:
+        phases[phase] = [wall, cpu, allocations, 1]
+    else:
+        values[0] += wall
+        values[1] += cpu
+        values[2] += allocations
+        values[3] += 1
@@ -0,0 +1,405 @@
+"""
+Reconcile the VPCs, VMs and applications of a fleet with a desired state spec, e.g., loaded from TOML:
+
+    [[vpcs]]
+    cluster = "Hou1"
+    name = "train-vpc"
+
+    [[servers]]
+    cluster = "Hou1"
+    name = "train-*"
+    count = 8
+    configuration = "A100_40GB_PCIe_1x"
+    vpc = "train-vpc"
+    rpool = "on-demand"
+    ssh_keys = ["ssh-ed25519 AAAA..."]
+
+    [[applications]]
+    cluster = "Msc1"
+    name = "notebook-*"
+    count = 2
+    status = "OFFLINE"
+    hardware_package_name = "g-nvidia-1xa100-40gb-pcie-14vcpu-112gb"
+    application_catalog_item_name = "jupyter-notebook"
+    application_catalog_item_version = "python-3.11.9"
+
+Each server or application group manages the resources in its cluster whose names match `name`, where `*` is
+numbered from 0 for new resources. Groups are scaled to `count` and started or stopped to their `status`
+(ONLINE by default), while other fields are only used to create resources. Existing resources whose
+configuration differs from their group are reported as conflicts rather than replaced. VPCs are created
+if they're missing, or destroyed with `absent = true`.
+
+The actual state comes from the list calls (`get_vpcs`, `get_servers` and `get_applications`) for the clusters
+in the spec, so a run with no drift costs only those calls. Changes run concurrently (see `denvr.batch.Batch`),
+and rather than polling each resource, the list calls are repeated until every changed resource settles.
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import json
+import logging
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+import toml
+
+from denvr.batch import Batch, Operation
+from denvr.inventory import clients
+from denvr.session import Session
+
+logger = logging.getLogger(__name__)
+
+# Resource kind -> (client, action -> method)
+SERVICES: dict[str, tuple[str, dict[str, str]]] = {
+    "vpc": ("vpcs", {"create": "create_vpc", "destroy": "destroy_vpc"}),
+    "server": (
+        "servers/virtual",
+        {
+            "create": "create_server",
+            "start": "start_server",
+            "stop": "stop_server",
+            "destroy": "destroy_server",
+        },
+    ),
+    "application": (
+        "servers/applications",
+        {
+            "create": "create_catalog_application",
+            "start": "start_application",
+            "stop": "stop_application",
+            "destroy": "destroy_application",
+        },
+    ),
+}
+
+# Group fields (and the list item fields) which can't be changed without replacing a resource
+CONFLICT_FIELDS = {
+    "server": [("configuration", "configuration")],
+    "application": [("hardware_package_name", "hardwarePackageName")],
+}
+
+# Group fields which aren't create kwargs
+_GROUP_FIELDS = {"cluster", "name", "count", "status"}
+
+# (Actual, desired) status -> action, where transitional statuses (e.g., PENDING) are left to settle
+ACTIONS: dict[tuple[str, str], str] = {
+    ("OFFLINE", "ONLINE"): "start",
+    ("ONLINE", "OFFLINE"): "stop",
+}
+
+# Status a resource is expected to have once a change settles, where `None` means deleted
+_EXPECT = {"create": "ONLINE", "start": "ONLINE", "stop": "OFFLINE", "destroy": None}
+
+
+def load(path: str) -> dict:
+    """
+    Load a spec from a TOML (or, for `.json` paths, JSON) file.
+    """
+    with open(path) as f:
+        return json.load(f) if path.endswith(".json") else toml.load(f)
+
+
+class Change:
+    """
+    Change(action, kind, cluster, name, kwargs)
+
+    A create, start, stop or destroy of a resource (e.g., a "server" in "Hou1" named "train-3").
+    """
+
+    __slots__ = ("action", "kind", "cluster", "name", "kwargs")
+
+    def __init__(self, action: str, kind: str, cluster: str, name: str, kwargs: dict):
+        self.action = action
+        self.kind = kind
+        self.cluster = cluster
+        self.name = name
+        self.kwargs = kwargs
+
+    @property
+    def expect(self) -> str | None:
+        return _EXPECT[self.action]
+
+    def operation(self) -> Operation:
+        service, methods = SERVICES[self.kind]
+        return Operation(service, methods[self.action], self.kwargs, id=str(self))
+
+    def to_dict(self) -> dict:
+        return {
+            "action": self.action,
+            "kind": self.kind,
+            "cluster": self.cluster,
+            "name": self.name,
+            "kwargs": self.kwargs,
+        }
+
+    def __str__(self) -> str:
+        return f"{self.action} {self.kind} {self.cluster}/{self.name}"
+
+    def __repr__(self) -> str:
+        return f"Change({self.action!r}, {self.kind!r}, {self.cluster!r}, {self.name!r})"
+
+
+class Report:
+    """
+    The outcome of a reconcile run.
+
+    Attributes:
+        changes (list): The changes needed to reach the desired state.
+        conflicts (list): Descriptions of resources which differ from their group, but weren't changed.
+        results (list): The result of each applied change (see `denvr.batch.Batch.run`), which is empty for a dry run.
+        pending (list): The changes which didn't settle before the timeout.
+        elapsed (float): Seconds spent reconciling.
+    """
+
+    def __init__(self, changes: list[Change], conflicts: list[str]):
+        self.changes = changes
+        self.conflicts = conflicts
+        self.results: list[dict] = []
+        self.pending: list[Change] = []
+        self.elapsed = 0.0
+
+    @property
+    def failed(self) -> list[dict]:
+        return [r for r in self.results if not r["ok"]]
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed and not self.pending
+
+
+def _index(name: str, pattern: str) -> tuple[int, str]:
+    # Order names by the number matching the pattern's `*` (e.g., train-2 before train-10)
+    prefix, _, suffix = pattern.partition("*")
+    middle = name[len(prefix) : len(name) - len(suffix)]
+    return (int(middle), name) if middle.isdigit() else (1 << 62, name)
+
+
+def _key(item: dict) -> str:
+    return item.get("name") or item["id"]
+
+
+def _settled(change: Change, actual: dict[str, dict[tuple[str, str], dict]]) -> bool:
+    item = actual[change.kind].get((change.cluster, change.name))
+    if change.expect is None:
+        return item is None
+    return item is not None and item.get("status") == change.expect
+
+
+class Reconciler:
+    """
+    Reconciler(session, spec, concurrency=8, interval=10, timeout=900)
+
+    Computes and applies the changes to reach a desired state `spec` (see the module docs).
+
+    Example:
+
+        report = Reconciler(Session(config()), toml.load("fleet.toml")).reconcile()
+        for change in report.changes:
+            print(change)
+
+    Args:
+        session: The session used for all requests.
+        spec: The desired "vpcs", "servers" and "applications" groups.
+        concurrency: The maximum changes in flight for each kind of resource.
+        interval: Seconds between the list calls while waiting for changes to settle.
+        timeout: Seconds to wait for changes to settle.
+    """
+
+    def __init__(
+        self,
+        session: Session,
+        spec: dict,
+        concurrency: int = 8,
+        interval: float = 10,
+        timeout: float = 900,
+    ):
+        unknown = set(spec) - {"vpcs", "servers", "applications"}
+        if unknown:
+            raise ValueError(f"Unknown spec sections {sorted(unknown)}")
+        self.session = session
+        self.vpcs: list[dict] = spec.get("vpcs", [])
+        self.groups: dict[str, list[dict]] = {
+            "server": spec.get("servers", []),
+            "application": spec.get("applications", []),
+        }
+        for kind, groups in [("vpc", self.vpcs), *self.groups.items()]:
+            for group in groups:
+                if not group.get("cluster") or not group.get("name"):
+                    raise ValueError(
+                        f"{kind.title()} groups need a `cluster` and `name`: {group}"
+                    )
+                count = group.get("count", 1)
+                if kind != "vpc" and count > 1 and "*" not in group["name"]:
+                    raise ValueError(
+                        f"{kind.title()} group {group['name']!r} needs a `*` for {count} names"
+                    )
+        self.concurrency = concurrency
+        self.interval = interval
+        self.timeout = timeout
+        self.clients = clients(self.session, [service for service, _ in SERVICES.values()])
+
+    def observe(self) -> dict[str, dict[tuple[str, str], dict]]:
+        """
+        The actual VPCs, VMs and applications in the spec's clusters (using only their list calls),
+        as kind -> (cluster, name) -> item.
+        """
+        calls: list[tuple[str, str | None]] = [
+            *(("vpc", c) for c in sorted({g["cluster"] for g in self.vpcs})),
+            *(("server", c) for c in sorted({g["cluster"] for g in self.groups["server"]})),
+        ]
+        if self.groups["application"]:
+            calls.append(("application", None))
+
+        def fetch(call: tuple[str, str | None]) -> list[dict]:
+            kind, cluster = call
+            client = self.clients[SERVICES[kind][0]]
+            if kind == "vpc":
+                return client.get_vpcs(cluster=cluster)["items"]
+            if kind == "server":
+                return client.get_servers(cluster=cluster)["items"]
+            return client.get_applications()["items"]
+
+        actual: dict[str, dict[tuple[str, str], dict]] = {kind: {} for kind in SERVICES}
+        with ThreadPoolExecutor(max_workers=max(len(calls), 1)) as executor:
+            for (kind, _), items in zip(calls, executor.map(fetch, calls)):
+                for item in items:
+                    actual[kind][(item["cluster"], _key(item))] = item
+        return actual
+
+    def diff(
+        self, actual: dict[str, dict[tuple[str, str], dict]]
+    ) -> tuple[list[Change], list[str]]:
+        """
+        The minimal changes from the `actual` state (see `observe`) to the spec, and any conflicts.
+        Existing resources are kept (whatever their number), so scaling only creates or destroys the difference.
+        """
+        changes = []
+        conflicts = []
+        for group in self.vpcs:
+            cluster, name = group["cluster"], group["name"]
+            item = actual["vpc"].get((cluster, name))
+            if group.get("absent"):
+                if item is not None:
+                    changes.append(
+                        Change(
+                            "destroy",
+                            "vpc",
+                            cluster,
+                            name,
+                            {"id": item["id"], "cluster": cluster},
+                        )
+                    )
+            elif item is None:
+                kwargs = {k: v for k, v in group.items() if k != "absent"}
+                changes.append(Change("create", "vpc", cluster, name, kwargs))
+
+        for kind, groups in self.groups.items():
+            for group in groups:
+                group_changes, group_conflicts = self._diff_group(kind, group, actual[kind])
+                changes.extend(group_changes)
+                conflicts.extend(group_conflicts)
+        return changes, conflicts
+
+    def _diff_group(self, kind: str, group: dict, actual: dict[tuple[str, str], dict]):
+        cluster, pattern = group["cluster"], group["name"]
+        count = group.get("count", 1)
+        status = group.get("status", "ONLINE")
+        names = [pattern.replace("*", str(i)) for i in range(count)]
+
+        # Keep the existing resources named like new ones first, then the lowest numbered
+        existing = sorted(
+            (
+                item
+                for (c, name), item in actual.items()
+                if c == cluster and fnmatch.fnmatchcase(name, pattern)
+            ),
+            key=lambda item: (_key(item) not in names, _index(_key(item), pattern)),
+        )
+        keep, extra = existing[:count], existing[count:]
+        taken = {_key(item) for item in existing}
+
+        changes = []
+        conflicts = []
+        ids = ("id", "namespace", "cluster") if kind == "server" else ("id", "cluster")
+        for item in reversed(extra):
+            changes.append(
+                Change("destroy", kind, cluster, _key(item), {k: item.get(k) for k in ids})
+            )
+
+        create = {k: v for k, v in group.items() if k not in _GROUP_FIELDS}
+        for name in [n for n in names if n not in taken][: count - len(keep)]:
+            changes.append(
+                Change(
+                    "create", kind, cluster, name, {"name": name, "cluster": cluster, **create}
+                )
+            )
+
+        for item in keep:
+            name = _key(item)
+            for field, item_field in CONFLICT_FIELDS[kind]:
+                if field in group and item.get(item_field) != group[field]:
+                    conflicts.append(
+                        f"{kind} {cluster}/{name} has {field} {item.get(item_field)!r}, not {group[field]!r}"
+                    )
+            action = ACTIONS.get((item.get("status", ""), status))
+            if action:
+                changes.append(
+                    Change(action, kind, cluster, name, {k: item.get(k) for k in ids})
+                )
+        return changes, conflicts
+
+    def apply(self, changes: list[Change]) -> tuple[list[dict], list[Change]]:
+        """
+        Run the changes concurrently, creating VPCs before the VMs and applications which may use them,
+        and destroying VPCs after the VMs and applications are gone.
+
+        Returns:
+            The result of each change and the changes which didn't settle before the timeout.
+        """
+        first = [c for c in changes if c.kind == "vpc" and c.action == "create"]
+        last = [c for c in changes if c.kind == "vpc" and c.action == "destroy"]
+        middle = [c for c in changes if c.kind != "vpc"]
+        batch = Batch(self.session, concurrency=self.concurrency)
+        results: list[dict] = []
+        pending: list[Change] = []
+        for phase in (first, middle, last):
+            if not phase:
+                continue
+            results.extend(batch.run(c.operation() for c in phase))
+            if phase is middle:
+                failed = {r["key"] for r in results if not r["ok"]}
+                pending = self.wait([c for c in phase if str(c) not in failed])
+        return results, pending
+
+    def wait(self, changes: list[Change]) -> list[Change]:
+        """
+        Wait for the changed resources to settle, by repeating the list calls (rather than polling each resource).
+
+        Returns:
+            The changes which didn't settle before the timeout.
+        """
+        deadline = time.monotonic() + self.timeout
+        pending = list(changes)
+        while pending:
+            actual = self.observe()
+            pending = [c for c in pending if not _settled(c, actual)]
+            if not pending or time.monotonic() >= deadline:
+                break
+            logger.debug("Waiting on %d changes", len(pending))
+            time.sleep(self.interval)
+        return pending
+
+    def reconcile(self, dry_run: bool = False) -> Report:
+        """
+        Observe the actual state, then compute and (unless `dry_run`) apply the changes.
+        """
+        start = time.perf_counter()
+        report = Report(*self.diff(self.observe()))
+        for conflict in report.conflicts:
+            logger.warning("Conflict: %s", conflict)
+        if report.changes and not dry_run:
+            report.results, report.pending = self.apply(report.changes)
+        report.elapsed = time.perf_counter() - start
+        return report
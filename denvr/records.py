@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import importlib
+
+from functools import lru_cache
+from typing import Any, ClassVar, Iterator
+
+from denvr.utils import snakecase
+
+# Fields which would hide the `dict` style methods are stored with a trailing underscore
+RESERVED = frozenset({"keys", "values", "items", "get", "to_dict", "from_json"})
+
+
+def slotname(field: str) -> str:
+    """
+    Returns the `__slots__` name used to store a field (e.g., `items_` for `items`).
+    """
+    return f"{field}_" if field in RESERVED else field
+
+
+class Record:
+    """
+    A compact `__slots__` based alternative to the `dict` responses returned by each `Client`.
+
+    Subclasses are generated by `scripts/apigen.py` for each response schema and only define their
+    snakecase field names in `__slots__`, along with any `_nested` record types for list (or dict) fields
+    (keyed by field name).
+    Unknown fields returned by the server are kept in `_extra` rather than dropped.
+
+    Records support the read-only `dict` operations (e.g., `record["status"]`, `record.get("ip")`),
+    so they can be used in place of the default responses.
+    Fields named after one of those methods are stored with a trailing underscore instead
+    (e.g., `GetServersResult.items_` or `result["items"]`), so `result.items()` still works.
+    """
+
+    __slots__ = ("_extra",)
+    _extra: dict | None
+    _nested: ClassVar[dict[str, type[Record]]] = {}
+    # Field names (i.e., keys) and their `__slots__` names, set for each subclass
+    _fields: ClassVar[tuple[str, ...]] = ()
+    _slots: ClassVar[dict[str, str]] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        names = {slotname(f): f for f in RESERVED}
+        cls._fields = tuple(names.get(s, s) for s in cls.__slots__)
+        cls._slots = dict(zip(cls._fields, cls.__slots__))
+
+    @classmethod
+    def from_json(cls, data: dict):
+        """
+        Construct a record from a decoded JSON object, converting its keys to snakecase.
+        """
+        values = {snakecase(k): v for k, v in data.items()}
+        record = cls.__new__(cls)
+        for field, name in cls._slots.items():
+            value = values.pop(field, None)
+            nested = cls._nested.get(field)
+            if nested is not None and value is not None:
+                value = _materialize(nested, value)
+            setattr(record, name, value)
+
+        record._extra = values or None
+        return record
+
+    def to_dict(self) -> dict:
+        """
+        Convert the record (and any nested records) back to a plain `dict`.
+        """
+        return {k: _unmaterialize(v) for k, v in self._pairs()}
+
+    def _keys(self) -> Iterator[str]:
+        yield from self._fields
+        if self._extra:
+            yield from self._extra
+
+    def _pairs(self) -> Iterator[tuple[str, Any]]:
+        for k in self._keys():
+            yield k, self[k]
+
+    def keys(self) -> Iterator[str]:
+        return self._keys()
+
+    def values(self) -> Iterator[Any]:
+        return (v for _, v in self._pairs())
+
+    def items(self) -> Iterator[tuple[str, Any]]:
+        return self._pairs()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __getitem__(self, key: str) -> Any:
+        name = self._slots.get(key)
+        if name is not None:
+            return getattr(self, name)
+        if self._extra and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._slots or bool(self._extra and key in self._extra)
+
+    def __iter__(self) -> Iterator[str]:
+        return self._keys()
+
+    def __len__(self) -> int:
+        return len(self._fields) + (len(self._extra) if self._extra else 0)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Record):
+            return type(self) is type(other) and self.to_dict() == other.to_dict()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{k}={v!r}" for k, v in self._pairs())
+        return f"{type(self).__name__}({fields})"
+
+
+def _materialize(record: type[Record], value: Any) -> Any:
+    if isinstance(value, list):
+        return [record.from_json(v) if isinstance(v, dict) else v for v in value]
+    if isinstance(value, dict):
+        return record.from_json(value)
+    return value
+
+
+def _unmaterialize(value: Any) -> Any:
+    if isinstance(value, Record):
+        return value.to_dict()
+    if isinstance(value, list):
+        return [_unmaterialize(v) for v in value]
+    return value
+
+
+@lru_cache(maxsize=None)
+def lookup(path: str) -> type[Record] | None:
+    """
+    Returns the generated record type for the response of an API path (e.g.,
+    `/api/v1/servers/virtual/GetServers`) or `None` if there isn't one.
+    """
+    module = "denvr" + ".".join(path.split("/")[:-1])
+    try:
+        mod = importlib.import_module(module)
+    except ImportError:
+        return None
+
+    return getattr(mod, "RECORDS", {}).get(path)
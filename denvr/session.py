@@ -1,47 +1,518 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
 import logging
+import threading
+import time
 
 import requests
-from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
 
+from denvr import profiling, tracing
+from denvr.cache import Cache
 from denvr.config import Config
-from denvr.utils import snakecase, raise_for_status, retry
+from denvr.endpoints import IDEMPOTENT_METHODS, Endpoints
+from denvr.records import Record, lookup
+from denvr.utils import Interner, snakecase, raise_for_status, retry, iter_items
 
 logger = logging.getLogger(__name__)
 
+# Size of the chunks read from streamed responses
+CHUNK_SIZE = 64 * 1024
+
+# Names of the `Session.counters`
+COUNTERS = (
+    "requests",
+    "bytes_sent",
+    "bytes_sent_wire",
+    "bytes_received",
+    "bytes_received_wire",
+)
+
+# Events which hooks can be added for, see `Session.add_hook`
+HOOKS = ("pre_request", "post_response", "on_retry", "on_error")
+
+# Max characters of request and response values included in debug logs
+LOG_LIMIT = 1000
+
+# Large list responses which are revalidated rather than re-parsed when unchanged
+REVALIDATED_PATHS = {
+    "/api/v1/servers/virtual/GetServers",
+    "/api/v1/servers/metal/GetHosts",
+    "/api/v1/servers/snapshots/GetSnapshots",
+    "/api/v1/vpcs/GetVpcs",
+}
+
+
+def _copy(value):
+    # Copies a normalized result, which only contains dicts, lists, records and immutable values
+    # (this is several times faster than `copy.deepcopy`)
+    cls = type(value)
+    if cls is dict:
+        return {k: _copy(v) for k, v in value.items()}
+    if cls is list:
+        return [_copy(v) for v in value]
+    if isinstance(value, Record):
+        record = object.__new__(cls)
+        for name in cls.__slots__:
+            setattr(record, name, _copy(getattr(value, name)))
+        record._extra = _copy(value._extra)
+        return record
+    return value
+
+
+class Validator:
+    """
+    The validators and decoded result of the last response for a revalidated request.
+    """
+
+    __slots__ = ("etag", "last_modified", "digest", "result")
+
+    def __init__(self, resp, digest, result):
+        self.digest = digest
+        self.result = result
+        self.update(resp)
+
+    def update(self, resp):
+        self.etag = resp.headers.get("ETag")
+        self.last_modified = resp.headers.get("Last-Modified")
+
+    def headers(self) -> dict:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
 
 class Session:
     """
     Session(config: Config)
 
     Handles authentication and HTTP requests to Denvr's API.
+
+    With the `revalidate` setting, unchanged responses for `REVALIDATED_PATHS` (detected by a
+    `304 Not Modified` to a conditional request or an identical body) return a copy of the previous
+    result rather than decoding the response again.
+
+    Hooks can be added for each request (see `HOOKS`), which are called with keyword arguments:
+
+    - `pre_request(method, path, kwargs)`: Before sending, where `kwargs` may be modified (e.g., headers).
+    - `post_response(method, path, response, elapsed, sent, received)`: For every response, including errors.
+    - `on_retry(method, path, response, error)`: Before retrying a request (or failing over to another server).
+    - `on_error(method, path, error, elapsed)`: When a request raises.
+
+    Hook callables should accept `**kwargs` so new arguments can be added later.
+    When no hooks are added, requests only pay for a single truthiness check.
     """
 
     def __init__(self, config: Config):
         self.config = config
         self.session = requests.Session()
 
+        # Shares repeated categorical values (e.g., `status`) between the items of large responses
+        self.interner = Interner(self.config.intern_size) if self.config.intern_size else None
+
+        # Optional local cache of GET responses shared between processes
+        self.cache = (
+            Cache(self.config.cache, self.config.cache_ttls) if self.config.cache else None
+        )
+        self.cache_scope = f"{self.config.server}#{self.config.tenant or ''}"
+        self.validators: dict[str, Validator] = {}
+
+        # Instrumentation hooks by event, where events without hooks are removed
+        self.hooks: dict[str, list] = {}
+
+        # Bytes sent and received, where `*_wire` counts are after compression
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self._lock = threading.Lock()
+        self.compress_requests = self.config.compress_requests
+
         # Set the auth, header and retry strategy for the session object
         self.session.auth = self.config.auth
-        self.session.headers.update({"Content-Type": "application/json"})
-        if self.config.retries:
+        self.session.headers.update(
+            {
+                "Content-Type": "application/json",
+                # Explicitly negotiate every encoding urllib3 can decode (e.g., `br` if brotli is installed)
+                "Accept-Encoding": ACCEPT_ENCODING if self.config.compression else "identity",
+            }
+        )
+        retries = self.config.retries
+        for server in self.config.servers:
             self.session.mount(
-                self.config.server, HTTPAdapter(max_retries=retry(retries=self.config.retries))
+                server,
+                tracing.TracingAdapter(
+                    max_retries=retry(retries=retries, on_retry=self._retried) if retries else 0
+                ),
             )
+        self.session.hooks["response"].append(tracing.response_hook)
+        if self.config.trace and tracing.tracer() is None:
+            tracing.enable(tracing.JsonlExporter(self.config.trace))
+        if self.config.profile is not None and profiling.profiler() is None:
+            profiling.enable(threshold=self.config.profile)
+
+        # Inject faults into each request attempt to measure resilience (see `denvr.faults`)
+        self.injector = None
+        if self.config.faults:
+            from denvr import faults
+
+            injector = self.config.faults
+            if not isinstance(injector, faults.Injector):
+                injector = faults.Injector.from_config(injector)
+            self.injector = faults.install(self, injector)
+
+        # Record each request and response to a cassette, or serve them from one (see `denvr.cassette`)
+        # Optional features are imported on first use to keep the CLI's cold start fast
+        self.recorder = None
+        if self.config.record:
+            from denvr import cassette
+
+            self.recorder = cassette.Recorder(self.config.record)
+            self.session.hooks["response"].append(self.recorder)
+        if self.config.replay:
+            from denvr import cassette
+
+            replay = cassette.ReplayAdapter(self.config.replay)
+            for server in self.config.servers:
+                self.session.mount(server, replay)
+
+        # Route requests to the fastest healthy server when multiple are configured
+        # (except when replaying, where responses don't depend on the server)
+        servers = self.config.servers
+        self.endpoints = (
+            Endpoints(servers) if len(servers) > 1 and not self.config.replay else None
+        )
+
+    def add_hook(self, event: str, hook):
+        """
+        Call `hook` with keyword arguments on each `event` (e.g., "post_response"), see `HOOKS`.
+        """
+        if event not in HOOKS:
+            raise ValueError(f"Unknown hook event {event!r}, expected one of {HOOKS}")
+        self.hooks.setdefault(event, []).append(hook)
+
+    def remove_hook(self, event: str, hook):
+        hooks = self.hooks.get(event, [])
+        hooks.remove(hook)
+        if not hooks:
+            del self.hooks[event]
+
+    def _emit(self, event: str, **kwargs):
+        for hook in self.hooks.get(event, ()):
+            hook(**kwargs)
+
+    def _retried(self, method, url, response, error):
+        # urllib3 retries report its own response type, while failover reports a `requests.Response`
+        status = getattr(response, "status", None) or getattr(response, "status_code", None)
+        profiling.retried(method, url, status or repr(error))
+        if self.hooks:
+            # urllib3 reports the request target, which may include a duplicate leading slash
+            path = "/" + (url or "").split("?", 1)[0].lstrip("/")
+            self._emit("on_retry", method=method, path=path, response=response, error=error)
+
+    def url(self, path, server=None):
+        return "/".join([server or self.config.server, *filter(None, path.split("/"))])
+
+    def _dispatch(self, method, path, **kwargs):
+        """
+        Send a request to the configured server or, with multiple servers, the fastest healthy one.
+        Idempotent requests fail over to the next endpoint on connection errors or 5xx responses.
+        """
+        if self.endpoints is None:
+            return self.session.request(method, self.url(path), **kwargs)
+
+        if not self.endpoints.probed:
+            self.endpoints.probe()
+
+        candidates = self.endpoints.ordered()
+        if method.upper() not in IDEMPOTENT_METHODS:
+            candidates = candidates[:1]
+
+        for i, endpoint in enumerate(candidates):
+            last = i == len(candidates) - 1
+            url = self.url(path, endpoint.url)
+            auth = self.config.auth_for(endpoint.url)
+            start = time.perf_counter()
+            try:
+                resp = self.session.request(method, url, auth=auth, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self.endpoints.failure(endpoint)
+                if last:
+                    raise
+                self._retried(method, path, None, e)
+                logger.debug("Request to %s failed, trying the next endpoint", endpoint.url)
+                continue
+
+            if resp.status_code >= 500:
+                self.endpoints.failure(endpoint)
+                if not last:
+                    self._retried(method, path, resp, None)
+                    logger.debug(
+                        "Request to %s returned %s, trying the next endpoint",
+                        endpoint.url,
+                        resp.status_code,
+                    )
+                    resp.close()
+                    continue
+            else:
+                self.endpoints.success(endpoint, time.perf_counter() - start)
+            return resp
 
     def request(self, method, path, **kwargs):
-        url = "/".join([self.config.server, *filter(None, path.split("/"))])
-        logger.debug("Request: self.session.request(%s, %s, **%s", method, url, kwargs)
-        resp = self.session.request(method, url, **kwargs)
-        raise_for_status(resp)
-        result = resp.json()
-        logger.debug("Response: resp.json() -> %s", result)
+        span = tracing.span(
+            "denvr.request", **{"http.method": method.upper(), "http.route": path}
+        )
+        with span, profiling.call(method, path, kwargs):
+            return self._request(method, path, **kwargs)
 
-        # According to the spec we should just be return result and not {"result": result }?
-        # For mock-server testing purposes we'll support both.
-        result = result.get("result", result) if isinstance(result, dict) else result
+    def _request(self, method, path, **kwargs):
+        is_get = method.lower() == "get"
+        params = kwargs.get("params")
+        if is_get and self.cache is not None:
+            result = self.cache.get(self.cache_scope, path, params)
+            if result is not None:
+                tracing.event("cache.hit")
+                return self.normalize(path, result)
+
+        # Revalidate large list responses which rarely change between polls
+        key = None
+        validator = None
+        if is_get and self.config.revalidate and path in REVALIDATED_PATHS:
+            key = Cache.key(self.cache_scope, path, params)
+            validator = self.validators.get(key)
+            if validator is not None:
+                kwargs["headers"] = {**validator.headers(), **kwargs.get("headers", {})}
+
+        resp = self._send(method, path, **kwargs)
+        if validator is not None and resp.status_code == 304:
+            logger.debug("Response: 304 Not Modified, reusing the previous result")
+            tracing.event("revalidated", **{"http.status_code": 304})
+            return _copy(validator.result)
+
+        digest = hashlib.blake2b(resp.content, digest_size=16).digest() if key else None
+        if validator is not None and digest == validator.digest:
+            logger.debug("Response: unchanged body, reusing the previous result")
+            tracing.event("revalidated", **{"http.status_code": resp.status_code})
+            validator.update(resp)
+            return _copy(validator.result)
 
-        # Standardize the response keys to snakecase if it's a dict'
+        with tracing.span("denvr.decode"), profiling.phase("decode"):
+            result = self._decode(resp)
+        if self.cache is not None:
+            if is_get:
+                self.cache.set(self.cache_scope, path, params, result)
+            else:
+                self.cache.invalidate(self.cache_scope, path)
+
+        with tracing.span("denvr.normalize"), profiling.phase("normalize"):
+            result = self.normalize(path, result)
+        if key is not None:
+            # Keep a private copy, so callers can't modify later results
+            self.validators[key] = Validator(resp, digest, _copy(result))
+
+        return result
+
+    def normalize(self, path, result):
+        """
+        Standardize the response keys to snakecase (or a record) and intern categorical values.
+        """
         if isinstance(result, dict):
+            if self.interner is not None:
+                self.interner.fields(result)
+
+            record = lookup(path) if self.config.records else None
+            if record is not None:
+                return record.from_json(result)
+
             return {snakecase(k): v for k, v in result.items()}
 
         return result
+
+    def _send(self, method, path, **kwargs):
+        hooks = self.hooks
+        if hooks:
+            self._emit("pre_request", method=method, path=path, kwargs=kwargs)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Request: %s %s %s", method, path, _Abbreviated(kwargs))
+
+        start = time.perf_counter()
+        try:
+            body = kwargs.pop("json", None)
+            original = kwargs.pop("headers", None)
+            with profiling.phase("encode"):
+                data, headers, size = self._encode(body, original)
+            span = tracing.span("denvr.http", "CLIENT", **{"http.method": method.upper()})
+            with span, profiling.phase("http"):
+                resp = self._dispatch(method, path, data=data, headers=headers, **kwargs)
+
+                # Fall back to uncompressed bodies if the server doesn't support them
+                if resp.status_code == 415 and headers and "Content-Encoding" in headers:
+                    logger.debug("Server doesn't support compressed request bodies, disabling")
+                    self.compress_requests = 0
+                    data, headers, size = self._encode(body, original)
+                    resp = self._dispatch(method, path, data=data, headers=headers, **kwargs)
+
+                received = len(resp.content)
+                span.set(
+                    **{
+                        "http.url": resp.url,
+                        "http.status_code": resp.status_code,
+                        "http.request_content_length": size,
+                        "http.response_content_length": received,
+                    }
+                )
+            self.count(size, len(data) if data else 0, received, _wire_bytes(resp, received))
+            profiling.update(request_size=size, response_size=received, status=resp.status_code)
+            if hooks:
+                self._emit(
+                    "post_response",
+                    method=method,
+                    path=path,
+                    response=resp,
+                    elapsed=time.perf_counter() - start,
+                    sent=size,
+                    received=received,
+                )
+            with profiling.phase("raise_for_status"):
+                raise_for_status(resp)
+        except Exception as e:
+            if hooks:
+                self._emit(
+                    "on_error",
+                    method=method,
+                    path=path,
+                    error=e,
+                    elapsed=time.perf_counter() - start,
+                )
+            raise
+
+        return resp
+
+    def _encode(self, body, headers):
+        # Serialize JSON bodies ourselves (like `requests` does) so we can count and compress them.
+        if body is None:
+            return None, headers, 0
+
+        data = json.dumps(body, allow_nan=False).encode()
+        size = len(data)
+        if self.compress_requests and size >= self.compress_requests:
+            data = gzip.compress(data, compresslevel=6)
+            headers = {**(headers or {}), "Content-Encoding": "gzip"}
+        return data, headers, size
+
+    def count(self, sent=0, sent_wire=0, received=0, received_wire=0):
+        """
+        Add a request and its body sizes to the `counters`.
+        """
+        with self._lock:
+            counters = self.counters
+            counters["requests"] += 1
+            counters["bytes_sent"] += sent
+            counters["bytes_sent_wire"] += sent_wire
+            counters["bytes_received"] += received
+            counters["bytes_received_wire"] += received_wire
+
+    def _decode(self, resp):
+        result = resp.json()
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Response: %s %s", resp.status_code, _Abbreviated(result))
+
+        # According to the spec we should just be return result and not {"result": result }?
+        # For mock-server testing purposes we'll support both.
+        return result.get("result", result) if isinstance(result, dict) else result
+
+    def stream(self, method, path, key="items", **kwargs):
+        """
+        Similar to `request`, but lazily yields the elements of the `key` array in the response
+        as they're parsed from the response stream, rather than decoding the full response.
+        Dict elements have their keys standardized to snakecase and categorical values interned.
+        """
+        hooks = self.hooks
+        if hooks:
+            self._emit("pre_request", method=method, path=path, kwargs=kwargs)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Stream: %s %s %s", method, path, _Abbreviated(kwargs))
+
+        record = lookup(path) if self.config.records else None
+        record = record._nested.get(key) if record is not None else None
+        start = time.perf_counter()
+        try:
+            with tracing.span(
+                "denvr.http", "CLIENT", **{"http.method": method.upper(), "http.route": path}
+            ) as span:
+                resp = self._dispatch(method, path, stream=True, **kwargs)
+                span.set(**{"http.url": resp.url, "http.status_code": resp.status_code})
+            raise_for_status(resp)
+        except Exception as e:
+            if hooks:
+                self._emit(
+                    "on_error",
+                    method=method,
+                    path=path,
+                    error=e,
+                    elapsed=time.perf_counter() - start,
+                )
+            raise
+
+        with resp:
+            received = 0
+
+            def chunks():
+                nonlocal received
+                for chunk in resp.iter_content(CHUNK_SIZE):
+                    received += len(chunk)
+                    yield chunk
+
+            try:
+                for item in iter_items(chunks(), key):
+                    if not isinstance(item, dict):
+                        yield item
+                        continue
+
+                    if self.interner is not None:
+                        self.interner.fields(item)
+
+                    if record is not None:
+                        yield record.from_json(item)
+                    else:
+                        yield {snakecase(k): v for k, v in item.items()}
+            finally:
+                self.count(received=received, received_wire=_wire_bytes(resp, received))
+                if hooks:
+                    self._emit(
+                        "post_response",
+                        method=method,
+                        path=path,
+                        response=resp,
+                        elapsed=time.perf_counter() - start,
+                        sent=0,
+                        received=received,
+                    )
+
+
+def _wire_bytes(resp, default: int) -> int:
+    # The number of (possibly compressed) body bytes read from the connection
+    try:
+        return int(resp.raw.tell())
+    except (AttributeError, TypeError, ValueError):
+        return default
+
+
+class _Abbreviated:
+    """
+    Lazily formats a (possibly large) request or response value for debug logs.
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __str__(self) -> str:
+        text = repr(self.value)
+        if len(text) <= LOG_LIMIT:
+            return text
+        return f"{text[:LOG_LIMIT]}... ({len(text)} characters)"
@@ -0,0 +1,30 @@
+"""
+Test utilities for code built on the SDK, such as a stateful fake of the Denvr API.
+
+    from denvr.testing import FakeServer, State
+
+    with FakeServer(State(durations={"planned": 0, "pending": 1})) as server:
+        client = virtual.Client(server.session())
+"""
+
+from denvr.testing.fake import (
+    DEFAULT_DURATIONS,
+    ROUTES,
+    ApiError,
+    FakeAdapter,
+    FakeServer,
+    RateLimiter,
+    Resource,
+    State,
+)
+
+__all__ = [
+    "DEFAULT_DURATIONS",
+    "ROUTES",
+    "ApiError",
+    "FakeAdapter",
+    "FakeServer",
+    "RateLimiter",
+    "Resource",
+    "State",
+]
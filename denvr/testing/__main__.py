@@ -0,0 +1,52 @@
+"""
+Run the fake Denvr API server in the foreground.
+
+    python -m denvr.testing --port 8080 --servers 1000 --latency 0.05 --rate-limit 100
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+
+from denvr.testing.fake import FakeServer, State
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m denvr.testing", description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--servers", type=int, default=0, help="VMs to create at startup")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds per response")
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="Fraction of requests failing with 503"
+    )
+    parser.add_argument(
+        "--rate-limit", type=float, default=0, help="Requests per second per client"
+    )
+    parser.add_argument("--user", action="append", default=[], help="USERNAME:PASSWORD")
+    parser.add_argument("--api-key", action="append", default=[])
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    state = State()
+    state.populate(args.servers)
+    server = FakeServer(
+        state,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        users=dict(u.split(":", 1) for u in args.user),
+        api_keys=args.api_key,
+    )
+    server.start(args.host, args.port)
+    try:
+        server.thread.join()  # type: ignore[union-attr]
+    except KeyboardInterrupt:
+        server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
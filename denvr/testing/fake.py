@@ -0,0 +1,1251 @@
+from __future__ import annotations
+
+import functools
+import gzip
+import io
+import json
+import logging
+import math
+import random
+import secrets
+import threading
+import time
+
+from collections import Counter
+from datetime import datetime, timezone
+from email.message import Message
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Iterable, Mapping
+from urllib.parse import parse_qsl, urlsplit
+
+from requests import PreparedRequest, Response
+from requests.adapters import BaseAdapter
+from requests.auth import AuthBase
+from requests.structures import CaseInsensitiveDict
+
+from denvr.auth import ApiKey, Bearer
+from denvr.config import Config
+from denvr.session import Session
+
+logger = logging.getLogger(__name__)
+
+# Seconds each lifecycle transition takes (e.g., a new VM is PLANNED for 5s, then PENDING for 30s)
+DEFAULT_DURATIONS = {
+    "planned": 5.0,
+    "pending": 30.0,
+    "start": 20.0,
+    "stop": 10.0,
+    "destroy": 5.0,
+    "snapshot": 30.0,
+    "application": 30.0,
+    "reboot": 60.0,
+    "reprovision": 300.0,
+}
+
+DEFAULT_CLUSTERS = ["Hou1", "Msc1", "Yyc1"]
+
+# Max VMs (or applications) per cluster and configuration (or hardware package)
+DEFAULT_CAPACITY = 100
+
+IMAGES = ["Ubuntu_22.04.4_LTS", "Ubuntu_20.04.6_LTS", "Ubuntu_24.04_LTS", "habana-1.16.2"]
+
+RESOURCE_POOLS = ["on-demand", "reserved-denvr"]
+
+# (name, gpu type, gpu brand, gpu name, gpus, vcpus, memory GB, storage GB, price per hour)
+MACHINES = [
+    ("A100_40GB_PCIe_1x", "nvidia.com/A100PCIE40GB", "nvidia", "A100", 1, 14, 112, 1700, 1.25),
+    ("A100_40GB_PCIe_2x", "nvidia.com/A100PCIE40GB", "nvidia", "A100", 2, 28, 224, 3400, 2.5),
+    (
+        "H100_80GB_SXM_8x",
+        "nvidia.com/H100SXM480GB",
+        "nvidia",
+        "H100",
+        8,
+        208,
+        1800,
+        30000,
+        19.2,
+    ),
+    ("G2_8x", "intel/GAUDI2", "intel", "Gaudi2", 8, 152, 1024, 30000, 9.6),
+]
+
+CATALOG = [
+    ("jupyter-notebook", "https://jupyter.org", ["python-3.11", "python-3.12"]),
+    ("vllm", "https://github.com/vllm-project/vllm", ["v0.6.3", "v0.8.4"]),
+    ("ollama", "https://ollama.com", ["0.5.7"]),
+]
+
+
+class ApiError(Exception):
+    """
+    An error response with an ABP style `{"error": {"message": ...}}` body.
+    """
+
+    def __init__(self, status: int, message: str, headers: dict | None = None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = headers or {}
+
+
+class Resource:
+    """
+    An item in the fake API state along with its pending lifecycle transitions.
+
+    Transitions are (time, updates) pairs applied lazily when the item is read, so thousands
+    of resources don't need background timers. An update of `{"deleted": True}` removes the item.
+    """
+
+    __slots__ = ("item", "transitions", "updated")
+
+    def __init__(self, item: dict, now: float):
+        self.item = item
+        self.transitions: list[tuple[float, dict]] = []
+        self.updated = now
+
+    def schedule(self, now: float, steps: Iterable[tuple[float, dict]]):
+        """
+        Replace any pending transitions with `steps` of (duration, updates) starting at `now`.
+        """
+        self.transitions = []
+        at = now
+        for duration, updates in steps:
+            at += duration
+            self.transitions.append((at, updates))
+        self.settle(now)
+
+    def settle(self, now: float) -> bool:
+        """
+        Apply the transitions which are due, returning `False` if the resource has been deleted.
+        """
+        while self.transitions and self.transitions[0][0] <= now:
+            at, updates = self.transitions.pop(0)
+            if updates.get("deleted"):
+                return False
+            self.item.update(updates)
+            self.updated = at
+        return True
+
+    @property
+    def busy(self) -> bool:
+        return bool(self.transitions)
+
+
+@functools.lru_cache(maxsize=4096)
+def timestamp(t: float) -> str:
+    return datetime.fromtimestamp(t, timezone.utc).isoformat(timespec="seconds")
+
+
+def _key(name: str) -> str:
+    # Match parameters regardless of case or style (e.g., "Cluster", "cluster", "ssh_keys", "sshKeys")
+    return name.replace("_", "").lower()
+
+
+class Args:
+    """
+    The merged query parameters and JSON body of a request.
+    """
+
+    __slots__ = ("values",)
+
+    def __init__(self, params: dict, body: Any):
+        self.values = {_key(k): v for k, v in params.items()}
+        if isinstance(body, dict):
+            self.values.update({_key(k): v for k, v in body.items()})
+
+    def get(self, name: str, default: Any = None) -> Any:
+        value = self.values.get(_key(name))
+        return default if value is None else value
+
+    def require(self, name: str) -> Any:
+        value = self.values.get(_key(name))
+        if value is None or value == "":
+            raise ApiError(400, f"The {name} field is required.")
+        return value
+
+    def flag(self, name: str, default: bool = False) -> bool:
+        value = self.get(name, default)
+        return value.lower() == "true" if isinstance(value, str) else bool(value)
+
+
+class State:
+    """
+    State(clusters=DEFAULT_CLUSTERS, durations=None, capacity=None, tenant="denvr", hosts=2, clock=time.time)
+
+    The in-memory resources of a fake Denvr API tenant.
+
+    Args:
+        clusters (list): The cluster names.
+        durations (dict): Lifecycle transition overrides in seconds (see `DEFAULT_DURATIONS`).
+        capacity (dict): Max VMs or applications per `(cluster, configuration)` (default: `DEFAULT_CAPACITY`).
+        tenant (str): The tenant name, which is also the VM namespace and default VPC.
+        hosts (int): Bare metal hosts per cluster.
+        clock (callable): Returns the current time in seconds since the epoch.
+    """
+
+    def __init__(
+        self,
+        clusters: list[str] | None = None,
+        durations: dict[str, float] | None = None,
+        capacity: dict[tuple[str, str], int] | None = None,
+        tenant: str = "denvr",
+        hosts: int = 2,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.clusters = list(clusters or DEFAULT_CLUSTERS)
+        self.durations = {**DEFAULT_DURATIONS, **(durations or {})}
+        self.capacity = capacity or {}
+        self.tenant = tenant
+        self.clock = clock
+        self.lock = threading.RLock()
+        self.counter = 0
+
+        # Resources keyed by (cluster, namespace or None, id)
+        self.servers: dict[tuple, Resource] = {}
+        self.snapshots: dict[tuple, Resource] = {}
+        self.applications: dict[tuple, Resource] = {}
+        self.vpcs: dict[tuple, Resource] = {}
+        self.hosts: dict[tuple, Resource] = {}
+        # Server key -> the id of the VPC it was created in (other servers are in the default VPC)
+        self.server_vpcs: dict[tuple, str] = {}
+
+        now = clock()
+        for cluster in self.clusters:
+            self._add_vpc(cluster, tenant, now, default=True)
+            for _ in range(hosts):
+                self._add_host(cluster, now)
+
+    def limit(self, cluster: str, configuration: str) -> int:
+        return self.capacity.get((cluster, configuration), DEFAULT_CAPACITY)
+
+    def _next(self) -> int:
+        self.counter += 1
+        return self.counter
+
+    def _cluster(self, args: Args, name: str = "cluster") -> str:
+        cluster = args.require(name)
+        if cluster not in self.clusters:
+            raise ApiError(400, f"Cluster {cluster} does not exist.")
+        return cluster
+
+    def _remove(self, resources: dict[tuple, Resource], key: tuple):
+        resources.pop(key, None)
+        if resources is self.servers:
+            self.server_vpcs.pop(key, None)
+
+    def _live(self, resources: dict[tuple, Resource], now: float) -> list[Resource]:
+        dead = [k for k, r in resources.items() if not r.settle(now)]
+        for k in dead:
+            self._remove(resources, k)
+        return list(resources.values())
+
+    def _find(self, resources: dict[tuple, Resource], key: tuple, kind: str) -> Resource:
+        resource = resources.get(key)
+        if resource is None or not resource.settle(self.clock()):
+            self._remove(resources, key)
+            raise ApiError(404, f"{kind} {key[-1]} was not found in {key[0]}.")
+        return resource
+
+    def _used(self, cluster: str, configuration: str, now: float) -> int:
+        used = sum(
+            1
+            for r in self._live(self.servers, now)
+            if r.item["cluster"] == cluster and r.item["configuration"] == configuration
+        )
+        return used + sum(
+            1
+            for r in self._live(self.applications, now)
+            if r.item["cluster"] == cluster and r.item["hardwarePackageName"] == configuration
+        )
+
+    def _reserve(self, cluster: str, configuration: str, now: float):
+        if configuration not in {m[0] for m in MACHINES}:
+            raise ApiError(400, f"Configuration {configuration} does not exist.")
+        if self._used(cluster, configuration, now) >= self.limit(cluster, configuration):
+            raise ApiError(400, f"Insufficient capacity for {configuration} in {cluster}.")
+
+    # clusters and images
+
+    def get_all(self, args: Args) -> list:
+        return [{"name": c} for c in self.clusters]
+
+    def get_operating_system_images(self, args: Args) -> dict:
+        return {"items": list(IMAGES)}
+
+    # virtual
+
+    def _server(self, cluster: str, namespace: str, id: str, configuration: str, **kw) -> dict:
+        machine = next(m for m in MACHINES if m[0] == configuration)
+        n = self._next()
+        return {
+            "username": kw.get("username", f"admin@{self.tenant}.com"),
+            "tenancyName": self.tenant,
+            "rpool": kw.get("rpool", "on-demand"),
+            "directAttachedStoragePersisted": kw.get("persist", False),
+            "id": id,
+            "namespace": namespace,
+            "configuration": configuration,
+            "storage": machine[7],
+            "gpuType": machine[1],
+            "gpus": machine[4],
+            "vcpus": machine[5],
+            "memory": machine[6],
+            "ip": f"130.250.{n // 250 % 250}.{n % 250 + 1}",
+            "privateIp": f"172.16.{n // 250 % 250}.{n % 250 + 1}",
+            "image": kw.get("image", IMAGES[0]),
+            "cluster": cluster,
+            "nodeSelector": f"node-{n % 64:03d}",
+            "status": kw.get("status", "PLANNED"),
+            "storageType": "na",
+            "rootDiskSize": str(kw.get("root_disk_size", 500)),
+            "lastUpdated": None,
+        }
+
+    def _view(self, resource: Resource) -> dict:
+        if "lastUpdated" in resource.item:
+            return {**resource.item, "lastUpdated": timestamp(resource.updated)}
+        return dict(resource.item)
+
+    def get_servers(self, args: Args) -> dict:
+        cluster = args.get("cluster")
+        with self.lock:
+            items = [
+                self._view(r)
+                for r in self._live(self.servers, self.clock())
+                if cluster is None or r.item["cluster"] == cluster
+            ]
+        return {"items": items}
+
+    def _server_key(self, args: Args) -> tuple:
+        return (self._cluster(args), args.require("namespace"), args.require("id"))
+
+    def get_server(self, args: Args) -> dict:
+        with self.lock:
+            return self._view(self._find(self.servers, self._server_key(args), "Server"))
+
+    def create_server(self, args: Args) -> dict:
+        cluster = self._cluster(args)
+        configuration = args.require("configuration")
+        args.require("ssh_keys")
+        vpc = args.require("vpc")
+        with self.lock:
+            now = self.clock()
+            match = next(
+                (
+                    r.item
+                    for r in self._live(self.vpcs, now)
+                    if r.item["cluster"] == cluster and vpc in (r.item["id"], r.item["name"])
+                ),
+                None,
+            )
+            if match is None:
+                raise ApiError(400, f"VPC {vpc} does not exist in {cluster}.")
+            self._reserve(cluster, configuration, now)
+
+            id = args.get("name") or f"vm-{int(now)}{self._next():06d}"
+            key = (cluster, self.tenant, id)
+            if key in self.servers and self.servers[key].settle(now):
+                raise ApiError(409, f"Server {id} already exists in {cluster}.")
+
+            snapshot = args.get("snapshot_name")
+            if snapshot and (cluster, self.tenant, snapshot) not in self.snapshots:
+                raise ApiError(400, f"Snapshot {snapshot} does not exist in {cluster}.")
+
+            resource = Resource(
+                self._server(
+                    cluster,
+                    self.tenant,
+                    id,
+                    configuration,
+                    rpool=args.get("rpool", "on-demand"),
+                    image=args.get("operating_system_image", IMAGES[0]),
+                    persist=args.flag("persist_storage"),
+                    root_disk_size=args.get("root_disk_size", 500),
+                ),
+                now,
+            )
+            resource.schedule(
+                now,
+                [
+                    (self.durations["planned"], {"status": "PENDING"}),
+                    (self.durations["pending"], {"status": "ONLINE"}),
+                ],
+            )
+            self.servers[key] = resource
+            self.server_vpcs[key] = match["id"]
+            return self._view(resource)
+
+    def _transition(self, args: Args, status: str, steps: list[tuple[float, dict]]) -> dict:
+        with self.lock:
+            key = self._server_key(args)
+            resource = self._find(self.servers, key, "Server")
+            if resource.busy:
+                raise ApiError(409, f"Server {key[-1]} is {resource.item['status']}.")
+            if status and resource.item["status"] != status:
+                raise ApiError(400, f"Server {key[-1]} is not {status}.")
+            resource.schedule(self.clock(), steps)
+            return {"id": key[-1], "cluster": key[0], "status": resource.item["status"]}
+
+    def start_server(self, args: Args) -> dict:
+        return self._transition(
+            args,
+            "OFFLINE",
+            [(0, {"status": "PENDING"}), (self.durations["start"], {"status": "ONLINE"})],
+        )
+
+    def stop_server(self, args: Args) -> dict:
+        return self._transition(
+            args,
+            "ONLINE",
+            [(0, {"status": "PENDING"}), (self.durations["stop"], {"status": "OFFLINE"})],
+        )
+
+    def destroy_server(self, args: Args) -> dict:
+        with self.lock:
+            key = self._server_key(args)
+            resource = self._find(self.servers, key, "Server")
+            resource.schedule(
+                self.clock(),
+                [(0, {"status": "PENDING"}), (self.durations["destroy"], {"deleted": True})],
+            )
+            if args.flag("delete_snapshots"):
+                for k, r in list(self.snapshots.items()):
+                    if k[0] == key[0] and r.item["sourceName"] == key[-1]:
+                        del self.snapshots[k]
+            return {"id": key[-1], "cluster": key[0], "status": "PENDING"}
+
+    def get_configurations(self, args: Args) -> dict:
+        return {
+            "items": [
+                {
+                    "id": i,
+                    "userFriendlyName": name.replace("_", " "),
+                    "name": name,
+                    "description": f"{gpus}x {gpu_name}",
+                    "osVersion": "22.04",
+                    "osType": "linux",
+                    "storage": storage,
+                    "gpuType": gpu_type,
+                    "gpuFamily": gpu_name,
+                    "gpuBrand": brand,
+                    "gpuName": gpu_name,
+                    "type": "virtual",
+                    "brandFamily": brand,
+                    "brand": brand,
+                    "textName": name,
+                    "gpus": gpus,
+                    "vcpus": vcpus,
+                    "memory": memory,
+                    "price": price,
+                    "computeNetwork": gpus == 8,
+                    "isGpuPlatform": True,
+                    "clusters": list(self.clusters),
+                }
+                for i, (
+                    name,
+                    gpu_type,
+                    brand,
+                    gpu_name,
+                    gpus,
+                    vcpus,
+                    memory,
+                    storage,
+                    price,
+                ) in (enumerate(MACHINES))
+            ]
+        }
+
+    def get_availability(self, args: Args) -> dict:
+        cluster = self._cluster(args)
+        pool = args.get("resource_pool", "on-demand")
+        report = args.flag("report_nodes", True)
+        with self.lock:
+            now = self.clock()
+            items = []
+            for machine in MACHINES:
+                limit = self.limit(cluster, machine[0])
+                free = max(limit - self._used(cluster, machine[0], now), 0)
+                item: dict[str, Any] = {
+                    "cluster": cluster,
+                    "configuration": machine[0],
+                    "resourcePool": pool,
+                    "available": free > 0,
+                }
+                if report:
+                    item.update(count=free, maxCount=limit)
+                items.append(item)
+        return {"items": items}
+
+    # applications
+
+    def _application(self, args: Args, cluster: str, package: str, **kw) -> dict:
+        n = self._next()
+        return {
+            "id": args.require("name"),
+            "cluster": cluster,
+            "status": "PLANNED",
+            "tenant": self.tenant,
+            "createdBy": f"admin@{self.tenant}.com",
+            "privateIp": f"172.17.{n // 250 % 250}.{n % 250 + 1}",
+            "publicIp": f"130.251.{n // 250 % 250}.{n % 250 + 1}",
+            "resourcePool": args.get("resource_pool", "on-demand"),
+            "dns": f"{args.require('name')}.{cluster.lower()}.apps.denvrdata.com",
+            "sshUsername": "ubuntu",
+            "applicationCatalogItemName": kw.get("catalog_item", ""),
+            "applicationCatalogItemVersionName": kw.get("version", ""),
+            "hardwarePackageName": package,
+            "persistedDirectAttachedStorage": args.flag("persist_direct_attached_storage"),
+            "personalSharedStorage": args.flag("personal_shared_storage", True),
+            "tenantSharedStorage": args.flag("tenant_shared_storage", True),
+        }
+
+    def _create_application(self, args: Args, **kw) -> dict:
+        cluster = self._cluster(args)
+        package = args.require("hardware_package_name")
+        with self.lock:
+            now = self.clock()
+            key = (cluster, None, args.require("name"))
+            if key in self.applications and self.applications[key].settle(now):
+                raise ApiError(409, f"Application {key[-1]} already exists in {cluster}.")
+            self._reserve(cluster, package, now)
+            resource = Resource(self._application(args, cluster, package, **kw), now)
+            resource.schedule(
+                now,
+                [
+                    (self.durations["planned"], {"status": "PENDING"}),
+                    (self.durations["application"], {"status": "ONLINE"}),
+                ],
+            )
+            self.applications[key] = resource
+            return dict(resource.item)
+
+    def create_catalog_application(self, args: Args) -> dict:
+        name = args.require("application_catalog_item_name")
+        version = args.require("application_catalog_item_version")
+        item = next((c for c in CATALOG if c[0] == name), None)
+        if item is None or version not in item[2]:
+            raise ApiError(400, f"Catalog item {name} {version} does not exist.")
+        return self._create_application(args, catalog_item=name, version=version)
+
+    def create_custom_application(self, args: Args) -> dict:
+        args.require("image_url")
+        return self._create_application(args)
+
+    def get_applications(self, args: Args) -> dict:
+        with self.lock:
+            return {
+                "items": [dict(r.item) for r in self._live(self.applications, self.clock())]
+            }
+
+    def _application_key(self, args: Args) -> tuple:
+        return (self._cluster(args), None, args.require("id"))
+
+    def get_application_details(self, args: Args) -> dict:
+        with self.lock:
+            item = dict(
+                self._find(self.applications, self._application_key(args), "Application").item
+            )
+        machine = next(m for m in MACHINES if m[0] == item["hardwarePackageName"])
+        catalog = next((c for c in CATALOG if c[0] == item["applicationCatalogItemName"]), None)
+        return {
+            "instanceDetails": item,
+            "applicationCatalogItem": {
+                "name": catalog[0],
+                "applicationSourceDetailsUrl": catalog[1],
+                "versions": [item["applicationCatalogItemVersionName"]],
+            }
+            if catalog
+            else None,
+            "hardwarePackage": self._hardware_package(machine),
+        }
+
+    def _application_action(self, args: Args, status: str, steps: list) -> dict:
+        with self.lock:
+            key = self._application_key(args)
+            resource = self._find(self.applications, key, "Application")
+            if resource.busy or resource.item["status"] != status:
+                raise ApiError(409, f"Application {key[-1]} is {resource.item['status']}.")
+            resource.schedule(self.clock(), steps)
+            return {"id": key[-1], "cluster": key[0]}
+
+    def start_application(self, args: Args) -> dict:
+        return self._application_action(
+            args,
+            "OFFLINE",
+            [(0, {"status": "PENDING"}), (self.durations["start"], {"status": "ONLINE"})],
+        )
+
+    def stop_application(self, args: Args) -> dict:
+        return self._application_action(
+            args,
+            "ONLINE",
+            [(0, {"status": "PENDING"}), (self.durations["stop"], {"status": "OFFLINE"})],
+        )
+
+    def destroy_application(self, args: Args) -> dict:
+        with self.lock:
+            key = self._application_key(args)
+            resource = self._find(self.applications, key, "Application")
+            resource.schedule(
+                self.clock(),
+                [(0, {"status": "PENDING"}), (self.durations["destroy"], {"deleted": True})],
+            )
+            return {"id": key[-1], "cluster": key[0]}
+
+    def _hardware_package(self, machine: tuple) -> dict:
+        name, gpu_type, brand, gpu_name, gpus, vcpus, memory, storage, price = machine
+        return {
+            "name": name,
+            "description": f"{gpus}x {gpu_name}",
+            "gpuCount": gpus,
+            "gpuType": gpu_type,
+            "gpuBrand": brand,
+            "gpuName": gpu_name,
+            "vcpusCount": vcpus,
+            "memoryGb": memory,
+            "directAttachedStorageGb": storage,
+            "pricePerHour": price,
+        }
+
+    def get_application_configurations(self, args: Args) -> dict:
+        return {"items": [self._hardware_package(m) for m in MACHINES]}
+
+    def get_application_availability(self, args: Args) -> dict:
+        args.require("resource_pool")
+        return self.get_availability(args)
+
+    def get_application_catalog_items(self, args: Args) -> dict:
+        return {
+            "items": [
+                {
+                    "name": name,
+                    "applicationSourceDetailsUrl": url,
+                    "versions": [
+                        {
+                            "name": version,
+                            "imageUrl": f"docker.io/denvr/{name}:{version}",
+                            "imageLastPushDate": "2025-01-01T00:00:00+00:00",
+                            "platform": "linux/amd64",
+                            "launchType": "jupyter" if name.startswith("jupyter") else "api",
+                            "releaseNotesUrl": url,
+                        }
+                        for version in versions
+                    ],
+                }
+                for name, url, versions in CATALOG
+            ]
+        }
+
+    # metal
+
+    def _add_host(self, cluster: str, now: float):
+        n = self._next()
+        id = f"{cluster.lower()}-host-{n:03d}"
+        item = {
+            "id": id,
+            "cluster": cluster,
+            "tenancyName": self.tenant,
+            "nodeType": MACHINES[2][0],
+            "image": IMAGES[0],
+            "privateIp": f"172.18.{n // 250 % 250}.{n % 250 + 1}",
+            "publicIp": f"130.252.{n // 250 % 250}.{n % 250 + 1}",
+            "provisionedHostname": id,
+            "operationalStatus": "Online",
+            "poweredOn": True,
+            "provisioningState": "Provisioned",
+        }
+        self.hosts[(cluster, None, id)] = Resource(item, now)
+
+    def get_hosts(self, args: Args) -> dict:
+        cluster = args.get("cluster")
+        with self.lock:
+            return {
+                "items": [
+                    dict(r.item)
+                    for r in self._live(self.hosts, self.clock())
+                    if cluster is None or r.item["cluster"] == cluster
+                ]
+            }
+
+    def _host(self, args: Args) -> Resource:
+        return self._find(self.hosts, (self._cluster(args), None, args.require("id")), "Host")
+
+    def get_host(self, args: Args) -> dict:
+        with self.lock:
+            return dict(self._host(args).item)
+
+    def reboot_host(self, args: Args) -> dict:
+        with self.lock:
+            host = self._host(args)
+            if host.busy:
+                raise ApiError(
+                    409, f"Host {host.item['id']} is {host.item['operationalStatus']}."
+                )
+            host.schedule(
+                self.clock(),
+                [
+                    (0, {"operationalStatus": "Rebooting", "poweredOn": False}),
+                    (
+                        self.durations["reboot"],
+                        {"operationalStatus": "Online", "poweredOn": True},
+                    ),
+                ],
+            )
+            return dict(host.item)
+
+    def reprovision_host(self, args: Args) -> dict:
+        with self.lock:
+            host = self._host(args)
+            if host.busy:
+                raise ApiError(
+                    409, f"Host {host.item['id']} is {host.item['operationalStatus']}."
+                )
+            image = args.get("image_url", host.item["image"])
+            host.schedule(
+                self.clock(),
+                [
+                    (0, {"provisioningState": "Provisioning", "operationalStatus": "Offline"}),
+                    (
+                        self.durations["reprovision"],
+                        {
+                            "provisioningState": "Provisioned",
+                            "operationalStatus": "Online",
+                            "image": image,
+                        },
+                    ),
+                ],
+            )
+            return dict(host.item)
+
+    # vpcs
+
+    def _add_vpc(self, cluster: str, name: str, now: float, default: bool = False, block=False):
+        n = len(self.vpcs) + 1
+        item = {
+            "id": name,
+            "name": name,
+            "cluster": cluster,
+            "tenancyName": self.tenant,
+            "ipRange": f"10.{n % 250}.0.0/16",
+            "createdAt": timestamp(now),
+            "blockIntraVpcComms": block,
+            "isDefault": default,
+        }
+        self.vpcs[(cluster, None, name)] = Resource(item, now)
+        return item
+
+    def get_vpcs(self, args: Args) -> dict:
+        cluster = args.get("cluster")
+        with self.lock:
+            return {
+                "items": [
+                    dict(r.item)
+                    for r in self._live(self.vpcs, self.clock())
+                    if cluster is None or r.item["cluster"] == cluster
+                ]
+            }
+
+    def _vpc_key(self, args: Args) -> tuple:
+        return (self._cluster(args), None, args.require("id"))
+
+    def get_vpc(self, args: Args) -> dict:
+        with self.lock:
+            return dict(self._find(self.vpcs, self._vpc_key(args), "VPC").item)
+
+    def create_vpc(self, args: Args) -> dict:
+        cluster = self._cluster(args)
+        name = args.require("name")
+        with self.lock:
+            if (cluster, None, name) in self.vpcs:
+                raise ApiError(409, f"VPC {name} already exists in {cluster}.")
+            return dict(
+                self._add_vpc(
+                    cluster,
+                    name,
+                    self.clock(),
+                    default=args.flag("is_default"),
+                    block=args.flag("block_intra_vpc_comms"),
+                )
+            )
+
+    def destroy_vpc(self, args: Args) -> dict:
+        with self.lock:
+            key = self._vpc_key(args)
+            resource = self._find(self.vpcs, key, "VPC")
+            default = resource.item["isDefault"]
+            self._live(self.servers, self.clock())
+            for k in self.servers:
+                vpc = self.server_vpcs.get(k)
+                if k[0] == key[0] and (vpc == key[-1] or (vpc is None and default)):
+                    raise ApiError(409, f"VPC {key[-1]} is in use.")
+            del self.vpcs[key]
+            return dict(resource.item)
+
+    # snapshots
+
+    def get_snapshots(self, args: Args) -> dict:
+        cluster = args.get("cluster")
+        with self.lock:
+            return {
+                "items": [
+                    dict(r.item)
+                    for k, r in list(self.snapshots.items())
+                    if (cluster is None or k[0] == cluster) and r.settle(self.clock())
+                ]
+            }
+
+    def _snapshot_key(self, args: Args) -> tuple:
+        return (self._cluster(args), args.require("namespace"), args.require("id"))
+
+    def get_snapshot(self, args: Args) -> dict:
+        with self.lock:
+            return dict(self._find(self.snapshots, self._snapshot_key(args), "Snapshot").item)
+
+    def create_snapshot(self, args: Args) -> dict:
+        cluster = self._cluster(args)
+        namespace = args.require("namespace")
+        source = args.require("source_vm_name")
+        with self.lock:
+            now = self.clock()
+            server = self._find(self.servers, (cluster, namespace, source), "Server").item
+            name = args.get("name") or f"{source}-snapshot-{self._next()}"
+            key = (cluster, namespace, name)
+            if key in self.snapshots:
+                raise ApiError(409, f"Snapshot {name} already exists in {cluster}.")
+            resource = Resource(
+                {
+                    "id": name,
+                    "namespace": namespace,
+                    "sourceName": source,
+                    "osImage": server["image"],
+                    "customPackage": server["configuration"],
+                    "rootDiskSize": int(server["rootDiskSize"]),
+                    "creationDate": timestamp(now),
+                    "username": server["username"],
+                    "tenancyName": self.tenant,
+                    "readyToUse": False,
+                },
+                now,
+            )
+            resource.schedule(now, [(self.durations["snapshot"], {"readyToUse": True})])
+            self.snapshots[key] = resource
+            return dict(resource.item)
+
+    def delete_snapshot(self, args: Args) -> dict:
+        with self.lock:
+            key = self._snapshot_key(args)
+            self._find(self.snapshots, key, "Snapshot")
+            del self.snapshots[key]
+            return {"id": key[-1]}
+
+    def populate(self, servers: int = 0, cluster: str | None = None, status: str = "ONLINE"):
+        """
+        Add `servers` VMs spread across the clusters (or in `cluster`), e.g., for scale testing.
+        """
+        with self.lock:
+            now = self.clock()
+            for i in range(servers):
+                c = cluster or self.clusters[i % len(self.clusters)]
+                id = f"vm-{self._next():08d}"
+                item = self._server(
+                    c, self.tenant, id, MACHINES[i % len(MACHINES)][0], status=status
+                )
+                self.servers[(c, self.tenant, id)] = Resource(item, now)
+
+
+# (method, path) -> State method name
+ROUTES = {
+    ("GET", "/api/v1/clusters/GetAll"): "get_all",
+    ("GET", "/api/v1/servers/images/GetOperatingSystemImages"): "get_operating_system_images",
+    ("GET", "/api/v1/servers/applications/GetApplications"): "get_applications",
+    ("GET", "/api/v1/servers/applications/GetApplicationDetails"): "get_application_details",
+    ("GET", "/api/v1/servers/applications/GetConfigurations"): "get_application_configurations",
+    ("GET", "/api/v1/servers/applications/GetAvailability"): "get_application_availability",
+    (
+        "GET",
+        "/api/v1/servers/applications/GetApplicationCatalogItems",
+    ): "get_application_catalog_items",
+    (
+        "POST",
+        "/api/v1/servers/applications/CreateCatalogApplication",
+    ): "create_catalog_application",
+    (
+        "POST",
+        "/api/v1/servers/applications/CreateCustomApplication",
+    ): "create_custom_application",
+    ("POST", "/api/v1/servers/applications/StartApplication"): "start_application",
+    ("POST", "/api/v1/servers/applications/StopApplication"): "stop_application",
+    ("DELETE", "/api/v1/servers/applications/DestroyApplication"): "destroy_application",
+    ("GET", "/api/v1/servers/metal/GetHosts"): "get_hosts",
+    ("GET", "/api/v1/servers/metal/GetHost"): "get_host",
+    ("POST", "/api/v1/servers/metal/RebootHost"): "reboot_host",
+    ("POST", "/api/v1/servers/metal/ReprovisionHost"): "reprovision_host",
+    ("GET", "/api/v1/servers/virtual/GetServers"): "get_servers",
+    ("GET", "/api/v1/servers/virtual/GetServer"): "get_server",
+    ("POST", "/api/v1/servers/virtual/CreateServer"): "create_server",
+    ("POST", "/api/v1/servers/virtual/StartServer"): "start_server",
+    ("POST", "/api/v1/servers/virtual/StopServer"): "stop_server",
+    ("DELETE", "/api/v1/servers/virtual/DestroyServer"): "destroy_server",
+    ("GET", "/api/v1/servers/virtual/GetConfigurations"): "get_configurations",
+    ("GET", "/api/v1/servers/virtual/GetAvailability"): "get_availability",
+    ("GET", "/api/v1/vpcs/GetVpcs"): "get_vpcs",
+    ("GET", "/api/v1/vpcs/GetVpc"): "get_vpc",
+    ("POST", "/api/v1/vpcs/CreateVpc"): "create_vpc",
+    ("DELETE", "/api/v1/vpcs/DestroyVpc"): "destroy_vpc",
+    ("GET", "/api/v1/servers/snapshots/GetSnapshots"): "get_snapshots",
+    ("GET", "/api/v1/servers/snapshots/GetSnapshot"): "get_snapshot",
+    ("POST", "/api/v1/servers/snapshots/CreateSnapshot"): "create_snapshot",
+    ("DELETE", "/api/v1/servers/snapshots/DeleteSnapshot"): "delete_snapshot",
+}
+
+
+class RateLimiter:
+    """
+    A token bucket per client allowing `rate` requests per second with bursts of up to `rate` requests.
+    """
+
+    def __init__(self, rate: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.clock = clock
+        self.buckets: dict[str, tuple[float, float]] = {}
+        self.lock = threading.Lock()
+
+    def acquire(self, client: str) -> float:
+        """
+        Take a token for `client`, returning 0 or the seconds to wait until one is available.
+        """
+        with self.lock:
+            now = self.clock()
+            tokens, last = self.buckets.get(client, (self.rate, now))
+            tokens = min(self.rate, tokens + (now - last) * self.rate)
+            if tokens < 1:
+                self.buckets[client] = (tokens, now)
+                return (1 - tokens) / self.rate
+            self.buckets[client] = (tokens - 1, now)
+            return 0.0
+
+
+class FakeServer:
+    """
+    FakeServer(state=None, latency=0.0, error_rate=0.0, rate_limit=0, users=None, api_keys=None, token_ttl=3600, seed=None)
+
+    A stateful fake of the Denvr API implementing every path the SDK supports, with realistic lifecycles
+    (e.g., VMs move from PLANNED to PENDING to ONLINE), capacity limits, auth and injected latency,
+    errors and rate limits, for testing and load testing code built on the SDK without a real tenant.
+
+    Requests can be served over HTTP (`start`, or as a context manager) or in process without sockets
+    (`adapter`), and `session` returns a `Session` connected either way.
+
+    Example:
+
+        with FakeServer(State(durations={"planned": 0, "pending": 1}), latency=0.01) as server:
+            client = virtual.Client(server.session())
+            vm = client.create_server(name="my-vm", configuration="A100_40GB_PCIe_1x", ...)
+
+    Args:
+        state (State): The resources to serve (default: an empty tenant with the `DEFAULT_CLUSTERS`).
+        latency (float or tuple): Seconds to delay each response, or a (min, max) range.
+        error_rate (float): The fraction of requests which fail with a `503`.
+        rate_limit (float): Requests per second allowed for each client before responding with `429`
+            and a `Retry-After` header (0 for unlimited).
+        users (dict): Username to password for bearer token auth.
+        api_keys (list): Accepted API keys.
+        token_ttl (float): Seconds access tokens are valid for.
+        seed (int): Random seed for latency and errors.
+
+    Auth is only required when `users` or `api_keys` are provided.
+    """
+
+    def __init__(
+        self,
+        state: State | None = None,
+        latency: float | tuple[float, float] = 0.0,
+        error_rate: float = 0.0,
+        rate_limit: float = 0,
+        users: dict[str, str] | None = None,
+        api_keys: list[str] | None = None,
+        token_ttl: float = 3600,
+        seed: int | None = None,
+    ):
+        self.state = state or State()
+        self.latency = latency
+        self.error_rate = error_rate
+        self.limiter = RateLimiter(rate_limit) if rate_limit else None
+        self.users = users or {}
+        self.api_keys = set(api_keys or [])
+        self.token_ttl = token_ttl
+        self.random = random.Random(seed)
+        # Access and refresh tokens -> (username, expiry)
+        self.tokens: dict[str, tuple[str, float]] = {}
+        self.refresh_tokens: dict[str, tuple[str, float]] = {}
+        # Requests served by (method, path, status)
+        self.requests: Counter = Counter()
+        self._lock = threading.Lock()
+        self.httpd: ThreadingHTTPServer | None = None
+        self.thread: threading.Thread | None = None
+
+    # request handling
+
+    def handle(
+        self, method: str, target: str, headers: Mapping[str, str] | Message, body: bytes = b""
+    ) -> tuple[int, dict, bytes]:
+        """
+        Respond to a request, returning the (status, headers, body).
+        """
+        url = urlsplit(target)
+        path = url.path.rstrip("/") or "/"
+        method = method.upper()
+        status, extra, payload = 200, {}, None
+        try:
+            self._delay()
+            payload = self._dispatch(method, path, url.query, headers, body)
+        except ApiError as e:
+            status, extra = e.status, e.headers
+            payload = {
+                "result": None,
+                "success": False,
+                "error": {"code": 0, "message": e.message, "details": None},
+                "unAuthorizedRequest": e.status == 401,
+            }
+
+        with self._lock:
+            self.requests[(method, path, status)] += 1
+
+        if isinstance(payload, bytes):
+            data = payload
+        else:
+            data = json.dumps(payload, separators=(",", ":")).encode()
+        return status, {"Content-Type": "application/json; charset=utf-8", **extra}, data
+
+    def _delay(self):
+        latency = self.latency
+        if isinstance(latency, tuple):
+            latency = self.random.uniform(*latency)
+        if latency:
+            time.sleep(latency)
+
+    def _dispatch(self, method: str, path: str, query: str, headers, body: bytes) -> Any:
+        if method == "HEAD":
+            return None
+
+        if path.startswith("/api/TokenAuth/"):
+            return self._token_auth(method, path, dict(parse_qsl(query)), _json(headers, body))
+
+        client = self._authenticate(headers)
+        if self.limiter is not None:
+            wait = self.limiter.acquire(client)
+            if wait:
+                raise ApiError(
+                    429, "Too many requests.", {"Retry-After": str(max(math.ceil(wait), 1))}
+                )
+        if self.error_rate and self.random.random() < self.error_rate:
+            raise ApiError(503, "Service temporarily unavailable.")
+
+        return self.route(method, path, dict(parse_qsl(query)), _json(headers, body))
+
+    def route(self, method: str, path: str, params: dict, body: Any) -> Any:
+        """
+        The response to an authorized API request, as JSON serializable data or encoded bytes.
+        Subclasses can override this to serve other responses (e.g., `denvr.testing.mock`).
+        """
+        name = ROUTES.get((method, path))
+        if name is None:
+            raise ApiError(*no_route(method, path, ROUTES))
+
+        result = getattr(self.state, name)(Args(params, body))
+        return {"result": result, "success": True, "error": None, "unAuthorizedRequest": False}
+
+    def _authenticate(self, headers) -> str:
+        auth = headers.get("Authorization", "")
+        if not self.users and not self.api_keys:
+            return auth or "anonymous"
+
+        scheme, _, credential = auth.partition(" ")
+        if scheme == "ApiKey" and credential in self.api_keys:
+            return auth
+        if scheme == "Bearer":
+            user, expires = self.tokens.get(credential, ("", 0.0))
+            if expires > time.time():
+                return user
+        raise ApiError(401, "Current user did not login to the application!")
+
+    def _token_auth(self, method: str, path: str, params: dict, body: Any) -> dict:
+        now = time.time()
+        if method == "POST" and path == "/api/TokenAuth/Authenticate":
+            body = body or {}
+            user = body.get("userNameOrEmailAddress", "")
+            if not user or self.users.get(user) != body.get("password"):
+                raise ApiError(401, "Invalid user name or password")
+            refresh = secrets.token_hex(16)
+            self.refresh_tokens[refresh] = (user, now + 30 * 24 * 3600)
+            return {
+                "result": {
+                    **self._issue(user, now),
+                    "refreshToken": refresh,
+                    "refreshTokenExpireInSeconds": 30 * 24 * 3600,
+                }
+            }
+
+        if method == "GET" and path == "/api/TokenAuth/RefreshToken":
+            user, expires = self.refresh_tokens.get(params.get("refreshToken", ""), ("", 0.0))
+            if expires <= now:
+                raise ApiError(401, "Refresh token is not valid!")
+            return {"result": self._issue(user, now)}
+
+        raise ApiError(404, f"No route for {method} {path}.")
+
+    def _issue(self, user: str, now: float) -> dict:
+        token = secrets.token_hex(16)
+        self.tokens[token] = (user, now + self.token_ttl)
+        return {"accessToken": token, "expireInSeconds": int(self.token_ttl)}
+
+    # transports
+
+    @property
+    def url(self) -> str:
+        if self.httpd is None:
+            return "http://denvr.fake"
+        host, port = self.httpd.socket.getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> FakeServer:
+        """
+        Serve the API over HTTP on a background thread (e.g., on port 0 for any free port).
+        """
+        self.httpd = ThreadingHTTPServer((host, port), _handler(self))
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        logger.info("Fake Denvr API listening on %s", self.url)
+        return self
+
+    def stop(self):
+        if self.httpd is not None:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
+
+    def __enter__(self) -> FakeServer:
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def adapter(self) -> FakeAdapter:
+        """
+        A `requests` transport adapter which serves requests in process, without any sockets.
+        """
+        return FakeAdapter(self)
+
+    def session(self, username: str | None = None, **defaults) -> Session:
+        """
+        A `Session` for this server, over HTTP if it's running or otherwise in process.
+
+        Bearer auth is used for `username` (or the first user) when users are configured,
+        otherwise the first API key (if any).
+        """
+        url = self.url
+        auth: AuthBase | None = None
+        if self.users and (username or not self.api_keys):
+            username = username or next(iter(self.users))
+            if self.httpd is None:
+                raise RuntimeError("Bearer auth requires the server to be started")
+            auth = Bearer(url, username, self.users[username], retries=0)
+        elif self.api_keys:
+            auth = ApiKey(next(iter(self.api_keys)))
+
+        config = Config(
+            defaults={"server": url, "cluster": self.state.clusters[0], **defaults}, auth=auth
+        )
+        session = Session(config)
+        if self.httpd is None:
+            session.session.mount(url, self.adapter())
+        return session
+
+
+class FakeAdapter(BaseAdapter):
+    """
+    Serves `requests` in process from a `FakeServer`.
+    """
+
+    def __init__(self, server: FakeServer):
+        super().__init__()
+        self.server = server
+
+    def send(self, request: PreparedRequest, *args, **kwargs) -> Response:
+        body = request.body or b""
+        if isinstance(body, str):
+            body = body.encode()
+        status, headers, data = self.server.handle(
+            request.method or "GET", request.url or "/", request.headers, body
+        )
+
+        resp = Response()
+        resp.url = request.url or ""
+        resp.request = request
+        resp.status_code = status
+        resp.reason = _REASONS.get(status, "")
+        resp.headers = CaseInsensitiveDict(headers)
+        resp.encoding = "utf-8"
+        resp.raw = io.BytesIO(data)
+        return resp
+
+    def close(self):
+        pass
+
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    401: "Unauthorized",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    409: "Conflict",
+    429: "Too Many Requests",
+    503: "Service Unavailable",
+}
+
+
+def no_route(method: str, path: str, routes: Iterable[tuple[str, str]]) -> tuple[int, str]:
+    """
+    The status and message for a request which doesn't match any of the (method, path) `routes`.
+    """
+    known = any(p == path for _, p in routes)
+    return 405 if known else 404, f"No route for {method} {path}."
+
+
+def _json(headers, body: bytes) -> Any:
+    if not body:
+        return None
+    if headers.get("Content-Encoding") == "gzip":
+        body = gzip.decompress(body)
+    try:
+        return json.loads(body)
+    except ValueError:
+        raise ApiError(400, "The request body is not valid JSON.") from None
+
+
+def _handler(server: FakeServer) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Buffer each response, so headers and body aren't split into packets stalled by Nagle
+        wbufsize = 1 << 16
+
+        def _respond(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length) if length else b""
+            status, headers, data = server.handle(self.command, self.path, self.headers, body)
+            self.send_response(status)
+            for k, v in headers.items():
+                self.send_header(k, v)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            if self.command != "HEAD":
+                self.wfile.write(data)
+
+        do_GET = do_POST = do_PUT = do_DELETE = do_HEAD = _respond
+
+        def log_message(self, format, *args):
+            logger.debug(format, *args)
+
+    return Handler
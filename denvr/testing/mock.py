@@ -0,0 +1,700 @@
+"""
+A stateless mock of the Denvr API which responds to every path included in the SDK with the example
+response from the OpenAPI spec, after validating the request's parameters and JSON body against the spec.
+
+    python -m denvr.testing.mock --port 8080
+
+Responses are encoded once at import, so the mock is limited by the HTTP server rather than by
+building responses (see `denvr.testing.FakeServer` for stateful lifecycles instead).
+
+NOTE: This module is generated by `scripts/apigen.py`, so don't edit it by hand.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sys
+
+from typing import Any
+
+from denvr.testing.fake import ApiError, FakeServer, no_route
+
+# (method, path) -> the query parameter types, JSON body property types, required names and example response
+ENDPOINTS: dict[tuple[str, str], dict[str, Any]] = {
+    ("GET", "/api/v1/clusters/GetAll"): {
+        "params": {},
+        "json": {},
+        "required": [],
+        "example": [{"name": "string"}],
+    },
+    ("GET", "/api/v1/servers/images/GetOperatingSystemImages"): {
+        "params": {},
+        "json": {},
+        "required": [],
+        "example": {"items": ["string"]},
+    },
+    ("GET", "/api/v1/servers/applications/GetApplications"): {
+        "params": {},
+        "json": {},
+        "required": [],
+        "example": {
+            "items": [
+                {
+                    "id": "string",
+                    "cluster": "string",
+                    "status": "string",
+                    "tenant": "string",
+                    "createdBy": "string",
+                    "privateIp": "string",
+                    "publicIp": "string",
+                    "resourcePool": "string",
+                    "dns": "string",
+                    "sshUsername": "string",
+                    "applicationCatalogItemName": "string",
+                    "applicationCatalogItemVersionName": "string",
+                    "hardwarePackageName": "string",
+                    "persistedDirectAttachedStorage": False,
+                    "personalSharedStorage": False,
+                    "tenantSharedStorage": False,
+                }
+            ]
+        },
+    },
+    ("GET", "/api/v1/servers/applications/GetApplicationDetails"): {
+        "params": {"Id": "str", "Cluster": "str"},
+        "json": {},
+        "required": ["Id", "Cluster"],
+        "example": {"instanceDetails": {}, "applicationCatalogItem": {}, "hardwarePackage": {}},
+    },
+    ("GET", "/api/v1/servers/applications/GetConfigurations"): {
+        "params": {},
+        "json": {},
+        "required": [],
+        "example": {
+            "items": [
+                {
+                    "name": "string",
+                    "description": "string",
+                    "gpuCount": "string",
+                    "gpuType": "string",
+                    "gpuBrand": "string",
+                    "gpuName": "string",
+                    "vcpusCount": "string",
+                    "memoryGb": "string",
+                    "directAttachedStorageGb": "string",
+                    "pricePerHour": "string",
+                }
+            ]
+        },
+    },
+    ("GET", "/api/v1/servers/applications/GetAvailability"): {
+        "params": {"cluster": "str", "resourcePool": "str"},
+        "json": {},
+        "required": ["cluster", "resourcePool"],
+        "example": {"items": ["string"]},
+    },
+    ("GET", "/api/v1/servers/applications/GetApplicationCatalogItems"): {
+        "params": {},
+        "json": {},
+        "required": [],
+        "example": {
+            "items": [
+                {
+                    "name": "string",
+                    "applicationSourceDetailsUrl": "string",
+                    "versions": [
+                        {
+                            "name": "string",
+                            "imageUrl": "string",
+                            "imageLastPushDate": "string",
+                            "platform": "string",
+                            "launchType": "string",
+                            "releaseNotesUrl": "string",
+                        }
+                    ],
+                }
+            ]
+        },
+    },
+    ("POST", "/api/v1/servers/applications/CreateCatalogApplication"): {
+        "params": {},
+        "json": {
+            "name": "str",
+            "cluster": "str",
+            "hardwarePackageName": "str",
+            "applicationCatalogItemName": "str",
+            "applicationCatalogItemVersion": "str",
+            "resourcePool": "str",
+            "sshKeys": "list",
+            "persistDirectAttachedStorage": "bool",
+            "personalSharedStorage": "bool",
+            "tenantSharedStorage": "bool",
+            "selectedNode": "str",
+            "jupyterToken": "str",
+            "startupCommands": "list",
+            "environmentVariables": "dict",
+            "proxyPort": "str",
+            "proxyApiKeys": "list",
+        },
+        "required": [
+            "name",
+            "cluster",
+            "hardwarePackageName",
+            "applicationCatalogItemName",
+            "applicationCatalogItemVersion",
+        ],
+        "example": {
+            "id": "string",
+            "cluster": "string",
+            "status": "string",
+            "tenant": "string",
+            "createdBy": "string",
+            "privateIp": "string",
+            "publicIp": "string",
+            "resourcePool": "string",
+            "dns": "string",
+            "sshUsername": "string",
+            "applicationCatalogItemName": "string",
+            "applicationCatalogItemVersionName": "string",
+            "hardwarePackageName": "string",
+            "persistedDirectAttachedStorage": False,
+            "personalSharedStorage": False,
+            "tenantSharedStorage": False,
+        },
+    },
+    ("POST", "/api/v1/servers/applications/CreateCustomApplication"): {
+        "params": {},
+        "json": {
+            "name": "str",
+            "cluster": "str",
+            "hardwarePackageName": "str",
+            "imageUrl": "str",
+            "imageCmdOverride": "list",
+            "environmentVariables": "dict",
+            "imageRepository": "dict",
+            "resourcePool": "str",
+            "readinessWatcherPort": "int",
+            "proxyPort": "int",
+            "proxyApiKeys": "list",
+            "persistDirectAttachedStorage": "bool",
+            "personalSharedStorage": "bool",
+            "tenantSharedStorage": "bool",
+            "selectedNode": "str",
+            "userScripts": "dict",
+            "securityContext": "dict",
+        },
+        "required": ["name", "cluster", "hardwarePackageName", "imageUrl"],
+        "example": {
+            "id": "string",
+            "cluster": "string",
+            "status": "string",
+            "tenant": "string",
+            "createdBy": "string",
+            "privateIp": "string",
+            "publicIp": "string",
+            "resourcePool": "string",
+            "dns": "string",
+            "sshUsername": "string",
+            "applicationCatalogItemName": "string",
+            "applicationCatalogItemVersionName": "string",
+            "hardwarePackageName": "string",
+            "persistedDirectAttachedStorage": False,
+            "personalSharedStorage": False,
+            "tenantSharedStorage": False,
+        },
+    },
+    ("POST", "/api/v1/servers/applications/StartApplication"): {
+        "params": {},
+        "json": {"id": "str", "cluster": "str"},
+        "required": ["id", "cluster"],
+        "example": {"id": "string", "cluster": "string"},
+    },
+    ("POST", "/api/v1/servers/applications/StopApplication"): {
+        "params": {},
+        "json": {"id": "str", "cluster": "str"},
+        "required": ["id", "cluster"],
+        "example": {"id": "string", "cluster": "string"},
+    },
+    ("DELETE", "/api/v1/servers/applications/DestroyApplication"): {
+        "params": {"Id": "str", "Cluster": "str"},
+        "json": {},
+        "required": ["Id", "Cluster"],
+        "example": {"id": "string", "cluster": "string"},
+    },
+    ("GET", "/api/v1/servers/metal/GetHosts"): {
+        "params": {"Cluster": "str"},
+        "json": {},
+        "required": [],
+        "example": {
+            "items": [
+                {
+                    "id": "string",
+                    "cluster": "string",
+                    "tenancyName": "string",
+                    "nodeType": "string",
+                    "image": "string",
+                    "privateIp": "string",
+                    "publicIp": "string",
+                    "provisionedHostname": "string",
+                    "operationalStatus": "string",
+                    "poweredOn": False,
+                    "provisioningState": "string",
+                }
+            ]
+        },
+    },
+    ("GET", "/api/v1/servers/metal/GetHost"): {
+        "params": {"Id": "str", "Cluster": "str"},
+        "json": {},
+        "required": ["Id", "Cluster"],
+        "example": {
+            "id": "string",
+            "cluster": "string",
+            "tenancyName": "string",
+            "nodeType": "string",
+            "image": "string",
+            "privateIp": "string",
+            "publicIp": "string",
+            "provisionedHostname": "string",
+            "operationalStatus": "string",
+            "poweredOn": False,
+            "provisioningState": "string",
+        },
+    },
+    ("POST", "/api/v1/servers/metal/RebootHost"): {
+        "params": {},
+        "json": {"id": "str", "cluster": "str"},
+        "required": ["id", "cluster"],
+        "example": {
+            "id": "string",
+            "cluster": "string",
+            "tenancyName": "string",
+            "nodeType": "string",
+            "image": "string",
+            "privateIp": "string",
+            "publicIp": "string",
+            "provisionedHostname": "string",
+            "operationalStatus": "string",
+            "poweredOn": False,
+            "provisioningState": "string",
+        },
+    },
+    ("POST", "/api/v1/servers/metal/ReprovisionHost"): {
+        "params": {},
+        "json": {
+            "imageUrl": "str",
+            "imageChecksum": "str",
+            "cloudInitBase64": "str",
+            "id": "str",
+            "cluster": "str",
+        },
+        "required": ["id", "cluster"],
+        "example": {
+            "id": "string",
+            "cluster": "string",
+            "tenancyName": "string",
+            "nodeType": "string",
+            "image": "string",
+            "privateIp": "string",
+            "publicIp": "string",
+            "provisionedHostname": "string",
+            "operationalStatus": "string",
+            "poweredOn": False,
+            "provisioningState": "string",
+        },
+    },
+    ("GET", "/api/v1/servers/virtual/GetServers"): {
+        "params": {"Cluster": "str"},
+        "json": {},
+        "required": [],
+        "example": {
+            "items": [
+                {
+                    "username": "string",
+                    "tenancyName": "string",
+                    "rpool": "string",
+                    "directAttachedStoragePersisted": False,
+                    "id": "string",
+                    "namespace": "string",
+                    "configuration": "string",
+                    "storage": 7,
+                    "gpuType": "string",
+                    "gpus": 7,
+                    "vcpus": 7,
+                    "memory": 7,
+                    "ip": "string",
+                    "privateIp": "string",
+                    "image": "string",
+                    "cluster": "string",
+                    "nodeSelector": "string",
+                    "status": "string",
+                    "storageType": "string",
+                    "rootDiskSize": "string",
+                    "lastUpdated": "string",
+                }
+            ]
+        },
+    },
+    ("GET", "/api/v1/servers/virtual/GetServer"): {
+        "params": {"Id": "str", "Namespace": "str", "Cluster": "str"},
+        "json": {},
+        "required": ["Id", "Namespace", "Cluster"],
+        "example": {
+            "username": "string",
+            "tenancyName": "string",
+            "rpool": "string",
+            "directAttachedStoragePersisted": False,
+            "id": "string",
+            "namespace": "string",
+            "configuration": "string",
+            "storage": 7,
+            "gpuType": "string",
+            "gpus": 7,
+            "vcpus": 7,
+            "memory": 7,
+            "ip": "string",
+            "privateIp": "string",
+            "image": "string",
+            "cluster": "string",
+            "nodeSelector": "string",
+            "status": "string",
+            "storageType": "string",
+            "rootDiskSize": "string",
+            "lastUpdated": "string",
+        },
+    },
+    ("POST", "/api/v1/servers/virtual/CreateServer"): {
+        "params": {},
+        "json": {
+            "name": "str",
+            "rpool": "str",
+            "vpc": "str",
+            "configuration": "str",
+            "cluster": "str",
+            "ssh_keys": "list",
+            "snapshotName": "str",
+            "operatingSystemImage": "str",
+            "personalStorageMountPath": "str",
+            "tenantSharedAdditionalStorage": "str",
+            "persistStorage": "bool",
+            "directStorageMountPath": "str",
+            "rootDiskSize": "int",
+            "selectedNode": "str",
+        },
+        "required": ["vpc", "configuration", "cluster", "ssh_keys"],
+        "example": {
+            "username": "string",
+            "tenancyName": "string",
+            "rpool": "string",
+            "directAttachedStoragePersisted": False,
+            "id": "string",
+            "namespace": "string",
+            "configuration": "string",
+            "storage": 7,
+            "gpuType": "string",
+            "gpus": 7,
+            "vcpus": 7,
+            "memory": 7,
+            "ip": "string",
+            "privateIp": "string",
+            "image": "string",
+            "cluster": "string",
+            "nodeSelector": "string",
+            "status": "string",
+            "storageType": "string",
+            "rootDiskSize": "string",
+            "lastUpdated": "string",
+        },
+    },
+    ("POST", "/api/v1/servers/virtual/StartServer"): {
+        "params": {},
+        "json": {"id": "str", "namespace": "str", "cluster": "str"},
+        "required": ["id", "namespace", "cluster"],
+        "example": {"id": "string", "cluster": "string", "status": "string"},
+    },
+    ("POST", "/api/v1/servers/virtual/StopServer"): {
+        "params": {},
+        "json": {"id": "str", "namespace": "str", "cluster": "str"},
+        "required": ["id", "namespace", "cluster"],
+        "example": {"id": "string", "cluster": "string", "status": "string"},
+    },
+    ("DELETE", "/api/v1/servers/virtual/DestroyServer"): {
+        "params": {
+            "DeleteSnapshots": "bool",
+            "Id": "str",
+            "Namespace": "str",
+            "Cluster": "str",
+        },
+        "json": {},
+        "required": ["Id", "Namespace", "Cluster"],
+        "example": {"id": "string", "cluster": "string", "status": "string"},
+    },
+    ("GET", "/api/v1/servers/virtual/GetConfigurations"): {
+        "params": {},
+        "json": {},
+        "required": [],
+        "example": {
+            "items": [
+                {
+                    "id": "string",
+                    "userFriendlyName": "string",
+                    "name": "string",
+                    "description": "string",
+                    "osVersion": "string",
+                    "osType": "string",
+                    "storage": 7,
+                    "gpuType": "string",
+                    "gpuFamily": "string",
+                    "gpuBrand": "string",
+                    "gpuName": "string",
+                    "type": "string",
+                    "brandFamily": "string",
+                    "brand": "string",
+                    "textName": "string",
+                    "gpus": 7,
+                    "vcpus": 7,
+                    "memory": 7,
+                    "price": "string",
+                    "computeNetwork": "string",
+                    "isGpuPlatform": "string",
+                    "clusters": "string",
+                }
+            ]
+        },
+    },
+    ("GET", "/api/v1/servers/virtual/GetAvailability"): {
+        "params": {"cluster": "str", "resourcePool": "str", "reportNodes": "bool"},
+        "json": {},
+        "required": ["cluster"],
+        "example": {"items": ["string"]},
+    },
+    ("GET", "/api/v1/vpcs/GetVpcs"): {
+        "params": {"cluster": "str"},
+        "json": {},
+        "required": [],
+        "example": {
+            "items": [
+                {
+                    "id": "string",
+                    "name": "string",
+                    "cluster": "string",
+                    "tenancyName": "string",
+                    "ipRange": "string",
+                    "createdAt": "string",
+                    "blockIntraVpcComms": False,
+                    "isDefault": False,
+                }
+            ]
+        },
+    },
+    ("GET", "/api/v1/vpcs/GetVpc"): {
+        "params": {"Id": "str", "Cluster": "str"},
+        "json": {},
+        "required": ["Id", "Cluster"],
+        "example": {
+            "id": "string",
+            "name": "string",
+            "cluster": "string",
+            "tenancyName": "string",
+            "ipRange": "string",
+            "createdAt": "string",
+            "blockIntraVpcComms": False,
+            "isDefault": False,
+        },
+    },
+    ("POST", "/api/v1/vpcs/CreateVpc"): {
+        "params": {},
+        "json": {
+            "name": "str",
+            "blockIntraVpcComms": "bool",
+            "isDefault": "bool",
+            "cluster": "str",
+        },
+        "required": ["name", "cluster"],
+        "example": {
+            "id": "string",
+            "name": "string",
+            "cluster": "string",
+            "tenancyName": "string",
+            "ipRange": "string",
+            "createdAt": "string",
+            "blockIntraVpcComms": False,
+            "isDefault": False,
+        },
+    },
+    ("DELETE", "/api/v1/vpcs/DestroyVpc"): {
+        "params": {"Id": "str", "Cluster": "str"},
+        "json": {},
+        "required": ["Id", "Cluster"],
+        "example": {
+            "id": "string",
+            "name": "string",
+            "cluster": "string",
+            "tenancyName": "string",
+            "ipRange": "string",
+            "createdAt": "string",
+            "blockIntraVpcComms": False,
+            "isDefault": False,
+        },
+    },
+    ("GET", "/api/v1/servers/snapshots/GetSnapshots"): {
+        "params": {"Cluster": "str"},
+        "json": {},
+        "required": [],
+        "example": {
+            "items": [
+                {
+                    "id": "string",
+                    "namespace": "string",
+                    "sourceName": "string",
+                    "osImage": "string",
+                    "customPackage": "string",
+                    "rootDiskSize": "string",
+                    "creationDate": "string",
+                    "username": "string",
+                    "tenancyName": "string",
+                    "readyToUse": False,
+                }
+            ]
+        },
+    },
+    ("GET", "/api/v1/servers/snapshots/GetSnapshot"): {
+        "params": {"Id": "str", "Namespace": "str", "Cluster": "str"},
+        "json": {},
+        "required": ["Id", "Namespace", "Cluster"],
+        "example": {
+            "id": "string",
+            "namespace": "string",
+            "sourceName": "string",
+            "osImage": "string",
+            "customPackage": "string",
+            "rootDiskSize": "string",
+            "creationDate": "string",
+            "username": "string",
+            "tenancyName": "string",
+            "readyToUse": False,
+        },
+    },
+    ("POST", "/api/v1/servers/snapshots/CreateSnapshot"): {
+        "params": {},
+        "json": {"name": "str", "namespace": "str", "cluster": "str", "sourceVMName": "str"},
+        "required": ["namespace", "cluster"],
+        "example": {
+            "id": "string",
+            "namespace": "string",
+            "sourceName": "string",
+            "osImage": "string",
+            "customPackage": "string",
+            "rootDiskSize": "string",
+            "creationDate": "string",
+            "username": "string",
+            "tenancyName": "string",
+            "readyToUse": False,
+        },
+    },
+    ("DELETE", "/api/v1/servers/snapshots/DeleteSnapshot"): {
+        "params": {"Id": "str", "Namespace": "str", "Cluster": "str"},
+        "json": {},
+        "required": ["Id", "Namespace", "Cluster"],
+        "example": {"id": "string"},
+    },
+}
+
+TYPES: dict[str, Any] = {
+    "str": str,
+    "bool": bool,
+    "int": int,
+    "list": list,
+    "dict": dict,
+    "Any": object,
+}
+
+# The encoded success response for each endpoint
+RESPONSES = {
+    k: json.dumps(
+        {"result": v["example"], "success": True, "error": None, "unAuthorizedRequest": False},
+        separators=(",", ":"),
+    ).encode()
+    for k, v in ENDPOINTS.items()
+}
+
+
+def check(endpoint: dict, params: dict, body: Any):
+    """
+    Raise a `400` `ApiError` if the query `params` or JSON `body` don't match the `endpoint` spec.
+    """
+    for name, value in params.items():
+        typ = endpoint["params"].get(name)
+        if typ is None:
+            raise ApiError(400, f"Unknown parameter {name}.")
+        if typ == "int" and not value.lstrip("-").isdigit():
+            raise ApiError(400, f"The value '{value}' is not valid for {name}.")
+        if typ == "bool" and value not in ("true", "false"):
+            raise ApiError(400, f"The value '{value}' is not valid for {name}.")
+
+    if body is not None and not isinstance(body, dict):
+        raise ApiError(400, "The request body must be a JSON object.")
+    for name, value in (body or {}).items():
+        typ = endpoint["json"].get(name)
+        if typ is None:
+            raise ApiError(400, f"Unknown property {name}.")
+        if value is not None and (
+            not isinstance(value, TYPES[typ]) or (typ == "int" and isinstance(value, bool))
+        ):
+            raise ApiError(400, f"The JSON value for {name} must be of type {typ}.")
+
+    for name in endpoint["required"]:
+        if params.get(name) in (None, "") and (body or {}).get(name) is None:
+            raise ApiError(400, f"The {name} field is required.")
+
+
+class MockServer(FakeServer):
+    """
+    MockServer(latency=0.0, error_rate=0.0, rate_limit=0, users=None, api_keys=None, token_ttl=3600, seed=None)
+
+    A `FakeServer` which serves the spec example for each endpoint rather than keeping any state.
+    Auth, latency, error rates, rate limits and transports (HTTP or in process) work the same way.
+
+    Example:
+
+        with MockServer() as server:
+            client = virtual.Client(server.session())
+            client.get_server(id="vm-1", namespace="denvr", cluster="Msc1")
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(None, **kwargs)
+
+    def route(self, method: str, path: str, params: dict, body: Any) -> Any:
+        endpoint = ENDPOINTS.get((method, path))
+        if endpoint is None:
+            raise ApiError(*no_route(method, path, ENDPOINTS))
+
+        check(endpoint, params, body)
+        return RESPONSES[(method, path)]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m denvr.testing.mock", description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds per response")
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="Fraction of requests failing with 503"
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    server = MockServer(latency=args.latency, error_rate=args.error_rate)
+    server.start(args.host, args.port)
+    try:
+        server.thread.join()  # type: ignore[union-attr]
+    except KeyboardInterrupt:
+        server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
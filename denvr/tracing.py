@@ -0,0 +1,332 @@
+from __future__ import annotations
+
+import contextvars
+import json
+import os
+import threading
+import time
+
+from typing import Callable
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+# The innermost active span of the current thread (or task)
+_current: contextvars.ContextVar[Span | None] = contextvars.ContextVar(
+    "denvr_span", default=None
+)
+
+# When the last connection of the current thread (or task) was established, in nanoseconds since the epoch
+_connected: contextvars.ContextVar[int] = contextvars.ContextVar("denvr_connected", default=0)
+
+# The global tracer, or `None` when tracing is disabled
+_tracer: Tracer | None = None
+
+
+class Span:
+    """
+    A timed operation, following the OpenTelemetry span data model.
+
+    Attributes:
+        name (str): The operation (e.g., "denvr.request").
+        trace_id (str): 32 hex digits shared by all spans in a trace.
+        span_id (str): 16 hex digits.
+        parent_id (str): The parent span's `span_id` or `None` for root spans.
+        kind (str): "CLIENT" for HTTP requests, otherwise "INTERNAL".
+        start (int): Start time in nanoseconds since the epoch.
+        end (int): End time in nanoseconds since the epoch, or `None` while the span is active.
+        attributes (dict): Attribute values (e.g., `{"http.status_code": 200}`).
+        events (list): Timestamped events (e.g., exceptions).
+        status (str): "UNSET", "OK" or "ERROR".
+    """
+
+    __slots__ = (
+        "name",
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "kind",
+        "start",
+        "end",
+        "attributes",
+        "events",
+        "status",
+        "message",
+        "_clock",
+        "_token",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        parent: Span | None = None,
+        kind: str = "INTERNAL",
+        attributes: dict | None = None,
+    ):
+        self.name = name
+        self.trace_id: str = parent.trace_id if parent else os.urandom(16).hex()
+        self.span_id: str = os.urandom(8).hex()
+        self.parent_id: str | None = parent.span_id if parent else None
+        self.kind = kind
+        self.start = time.time_ns()
+        self.end: int | None = None
+        self.attributes = attributes or {}
+        self.events: list[dict] = []
+        self.status = "UNSET"
+        self.message = ""
+        # Durations are measured with a monotonic clock relative to the start time
+        self._clock = time.perf_counter_ns()
+        self._token: contextvars.Token | None = None
+
+    @property
+    def duration(self) -> float:
+        """
+        The span duration in seconds.
+        """
+        end = self.end if self.end is not None else self.now()
+        return (end - self.start) / 1e9
+
+    def now(self) -> int:
+        return self.start + time.perf_counter_ns() - self._clock
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def event(self, name: str, **attributes):
+        self.events.append({"name": name, "time": self.now(), "attributes": attributes})
+
+    def error(self, error: BaseException):
+        self.status = "ERROR"
+        self.message = str(error)
+        self.event(
+            "exception",
+            **{"exception.type": type(error).__name__, "exception.message": str(error)},
+        )
+
+    def to_dict(self) -> dict:
+        """
+        A JSON serializable dict using the OTLP/JSON field names.
+        """
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id,
+            "name": self.name,
+            "kind": f"SPAN_KIND_{self.kind}",
+            "startTimeUnixNano": self.start,
+            "endTimeUnixNano": self.end,
+            "attributes": self.attributes,
+            "events": [
+                {"name": e["name"], "timeUnixNano": e["time"], "attributes": e["attributes"]}
+                for e in self.events
+            ],
+            "status": {"code": f"STATUS_CODE_{self.status}", "message": self.message},
+        }
+
+    def __enter__(self) -> Span:
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc is not None:
+            self.error(exc)
+        self.end = self.now()
+        if self._token is not None:
+            _current.reset(self._token)
+            self._token = None
+        if _tracer is not None:
+            _tracer.export(self)
+
+    def __repr__(self) -> str:
+        return f"Span(name={self.name!r}, duration={self.duration:.6f}, status={self.status})"
+
+
+class _NoopSpan:
+    """
+    Returned by `span` when tracing is disabled, so instrumented code doesn't need to check.
+    """
+
+    __slots__ = ()
+
+    def set(self, **attributes):
+        pass
+
+    def event(self, name: str, **attributes):
+        pass
+
+    def __enter__(self) -> _NoopSpan:
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        pass
+
+
+NOOP = _NoopSpan()
+
+
+class JsonlExporter:
+    """
+    JsonlExporter(path)
+
+    Appends each finished span to a local file as a line of JSON (e.g., for `jq` or loading into
+    a trace viewer), so no collector is required.
+    """
+
+    def __init__(self, path: str):
+        self.path = os.path.expanduser(path)
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._file = open(self.path, "a", buffering=1, encoding="utf-8")  # noqa: SIM115
+
+    def __call__(self, span: Span):
+        line = json.dumps(span.to_dict(), separators=(",", ":"), default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class Tracer:
+    """
+    Tracer(exporter, resource=None)
+
+    Passes each finished span to an `exporter` callable (e.g., `JsonlExporter(path)` or `list.append`).
+
+    Args:
+        exporter (callable): Called with each finished `Span`.
+        resource (dict): Attributes added to every root span (e.g., `{"service.name": "my-job"}`).
+    """
+
+    def __init__(self, exporter: Callable[[Span], None], resource: dict | None = None):
+        self.exporter = exporter
+        self.resource = {"service.name": "denvr", **(resource or {})}
+
+    def span(self, name: str, kind: str = "INTERNAL", /, **attributes) -> Span:
+        parent = _current.get()
+        if parent is None:
+            attributes = {**self.resource, **attributes}
+        return Span(name, parent, kind, attributes)
+
+    def record(self, name: str, start: int, end: int, **attributes) -> Span:
+        """
+        Export a span for an operation which has already finished (e.g., measured by another library),
+        as a child of the current span. `start` and `end` are nanoseconds since the epoch.
+        """
+        span = self.span(name, **attributes)
+        span.start = start
+        span.end = end
+        self.export(span)
+        return span
+
+    def export(self, span: Span):
+        self.exporter(span)
+
+
+def enable(exporter: Callable[[Span], None], resource: dict | None = None) -> Tracer:
+    """
+    Enable tracing for all sessions, passing finished spans to `exporter`.
+
+    Example:
+
+        tracing.enable(tracing.JsonlExporter("~/denvr-trace.jsonl"))
+    """
+    global _tracer
+    _tracer = Tracer(exporter, resource)
+    return _tracer
+
+
+def disable():
+    global _tracer
+    _tracer = None
+
+
+def tracer() -> Tracer | None:
+    return _tracer
+
+
+def current() -> Span | None:
+    """
+    The active span or `None`.
+    """
+    return _current.get()
+
+
+def span(name: str, kind: str = "INTERNAL", /, **attributes):
+    """
+    A context manager for a new span, which is a child of the active span (if any).
+    This is a no-op when tracing is disabled.
+
+    Example:
+
+        with tracing.span("provision", cluster="Msc1") as s:
+            ...
+            s.set(servers=3)
+    """
+    if _tracer is None:
+        return NOOP
+    return _tracer.span(name, kind, **attributes)
+
+
+def record(name: str, start: int, end: int, **attributes):
+    if _tracer is not None:
+        _tracer.record(name, start, end, **attributes)
+
+
+def event(name: str, **attributes):
+    """
+    Add an event to the active span (if any).
+    """
+    span = _current.get()
+    if span is not None and _tracer is not None:
+        span.event(name, **attributes)
+
+
+def response_hook(resp, *args, **kwargs):
+    """
+    A `requests` response hook which records a "denvr.server" span from when the request was sent
+    (after any new connection was established) until the response headers were received.
+    """
+    if _tracer is None:
+        return
+
+    end = time.time_ns()
+    start = max(end - int(resp.elapsed.total_seconds() * 1e9), _connected.get())
+    record("denvr.server", start, end, **{"http.status_code": resp.status_code})
+
+
+class TracedHTTPConnection(HTTPConnection):
+    def connect(self):
+        with span("denvr.connect", **{"net.peer.name": self.host, "net.peer.port": self.port}):
+            super().connect()
+        _connected.set(time.time_ns())
+
+
+class TracedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        with span("denvr.connect", **{"net.peer.name": self.host, "net.peer.port": self.port}):
+            super().connect()
+        _connected.set(time.time_ns())
+
+
+class TracedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TracedHTTPConnection
+
+
+class TracedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TracedHTTPSConnection
+
+
+class TracingAdapter(HTTPAdapter):
+    """
+    An `HTTPAdapter` which adds a "denvr.connect" span for each new connection (including TLS setup).
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": TracedHTTPConnectionPool,
+            "https": TracedHTTPSConnectionPool,
+        }
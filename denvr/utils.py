@@ -1,12 +1,18 @@
+import codecs
+import json
 import logging
 import typing
 
+from functools import lru_cache
+from json.decoder import scanstring  # type: ignore[attr-defined]
 from urllib3.util.retry import Retry
 from requests import JSONDecodeError, HTTPError, Response
 
 logger = logging.getLogger(__name__)
 
 
+# Response keys are drawn from a small fixed set, so caching avoids re-converting the same keys for every item.
+@lru_cache(maxsize=4096)
 def snakecase(text: str) -> str:
     """
     Convert camelcase and titlecase strings to snakecase.
@@ -20,6 +26,90 @@ def snakecase(text: str) -> str:
     return "".join(["_" + i.lower() if i.isupper() else i for i in text]).lstrip("_")
 
 
+def camelcase(text: str) -> str:
+    """
+    Convert snakecase strings to camelcase.
+
+    Args:
+        str (str): The string to convert.
+
+    Returns:
+        str: The converted string.
+    """
+    first, *rest = text.split("_")
+    return first + "".join(part.title() for part in rest)
+
+
+# Categorical fields which repeat across the items of large list responses (e.g., `get_servers`).
+# We include the camelcase variants since nested items aren't standardized to snakecase.
+INTERNED_FIELDS = frozenset(
+    name
+    for field in [
+        "cluster",
+        "status",
+        "gpu_type",
+        "rpool",
+        "tenancy_name",
+        "namespace",
+        "image",
+        "configuration",
+        "node_selector",
+        "storage_type",
+        "username",
+        "tenant",
+        "created_by",
+        "resource_pool",
+        "hardware_package_name",
+        "application_catalog_item_name",
+        "application_catalog_item_version_name",
+        "node_type",
+        "operational_status",
+        "provisioning_state",
+        "os_image",
+    ]
+    for name in (field, camelcase(field))
+)
+
+
+class Interner:
+    """
+    Interner(maxsize=10000)
+
+    A bounded string intern table, so that equal strings can share a single object.
+    Once the table is full new strings are returned as is, but existing entries are still shared.
+    """
+
+    def __init__(self, maxsize: int = 10000):
+        self.maxsize = maxsize
+        self.table: typing.Dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def __call__(self, value: str) -> str:
+        try:
+            return self.table[value]
+        except KeyError:
+            if len(self.table) < self.maxsize:
+                self.table[value] = value
+            return value
+
+    def fields(self, obj: dict, fields: typing.AbstractSet[str] = INTERNED_FIELDS) -> dict:
+        """
+        Intern the string values of `fields` in a dict and any dicts in its list values (e.g., `items`).
+        The dict is modified in place and returned.
+        """
+        for k, v in obj.items():
+            if isinstance(v, list):
+                for item in v:
+                    if isinstance(item, dict):
+                        self.fields(item, fields)
+            elif k in fields and type(v) is str:
+                obj[k] = self(v)
+
+        return obj
+
+
 # We'll disable mypy for this function since we're largely trying to match the requests code.
 @typing.no_type_check
 def raise_for_status(resp: Response):
@@ -69,10 +159,36 @@ def raise_for_status(resp: Response):
         raise HTTPError(msg, response=resp)
 
 
-def retry(retries: int = 3, idempotent_only: bool = True):
+class ObservedRetry(Retry):
+    """
+    A `Retry` which calls `on_retry(method, url, response, error)` before each retry (excluding redirects).
+    """
+
+    def __init__(self, *args, on_retry: typing.Optional[typing.Callable] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.on_retry = on_retry
+
+    def new(self, **kw):
+        new = super().new(**kw)
+        new.on_retry = self.on_retry
+        return new
+
+    def increment(self, method=None, url=None, response=None, error=None, *args, **kwargs):
+        new = super().increment(method, url, response, error, *args, **kwargs)
+        if self.on_retry is not None and not (response and response.get_redirect_location()):
+            self.on_retry(method, url, response, error)
+        return new
+
+
+def retry(
+    retries: int = 3, idempotent_only: bool = True, on_retry=None, backoff_factor: float = 1
+):
     """
     Generates a reasonable default Retry object for use with the requests library
     given a total number of retries.
+    An optional `on_retry(method, url, response, error)` callback is called before each retry.
+    Consecutive retries sleep for `backoff_factor * 2 ** (retry - 1)` seconds (after the first,
+    unless the response has a `Retry-After` header).
 
     NOTES:
         - by default only retry on idempotent requests (including DELETE and PUT)
@@ -85,13 +201,103 @@ def retry(retries: int = 3, idempotent_only: bool = True):
     if not idempotent_only:
         allowed_methods.extend(["POST", "PATCH"])
 
-    return Retry(
+    return ObservedRetry(
         total=retries,
-        backoff_factor=1,
+        backoff_factor=backoff_factor,
         status_forcelist=[429, 500, 502, 503, 504],
         allowed_methods=allowed_methods,
         respect_retry_after_header=True,
         remove_headers_on_redirect=["Authorization"],
         raise_on_redirect=False,
         raise_on_status=False,
+        on_retry=on_retry,
     )
+
+
+def iter_items(chunks: typing.Iterable[bytes], key: str = "items") -> typing.Iterator:
+    """
+    Incrementally yield the elements of the first `key` array found in a streamed JSON document.
+
+    Only the unparsed remainder of the current chunk is buffered, so memory use is bounded by the
+    largest element rather than the full document.
+
+    Args:
+        chunks (Iterable[bytes]): UTF-8 encoded chunks of the JSON document (e.g., `resp.iter_content()`).
+        key (str): The name of the array to extract elements from.
+
+    Returns:
+        An iterator over the decoded array elements.
+        Nothing is yielded if the document doesn't contain `key`.
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder("utf-8")()
+    chunks = iter(chunks)
+    buf = ""
+    i = 0
+
+    def refill() -> bool:
+        # Drop everything we've already consumed and append the next chunk.
+        nonlocal buf, i
+        for chunk in chunks:
+            buf = buf[i:] + text.decode(chunk)
+            i = 0
+            return True
+        return False
+
+    # Scan for `"<key>": [` while skipping over the contents of any other strings.
+    last = None
+    found = False
+    while True:
+        if i >= len(buf) and not refill():
+            return
+
+        c = buf[i]
+        if c in " \t\r\n":
+            i += 1
+            continue
+
+        if found:
+            if c == "[":
+                i += 1
+                break
+            found = False
+
+        if c == '"':
+            try:
+                last, i = scanstring(buf, i + 1)
+            except json.JSONDecodeError:
+                # The string spans multiple chunks
+                if not refill():
+                    raise
+            continue
+
+        found = c == ":" and last == key
+        last = None
+        i += 1
+
+    # Decode each array element as soon as it's complete
+    while True:
+        if i >= len(buf) and not refill():
+            raise json.JSONDecodeError(f"Unterminated {key} array", buf, i)
+
+        c = buf[i]
+        if c in " \t\r\n,":
+            i += 1
+            continue
+
+        if c == "]":
+            return
+
+        try:
+            item, end = decoder.raw_decode(buf, i)
+        except json.JSONDecodeError:
+            if not refill():
+                raise
+            continue
+
+        # Scalars (e.g., numbers) could continue in the next chunk so we retry once more data is available.
+        if end == len(buf) and refill():
+            continue
+
+        i = end
+        yield item
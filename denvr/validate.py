@@ -3,6 +3,8 @@ import logging
 
 from typing import Dict
 
+from denvr import profiling
+
 logger = logging.getLogger(__name__)
 
 
@@ -10,6 +12,11 @@ def validate_kwargs(method, path, kwargs, required):
     """
     For `None` values in `kwargs` error if they are in `required` or drop them.
     """
+    with profiling.phase("validate_kwargs"):
+        return _validate_kwargs(method, path, kwargs, required)
+
+
+def _validate_kwargs(method, path, kwargs, required):
     result: Dict[str, Dict] = {}
     for kw, args in kwargs.items():
         result[kw] = {}
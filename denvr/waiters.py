@@ -2,6 +2,8 @@ import time
 
 from typing import Tuple, Callable, Union
 
+from denvr import tracing
+
 
 class Waiter:
     """
@@ -23,27 +25,40 @@ class Waiter:
         self.cleanup = cleanup
 
     def __call__(self, interval=30, timeout=600, **kwargs):
-        resp = self.action(**kwargs)
-        try:
-            return self.wait(resp, interval, timeout)
-        except Exception as e:
-            if self.cleanup:
-                self.cleanup(resp)
-            raise e
+        name = getattr(self.action, "__name__", "action")
+        with tracing.span("denvr.waiter", **{"waiter.action": name}):
+            resp = self.action(**kwargs)
+            target = resp
+            if hasattr(resp, "keys"):
+                # Some responses (dicts or records) omit identifiers from the request
+                # (e.g., `stop_server` has no namespace)
+                target = {**kwargs, **{k: v for k, v in resp.items() if v is not None}}
+            try:
+                return self.wait(target, interval, timeout)
+            except Exception as e:
+                if self.cleanup:
+                    self.cleanup(target)
+                raise e
 
     def wait(self, resp, interval=30, timeout=600):
         start_time = time.time()
 
         # Loop until check succeeds or timeout occurs
-        while True:
-            passes, result = self.check(resp)
-            if passes:
-                return result
-
-            if time.time() - start_time > timeout:
-                raise TimeoutError("Wait operation timed out")
-
-            time.sleep(interval)
+        with tracing.span("denvr.waiter.wait") as span:
+            attempt = 0
+            while True:
+                attempt += 1
+                span.set(**{"waiter.attempts": attempt})
+                with tracing.span("denvr.waiter.check", **{"waiter.attempt": attempt}):
+                    passes, result = self.check(resp)
+                if passes:
+                    return result
+
+                if time.time() - start_time > timeout:
+                    raise TimeoutError("Wait operation timed out")
+
+                with tracing.span("denvr.waiter.sleep", **{"waiter.interval": interval}):
+                    time.sleep(interval)
 
 
 def waiter(operation: Callable) -> Waiter:
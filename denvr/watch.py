@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+from typing import Any, Callable, Iterable, Iterator
+
+from denvr.inventory import Index, Key
+
+logger = logging.getLogger(__name__)
+
+ADDED = "ADDED"
+MODIFIED = "MODIFIED"
+DELETED = "DELETED"
+
+
+class Event:
+    """
+    A change to a watched item.
+
+    Attributes:
+        type (str): One of "ADDED", "MODIFIED" or "DELETED".
+        key (tuple): The item's (cluster, namespace, id).
+        item: The current item, or the last seen item for "DELETED" events (`None` if the item was
+            deleted before it was seen by this process, e.g., after resuming from a checkpoint).
+    """
+
+    __slots__ = ("type", "key", "item")
+
+    def __init__(self, type: str, key: Key, item: Any):
+        self.type = type
+        self.key = key
+        self.item = item
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Event):
+            return NotImplemented
+        return (self.type, self.key, self.item) == (other.type, other.key, other.item)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"Event(type={self.type!r}, key={self.key!r})"
+
+
+def fingerprint(item) -> str:
+    """
+    A content hash of an item (e.g., a `dict` or `Record`), independent of key order.
+    """
+    if hasattr(item, "to_dict"):
+        item = item.to_dict()
+    content = json.dumps(item, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(content.encode(), digest_size=16).hexdigest()
+
+
+class Watcher:
+    """
+    Watcher(list_items, interval=5, max_interval=60, backoff=1.5, checkpoint=None)
+
+    Polls a list operation (e.g., `virtual.iter_servers`) and emits only the "ADDED", "MODIFIED" and
+    "DELETED" events between polls.
+
+    Items whose `last_updated` field hasn't changed since the last poll are skipped without hashing,
+    otherwise changes are detected by comparing content hashes.
+    The poll interval starts at `interval`, grows by `backoff` after each poll without changes
+    (up to `max_interval`) and resets once changes are seen again.
+
+    If a `checkpoint` path is provided the hashes are saved after each poll with changes, so a
+    restarted watcher resumes from where it left off rather than reporting every item as "ADDED".
+
+    Example:
+
+        for event in watch_servers(virtual, cluster="Hou1", checkpoint="servers.json"):
+            if event.type == "MODIFIED" and event.item["status"] == "ONLINE":
+                ...
+
+    Args:
+        list_items (callable): Returns the current items (or a list response with `items`).
+        interval (float): The minimum seconds between polls.
+        max_interval (float): The maximum seconds between polls.
+        backoff (float): The multiplier applied to the interval after a poll without changes.
+        checkpoint (str): An optional path to save and resume the watch state from.
+    """
+
+    def __init__(
+        self,
+        list_items: Callable[[], Any],
+        interval: float = 5,
+        max_interval: float = 60,
+        backoff: float = 1.5,
+        checkpoint: str | None = None,
+    ):
+        self.list_items = list_items
+        self.min_interval = interval
+        self.max_interval = max(interval, max_interval)
+        self.backoff = backoff
+        self.interval = interval
+        self.checkpoint = checkpoint
+
+        self.hashes: dict[Key, str] = {}
+        self.last_updated: dict[Key, Any] = {}
+        self.items: dict[Key, Any] = {}
+        if checkpoint and os.path.exists(checkpoint):
+            self.load(checkpoint)
+
+    def poll(self) -> list[Event]:
+        """
+        List the items once and return the events since the last poll.
+        """
+        result = self.list_items()
+        items: Iterable = result
+        if hasattr(result, "get") and not isinstance(result, list):
+            items = result.get("items", [])
+
+        # Build the new state before replacing the old one, so a list which fails partway
+        # (e.g., a dropped stream) doesn't lose its events
+        events = []
+        hashes: dict[Key, str] = {}
+        last_updated: dict[Key, Any] = {}
+        current: dict[Key, Any] = {}
+        for item in items:
+            key = Index.key(item)
+            updated = item.get("last_updated")
+            previous = self.hashes.get(key)
+            current[key] = item
+            last_updated[key] = updated
+            if (
+                previous is not None
+                and updated is not None
+                and updated == self.last_updated.get(key)
+            ):
+                hashes[key] = previous
+                continue
+
+            digest = fingerprint(item)
+            if previous != digest:
+                events.append(Event(ADDED if previous is None else MODIFIED, key, item))
+            hashes[key] = digest
+
+        for key in self.hashes:
+            if key not in hashes:
+                events.append(Event(DELETED, key, self.items.get(key)))
+
+        self.hashes = hashes
+        self.last_updated = last_updated
+        self.items = current
+
+        logger.debug("Watch poll found %d events", len(events))
+        if events:
+            self.interval = self.min_interval
+            if self.checkpoint:
+                self.save(self.checkpoint)
+        else:
+            self.interval = min(self.interval * self.backoff, self.max_interval)
+
+        return events
+
+    def __iter__(self) -> Iterator[Event]:
+        """
+        Poll indefinitely, yielding each event and sleeping for the adaptive interval between polls.
+        Errors from the list operation are raised, and the watch can be resumed from its checkpoint.
+        """
+        while True:
+            yield from self.poll()
+            time.sleep(self.interval)
+
+    def run(self, callback: Callable[[Event], Any], stop: threading.Event | None = None):
+        """
+        Call `callback` with each event until `stop` is set.
+        """
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            for event in self.poll():
+                callback(event)
+            stop.wait(self.interval)
+
+    def save(self, path: str):
+        """
+        Atomically write the current watch state to `path`.
+        """
+        state = {
+            "items": [[list(k), h, self.last_updated.get(k)] for k, h in self.hashes.items()]
+        }
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as fobj:
+            json.dump(state, fobj)
+        os.replace(tmp, path)
+
+    def load(self, path: str):
+        """
+        Resume from the watch state saved at `path`.
+        """
+        with open(path) as fobj:
+            state = json.load(fobj)
+
+        for (cluster, namespace, id), digest, updated in state["items"]:
+            self.hashes[(cluster, namespace, id)] = digest
+            self.last_updated[(cluster, namespace, id)] = updated
+
+
+def watch_servers(client, cluster: str | None = None, **kwargs) -> Watcher:
+    """
+    Watch the virtual machines in a cluster using `iter_servers`.
+
+    Args:
+        client: A `servers/virtual` Client.
+        cluster (str): The cluster to watch.
+        **kwargs: Any `Watcher` options (e.g., `interval`, `checkpoint`).
+    """
+    return Watcher(lambda: client.iter_servers(cluster=cluster), **kwargs)
+
+
+def watch_applications(client, **kwargs) -> Watcher:
+    """
+    Watch the applications using `iter_applications`.
+
+    Args:
+        client: A `servers/applications` Client.
+        **kwargs: Any `Watcher` options (e.g., `interval`, `checkpoint`).
+    """
+    return Watcher(client.iter_applications, **kwargs)
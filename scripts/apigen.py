@@ -36,7 +36,9 @@ API_SPEC_PATH = "./swagger.json"
 
 # Add the denvr module to our search path, so we can load a few utility functions from it.
 sys.path.append(DENVR_PATH)
+sys.path.append(os.path.dirname(DENVR_PATH))
 from utils import snakecase  # noqa: E402
+from denvr.records import slotname  # noqa: E402
 
 # Paths to include in our SDK to identify breaking changes,
 # but supporting feature gating.
@@ -78,6 +80,16 @@ INCLUDED_PATHS = [
     "/api/v1/servers/snapshots/DeleteSnapshot",
 ]
 
+# List paths which should also get an `iter_*` method that streams the response `items`
+# rather than loading the full response into memory.
+STREAMED_PATHS = [
+    "/api/v1/servers/applications/GetApplications",
+    "/api/v1/servers/metal/GetHosts",
+    "/api/v1/servers/virtual/GetServers",
+    "/api/v1/vpcs/GetVpcs",
+    "/api/v1/servers/snapshots/GetSnapshots",
+]
+
 TYPE_MAP = {
     "string": "str",
     "boolean": "bool",
@@ -304,6 +316,118 @@ def extract_schema_examples(schema: dict, seed=1234) -> Any:
         return None
 
 
+def mock_endpoint(path: str, http_method: str, path_vals: dict) -> dict:
+    """
+    Collect the parameter types, required names and example response for a path,
+    which `denvr.testing.mock` uses to validate requests and respond.
+
+    Args:
+        path (str): The API path (e.g., `/api/v1/servers/virtual/GetServer`).
+        http_method (str): The lowercase HTTP method from the spec.
+        path_vals (dict): The spec entry for the path and method.
+
+    Returns:
+        A dict of the request spec and example response to render in the mock template.
+
+    NOTE: We assume that the spec has already been flattened.
+    """
+    parameters = path_vals.get("parameters", [])
+    params = {p["name"]: TYPE_MAP[p["schema"]["type"]] for p in parameters}
+    required = [p["name"] for p in parameters if p.get("required", False)]
+
+    body = {}
+    if "requestBody" in path_vals:
+        schema = path_vals["requestBody"]["content"]["application/json"]["schema"]
+        body = {k: TYPE_MAP[v.get("type", "any")] for k, v in schema["properties"].items()}
+        required.extend(schema.get("required", []))
+
+    success = next(v for k, v in path_vals["responses"].items() if "200" <= k < "300")
+    return {
+        "method": http_method.upper(),
+        "path": path,
+        "params": params,
+        "json": body,
+        "required": required,
+        "example": extract_schema_examples(success["content"]["application/json"]["schema"]),
+    }
+
+
+def command_group(module: str) -> str:
+    """
+    The CLI command group for a module path (e.g., `/api/v1/servers/virtual` -> "servers virtual").
+    """
+    return " ".join(module.split("/")[3:])
+
+
+def command(method: dict) -> dict:
+    """
+    The `denvr` CLI command for a client method (e.g., `get_servers` -> `get-servers`),
+    which `denvr.cli` uses to build its parser without importing the client modules.
+
+    Args:
+        method (dict): The method context rendered in the client template.
+
+    Returns:
+        A dict of the command metadata to render in the commands template.
+    """
+    module = method["path"].split("/")[3:-1]
+    return {
+        "name": method["name"].replace("_", "-"),
+        "module": ".".join(module),
+        "method": method["name"],
+        "stream": method["stream"],
+        "help": method["description"],
+        "args": [
+            {**arg, "required": arg.get("required", arg["param"] in method["required"])}
+            for arg in method["params"] + method["json"]
+        ],
+    }
+
+
+def records(name: str, schema: dict, source: str, suffix: str = "") -> list[dict]:
+    """
+    Collect the slotted record definitions for an object schema, including any
+    arrays of objects it contains (e.g., `items`).
+
+    Args:
+        name (str): The base record name (e.g., `GetServers`).
+        schema (dict): The flattened object schema.
+        source (str): What the record represents for the docstring (e.g., "the `get_servers` response").
+        suffix (str): An optional suffix for the record name (e.g., `Result`).
+
+    Returns:
+        A list of record definitions where nested records come before the records that reference them.
+
+    NOTE: We assume that the spec has already been flattened.
+    """
+    results = []
+    nested = {}
+    for prop, val in schema.get("properties", {}).items():
+        items = val.get("items", {})
+        if (
+            val.get("type") == "array"
+            and items.get("type") == "object"
+            and "properties" in items
+        ):
+            singular = prop[0].upper() + prop[1:].removesuffix("s")
+            results.extend(
+                records(
+                    f"{name}{singular}", items, f"each of the `{snakecase(prop)}` in {source}"
+                )
+            )
+            nested[snakecase(prop)] = results[-1]["name"]
+
+    results.append(
+        {
+            "name": f"{name}{suffix}",
+            "description": f"Record for {source}.",
+            "fields": [slotname(snakecase(prop)) for prop in schema.get("properties", {})],
+            "nested": nested,
+        }
+    )
+    return results
+
+
 def splitpaths(paths: list[str]) -> defaultdict[str, list]:
     """
     Split a list of paths into modules and methods.
@@ -364,14 +488,19 @@ def generate(included=INCLUDED_PATHS):
         trim_blocks=True,
         lstrip_blocks=True,
     )
-    template_env.filters["quotify"] = (
-        lambda val: "'{}'".format(val) if isinstance(val, str) else val
+    template_env.filters["quotify"] = lambda val: (
+        "'{}'".format(val) if isinstance(val, str) else val
     )
+    template_env.filters["pyrepr"] = repr
     client_template = template_env.get_template("client.py.jinja2")
     test_template = template_env.get_template("test_client.py.jinja2")
+    mock_template = template_env.get_template("mock.py.jinja2")
+    commands_template = template_env.get_template("commands.py.jinja2")
 
     api = flatten(filter(fetchapi(), included))
     paths = api["paths"]
+    endpoints = []
+    groups = defaultdict(list)
 
     # Start generating each new module
     for module, methods in splitpaths(list(paths.keys())).items():
@@ -415,6 +544,7 @@ def generate(included=INCLUDED_PATHS):
             method["params"] = []
             method["json"] = []
             method["rprops"] = []
+            method["records"] = []
             method["required"] = []
             method["example"] = {}
 
@@ -466,6 +596,9 @@ def generate(included=INCLUDED_PATHS):
             assert "type" in schema
             if schema["type"] == "object":
                 method["rtype"] = "dict"
+                method["records"] = records(
+                    methodname, schema, f"the `{method['name']}` response", suffix="Result"
+                )
                 for name, val in schema["properties"].items():
                     logger.debug("%s : %s", name, val)
                     method["rprops"].append(
@@ -478,8 +611,19 @@ def generate(included=INCLUDED_PATHS):
             elif schema["type"] == "array":
                 method["rtype"] = "list"
 
+            # Streamed paths get an extra `iter_*` method (e.g., `get_servers` -> `iter_servers`)
+            method["stream"] = None
+            if method_path in STREAMED_PATHS:
+                assert http_method == "get"
+                assert any(
+                    p["name"] == "items" and p["type"] == "list" for p in method["rprops"]
+                )
+                method["stream"] = "iter_" + method["name"].removeprefix("get_")
+
             # Add our method to
             context["methods"].append(method)
+            endpoints.append(mock_endpoint(method_path, http_method, path_vals))
+            groups[command_group(module)].append(command(method))
 
         content = client_template.render(context)
         with open(modpath, "w") as fobj:
@@ -489,6 +633,16 @@ def generate(included=INCLUDED_PATHS):
         with open(testspath, "w") as fobj:
             fobj.write(content)
 
+    # Generate the CLI metadata for every method
+    content = commands_template.render({"groups": groups})
+    with open(os.path.join(DENVR_PATH, "commands.py"), "w") as fobj:
+        fobj.write(content)
+
+    # Generate the spec driven mock server for every path
+    content = mock_template.render({"endpoints": endpoints})
+    with open(os.path.join(DENVR_PATH, "testing", "mock.py"), "w") as fobj:
+        fobj.write(content)
+
 
 if __name__ == "__main__":
     generate()
@@ -76,6 +76,52 @@ def test_get_snapshots_mockserver(mock_config):
     # TODO: Test return type once we add support for that in our genapi script.
 
 
+def test_iter_snapshots():
+    """
+    Unit test default input/output behaviour when mocking the internal Session object.
+    """
+    config = Config(defaults={}, auth=None)
+
+    session = Mock()
+    session.config = config
+    client = Client(session)
+
+    client_kwargs: Dict[str, Any] = {"cluster": "Cluster"}
+
+    request_kwargs = validate_kwargs(
+        "get", "/api/v1/servers/snapshots/GetSnapshots", {"params": {"Cluster": "Cluster"}}, {}
+    )
+
+    client.iter_snapshots(**client_kwargs)
+
+    session.stream.assert_called_with(
+        "get", "/api/v1/servers/snapshots/GetSnapshots", **request_kwargs
+    )
+
+
+def test_iter_snapshots_httpserver(httpserver: HTTPServer):
+    """
+    Test we're producing valid session HTTP requests and streaming the response items
+    """
+    config = Config(defaults={"server": httpserver.url_for("/")}, auth=None)
+
+    session = Session(config)
+    client = Client(session)
+
+    client_kwargs: Dict[str, Any] = {"cluster": "Cluster"}
+
+    request_kwargs = validate_kwargs(
+        "get", "/api/v1/servers/snapshots/GetSnapshots", {"params": {"Cluster": "Cluster"}}, {}
+    )
+
+    httpserver.expect_request(
+        "/api/v1/servers/snapshots/GetSnapshots",
+        method="get",
+        query_string=request_kwargs.get("params", None),
+    ).respond_with_json({"items": [request_kwargs, request_kwargs]})
+    assert list(client.iter_snapshots(**client_kwargs)) == [request_kwargs, request_kwargs]
+
+
 def test_get_snapshot():
     """
     Unit test default input/output behaviour when mocking the internal Session object.
@@ -16,3 +16,9 @@ def mock_config():
 
     # NOTE: We set Auth to None because our mock server doesn't support the auth endpoint.
     return Config(defaults={"server": "http://localhost:1080"}, auth=None)
+
+
+@pytest.fixture(autouse=True)
+def no_agent(monkeypatch):
+    # Don't send test requests through a local agent the developer may have running
+    monkeypatch.setenv("DENVR_NO_AGENT", "1")
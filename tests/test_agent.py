@@ -0,0 +1,153 @@
+import json
+import os
+import socket
+import subprocess
+import sys
+
+import pytest
+
+from requests import HTTPError
+
+from denvr import agent, cli
+from denvr.api.v1.servers.virtual import GetServerResult, GetServersItem, GetServersResult
+from denvr.client import client
+from denvr.testing import FakeServer, State
+
+LOGIN = "/api/TokenAuth/Authenticate"
+
+
+@pytest.fixture(scope="module")
+def server():
+    state = State()
+    state.populate(3, cluster="Msc1")
+    with FakeServer(state, users={"alice": "secret"}) as server:
+        yield server
+
+
+@pytest.fixture
+def running(server, tmp_path, monkeypatch):
+    path = tmp_path / "denvr.toml"
+    path.write_text(
+        f'[defaults]\nserver = "{server.url}"\ncluster = "Msc1"\nretries = 0\n'
+        '[credentials]\nusername = "alice"\npassword = "secret"\n'
+    )
+    for name in ("DENVR_NO_AGENT", "DENVR_APIKEY", "DENVR_USERNAME", "DENVR_PASSWORD"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("DENVR_CONFIG", str(path))
+    monkeypatch.setenv("DENVR_AGENT_SOCKET", str(tmp_path / "agent.sock"))
+    with agent.Agent(idle_timeout=None) as running:
+        yield running
+
+
+def logins(server) -> int:
+    return sum(n for (_, path, _), n in server.requests.items() if path == LOGIN)
+
+
+def test_cli(running, server, capsys):
+    before = logins(server)
+    assert cli.main(["servers", "virtual", "get-servers"]) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 3
+    vm = json.loads(lines[0])
+
+    argv = ["servers", "virtual", "get-server", "--id", vm["id"], "--namespace", "denvr"]
+    assert cli.main(argv) == 0
+    assert json.loads(capsys.readouterr().out)["id"] == vm["id"]
+    assert cli.main(["servers", "virtual", "get-servers", "--no-stream"]) == 0
+    assert len(json.loads(capsys.readouterr().out)["items"]) == 3
+
+    # Errors are reported the same way as without the agent
+    assert cli.main(argv[:-2]) == 1
+    assert "Namespace is missing" in capsys.readouterr().err
+    assert cli.main([*argv[:4], "vm-missing", "--namespace", "denvr"]) == 1
+    assert "404" in capsys.readouterr().err
+
+    # One login is shared by every call
+    assert logins(server) == before + 1
+    assert len(running.sessions) == 1
+    assert running.counters["requests"] == 5
+    assert running.counters["errors"] == 2
+
+
+def test_client(running, server, monkeypatch):
+    virtual = client("servers/virtual")
+    assert isinstance(virtual.session, agent.AgentSession)
+    assert len(virtual.get_servers()["items"]) == 3
+
+    # Stopping a stream early doesn't leave its items in the connection
+    for vm in virtual.iter_servers():
+        break
+    assert virtual.get_server(id=vm["id"], namespace="denvr")["id"] == vm["id"]
+
+    with pytest.raises(HTTPError) as e:
+        virtual.get_server(id="vm-missing", namespace="denvr")
+    assert e.value.response is not None and e.value.response.status_code == 404
+    # With the response headers and body
+    assert e.value.response.headers["Content-Type"].startswith("application/json")
+    assert "was not found" in e.value.response.json()["error"]["message"]
+    with pytest.raises(TypeError, match="Namespace is missing"):
+        virtual.get_server(id=vm["id"])
+
+    # Without the agent, the client has its own session
+    monkeypatch.setenv("DENVR_NO_AGENT", "1")
+    assert not isinstance(client("servers/virtual").session, agent.AgentSession)
+
+
+def test_client_records(running, tmp_path, monkeypatch):
+    path = tmp_path / "denvr.toml"
+    path.write_text(path.read_text().replace("retries = 0\n", "retries = 0\nrecords = true\n"))
+
+    # Records are rebuilt from the agent's responses, as without the agent
+    virtual = client("servers/virtual")
+    assert isinstance(virtual.session, agent.AgentSession)
+    result = virtual.get_servers()
+    assert isinstance(result, GetServersResult) and len(result["items"]) == 3
+    assert all(isinstance(vm, GetServersItem) for vm in virtual.iter_servers())
+    vm = result["items"][0]
+    assert isinstance(virtual.get_server(id=vm.id, namespace="denvr"), GetServerResult)
+
+    monkeypatch.setenv("DENVR_NO_AGENT", "1")
+    assert isinstance(client("servers/virtual").get_servers(), GetServersResult)
+
+
+def test_lifecycle(tmp_path):
+    path = str(tmp_path / "agent.sock")
+    assert agent.connect(path) is None
+
+    # A stale socket from an agent which didn't exit cleanly
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(path)
+    stale.close()
+    assert agent.connect(path) is None
+
+    running = agent.Agent(path, idle_timeout=None).start()
+    assert os.stat(path).st_mode & 0o777 == 0o600
+    with pytest.raises(RuntimeError, match="already listening"):
+        agent.Agent(path).start()
+
+    connection = agent.connect(path)
+    assert connection is not None
+    assert next(connection.send({"op": "status"}))["pid"] == os.getpid()
+    assert next(connection.send({"op": "shutdown"})) is True
+    connection.close()
+    running.wait()
+    assert not os.path.exists(path)
+
+    # Idle agents exit
+    idle = agent.Agent(path, idle_timeout=0.1).start()
+    idle.wait()
+    assert idle.server is None and agent.connect(path) is None
+
+
+def test_thin_client(running):
+    # CLI calls served by the agent don't import `requests` or the client modules
+    code = (
+        "import sys; from denvr import cli; cli.main(['clusters', 'get-all']); "
+        "print(sorted(m for m in sys.modules if m == 'requests' or m.startswith('denvr.api')))"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    lines = out.stdout.splitlines()
+    assert [json.loads(line)["name"] for line in lines[:-1]] == ["Hou1", "Msc1", "Yyc1"]
+    assert lines[-1] == "[]"
@@ -0,0 +1,130 @@
+import json
+import threading
+
+import pytest
+
+from denvr import cli
+from denvr.batch import Batch, Checkpoint, Operation, load
+from denvr.testing import FakeServer, State
+
+
+@pytest.fixture
+def server():
+    state = State(durations={"stop": 0.05, "start": 0.05})
+    state.populate(6, cluster="Msc1")
+    with FakeServer(state, api_keys=["key-1"]) as server:
+        yield server
+
+
+def manifest(server) -> list[str]:
+    vms = server.session().request("get", "/api/v1/servers/virtual/GetServers")["items"]
+    lines = [
+        {
+            "service": "servers/virtual",
+            "method": "stop_server",
+            "kwargs": {"id": vm["id"], "namespace": "denvr", "cluster": "Msc1"},
+            "wait": True,
+        }
+        for vm in vms[:4]
+    ]
+    lines.append({"service": "clusters", "method": "get_all", "id": "clusters"})
+    lines.append(
+        {
+            "service": "servers/virtual",
+            "method": "get_server",
+            "kwargs": {"id": "vm-missing", "namespace": "denvr", "cluster": "Msc1"},
+        }
+    )
+    return [json.dumps(line) for line in lines]
+
+
+def test_load():
+    ops = load(
+        [
+            '{"service": "clusters", "method": "get_all"}',
+            "",
+            '{"service": "clusters", "method": "get_all"}',
+        ]
+    )
+    assert [op.line for op in ops] == [1, 3]
+    # Identical operations are distinguished by their occurrence
+    assert ops[1].key == f"{ops[0].key}#2"
+    assert Operation("clusters", "get_all", id="a").key == "a"
+
+    with pytest.raises(ValueError, match="line 2"):
+        load(['{"service": "clusters", "method": "get_all"}', '{"service": "clusters"}'])
+    with pytest.raises(ValueError, match="Unknown operation fields"):
+        load(['{"service": "clusters", "method": "get_all", "args": {}}'])
+
+
+def test_run(server, tmp_path):
+    checkpoint = str(tmp_path / "changes.done")
+    batch = Batch(server.session(), checkpoint=checkpoint, interval=0.02, timeout=5)
+    results = list(batch.run(load(manifest(server))))
+    assert len(results) == 6
+    assert batch.counts == {"ok": 5, "failed": 1}
+
+    stopped = [r for r in results if r["method"] == "stop_server"]
+    assert all(r["ok"] and r["result"]["status"] == "OFFLINE" for r in stopped)
+    failed = next(r for r in results if not r["ok"])
+    assert failed["line"] == 6 and failed["error"]["status"] == 404
+    assert len(Checkpoint(checkpoint)) == 5
+
+    # Rerunning skips the completed operations and retries the failed one
+    batch = Batch(server.session(), checkpoint=checkpoint)
+    results = list(batch.run(load(manifest(server))))
+    assert [r["method"] for r in results] == ["get_server"]
+    assert batch.counts == {"skipped": 5, "failed": 1}
+
+
+def test_limits(server):
+    in_flight = {"servers/virtual": 0, "clusters": 0}
+    peak = dict(in_flight)
+    lock = threading.Lock()
+
+    class Tracked(Batch):
+        def execute(self, op):
+            with lock:
+                in_flight[op.service] += 1
+                peak[op.service] = max(peak[op.service], in_flight[op.service])
+            try:
+                return super().execute(op)
+            finally:
+                with lock:
+                    in_flight[op.service] -= 1
+
+    ops = [Operation("servers/virtual", "get_servers", {"cluster": "Msc1"}) for _ in range(12)]
+    ops += [Operation("clusters", "get_all") for _ in range(12)]
+    batch = Tracked(server.session(), limits={"servers/virtual": 2}, concurrency=3)
+    assert len(list(batch.run(ops))) == 24
+    assert peak["servers/virtual"] <= 2 and peak["clusters"] <= 3
+
+    # Typos fail before any operations run
+    with pytest.raises(ValueError, match="Unknown method"):
+        list(
+            batch.run(
+                [Operation("clusters", "get_all"), Operation("clusters", "get_everything")]
+            )
+        )
+    with pytest.raises(ValueError, match="Unsupported operation"):
+        list(batch.run([Operation("clusters", "get_all", wait=True)]))
+    assert batch.counts["ok"] == 24
+
+
+def test_cli(server, tmp_path, capsys):
+    config = tmp_path / "denvr.toml"
+    config.write_text(
+        f'[defaults]\nserver = "{server.url}"\nretries = 0\n[credentials]\napikey = "key-1"\n'
+    )
+    path = tmp_path / "changes.jsonl"
+    path.write_text("\n".join(manifest(server)[4:]))
+
+    argv = ["--config", str(config), "batch", str(path), "--limit", "clusters=1"]
+    assert cli.main(argv) == 1
+    out, err = capsys.readouterr()
+    assert len(out.splitlines()) == 2
+    assert "1 ok, 1 failed, 0 skipped" in err
+    assert (tmp_path / "changes.jsonl.done").read_text() == "clusters\n"
+
+    assert cli.main([*argv, "--no-checkpoint"]) == 1
+    assert "1 ok, 1 failed, 0 skipped" in capsys.readouterr().err
@@ -0,0 +1,60 @@
+import json
+import time
+
+import pytest
+
+from denvr import bench
+from denvr.api.v1.servers import virtual
+from denvr.config import Config
+from denvr.testing import FakeServer, State
+
+
+def test_parse_mix():
+    assert bench.parse_mix("get_server=3,get_servers=1") == {
+        "get_server": 0.75,
+        "get_servers": 0.25,
+    }
+    assert bench.parse_mix("get_servers") == {"get_servers": 1.0}
+    with pytest.raises(ValueError, match="Unknown operation"):
+        bench.parse_mix("delete_everything=1")
+
+
+def test_main(capsys):
+    argv = ["--duration", "0.5", "--concurrency", "2", "--interval", "0.05", "--json"]
+    assert bench.main([*argv, "--rps", "40"]) == 0
+    report = json.loads(capsys.readouterr().out)
+    assert report["target_rps"] == 40
+    assert set(report["operations"]) <= {
+        "get_server",
+        "get_servers",
+        "create_server",
+        "destroy_server",
+    }
+    assert report["operations"]["get_server"]["ok"] > 0
+    assert report["errors"] == {}
+    assert report["requests"] >= sum(op["ok"] for op in report["operations"].values())
+    assert report["cpu_per_request"] > 0
+
+    assert bench.main(["--duration", "0.2", "--mix", "get_servers"]) == 0
+    out = capsys.readouterr().out
+    assert "closed loop" in out and "get_servers" in out and "SDK CPU" in out
+
+
+def test_create_server_timing(monkeypatch):
+    destroy_server = virtual.Client.destroy_server
+
+    def slow_destroy(self, **kwargs):
+        time.sleep(0.3)
+        return destroy_server(self, **kwargs)
+
+    monkeypatch.setattr(virtual.Client, "destroy_server", slow_destroy)
+    state = State(durations={"planned": 0.01, "pending": 0.01, "destroy": 0.01})
+    with FakeServer(state) as server:
+        config = Config(defaults={"server": server.url, "retries": 0}, auth=None)
+        mix = {"create_server": 1.0}
+        report = bench.Bench(config, mix, duration=0.1, concurrency=1, interval=0.01).run()
+
+    # Destroying the VM is timed separately from creating it
+    operations = report["operations"]
+    assert operations["create_server"]["ok"] == operations["destroy_server"]["ok"] >= 1
+    assert operations["create_server"]["max"] < 0.3 <= operations["destroy_server"]["p50"]
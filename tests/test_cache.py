@@ -0,0 +1,106 @@
+import time
+
+from pytest_httpserver import HTTPServer
+
+from denvr import cache as cache_module, cli
+from denvr.cache import Cache
+from denvr.config import Config
+from denvr.session import Session
+
+SERVERS = "/api/v1/servers/virtual/GetServers"
+
+
+def test_cache(tmp_path):
+    cache = Cache(str(tmp_path / "cache.sqlite"), ttls={SERVERS: 0.2})
+    assert cache.get("scope", SERVERS, {"Cluster": "Hou1"}) is None
+
+    cache.set("scope", SERVERS, {"Cluster": "Hou1"}, {"items": [1]})
+    assert cache.get("scope", SERVERS, {"Cluster": "Hou1"}) == {"items": [1]}
+    assert cache.get("scope", SERVERS, {"Cluster": "Msc1"}) is None
+    assert cache.get("other", SERVERS, {"Cluster": "Hou1"}) is None
+
+    # Paths without a TTL aren't cached
+    cache.set("scope", "/api/v1/servers/virtual/GetServer", {}, {"id": 1})
+    assert cache.get("scope", "/api/v1/servers/virtual/GetServer", {}) is None
+
+    stats = cache.stats()["paths"][SERVERS]
+    assert stats["entries"] == 1
+    assert (stats["hits"], stats["misses"]) == (1, 3)
+
+    time.sleep(0.2)
+    assert cache.get("scope", SERVERS, {"Cluster": "Hou1"}) is None
+    assert cache.stats()["paths"][SERVERS]["expired"] == 1
+
+    assert cache.clear() == 1
+    assert cache.stats()["paths"] == {}
+
+
+def test_cache_counters(tmp_path, monkeypatch):
+    path = str(tmp_path / "cache.sqlite")
+    cache = Cache(path, ttls={SERVERS: 60})
+    cache.set("scope", SERVERS, {}, {"items": []})
+
+    # Lookups don't write to the database until the counts are flushed
+    monkeypatch.setattr(cache_module, "FLUSH_LOOKUPS", 3)
+    for _ in range(2):
+        cache.get("scope", SERVERS, {})
+    assert Cache(path).stats()["paths"][SERVERS]["hits"] == 0
+    cache.get("other", SERVERS, {})
+    stats = Cache(path).stats()["paths"][SERVERS]
+    assert (stats["hits"], stats["misses"]) == (2, 1)
+
+    # Stats include this process's pending counts
+    cache.get("scope", SERVERS, {})
+    assert cache.stats()["paths"][SERVERS]["hits"] == 3
+
+
+def test_invalidate(tmp_path):
+    cache = Cache(str(tmp_path / "cache.sqlite"), ttls={SERVERS: 60})
+    for scope in ("a", "b"):
+        cache.set(scope, SERVERS, {}, {"items": []})
+        cache.set(scope, "/api/v1/vpcs/GetVpcs", {}, {"items": []})
+
+    # Only the service's responses in the same scope are removed
+    cache.invalidate("a", "/api/v1/servers/virtual/CreateServer")
+    assert cache.get("a", SERVERS, {}) is None
+    assert cache.get("a", "/api/v1/vpcs/GetVpcs", {}) is not None
+    assert cache.get("b", SERVERS, {}) is not None
+
+
+def test_session_cache(httpserver: HTTPServer, tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    config = Config(
+        defaults={"server": httpserver.url_for("/"), "cache": path, "retries": 0}, auth=None
+    )
+    httpserver.expect_request(SERVERS).respond_with_json({"items": [{"id": "vm-1"}]})
+    httpserver.expect_request("/api/v1/servers/virtual/StopServer").respond_with_json({})
+
+    session = Session(config)
+    assert session.request("get", SERVERS, params={"Cluster": "Hou1"}) == {
+        "items": [{"id": "vm-1"}]
+    }
+
+    # Other processes (sessions) share the same cache
+    other = Session(config)
+    assert other.request("get", SERVERS, params={"Cluster": "Hou1"}) == {
+        "items": [{"id": "vm-1"}]
+    }
+    assert len(httpserver.log) == 1
+
+    # Mutations invalidate the service's cached responses
+    other.request("post", "/api/v1/servers/virtual/StopServer", json={})
+    session.request("get", SERVERS, params={"Cluster": "Hou1"})
+    assert len(httpserver.log) == 3
+
+
+def test_cli(tmp_path, capsys):
+    path = str(tmp_path / "cache.sqlite")
+    cache = Cache(path)
+    cache.set("scope", SERVERS, {}, {"items": []})
+    cache.get("scope", SERVERS, {})
+
+    assert cli.main(["cache", "stats", "--path", path]) == 0
+    assert SERVERS in capsys.readouterr().out
+
+    assert cli.main(["cache", "clear", "--path", path]) == 0
+    assert "Removed 1" in capsys.readouterr().out
@@ -0,0 +1,109 @@
+import time
+
+from typing import Any, Dict
+
+import pytest
+import requests
+
+from denvr import cassette
+from denvr.api.v1.servers import virtual
+from denvr.config import Config, config
+from denvr.session import Session
+from denvr.testing import FakeServer, State
+
+VM: Dict[str, Any] = {
+    "rpool": "on-demand",
+    "vpc": "denvr",
+    "configuration": "A100_40GB_PCIe_1x",
+    "cluster": "Msc1",
+    "ssh_keys": ["ssh-ed25519 AAAA"],
+}
+
+
+def reconcile(client: virtual.Client) -> list:
+    results = [client.create_server(name=f"vm-{i}", **VM)["id"] for i in range(3)]
+    results.append(client.get_server(id="vm-1", namespace="denvr", cluster="Msc1")["status"])
+    results.append([s["id"] for s in client.get_servers(cluster="Msc1")["items"]])
+    with pytest.raises(requests.HTTPError, match="409"):
+        client.create_server(name="vm-0", **VM)
+    return results
+
+
+def test_config(monkeypatch):
+    monkeypatch.delenv("DENVR_RECORD", raising=False)
+    monkeypatch.delenv("DENVR_REPLAY", raising=False)
+    assert Config(defaults={}, auth=None).record is None
+    assert Config(defaults={"replay": "~/a.jsonl"}, auth=None).replay.endswith("/a.jsonl")
+    monkeypatch.setenv("DENVR_RECORD", "/tmp/b.jsonl")
+    assert Config(defaults={"record": "/tmp/a.jsonl"}, auth=None).record == "/tmp/b.jsonl"
+
+
+def test_record_replay(tmp_path, monkeypatch):
+    path = str(tmp_path / "cassette.jsonl")
+    monkeypatch.setattr(cassette, "COMPRESS_MIN", 300)
+
+    server = FakeServer(State(clock=lambda: 1_700_000_000.0))
+    session = server.session(record=path)
+    recorded = reconcile(virtual.Client(session))
+    session.recorder.close()  # type: ignore[union-attr]
+
+    entries = cassette.load(path)
+    assert [(e["method"], e["status"]) for e in entries] == [("POST", 200)] * 3 + [
+        ("GET", 200),
+        ("GET", 200),
+        ("POST", 409),
+    ]
+    assert entries[0]["json"]["name"] == "vm-0"
+    assert entries[1]["path"] == "/api/v1/servers/virtual/CreateServer"
+    assert "body_z" in entries[4]
+    assert "body" in entries[5]
+    assert entries[0]["t"] <= entries[-1]["t"]
+
+    # Replay without the server, matching repeated requests by body
+    served = sum(server.requests.values())
+    config = Config(defaults={"server": "http://denvr.replay", "replay": path}, auth=None)
+    assert reconcile(virtual.Client(Session(config))) == recorded
+    assert sum(server.requests.values()) == served
+
+    # Replay the recorded requests directly
+    results = list(cassette.play(Session(config), entries))
+    assert [r["id"] for r in results[:3]] == ["vm-0", "vm-1", "vm-2"]
+    assert isinstance(results[-1], requests.HTTPError)
+
+
+def test_replay_adapter():
+    entry = {
+        "t": 0.0,
+        "elapsed": 0.05,
+        "method": "GET",
+        "path": "/api/v1/clusters/GetAll",
+        "query": "",
+        "json": None,
+        "status": 200,
+        "headers": {"Content-Type": "application/json"},
+        "body": '{"result": [{"name": "Msc1"}]}',
+    }
+    session = Session(Config(defaults={"server": "http://denvr.replay"}, auth=None))
+    session.session.mount("http://denvr.replay", cassette.ReplayAdapter([entry], latency=1))
+
+    start = time.perf_counter()
+    assert session.request("get", "/api/v1/clusters/GetAll") == [{"name": "Msc1"}]
+    assert time.perf_counter() - start >= 0.05
+
+    with pytest.raises(requests.ConnectionError, match="No recorded response"):
+        session.request("get", "/api/v1/vpcs/GetVpcs")
+
+    session.session.mount("http://denvr.replay", cassette.ReplayAdapter([entry], loop=False))
+    session.request("get", "/api/v1/clusters/GetAll")
+    with pytest.raises(requests.ConnectionError, match="were served"):
+        session.request("get", "/api/v1/clusters/GetAll")
+
+
+def test_config_replay(tmp_path, monkeypatch):
+    path = tmp_path / "denvr.toml"
+    path.write_text(
+        '[defaults]\nserver = "https://api.invalid"\nreplay = "c.jsonl"\n'
+        '[credentials]\nusername = "alice"\npassword = "secret"\n'
+    )
+    monkeypatch.delenv("DENVR_REPLAY", raising=False)
+    assert config(str(path)).auth is None
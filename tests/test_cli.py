@@ -0,0 +1,98 @@
+import importlib
+import inspect
+import json
+import subprocess
+import sys
+
+import pytest
+
+from denvr import cli
+from denvr.commands import COMMANDS
+from denvr.testing import FakeServer, State
+
+
+@pytest.fixture(scope="module")
+def server():
+    state = State()
+    state.populate(5, cluster="Msc1")
+    with FakeServer(state, api_keys=["key-1"]) as server:
+        yield server
+
+
+@pytest.fixture
+def config(server, tmp_path, monkeypatch):
+    path = tmp_path / "denvr.toml"
+    path.write_text(
+        f'[defaults]\nserver = "{server.url}"\ncluster = "Msc1"\nretries = 0\n'
+        '[credentials]\napikey = "key-1"\n'
+    )
+    for name in ("DENVR_APIKEY", "DENVR_USERNAME", "DENVR_PASSWORD"):
+        monkeypatch.delenv(name, raising=False)
+    return str(path)
+
+
+def test_commands():
+    # The generated metadata matches the generated clients
+    for specs in COMMANDS.values():
+        for name, spec in specs.items():
+            client = importlib.import_module(f"denvr.api.v1.{spec['module']}").Client
+            method = getattr(client, spec["method"])
+            assert name == spec["method"].replace("_", "-")
+            kwargs = list(inspect.signature(method).parameters)[1:]
+            assert [a[0] for a in spec["args"]] == kwargs
+            assert spec["stream"] is None or hasattr(client, spec["stream"])
+
+
+def test_main(config, capsys):
+    assert cli.main(["--config", config, "servers", "virtual", "get-servers"]) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 5
+    vm = json.loads(lines[0])
+    assert vm["cluster"] == "Msc1"
+
+    argv = ["--config", config, "servers", "virtual", "get-server", "--id", vm["id"]]
+    assert cli.main([*argv, "--namespace", "denvr"]) == 0
+    assert json.loads(capsys.readouterr().out)["id"] == vm["id"]
+
+    stream = ["--config", config, "servers", "virtual", "get-servers", "--no-stream"]
+    assert cli.main(stream) == 0
+    assert len(json.loads(capsys.readouterr().out)["items"]) == 5
+
+    assert cli.main(["--config", config, "clusters", "get-all"]) == 0
+    assert [json.loads(line)["name"] for line in capsys.readouterr().out.splitlines()] == [
+        "Hou1",
+        "Msc1",
+        "Yyc1",
+    ]
+
+    # Missing required arguments and request errors
+    assert cli.main(argv) == 1
+    assert "Namespace is missing" in capsys.readouterr().err
+    assert cli.main([*argv[:-1], "vm-missing", "--namespace", "denvr"]) == 1
+    assert "404" in capsys.readouterr().err
+
+
+def test_arguments(config, capsys):
+    argv = ["--config", config, "servers", "virtual", "create-server", "--name", "vm-cli"]
+    argv += ["--vpc", "denvr", "--configuration", "A100_40GB_PCIe_1x"]
+    argv += ["--persist-storage", "no"]
+    argv += ["--ssh-keys", "ssh-ed25519 A", "--ssh-keys", "ssh-ed25519 B"]
+    assert cli.main(argv) == 0
+    assert json.loads(capsys.readouterr().out)["id"] == "vm-cli"
+
+    with pytest.raises(SystemExit):
+        cli.main([*argv, "--root-disk-size", "big"])
+    assert "invalid int value" in capsys.readouterr().err
+
+
+def test_lazy_imports():
+    # Parsing a command doesn't import any client modules
+    code = (
+        "import sys; from denvr import cli; p = cli.parser(['clusters', 'get-all']); "
+        "p.parse_args(['clusters', 'get-all']); "
+        "print(sorted(m for m in sys.modules if m.startswith('denvr.api')))"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert out.stdout.strip() == "[]"
@@ -0,0 +1,101 @@
+from array import array
+
+import pytest
+
+from denvr.api.v1.servers import virtual
+from denvr.api.v1.servers.virtual import GetServersItem
+from denvr.columns import Columns
+from denvr.testing import FakeServer, State
+
+
+def items():
+    return [
+        {"id": "vm-1", "status": "ONLINE", "gpus": 1, "price": 1.5, "isGpuPlatform": True},
+        {"id": "vm-2", "status": "ONLINE", "gpus": 8, "price": 2, "isGpuPlatform": False},
+        {"id": "vm-3", "status": None, "gpus": None, "price": 3.5, "extra": [1]},
+    ]
+
+
+def test_columns():
+    columns = Columns()
+    columns.extend({"items": items()}, cluster="Hou1")
+    columns.append(GetServersItem.from_json({"id": "vm-4", "cluster": "Msc1"}))
+
+    assert len(columns) == 4
+    assert columns.fields[:6] == ["id", "status", "gpus", "price", "is_gpu_platform", "cluster"]
+
+    result = columns.to_columns()
+    assert result["id"] == ["vm-1", "vm-2", "vm-3", "vm-4"]
+    assert result["status"] == ["ONLINE", "ONLINE", None, None]
+    assert result["gpus"] == [1, 8, None, None]
+    assert result["is_gpu_platform"] == [True, False, None, None]
+    assert result["extra"] == [None, None, [1], None]
+    assert result["cluster"] == ["Hou1", "Hou1", "Hou1", "Msc1"]
+
+    # Ints are promoted to floats and homogeneous columns are stored in arrays
+    assert columns.columns["price"].kind == "float"
+    assert columns.columns["gpus"].kind == "int"
+    assert isinstance(columns.columns["gpus"].data, array)
+
+    # Repeated strings are interned
+    assert result["status"][0] is result["status"][1]
+
+
+def test_columns_records():
+    state = State()
+    state.populate(3, cluster="Hou1")
+    with FakeServer(state) as server:
+        result = virtual.Client(server.session(records=True)).get_servers(cluster="Hou1")
+
+    # List result records are unwrapped like the default dict responses
+    assert isinstance(result, virtual.GetServersResult)
+    columns = Columns()
+    columns.extend(result, cluster="Hou1")
+    assert len(columns) == 3
+    assert columns.to_columns()["id"] == [item.id for item in result["items"]]
+    assert set(columns.to_columns()["cluster"]) == {"Hou1"}
+
+
+def test_columns_mixed_types():
+    columns = Columns()
+    columns.extend([{"v": 1}, {"v": "a"}, {"v": None}, {"v": 2.5}])
+    assert columns.columns["v"].kind == "object"
+    assert columns.to_columns()["v"] == [1, "a", None, 2.5]
+
+    columns = Columns()
+    columns.extend([{"v": 1}, {"v": 2}])
+    assert columns.to_columns()["v"] == array("q", [1, 2])
+
+
+def test_to_arrow_like_dict():
+    columns = Columns()
+    columns.extend(items())
+    result = columns.to_arrow_like_dict()
+
+    assert result["num_rows"] == 3
+    assert result["schema"]["gpus"] == "int64"
+    assert result["schema"]["status"] == "string"
+    assert result["schema"]["is_gpu_platform"] == "bool"
+    assert result["columns"]["gpus"]["data"] == array("q", [1, 8, 0])
+    assert result["columns"]["gpus"]["validity"] == b"\x01\x01\x00"
+    assert result["columns"]["id"]["validity"] is None
+
+
+def test_to_numpy():
+    np = pytest.importorskip("numpy")
+
+    columns = Columns()
+    columns.extend(items())
+    result = columns.to_numpy()
+
+    assert result["price"].dtype == np.float64
+    assert result["gpus"].dtype == np.float64
+    assert np.isnan(result["gpus"][2])
+    assert result["id"].dtype == object
+    assert result["is_gpu_platform"].tolist() == [True, False, None]
+
+    columns = Columns()
+    columns.extend([{"gpus": 1, "on": True}, {"gpus": 2, "on": False}])
+    result = columns.to_numpy()
+    assert result["gpus"].dtype == np.int64
+    assert result["on"].dtype == bool
@@ -0,0 +1,124 @@
+import threading
+
+import pytest
+import requests
+
+from pytest_httpserver import HTTPServer
+from requests import HTTPError
+
+from denvr.auth import ApiKey
+from denvr.config import Config
+from denvr.endpoints import Endpoints
+from denvr.session import Session
+
+
+def test_endpoints():
+    endpoints = Endpoints(["https://a.example.com/", "https://b.example.com"], max_failures=2)
+    a, b = endpoints
+    assert a.url == "https://a.example.com"
+
+    # Unmeasured endpoints keep their configured order
+    assert endpoints.select() is a
+
+    endpoints.success(a, 0.2)
+    endpoints.success(b, 0.1)
+    assert endpoints.ordered() == [b, a]
+
+    # Errors penalize an endpoint before it's considered down
+    endpoints.failure(b)
+    assert b.healthy()
+    assert endpoints.select() is a
+
+    endpoints.failure(b)
+    assert not b.healthy()
+    assert endpoints.ordered() == [a, b]
+
+    endpoints.success(b, 0.1)
+    assert b.healthy()
+    assert b.failures == 0
+
+
+def test_servers_config():
+    auth = ApiKey("b")
+    config = Config(
+        defaults={"servers": ["https://a", "https://b"]}, auth=None, auths={"https://b": auth}
+    )
+    assert config.server == "https://a"
+    assert config.servers == ["https://a", "https://b"]
+    assert config.auth_for("https://a") is None
+    assert config.auth_for("https://b") is auth
+
+    assert Config(defaults={"server": "https://c"}, auth=None).servers == ["https://c"]
+
+
+@pytest.fixture
+def secondary():
+    server = HTTPServer()
+    server.start()
+    yield server
+    server.clear()
+    server.stop()
+
+
+def test_failover(httpserver: HTTPServer, secondary: HTTPServer):
+    primary_url = httpserver.url_for("").rstrip("/")
+    secondary_url = secondary.url_for("").rstrip("/")
+    config = Config(defaults={"servers": [primary_url, secondary_url], "retries": 0}, auth=None)
+    session = Session(config)
+    assert session.endpoints is not None
+    session.endpoints.probed = True
+    primary, other = session.endpoints
+    session.endpoints.success(primary, 0.001)
+    session.endpoints.success(other, 0.01)
+
+    path = "/api/v1/servers/virtual/GetServers"
+    httpserver.expect_request(path).respond_with_data("", status=503)
+    secondary.expect_request(path).respond_with_json({"items": [{"id": "vm-1"}]})
+    assert session.request("get", path) == {"items": [{"id": "vm-1"}]}
+    assert primary.failures == 1
+
+    # Non-idempotent requests aren't retried against another endpoint
+    path = "/api/v1/servers/virtual/CreateServer"
+    httpserver.expect_request(path, method="POST").respond_with_data("", status=503)
+    secondary.expect_request(path, method="POST").respond_with_json({"id": "vm-2"})
+    with pytest.raises(HTTPError):
+        session.request("post", path, json={})
+    assert len(secondary.log) == 1
+
+
+def test_probe(httpserver: HTTPServer):
+    httpserver.expect_request("/", method="HEAD").respond_with_data("")
+    endpoints = Endpoints([httpserver.url_for("/"), "http://127.0.0.1:1"], max_failures=1)
+    endpoints.probe(timeout=1)
+    reachable, unreachable = endpoints
+    assert reachable.rtt is not None
+    assert not unreachable.healthy()
+    assert endpoints.select() is reachable
+
+    # Only the first (or a forced) probe measures the endpoints again
+    endpoints.probe(timeout=1)
+    assert len(httpserver.log) == 1
+    endpoints.probe(timeout=1, force=True)
+    assert len(httpserver.log) == 2
+
+
+def test_probe_once(httpserver: HTTPServer, monkeypatch):
+    closed = []
+
+    class Session(requests.Session):
+        def close(self):
+            closed.append(self)
+            super().close()
+
+    monkeypatch.setattr(requests, "Session", Session)
+    httpserver.expect_request("/", method="HEAD").respond_with_data("")
+    endpoints = Endpoints([httpserver.url_for("/")])
+
+    # Concurrent first requests only probe once, and the temporary session is closed
+    threads = [threading.Thread(target=endpoints.probe) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert endpoints.probed and len(httpserver.log) == 1
+    assert len(closed) == 1
@@ -0,0 +1,125 @@
+import time
+
+import pytest
+import requests
+
+from denvr import faults
+from denvr.api.v1.servers import virtual
+from denvr.config import Config
+from denvr.session import Session
+from denvr.testing import FakeServer, State
+from denvr.utils import retry
+
+GET_SERVERS = "/api/v1/servers/virtual/GetServers"
+
+
+@pytest.fixture(scope="module")
+def server():
+    state = State()
+    state.populate(3, cluster="Msc1")
+    with FakeServer(state) as server:
+        yield server
+
+
+def session(server, injector, **retries) -> Session:
+    session = server.session(retries=0)
+    session.session.mount(
+        server.url,
+        faults.FaultAdapter(
+            injector, max_retries=retry(backoff_factor=0, **retries) if retries else 0
+        ),
+    )
+    return session
+
+
+def test_distribution():
+    rng = faults.random.Random(1)
+    assert faults.distribution(0.5)(rng) == 0.5
+    assert faults.distribution("0.25")(rng) == 0.25
+    assert 0.01 <= faults.distribution("uniform:0.01,0.1")(rng) <= 0.1
+    samples = sorted(faults.distribution("lognormal:0.02,1")(rng) for _ in range(10_000))
+    assert 0.015 < samples[5000] < 0.025
+    with pytest.raises(ValueError, match="Unknown latency distribution"):
+        faults.distribution("pareto:1")
+
+
+def test_draw():
+    rules = [
+        faults.Rule(path="/api/v1/servers/*", method="get", status=503, rate=0.5, burst=3),
+        faults.Rule(latency=0.1, rate=0.5),
+    ]
+    draws = []
+    for _ in range(2):
+        injector = faults.Injector(rules, seed=7)
+        draws.append(
+            [
+                (f.status, f.delay) if f else None
+                for f in (
+                    injector.draw("GET", "/api/v1/servers/virtual/GetServers")
+                    for _ in range(50)
+                )
+            ]
+        )
+    # Seeded draws are reproducible, and bursts fail consecutive requests
+    assert draws[0] == draws[1]
+    statuses = [d[0] if d else None for d in draws[0]]
+    first = statuses.index(503)
+    assert statuses[first : first + 3] == [503] * 3
+    assert injector.counts["attempts"] == 50
+    assert injector.counts["status.503"] == statuses.count(503)
+
+    # Rules only apply to matching requests
+    assert (
+        faults.Injector(rules[:1]).draw("POST", "/api/v1/servers/virtual/StartServer") is None
+    )
+    assert faults.Injector(rules[:1]).draw("GET", "/api/v1/clusters/GetAll") is None
+
+
+def test_status(server):
+    injector = faults.Injector([faults.Rule(status=503, limit=2, retry_after=0)], seed=1)
+    client = virtual.Client(session(server, injector, retries=3))
+    assert len(client.get_servers(cluster="Msc1")["items"]) == 3
+    assert injector.counts["attempts"] == 3
+    assert injector.counts["status.503"] == 2
+
+    injector = faults.Injector([faults.Rule(status=429)], seed=1)
+    with pytest.raises(requests.HTTPError, match="429"):
+        session(server, injector).request("get", GET_SERVERS)
+
+    # Non-idempotent requests aren't retried by default
+    injector = faults.Injector([faults.Rule(status=503)], seed=1)
+    with pytest.raises(requests.HTTPError, match="503"):
+        session(server, injector, retries=3).request(
+            "post", "/api/v1/servers/virtual/StartServer"
+        )
+    assert injector.counts["attempts"] == 1
+
+
+def test_reset_and_timeout(server):
+    injector = faults.Injector([faults.Rule(reset=True, limit=2)], seed=1)
+    assert session(server, injector, retries=2).request("get", GET_SERVERS)["items"]
+    assert injector.counts["reset"] == 2
+
+    with pytest.raises(requests.ConnectionError, match="reset"):
+        session(server, faults.Injector([faults.Rule(reset=True)])).request("get", GET_SERVERS)
+
+    injector = faults.Injector([faults.Rule(latency=10.0)], seed=1)
+    start = time.perf_counter()
+    with pytest.raises(requests.ReadTimeout):
+        session(server, injector).request("get", GET_SERVERS, timeout=0.05)
+    assert time.perf_counter() - start < 1
+    assert injector.counts["timeout"] == 1
+
+
+def test_config(server):
+    rules = [{"path": "/api/v1/servers/virtual/*", "status": 503, "rate": 1.0}]
+    config = Config(
+        defaults={"server": server.url, "retries": 0, "faults": {"seed": 1, "rules": rules}},
+        auth=None,
+    )
+    session = Session(config)
+    with pytest.raises(requests.HTTPError, match="503"):
+        session.request("get", GET_SERVERS)
+    assert session.request("get", "/api/v1/clusters/GetAll")
+    assert session.injector is not None
+    assert session.injector.counts == {"attempts": 2, "status.503": 1}
@@ -0,0 +1,126 @@
+from pytest_httpserver import HTTPServer
+from requests import HTTPError
+
+from denvr.config import Config
+from denvr.inventory import Index, cluster_names, snapshot
+from denvr.session import Session
+
+
+def test_cluster_names():
+    assert cluster_names(["Hou1", {"name": "Msc1"}]) == ["Hou1", "Msc1"]
+
+
+def test_snapshot(httpserver: HTTPServer):
+    config = Config(defaults={"server": httpserver.url_for("/"), "retries": 0}, auth=None)
+    session = Session(config)
+
+    httpserver.expect_request("/api/v1/clusters/GetAll").respond_with_json(["Hou1", "Msc1"])
+    httpserver.expect_request("/api/v1/servers/applications/GetApplications").respond_with_json(
+        {"items": [{"id": "app-1", "cluster": "Hou1"}, {"id": "app-2", "cluster": "Msc1"}]}
+    )
+    for cluster in ["Hou1", "Msc1"]:
+        query = {"Cluster": cluster}
+        httpserver.expect_request(
+            "/api/v1/servers/virtual/GetServers", query_string=query
+        ).respond_with_json({"items": [{"id": f"vm-{cluster}", "cluster": cluster}]})
+        httpserver.expect_request(
+            "/api/v1/servers/snapshots/GetSnapshots", query_string=query
+        ).respond_with_json({"items": []})
+
+    # Msc1 hosts are unavailable
+    httpserver.expect_request(
+        "/api/v1/servers/metal/GetHosts", query_string={"Cluster": "Hou1"}
+    ).respond_with_json({"items": [{"id": "host-1", "cluster": "Hou1"}]})
+    httpserver.expect_request(
+        "/api/v1/servers/metal/GetHosts", query_string={"Cluster": "Msc1"}
+    ).respond_with_data("", status=503)
+
+    inventory = snapshot(session, max_workers=4)
+    assert inventory.clusters == ["Hou1", "Msc1"]
+    assert [s["id"] for s in inventory.servers] == ["vm-Hou1", "vm-Msc1"]
+    assert [h["id"] for h in inventory.hosts] == ["host-1"]
+    assert inventory.snapshots == []
+    assert [a["id"] for a in inventory.items("applications", cluster="Msc1")] == ["app-2"]
+
+    assert not inventory.complete
+    assert list(inventory.errors) == ["Msc1"]
+    assert isinstance(inventory.errors["Msc1"]["hosts"], HTTPError)
+
+    timestamps = inventory.timestamps()
+    assert len(timestamps) == 7
+    assert all(inventory.started <= t <= inventory.finished for t in timestamps.values())
+
+    # Failed sources are skipped when updating an index
+    index = Index(fields=["powered_on"])
+    index.refresh([{"id": "host-2", "cluster": "Msc1", "powered_on": False}])
+    index.update(inventory, "hosts")
+    assert [h["id"] for h in index.query(powered_on=False)] == ["host-2"]
+    assert len(index) == 2
+
+
+def test_snapshot_clusters(httpserver: HTTPServer):
+    config = Config(defaults={"server": httpserver.url_for("/"), "retries": 0}, auth=None)
+    httpserver.expect_request("/api/v1/servers/applications/GetApplications").respond_with_json(
+        {"items": []}
+    )
+    httpserver.expect_request("/api/v1/servers/virtual/GetServers").respond_with_json(
+        {"items": [{"id": "vm-1", "cluster": "Yyc1"}]}
+    )
+    httpserver.expect_request("/api/v1/servers/metal/GetHosts").respond_with_json({"items": []})
+    httpserver.expect_request("/api/v1/servers/snapshots/GetSnapshots").respond_with_json(
+        {"items": []}
+    )
+
+    inventory = snapshot(Session(config), clusters=["Yyc1"])
+    assert inventory.complete
+    assert inventory.items("servers", cluster="Yyc1") == [{"id": "vm-1", "cluster": "Yyc1"}]
+
+
+def vm(id, cluster="Hou1", status="ONLINE", gpu_type="A100"):
+    return {
+        "id": id,
+        "namespace": "denvr",
+        "cluster": cluster,
+        "status": status,
+        "gpu_type": gpu_type,
+    }
+
+
+def test_index():
+    index = Index()
+    changes = index.refresh(
+        {"items": [vm("a"), vm("b", gpu_type="H100"), vm("c", status="PENDING")]}
+    )
+    assert len(changes["added"]) == 3
+    assert len(index) == 3
+
+    assert [v["id"] for v in index.query(status="ONLINE", gpu_type="A100")] == ["a"]
+    assert {v["id"] for v in index.query(cluster="Hou1", status="ONLINE")} == {"a", "b"}
+    assert index.query(status="OFFLINE") == []
+    assert index.count("status") == {"ONLINE": 2, "PENDING": 1}
+
+    # Non-indexed fields are filtered from the remaining candidates
+    assert [v["id"] for v in index.query(status="ONLINE", id="b")] == ["b"]
+
+    # Only the changed items are updated
+    changes = index.refresh([vm("a"), vm("c"), vm("d")])
+    assert changes == {
+        "added": [("Hou1", "denvr", "d")],
+        "modified": [("Hou1", "denvr", "c")],
+        "deleted": [("Hou1", "denvr", "b")],
+    }
+    assert index.count("status") == {"ONLINE": 3}
+    assert index.count("gpu_type") == {"A100": 3}
+    assert index.get("Hou1", "denvr", "c")["status"] == "ONLINE"
+
+
+def test_index_clusters():
+    index = Index()
+    index.refresh([vm("a"), vm("b")], cluster="Hou1")
+    index.refresh([vm("c", cluster="Msc1")], cluster="Msc1")
+
+    # Refreshing one cluster doesn't delete items from the others
+    changes = index.refresh([vm("a")], cluster="Hou1")
+    assert changes["deleted"] == [("Hou1", "denvr", "b")]
+    assert [v["id"] for v in index.query(cluster="Msc1")] == ["c"]
+    assert len(index.query()) == 2
@@ -0,0 +1,89 @@
+import random
+
+import pytest
+
+from pytest_httpserver import HTTPServer
+from requests import HTTPError
+
+from denvr.config import Config
+from denvr.metrics import Histogram, Metrics
+from denvr.session import Session
+
+
+def test_histogram():
+    hist = Histogram()
+    assert hist.percentile(0.5) == 0.0
+
+    random.seed(0)
+    values = sorted(random.uniform(0.001, 2.0) for _ in range(10_000))
+    for v in values:
+        hist.record(v)
+
+    assert hist.count == 10_000
+    for q in [0.5, 0.9, 0.99]:
+        expected = values[int(q * len(values)) - 1]
+        assert hist.percentile(q) == pytest.approx(expected, rel=0.04)
+    assert hist.percentile(1.0) <= hist.max == values[-1]
+    assert hist.mean == pytest.approx(sum(values) / len(values))
+
+    # Memory is bounded by the number of buckets rather than values
+    assert len(hist.counts) < 500
+
+    other = Histogram()
+    other.record(5.0)
+    hist.merge(other)
+    assert hist.count == 10_001
+    assert hist.max == 5.0
+    assert list(hist.buckets())[-1][1] == 1
+
+
+def test_metrics(httpserver: HTTPServer):
+    config = Config(defaults={"server": httpserver.url_for("/"), "retries": 1}, auth=None)
+    session = Session(config)
+    metrics = Metrics().install(session)
+
+    path = "/api/v1/servers/virtual/GetServers"
+    httpserver.expect_ordered_request(path).respond_with_data("", status=503)
+    httpserver.expect_ordered_request(path).respond_with_json({"items": []})
+    httpserver.expect_ordered_request("/api/v1/servers/virtual/GetServer").respond_with_data(
+        "", status=404
+    )
+
+    session.request("get", path)
+    with pytest.raises(HTTPError):
+        session.request("get", "/api/v1/servers/virtual/GetServer")
+
+    snapshot = metrics.snapshot()
+    assert snapshot[path]["requests"] == 1
+    assert snapshot[path]["retries"] == 1
+    assert snapshot[path]["statuses"] == {200: 1}
+    assert snapshot[path]["bytes_received"] > 0
+    assert snapshot[path]["latency"]["count"] == 1
+    assert snapshot["/api/v1/servers/virtual/GetServer"]["errors"] == 1
+    assert snapshot["/api/v1/servers/virtual/GetServer"]["statuses"] == {404: 1}
+
+    text = metrics.render()
+    assert f'denvr_requests_total{{path="{path}",code="200"}} 1' in text
+    assert f'denvr_retries_total{{path="{path}"}} 1' in text
+    assert f'denvr_request_duration_seconds_count{{path="{path}"}} 1' in text
+    assert "# TYPE denvr_request_duration_seconds summary" in text
+
+    metrics.uninstall(session)
+    assert session.hooks == {}
+
+
+def test_hooks(httpserver: HTTPServer):
+    session = Session(Config(defaults={"server": httpserver.url_for("/")}, auth=None))
+    with pytest.raises(ValueError, match="Unknown hook"):
+        session.add_hook("post_request", print)
+
+    def inject(kwargs, **_):
+        kwargs["headers"] = {**(kwargs.get("headers") or {}), "X-Request-Id": "abc"}
+
+    events = []
+    session.add_hook("pre_request", inject)
+    session.add_hook("post_response", lambda **kw: events.append(kw["response"].status_code))
+
+    httpserver.expect_request("/hooked", headers={"X-Request-Id": "abc"}).respond_with_json({})
+    assert session.request("get", "/hooked") == {}
+    assert events == [200]
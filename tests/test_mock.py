@@ -0,0 +1,61 @@
+import pytest
+
+from requests import HTTPError
+
+from denvr.api.v1 import clusters
+from denvr.api.v1.servers import virtual
+from denvr.testing import ROUTES
+from denvr.testing.fake import ApiError
+from denvr.testing.mock import ENDPOINTS, MockServer, check
+
+
+def test_endpoints():
+    # The generated mock and the stateful fake serve the same paths
+    assert set(ENDPOINTS) == set(ROUTES)
+
+
+def test_check():
+    endpoint = ENDPOINTS[("POST", "/api/v1/servers/virtual/CreateServer")]
+    body = {
+        "name": "vm-1",
+        "vpc": "denvr",
+        "cluster": "Msc1",
+        "configuration": "A100_40GB_PCIe_1x",
+        "ssh_keys": ["ssh-ed25519 AAAA"],
+        "rootDiskSize": 500,
+    }
+    check(endpoint, {}, body)
+
+    with pytest.raises(ApiError, match="Unknown property nme"):
+        check(endpoint, {}, {**body, "nme": "vm-1"})
+    with pytest.raises(ApiError, match="rootDiskSize must be of type int"):
+        check(endpoint, {}, {**body, "rootDiskSize": True})
+    with pytest.raises(ApiError, match="Unknown parameter Id"):
+        check(endpoint, {"Id": "vm-1"}, body)
+    with pytest.raises(ApiError, match="The vpc field is required"):
+        check(endpoint, {}, {**body, "vpc": None})
+
+    endpoint = ENDPOINTS[("GET", "/api/v1/servers/virtual/GetServer")]
+    with pytest.raises(ApiError, match="The Id field is required"):
+        check(endpoint, {"Namespace": "denvr", "Cluster": "Msc1"}, None)
+
+
+def test_mock():
+    server = MockServer()
+    client = virtual.Client(server.session())
+    vm = client.get_server(id="vm-1", namespace="denvr", cluster="Msc1")
+    assert set(vm) >= {"id", "namespace", "cluster", "status"}
+    assert [s["id"] for s in client.iter_servers()] == [vm["id"]]
+    assert (
+        clusters.Client(server.session()).get_all()
+        == ENDPOINTS[("GET", "/api/v1/clusters/GetAll")]["example"]
+    )
+
+    with pytest.raises(HTTPError, match="field is required"):
+        server.session().request("get", "/api/v1/servers/virtual/GetServer")
+    with pytest.raises(HTTPError, match="405"):
+        server.session().request("post", "/api/v1/servers/virtual/GetServer")
+
+    with MockServer(api_keys=["key-1"]) as http:
+        client = virtual.Client(http.session(retries=0))
+        assert client.get_servers()["items"]
@@ -0,0 +1,233 @@
+import socket
+
+import pytest
+
+from requests import ConnectionError, HTTPError
+
+from denvr import faults
+from denvr.config import Config
+from denvr.plan import Plan, PlanError, Ref
+from denvr.session import Session
+from denvr.testing import FakeServer, State
+
+VM = {
+    "rpool": "on-demand",
+    "configuration": "A100_40GB_PCIe_1x",
+    "cluster": "Msc1",
+    "ssh_keys": ["ssh-ed25519 AAAA"],
+}
+
+
+@pytest.fixture
+def server():
+    state = State(durations={"planned": 0.1, "pending": 0.1, "snapshot": 0.05, "destroy": 0.05})
+    with FakeServer(state) as server:
+        yield server
+
+
+def provision(plan: Plan, vms: int = 2):
+    vpc = plan.add("vpc", "vpcs", "create_vpc", {"name": "train-vpc", "cluster": "Msc1"})
+    for i in range(vms):
+        plan.add(
+            f"vm{i}",
+            "servers/virtual",
+            "create_server",
+            {"name": f"train-{i}", "vpc": vpc["id"], **VM},
+            wait=True,
+        )
+    plan.add(
+        "snapshot",
+        "servers/snapshots",
+        "create_snapshot",
+        {
+            "source_v_m_name": Ref("vm0", "id"),
+            "namespace": Ref("vm0", "namespace"),
+            "cluster": "Msc1",
+        },
+    )
+
+
+def test_run(server):
+    plan = Plan(server.session(retries=0), interval=0.02, timeout=5)
+    provision(plan)
+    results = plan.run()
+    assert results["vpc"]["id"] == "train-vpc"
+    assert results["vm0"]["status"] == "ONLINE" and results["vm1"]["status"] == "ONLINE"
+    assert results["snapshot"]["source_name"] == "train-0"
+
+    # The VMs ran concurrently, after the VPC and before the snapshot
+    timings = plan.timings
+    assert timings["vm0"][0] < timings["vm1"][1] and timings["vm1"][0] < timings["vm0"][1]
+    assert timings["vpc"][1] <= min(timings["vm0"][0], timings["vm1"][0])
+    assert timings["snapshot"][0] >= timings["vm0"][1]
+
+
+def test_cleanup(server):
+    session = server.session(retries=0)
+    plan = Plan(session, interval=0.02, timeout=5)
+    provision(plan, vms=1)
+    plan.add(
+        "bad",
+        "servers/virtual",
+        "create_server",
+        {"name": "bad", "vpc": "missing", **VM},
+        after=["vm0"],
+    )
+
+    with pytest.raises(PlanError) as e:
+        plan.run()
+    error = e.value
+    assert list(error.errors) == ["bad"]
+    bad = error.errors["bad"]
+    assert isinstance(bad, HTTPError) and bad.response is not None
+    assert bad.response.status_code == 400
+    # The snapshot ran alongside the failed step, so it's cleaned up too (in reverse completion order)
+    assert error.cleaned[-2:] == ["vm0", "vpc"] and set(error.cleaned) == {
+        "snapshot",
+        "vm0",
+        "vpc",
+    }
+    assert not error.cleanup_errors and not error.skipped
+
+    # The VPC is only destroyed once its VM is gone (the fake rejects destroying a VPC in use)
+    servers = session.request("get", "/api/v1/servers/virtual/GetServers")["items"]
+    assert "train-0" not in [vm["id"] for vm in servers]
+    assert "train-vpc" not in [
+        v["id"] for v in session.request("get", "/api/v1/vpcs/GetVpcs")["items"]
+    ]
+
+
+def test_retries(server):
+    session = server.session(retries=0)
+    rule = faults.Rule("*/CreateVpc", status=503, retry_after=0, limit=2)
+    faults.install(session, faults.Injector([rule]))
+    plan = Plan(session, backoff=0)
+    plan.add("vpc", "vpcs", "create_vpc", {"name": "retried", "cluster": "Msc1"}, retries=2)
+    assert plan.run()["vpc"]["id"] == "retried"
+
+    # Errors which may have happened after the request reached the server aren't retried
+    for rule in [
+        faults.Rule("*/CreateVpc", status=503, limit=1),
+        faults.Rule("*/CreateVpc", reset=True, limit=1),
+    ]:
+        session = server.session(retries=0)
+        faults.install(session, faults.Injector([rule]))
+        plan = Plan(session, backoff=0)
+        plan.add("vpc", "vpcs", "create_vpc", {"name": "unsafe", "cluster": "Msc1"}, retries=2)
+        with pytest.raises(PlanError):
+            plan.run()
+    assert server.requests[("POST", "/api/v1/vpcs/CreateVpc", 200)] == 1
+
+    # Client errors aren't retried
+    plan = Plan(server.session(retries=0), backoff=0)
+    plan.add(
+        "vm",
+        "servers/virtual",
+        "create_server",
+        {"name": "vm", "vpc": "missing", **VM},
+        retries=2,
+    )
+    with pytest.raises(PlanError, match="400"):
+        plan.run()
+    assert server.requests[("POST", "/api/v1/servers/virtual/CreateServer", 400)] == 1
+
+
+def test_retry_lookup(server):
+    # Creates look up the resource before retrying, e.g., a VPC created by a previous attempt
+    session = server.session(retries=0)
+    session.request(
+        "post", "/api/v1/vpcs/CreateVpc", json={"name": "train-vpc", "cluster": "Msc1"}
+    )
+    faults.install(
+        session, faults.Injector([faults.Rule("*/CreateVpc", status=429, retry_after=0)])
+    )
+    plan = Plan(session, backoff=0)
+    plan.add("vpc", "vpcs", "create_vpc", {"name": "train-vpc", "cluster": "Msc1"}, retries=1)
+    assert plan.run()["vpc"]["id"] == "train-vpc"
+    assert server.requests[("POST", "/api/v1/vpcs/CreateVpc", 200)] == 1
+
+    # Requests which couldn't connect are retried
+    errors = []
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    session = Session(
+        Config(defaults={"server": f"http://127.0.0.1:{port}", "retries": 0}, auth=None)
+    )
+    session.add_hook("on_error", lambda **kw: errors.append(kw["error"]))
+    plan = Plan(session, backoff=0)
+    plan.add("vpc", "vpcs", "create_vpc", {"name": "refused", "cluster": "Msc1"}, retries=2)
+    with pytest.raises(PlanError):
+        plan.run()
+    assert len(errors) == 3 and all(isinstance(e, ConnectionError) for e in errors)
+
+
+def test_retry_wait(server):
+    # Errors while waiting retry the wait, rather than destroying and recreating the VM
+    session = server.session(retries=0)
+    rule = faults.Rule("/api/v1/servers/virtual/GetServer", status=503, retry_after=0, limit=1)
+    faults.install(session, faults.Injector([rule]))
+    plan = Plan(session, interval=0.02, backoff=0)
+    plan.add(
+        "vm",
+        "servers/virtual",
+        "create_server",
+        {"name": "vm", "vpc": "denvr", **VM},
+        wait=True,
+        retries=2,
+    )
+    assert plan.run()["vm"]["status"] == "ONLINE"
+    assert server.requests[("POST", "/api/v1/servers/virtual/CreateServer", 200)] == 1
+    assert not server.requests[("DELETE", "/api/v1/servers/virtual/DestroyServer", 200)]
+    assert not plan.deleting
+
+    # Resources cleaned up by the plan aren't adopted while they're being deleted
+    plan = Plan(session, backoff=0)
+    step = plan.add("again", "servers/virtual", "create_server", {"name": "vm", **VM})
+    plan.prepare()
+    assert plan.find(step, step.kwargs)["id"] == "vm"
+    plan.deleting.add(("Msc1", "vm"))
+    assert plan.find(step, step.kwargs) is None
+
+
+def test_validation(server):
+    session = server.session()
+    plan = Plan.from_dict(
+        session,
+        {
+            "vpc": {"service": "vpcs", "method": "create_vpc", "kwargs": {"name": "${vm.vpc}"}},
+            "vm": {"service": "servers/virtual", "method": "create_server", "after": ["vpc"]},
+        },
+    )
+    assert plan.steps["vpc"].dependencies == {"vm"}
+    with pytest.raises(ValueError, match="cycle"):
+        plan.run()
+
+    assert repr(Ref.parse("${vm0.items.0.id}")) == "Ref('vm0', 'items', 0, 'id')"
+    assert Ref.parse("vm0.id") is None
+
+    plan = Plan(session)
+    plan.add("a", "vpcs", "create_vpc", after=["b"])
+    with pytest.raises(ValueError, match="unknown steps"):
+        plan.run()
+    plan = Plan(session)
+    plan.add("a", "clusters", "get_all", wait=True)
+    with pytest.raises(ValueError, match="Unsupported operation"):
+        plan.run()
+    with pytest.raises(ValueError, match="Duplicate"):
+        plan.add("a", "clusters", "get_all")
+
+
+def test_waiter_cleanup():
+    # A VM which doesn't come online in time is destroyed
+    state = State(durations={"planned": 60, "destroy": 0.05})
+    with FakeServer(state) as server:
+        session = server.session(retries=0)
+        plan = Plan(session, interval=0.02, timeout=0.1)
+        provision(plan, vms=1)
+        with pytest.raises(PlanError) as e:
+            plan.run()
+        assert isinstance(e.value.errors["vm0"], TimeoutError)
+        assert e.value.cleaned == ["vpc"] and e.value.skipped == ["snapshot"]
+        # The VPC was destroyed after the VM was deleted
+        assert ("Msc1", "denvr", "train-0") not in state.servers
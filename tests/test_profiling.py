@@ -0,0 +1,93 @@
+import pytest
+
+from pytest_httpserver import HTTPServer
+
+from denvr import profiling
+from denvr.api.v1.servers import virtual
+from denvr.config import Config
+from denvr.session import Session
+
+
+@pytest.fixture
+def profiler():
+    yield profiling.enable(threshold=0)
+    profiling.disable()
+
+
+def test_disabled():
+    assert profiling.profiler() is None
+    assert profiling.call("get", "/", {}) is profiling.NOOP
+    assert profiling.phase("decode") is profiling.NOOP
+    # Updates outside a call are ignored
+    profiling.update(status=200)
+    profiling.retried("GET", "/", 503)
+
+
+def test_config(monkeypatch):
+    monkeypatch.delenv("DENVR_PROFILE", raising=False)
+    assert Config(defaults={}, auth=None).profile is None
+    assert Config(defaults={"profile": True}, auth=None).profile == 1.0
+    assert Config(defaults={"profile": 0.25}, auth=None).profile == 0.25
+    monkeypatch.setenv("DENVR_PROFILE", "0.5")
+    assert Config(defaults={}, auth=None).profile == 0.5
+    monkeypatch.setenv("DENVR_PROFILE", "off")
+    assert Config(defaults={"profile": True}, auth=None).profile is None
+
+
+def test_profile(profiler, httpserver: HTTPServer):
+    config = Config(defaults={"server": httpserver.url_for("/"), "retries": 1}, auth=None)
+    client = virtual.Client(Session(config))
+
+    path = "/api/v1/servers/virtual/GetServer"
+    httpserver.expect_ordered_request(path).respond_with_data("", status=503)
+    httpserver.expect_ordered_request(path).respond_with_json(
+        {"result": {"id": "vm-1", "namespace": "denvr", "status": "ONLINE"}}
+    )
+    client.get_server(id="vm-1", namespace="denvr", cluster="Msc1")
+
+    (call,) = profiler.slow_calls()
+    assert call["method"] == "GET"
+    assert call["path"] == path
+    assert call["status"] == 200
+    assert call["params_size"] > 0
+    assert call["response_size"] > 0
+    assert call["error"] is None
+    assert len(call["retries"]) == 1
+    assert call["retries"][0][2] == 503
+    assert set(call["phases"]) >= {
+        "validate_kwargs",
+        "encode",
+        "http",
+        "raise_for_status",
+        "decode",
+        "normalize",
+    }
+    assert call["network"] == call["phases"]["http"]["wall"]
+    assert call["sdk"] == pytest.approx(call["wall"] - call["network"])
+
+    stats = profiler.stats()
+    assert stats["request"]["count"] == 1
+    assert stats["validate_kwargs"]["count"] == 1
+    assert "validate_kwargs" in profiler.report()
+
+
+def test_slow_calls(profiler, httpserver: HTTPServer):
+    profiler = profiling.enable(threshold=60, size=2)
+    session = Session(Config(defaults={"server": httpserver.url_for("/")}, auth=None))
+    httpserver.expect_request("/ok").respond_with_json({})
+    httpserver.expect_request("/missing").respond_with_data("", status=404)
+
+    session.request("get", "/ok")
+    assert profiler.slow_calls() == []
+
+    # Only the most recent slow calls are kept
+    profiler = profiling.enable(threshold=0, size=2)
+    for _ in range(3):
+        session.request("get", "/ok")
+    with pytest.raises(Exception, match="404"):
+        session.request("get", "/missing")
+
+    calls = profiler.slow_calls()
+    assert [c["path"] for c in calls] == ["/ok", "/missing"]
+    assert calls[-1]["error"].startswith("HTTPError")
+    assert profiler.calls == 4
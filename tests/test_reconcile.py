@@ -0,0 +1,171 @@
+import json
+
+from collections import Counter
+
+import pytest
+
+from denvr import cli
+from denvr.reconcile import Reconciler
+from denvr.testing import FakeServer, State
+
+
+def fleet(count: int = 3, status: str = "ONLINE", **overrides) -> dict:
+    return {
+        "vpcs": [{"cluster": "Msc1", "name": "train-vpc"}],
+        "servers": [
+            {
+                "cluster": "Msc1",
+                "name": "train-*",
+                "count": count,
+                "status": status,
+                "configuration": "A100_40GB_PCIe_1x",
+                "vpc": "train-vpc",
+                "rpool": "on-demand",
+                "ssh_keys": ["ssh-ed25519 AAAA"],
+                **overrides,
+            }
+        ],
+        "applications": [
+            {
+                "cluster": "Msc1",
+                "name": "notebook-*",
+                "hardware_package_name": "A100_40GB_PCIe_1x",
+                "application_catalog_item_name": "jupyter-notebook",
+                "application_catalog_item_version": "python-3.12",
+            }
+        ],
+    }
+
+
+@pytest.fixture
+def server():
+    state = State(
+        durations={
+            "planned": 0.05,
+            "pending": 0.05,
+            "application": 0.05,
+            "start": 0.05,
+            "stop": 0.05,
+            "destroy": 0.05,
+        }
+    )
+    # Unmanaged VMs are left alone
+    state.populate(2, cluster="Msc1")
+    with FakeServer(state, api_keys=["key-1"]) as server:
+        yield server
+
+
+def reconcile(server, spec: dict, **kwargs):
+    reconciler = Reconciler(server.session(retries=0), spec, interval=0.02, timeout=5)
+    return reconciler.reconcile(**kwargs)
+
+
+def statuses(server) -> dict[str, str]:
+    return {
+        id: r.item["status"]
+        for (_, _, id), r in server.state.servers.items()
+        if id.startswith("train-")
+    }
+
+
+def test_reconcile(server):
+    report = reconcile(server, fleet(), dry_run=True)
+    assert [str(c) for c in report.changes] == [
+        "create vpc Msc1/train-vpc",
+        "create server Msc1/train-0",
+        "create server Msc1/train-1",
+        "create server Msc1/train-2",
+        "create application Msc1/notebook-0",
+    ]
+    assert not report.results and not statuses(server)
+
+    report = reconcile(server, fleet())
+    assert report.ok and len(report.results) == 5
+    assert statuses(server) == {"train-0": "ONLINE", "train-1": "ONLINE", "train-2": "ONLINE"}
+    apps = server.state.applications
+    assert apps[("Msc1", None, "notebook-0")].item["status"] == "ONLINE"
+
+    # Without drift, only the list calls are made
+    before = Counter(server.requests)
+    report = reconcile(server, fleet())
+    assert report.ok and not report.changes and not report.results
+    assert sorted(path for method, path, _ in server.requests - before) == [
+        "/api/v1/servers/applications/GetApplications",
+        "/api/v1/servers/virtual/GetServers",
+        "/api/v1/vpcs/GetVpcs",
+    ]
+
+
+def test_scale(server):
+    assert reconcile(server, fleet()).ok
+
+    # Scaling down keeps the lowest numbered VMs
+    report = reconcile(server, fleet(count=1, status="OFFLINE"))
+    assert report.ok
+    assert [str(c) for c in report.changes] == [
+        "destroy server Msc1/train-2",
+        "destroy server Msc1/train-1",
+        "stop server Msc1/train-0",
+    ]
+    assert statuses(server) == {"train-0": "OFFLINE"}
+    assert len(server.state.servers) == 3
+
+    # Scaling up only creates the missing VMs, and new VMs come up ONLINE
+    report = reconcile(server, fleet(count=2))
+    assert [str(c) for c in report.changes] == [
+        "create server Msc1/train-1",
+        "start server Msc1/train-0",
+    ]
+    assert report.ok and statuses(server) == {"train-0": "ONLINE", "train-1": "ONLINE"}
+
+
+def test_conflicts(server):
+    assert reconcile(server, fleet(count=1)).ok
+
+    # VMs aren't replaced to change their configuration
+    report = reconcile(server, fleet(count=1, configuration="A100_40GB_PCIe_2x"), dry_run=True)
+    assert not report.changes
+    assert report.conflicts == [
+        "server Msc1/train-0 has configuration 'A100_40GB_PCIe_1x', not 'A100_40GB_PCIe_2x'"
+    ]
+
+    # Failed changes are reported, rather than waited on
+    spec = fleet(count=2, vpc="missing")
+    del spec["applications"]
+    report = reconcile(server, spec)
+    assert not report.ok and not report.pending
+    assert [r["error"]["status"] for r in report.failed] == [400]
+
+
+def test_validation(server):
+    session = server.session()
+    with pytest.raises(ValueError, match="Unknown spec sections"):
+        Reconciler(session, {"volumes": []})
+    with pytest.raises(ValueError, match="needs a `\\*`"):
+        Reconciler(session, {"servers": [{"cluster": "Msc1", "name": "train", "count": 2}]})
+    with pytest.raises(ValueError, match="`cluster` and `name`"):
+        Reconciler(session, {"vpcs": [{"name": "train-vpc"}]})
+
+
+def test_cli(server, tmp_path, capsys):
+    config = tmp_path / "denvr.toml"
+    config.write_text(
+        f'[defaults]\nserver = "{server.url}"\nretries = 0\n[credentials]\napikey = "key-1"\n'
+    )
+    spec = tmp_path / "fleet.json"
+    spec.write_text(json.dumps(fleet(count=1)))
+
+    argv = ["--config", str(config), "reconcile", str(spec), "--interval", "0.02"]
+    assert cli.main([*argv, "--dry-run"]) == 0
+    out, err = capsys.readouterr()
+    assert [json.loads(line)["action"] for line in out.splitlines()] == ["create"] * 3
+    assert "3 changes, 0 failed, 0 conflicts" in err
+
+    assert cli.main(argv) == 0
+    out, err = capsys.readouterr()
+    assert all(json.loads(line)["ok"] for line in out.splitlines())
+    assert statuses(server) == {"train-0": "ONLINE"}
+
+    spec.write_text("{")
+    assert cli.main(argv) == 1
+    assert "denvr: error" in capsys.readouterr().err
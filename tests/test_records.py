@@ -0,0 +1,97 @@
+import pytest
+
+from pytest_httpserver import HTTPServer
+
+from denvr.config import Config
+from denvr.records import lookup
+from denvr.session import Session
+from denvr.api.v1.servers import virtual
+from denvr.api.v1.servers.applications import (
+    GetApplicationCatalogItemsItemVersion,
+    GetApplicationCatalogItemsResult,
+)
+
+
+def test_record():
+    record = virtual.GetServerResult.from_json(
+        {"id": "vm-1", "gpuType": "intel/GAUDI2", "status": "ONLINE", "newField": 1}
+    )
+
+    # Attribute and dict style access
+    assert record.id == "vm-1"
+    assert record.gpu_type == "intel/GAUDI2"
+    assert record.ip is None
+    assert record["status"] == "ONLINE"
+    assert record.get("new_field") == 1
+    assert record.get("missing", "default") == "default"
+    assert "new_field" in record
+    assert "missing" not in record
+    with pytest.raises(KeyError):
+        record["missing"]
+
+    # Unknown fields are kept when converting back to a dict
+    result = record.to_dict()
+    assert len(record) == len(result) == len(virtual.GetServerResult.__slots__) + 1
+    assert result["new_field"] == 1
+    assert list(record) == list(result)
+    assert record == result
+    assert record == virtual.GetServerResult.from_json(result)
+    assert record != virtual.CreateServerResult.from_json(result)
+    assert repr(record).startswith("GetServerResult(username=None,")
+
+
+def test_nested_record():
+    record = GetApplicationCatalogItemsResult.from_json(
+        {
+            "items": [
+                {
+                    "name": "jupyter-notebook",
+                    "versions": [{"name": "python-3.11.9", "imageUrl": "quay.io/jupyter"}],
+                }
+            ]
+        }
+    )
+
+    version = record.items_[0].versions[0]
+    assert isinstance(version, GetApplicationCatalogItemsItemVersion)
+    assert version["image_url"] == "quay.io/jupyter"
+    assert record.to_dict()["items"][0]["versions"][0]["image_url"] == "quay.io/jupyter"
+
+
+def test_reserved_fields():
+    record = virtual.GetServersResult.from_json({"items": [{"id": "vm-1"}], "total": 1})
+
+    # `items` is stored as `items_`, so the dict style methods still work
+    assert record["items"] is record.items_
+    assert [k for k, _ in record.items()] == list(record.keys()) == ["items", "total"]
+    assert dict(record.items())["items"][0].id == "vm-1"
+    assert "items" in record and "items_" not in record
+    assert record.to_dict() == {"items": [{**record.items_[0].to_dict()}], "total": 1}
+    assert virtual.GetServersResult._fields == ("items",)
+
+
+def test_lookup():
+    assert lookup("/api/v1/servers/virtual/GetServers") is virtual.GetServersResult
+    assert lookup("/api/v1/servers/virtual/Missing") is None
+    assert lookup("/api/v1/missing/GetAll") is None
+    assert Config(defaults={}, auth=None).records is False
+
+
+def test_session_records(httpserver: HTTPServer):
+    config = Config(defaults={"server": httpserver.url_for("/"), "records": True}, auth=None)
+    client = virtual.Client(Session(config))
+
+    items = [{"id": f"vm-{i}", "cluster": "Hou1", "status": "ONLINE"} for i in range(3)]
+    httpserver.expect_request("/api/v1/servers/virtual/GetServers").respond_with_json(
+        {"items": items}
+    )
+    httpserver.expect_request("/api/v1/servers/virtual/GetServer").respond_with_json(items[0])
+
+    result = client.get_servers(cluster="Hou1")
+    assert isinstance(result, virtual.GetServersResult)
+    assert [item.id for item in result["items"]] == ["vm-0", "vm-1", "vm-2"]
+    assert all(isinstance(item, virtual.GetServersItem) for item in client.iter_servers())
+
+    result = client.get_server(id="vm-0", namespace="denvr", cluster="Hou1")
+    assert isinstance(result, virtual.GetServerResult)
+    assert result.status == "ONLINE"
@@ -0,0 +1,156 @@
+import gzip
+import json
+
+from pytest_httpserver import HTTPServer
+from werkzeug import Response
+
+from denvr.config import Config
+from denvr.session import Session
+
+
+def test_stream(httpserver: HTTPServer):
+    config = Config(defaults={"server": httpserver.url_for("/")}, auth=None)
+    session = Session(config)
+
+    items = [{"id": f"vm-{i}", "gpuType": "nvidia.com/A100PCIE40GB"} for i in range(100)]
+    httpserver.expect_request("/api/v1/servers/virtual/GetServers").respond_with_json(
+        {"items": items}
+    )
+
+    results = session.stream("get", "/api/v1/servers/virtual/GetServers")
+    assert next(results) == {"id": "vm-0", "gpu_type": "nvidia.com/A100PCIE40GB"}
+    assert len(list(results)) == 99
+
+
+def test_intern(httpserver: HTTPServer):
+    config = Config(
+        defaults={"server": httpserver.url_for("/"), "intern_size": 10000}, auth=None
+    )
+    session = Session(config)
+
+    items = [{"id": f"vm-{i}", "cluster": "Hou1", "status": "ONLINE"} for i in range(3)]
+    httpserver.expect_request("/api/v1/servers/virtual/GetServers").respond_with_json(
+        {"items": items}
+    )
+
+    results = session.request("get", "/api/v1/servers/virtual/GetServers")["items"]
+    assert results[0]["cluster"] is results[1]["cluster"] is results[2]["cluster"]
+
+    # Values are shared across responses and streams too
+    streamed = list(session.stream("get", "/api/v1/servers/virtual/GetServers"))
+    assert streamed[0]["status"] is results[0]["status"]
+
+    # Interning is opt-in
+    config = Config(defaults={"server": httpserver.url_for("/")}, auth=None)
+    assert config.intern_size == 0
+    results = Session(config).request("get", "/api/v1/servers/virtual/GetServers")["items"]
+    assert results[0]["cluster"] is not results[1]["cluster"]
+
+
+def test_revalidate_etag(httpserver: HTTPServer):
+    config = Config(defaults={"server": httpserver.url_for("/"), "revalidate": True}, auth=None)
+    session = Session(config)
+    path = "/api/v1/servers/virtual/GetServers"
+
+    httpserver.expect_ordered_request(path).respond_with_json(
+        {"items": [{"id": "vm-1"}]}, headers={"ETag": '"v1"'}
+    )
+    httpserver.expect_ordered_request(
+        path, headers={"If-None-Match": '"v1"'}
+    ).respond_with_data("", status=304)
+    first = session.request("get", path)
+    second = session.request("get", path)
+    assert second == first == {"items": [{"id": "vm-1"}]}
+    assert second is not first and second["items"] is not first["items"]
+
+
+def test_revalidate_body_hash(httpserver: HTTPServer):
+    config = Config(defaults={"server": httpserver.url_for("/"), "revalidate": True}, auth=None)
+    session = Session(config)
+    path = "/api/v1/servers/virtual/GetServers"
+
+    httpserver.expect_ordered_request(path).respond_with_json({"items": [{"id": "vm-1"}]})
+    httpserver.expect_ordered_request(path).respond_with_json({"items": [{"id": "vm-1"}]})
+    httpserver.expect_ordered_request(path).respond_with_json({"items": [{"id": "vm-2"}]})
+
+    first = session.request("get", path)
+    assert session.request("get", path) == first
+    assert session.request("get", path) == {"items": [{"id": "vm-2"}]}
+
+    # Other paths (and sessions without revalidation, the default) always decode the response
+    session = Session(Config(defaults={"server": httpserver.url_for("/")}, auth=None))
+    httpserver.expect_request(path).respond_with_json({"items": []})
+    assert session.request("get", path) is not session.request("get", path)
+
+
+def test_revalidate_copies(httpserver: HTTPServer):
+    config = Config(defaults={"server": httpserver.url_for("/"), "revalidate": True}, auth=None)
+    session = Session(config)
+    path = "/api/v1/servers/virtual/GetServers"
+    body = {"items": [{"id": "vm-1"}, {"id": "vm-2"}]}
+    httpserver.expect_request(path).respond_with_json(body)
+
+    # Changes to a result don't leak into the results of unchanged responses
+    first = session.request("get", path)
+    first["items"].pop()
+    first["items"][0]["id"] = "changed"
+    assert session.request("get", path) == body
+    assert session.request("get", path) == body
+
+    # Including records
+    defaults = {"server": httpserver.url_for("/"), "revalidate": True, "records": True}
+    session = Session(Config(defaults=defaults, auth=None))
+    first = session.request("get", path)
+    first["items"].pop()
+    first["items"][0].id = "changed"
+    assert [vm["id"] for vm in session.request("get", path)["items"]] == ["vm-1", "vm-2"]
+
+
+def test_compression(httpserver: HTTPServer):
+    config = Config(
+        defaults={"server": httpserver.url_for("/"), "compress_requests": 1024}, auth=None
+    )
+    session = Session(config)
+    assert "gzip" in session.session.headers["Accept-Encoding"]
+
+    def handler(request):
+        assert request.headers["Content-Encoding"] == "gzip"
+        body = json.loads(gzip.decompress(request.get_data()))
+        return Response(
+            gzip.compress(json.dumps({"size": len(body["cloudInitBase64"])}).encode()),
+            headers={"Content-Encoding": "gzip", "Content-Type": "application/json"},
+        )
+
+    path = "/api/v1/servers/applications/CreateCustomApplication"
+    httpserver.expect_request(path, method="POST").respond_with_handler(handler)
+    assert session.request("post", path, json={"cloudInitBase64": "a" * 4096}) == {"size": 4096}
+
+    counters = session.counters
+    assert counters["requests"] == 1
+    assert counters["bytes_sent_wire"] < counters["bytes_sent"]
+    assert counters["bytes_received"] == len(b'{"size": 4096}')
+    assert 0 < counters["bytes_received_wire"]
+
+    # Small bodies aren't compressed
+    sent, sent_wire = counters["bytes_sent"], counters["bytes_sent_wire"]
+    httpserver.expect_request("/small", method="POST", json={"a": 1}).respond_with_json({})
+    session.request("post", "/small", json={"a": 1})
+    assert counters["bytes_sent"] - sent == counters["bytes_sent_wire"] - sent_wire == 8
+
+
+def test_compression_unsupported(httpserver: HTTPServer):
+    config = Config(
+        defaults={"server": httpserver.url_for("/"), "compress_requests": 1, "retries": 0},
+        auth=None,
+    )
+    session = Session(config)
+    path = "/api/v1/servers/metal/ReprovisionHost"
+    httpserver.expect_ordered_request(
+        path, headers={"Content-Encoding": "gzip"}
+    ).respond_with_data("", status=415)
+    httpserver.expect_ordered_request(path, json={"id": "host-1"}).respond_with_json(
+        {"ok": True}
+    )
+
+    assert session.request("post", path, json={"id": "host-1"}) == {"ok": True}
+    assert session.compress_requests == 0
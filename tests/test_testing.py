@@ -0,0 +1,209 @@
+import ast
+import pathlib
+
+from typing import Any, Dict
+
+import pytest
+
+from requests import HTTPError
+
+from denvr.api.v1 import vpcs
+from denvr.api.v1.servers import applications, metal, snapshots, virtual
+from denvr.auth import Bearer
+from denvr.testing import ROUTES, FakeServer, State
+
+VM: Dict[str, Any] = {
+    "rpool": "on-demand",
+    "vpc": "denvr",
+    "configuration": "A100_40GB_PCIe_1x",
+    "cluster": "Msc1",
+    "ssh_keys": ["ssh-ed25519 AAAA"],
+    "operating_system_image": "Ubuntu_22.04.4_LTS",
+    "personal_storage_mount_path": None,
+    "tenant_shared_additional_storage": None,
+    "persist_storage": False,
+    "direct_storage_mount_path": None,
+    "root_disk_size": 500,
+}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def server(clock):
+    return FakeServer(State(clock=clock))
+
+
+def test_routes():
+    # Every path the SDK is generated for has a route
+    tree = ast.parse(pathlib.Path("scripts/apigen.py").read_text())
+    included = next(
+        ast.literal_eval(node.value)
+        for node in tree.body
+        if isinstance(node, ast.Assign) and node.targets[0].id == "INCLUDED_PATHS"  # type: ignore[attr-defined]
+    )
+    assert sorted(included) == sorted(path for _, path in ROUTES)
+    assert all(hasattr(State, name) for name in ROUTES.values())
+
+
+def test_server_lifecycle(server, clock):
+    client = virtual.Client(server.session())
+    vm = client.create_server(name="vm-1", **VM)
+    assert vm["status"] == "PLANNED"
+
+    clock.now += 5
+    assert (
+        client.get_server(id="vm-1", namespace="denvr", cluster="Msc1")["status"] == "PENDING"
+    )
+    clock.now += 30
+    assert client.get_server(id="vm-1", namespace="denvr", cluster="Msc1")["status"] == "ONLINE"
+
+    with pytest.raises(HTTPError, match="409"):
+        client.create_server(name="vm-1", **VM)
+    with pytest.raises(HTTPError, match="not OFFLINE"):
+        client.start_server(id="vm-1", namespace="denvr", cluster="Msc1")
+
+    client.stop_server(id="vm-1", namespace="denvr", cluster="Msc1")
+    clock.now += 10
+    assert (
+        client.get_server(id="vm-1", namespace="denvr", cluster="Msc1")["status"] == "OFFLINE"
+    )
+
+    client.destroy_server(id="vm-1", namespace="denvr", cluster="Msc1")
+    assert [s["status"] for s in client.get_servers(cluster="Msc1")["items"]] == ["PENDING"]
+    clock.now += 5
+    assert client.get_servers(cluster="Msc1")["items"] == []
+    with pytest.raises(HTTPError, match="404"):
+        client.get_server(id="vm-1", namespace="denvr", cluster="Msc1")
+
+
+def test_capacity(clock):
+    server = FakeServer(State(clock=clock, capacity={("Msc1", "A100_40GB_PCIe_1x"): 2}))
+    client = virtual.Client(server.session())
+    client.create_server(name="vm-1", **VM)
+    client.create_server(name="vm-2", **VM)
+    with pytest.raises(HTTPError, match="Insufficient capacity"):
+        client.create_server(name="vm-3", **VM)
+
+    availability = {
+        item["configuration"]: item
+        for item in client.get_availability(cluster="Msc1", resource_pool="on-demand")["items"]
+    }
+    assert availability["A100_40GB_PCIe_1x"]["available"] is False
+    assert availability["A100_40GB_PCIe_1x"]["maxCount"] == 2
+    assert availability["H100_80GB_SXM_8x"]["count"] == 100
+
+    with pytest.raises(HTTPError, match="Cluster Nowhere does not exist"):
+        client.create_server(name="vm-4", **{**VM, "cluster": "Nowhere"})
+
+
+def test_snapshots_and_applications(server, clock):
+    server.state.populate(1, cluster="Msc1")
+    vm = virtual.Client(server.session()).get_servers(cluster="Msc1")["items"][0]
+
+    client = snapshots.Client(server.session())
+    snapshot = client.create_snapshot(
+        name="snap-1", cluster="Msc1", namespace="denvr", source_v_m_name=vm["id"]
+    )
+    assert snapshot["ready_to_use"] is False
+    clock.now += 30
+    snapshot = client.get_snapshot(id="snap-1", namespace="denvr", cluster="Msc1")
+    assert snapshot["ready_to_use"] is True
+    client.delete_snapshot(id="snap-1", namespace="denvr", cluster="Msc1")
+    assert client.get_snapshots()["items"] == []
+
+    apps = applications.Client(server.session())
+    apps.create_catalog_application(
+        name="app-1",
+        cluster="Msc1",
+        hardware_package_name="A100_40GB_PCIe_1x",
+        application_catalog_item_name="vllm",
+        application_catalog_item_version="v0.8.4",
+        resource_pool="on-demand",
+        ssh_keys=["ssh-ed25519 AAAA"],
+        persist_direct_attached_storage=False,
+        personal_shared_storage=True,
+        tenant_shared_storage=True,
+    )
+    clock.now += 35
+    details = apps.get_application_details(id="app-1", cluster="Msc1")
+    assert details["instance_details"]["status"] == "ONLINE"
+
+    hosts = metal.Client(server.session())
+    host = hosts.get_hosts(cluster="Msc1")["items"][0]
+    hosts.reboot_host(id=host["id"], cluster="Msc1")
+    assert hosts.get_host(id=host["id"], cluster="Msc1")["operational_status"] == "Rebooting"
+
+    assert [
+        v["name"] for v in vpcs.Client(server.session()).get_vpcs(cluster="Msc1")["items"]
+    ] == ["denvr"]
+
+
+def test_vpc_in_use(server, clock):
+    with server:
+        client = vpcs.Client(server.session(retries=0))
+        vms = virtual.Client(server.session(retries=0))
+        client.create_vpc(name="train", cluster="Msc1")
+        vms.create_server(name="vm-1", **{**VM, "vpc": "train"})
+        vms.create_server(name="vm-2", **VM)
+
+        # VPCs can't be destroyed until their VMs are deleted, whether or not they're the default
+        for vpc in ["train", "denvr"]:
+            with pytest.raises(HTTPError, match="409"):
+                client.destroy_vpc(id=vpc, cluster="Msc1")
+        vms.destroy_server(id="vm-1", namespace="denvr", cluster="Msc1")
+        with pytest.raises(HTTPError, match="409"):
+            client.destroy_vpc(id="train", cluster="Msc1")
+        clock.now += 5
+        client.destroy_vpc(id="train", cluster="Msc1")
+        assert [v["name"] for v in client.get_vpcs(cluster="Msc1")["items"]] == ["denvr"]
+        assert list(server.state.server_vpcs) == [("Msc1", "denvr", "vm-2")]
+
+
+def test_auth():
+    server = FakeServer(users={"alice": "secret"}, api_keys=["key-1"], token_ttl=1)
+    with server:
+        client = virtual.Client(server.session("alice", retries=0))
+        assert client.get_servers()["items"] == []
+
+        # Tokens are refreshed after they expire
+        client.session.config.auth._access_expires = 0  # type: ignore[union-attr]
+        assert client.get_servers()["items"] == []
+
+        with pytest.raises(HTTPError, match="401"):
+            Bearer(server.url, "alice", "wrong", retries=0)
+
+    # API keys work in process
+    server.users = {}
+    client = virtual.Client(server.session())
+    assert client.get_servers()["items"] == []
+    server.api_keys = {"key-2"}
+    with pytest.raises(HTTPError, match="401"):
+        client.get_servers()
+
+
+def test_faults():
+    server = FakeServer(rate_limit=2)
+    with server:
+        client = virtual.Client(server.session(retries=0))
+        client.get_servers()
+        client.get_servers()
+        with pytest.raises(HTTPError, match="429") as e:
+            client.get_servers()
+        assert e.value.response.headers["Retry-After"] == "1"
+
+    server = FakeServer(error_rate=1.0)
+    with pytest.raises(HTTPError, match="503"):
+        virtual.Client(server.session()).get_servers()
+    assert server.requests[("GET", "/api/v1/servers/virtual/GetServers", 503)] == 1
@@ -0,0 +1,108 @@
+import json
+
+import pytest
+
+from pytest_httpserver import HTTPServer
+
+from denvr import tracing
+from denvr.config import Config
+from denvr.session import Session
+from denvr.waiters import Waiter
+
+
+@pytest.fixture
+def spans():
+    spans: list = []
+    tracing.enable(spans.append)
+    yield spans
+    tracing.disable()
+
+
+def test_disabled():
+    assert tracing.tracer() is None
+    with tracing.span("noop") as span:
+        span.set(x=1)
+    assert span is tracing.NOOP
+    assert tracing.current() is None
+
+
+def test_nested(spans):
+    with tracing.span("outer", x=1):
+        assert tracing.current() is not None
+        with tracing.span("inner") as span:
+            span.set(y=2)
+        with pytest.raises(ValueError), tracing.span("failed"):
+            raise ValueError("boom")
+
+    assert tracing.current() is None
+    assert [s.name for s in spans] == ["inner", "failed", "outer"]
+    inner, _, outer = spans
+    assert all(s.trace_id == outer.trace_id for s in spans)
+    assert inner.parent_id == outer.span_id
+    assert outer.parent_id is None
+    assert outer.attributes == {"service.name": "denvr", "x": 1}
+    assert inner.attributes == {"y": 2}
+    assert spans[1].status == "ERROR"
+    assert spans[1].events[0]["attributes"]["exception.type"] == "ValueError"
+    assert outer.start <= inner.start <= inner.end <= outer.end
+
+
+def test_session(spans, httpserver: HTTPServer):
+    session = Session(Config(defaults={"server": httpserver.url_for("/")}, auth=None))
+    httpserver.expect_request("/api/v1/servers/virtual/GetServer").respond_with_json(
+        {"result": {"id": "vm-1", "status": "ONLINE"}}
+    )
+    session.request("get", "/api/v1/servers/virtual/GetServer")
+
+    names = {s.name: s for s in spans}
+    assert set(names) >= {
+        "denvr.request",
+        "denvr.http",
+        "denvr.connect",
+        "denvr.server",
+        "denvr.decode",
+        "denvr.normalize",
+    }
+    root = names["denvr.request"]
+    http = names["denvr.http"]
+    assert http.parent_id == root.span_id
+    assert names["denvr.connect"].parent_id == http.span_id
+    assert names["denvr.server"].parent_id == http.span_id
+    assert names["denvr.decode"].parent_id == root.span_id
+    assert http.attributes["http.status_code"] == 200
+    assert names["denvr.server"].start >= names["denvr.connect"].end
+
+
+def test_waiter(spans):
+    checks = iter([False, False, True])
+    waiter = Waiter(action=lambda: "resp", check=lambda resp: (next(checks), resp))
+    assert waiter(interval=0.01, timeout=1) == "resp"
+
+    names = [s.name for s in spans]
+    assert names.count("denvr.waiter.check") == 3
+    assert names.count("denvr.waiter.sleep") == 2
+    assert names[-1] == "denvr.waiter"
+    wait = next(s for s in spans if s.name == "denvr.waiter.wait")
+    assert wait.attributes["waiter.attempts"] == 3
+
+
+def test_jsonl(tmp_path, httpserver: HTTPServer):
+    path = tmp_path / "trace.jsonl"
+    Session(Config(defaults={"server": httpserver.url_for("/"), "trace": str(path)}, auth=None))
+    tracer = tracing.tracer()
+    assert tracer is not None
+    assert isinstance(tracer.exporter, tracing.JsonlExporter)
+    try:
+        with tracing.span("test", x=1):
+            pass
+    finally:
+        tracer.exporter.close()
+        tracing.disable()
+
+    (line,) = path.read_text().splitlines()
+    span = json.loads(line)
+    assert span["name"] == "test"
+    assert span["kind"] == "SPAN_KIND_INTERNAL"
+    assert span["attributes"]["x"] == 1
+    assert span["endTimeUnixNano"] >= span["startTimeUnixNano"]
+    assert span["status"]["code"] == "STATUS_CODE_UNSET"
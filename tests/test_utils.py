@@ -1,9 +1,11 @@
+import json
+
 from unittest.mock import MagicMock
 
 import pytest
 from requests.exceptions import HTTPError, JSONDecodeError
 
-from denvr.utils import raise_for_status
+from denvr.utils import Interner, camelcase, raise_for_status, iter_items
 
 
 def test_raise_for_status_pass():
@@ -53,3 +55,70 @@ def test_raise_for_status_error_with_details():
     response.json = lambda: (_ for _ in ()).throw(JSONDecodeError("err", "", 0))
     with pytest.raises(HTTPError):
         raise_for_status(response)
+
+
+def chunked(content: bytes, size: int):
+    return (content[i : i + size] for i in range(0, len(content), size))
+
+
+def test_iter_items():
+    items = [{"id": f"vm-{i}", "note": 'caf\u00e9 \\ "items": [', "gpus": i} for i in range(20)]
+    content = json.dumps({"items": items}).encode()
+
+    # Every chunk size should produce the same results, including splitting multibyte characters.
+    for size in [1, 2, 3, 7, 64, len(content)]:
+        assert list(iter_items(chunked(content, size))) == items
+
+    # Support the mock-server `{"result": ...}` wrapper and keys preceding the array
+    content = json.dumps(
+        {"success": True, "result": {"total": 3, "items": [1, 22, 333]}}
+    ).encode()
+    for size in [1, 2, 64]:
+        assert list(iter_items(chunked(content, size))) == [1, 22, 333]
+
+    # Missing or empty arrays yield nothing
+    assert list(iter_items([b'{"items": []}'])) == []
+    assert list(iter_items([b'{"other": ["items"]}'])) == []
+    assert list(iter_items([b'{"name": "items", "rows": [1]}'])) == []
+
+
+def test_iter_items_errors():
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_items(chunked(b'{"items": [{"id": 1}, {"id":', 4)))
+
+    with pytest.raises(json.JSONDecodeError, match="Unterminated items array"):
+        list(iter_items([b'{"items": [{"id": 1}']))
+
+
+def test_camelcase():
+    assert camelcase("gpu_type") == "gpuType"
+    assert camelcase("application_catalog_item_name") == "applicationCatalogItemName"
+    assert camelcase("status") == "status"
+
+
+def test_interner():
+    interner = Interner(maxsize=2)
+    a = interner("".join(["ON", "LINE"]))
+    assert interner("".join(["ON", "LINE"])) is a
+    interner("OFFLINE")
+
+    # The table is full, so new values are returned as is
+    pending = "".join(["PEN", "DING"])
+    assert interner(pending) is pending
+    assert interner("".join(["PEN", "DING"])) is not pending
+    assert len(interner) == 2
+
+
+def test_interner_fields():
+    interner = Interner()
+    result: dict = {
+        "status": "".join(["ON", "LINE"]),
+        "items": [
+            {"status": "".join(["ON", "LINE"]), "gpuType": "".join(["H", "100"]), "id": str(i)}
+            for i in range(2)
+        ],
+    }
+    interner.fields(result)
+    assert result["status"] is result["items"][0]["status"]
+    assert result["items"][0]["gpuType"] is result["items"][1]["gpuType"]
+    assert len(interner) == 2
@@ -21,6 +21,13 @@ def test_waiter_timeout():
 
     assert log == ["Failed Action"]
 
+    # Cleanups get the identifiers from the request which the response omits
+    with pytest.raises(TimeoutError):
+        Waiter(action=lambda **kw: {"id": "vm-1"}, check=lambda x: (False, x), cleanup=cleanup)(
+            interval=0.01, timeout=0.05, id="vm-1", namespace="denvr"
+        )
+    assert log[-1] == {"id": "vm-1", "namespace": "denvr"}
+
 
 def test_unknown_waiter_operation():
     x = "foo"
@@ -90,6 +97,33 @@ def test_vm_stop_server(httpserver: HTTPServer):
     assert result["status"] == "OFFLINE"
 
 
+@pytest.mark.parametrize("records", [False, True])
+def test_vm_stop_server_partial_response(httpserver: HTTPServer, records: bool):
+    config = Config(defaults={"server": httpserver.url_for("/"), "records": records}, auth=None)
+    session = Session(config)
+    client = virtual.Client(session)
+
+    kwargs: Dict[str, Any] = {
+        "id": "vm-2024093009357617",
+        "namespace": "denvr",
+        "cluster": "Hou1",
+    }
+
+    # StopServer responses don't include the namespace, so it's taken from the request
+    httpserver.expect_ordered_request("/api/v1/servers/virtual/StopServer").respond_with_json(
+        {"id": kwargs["id"], "cluster": kwargs["cluster"], "status": "OFFLINE"}
+    )
+    httpserver.expect_ordered_request(
+        "/api/v1/servers/virtual/GetServer",
+        query_string={"Id": kwargs["id"], "Namespace": "denvr", "Cluster": "Hou1"},
+    ).respond_with_json({"status": "OFFLINE"})
+
+    stop_server = waiter(client.stop_server)
+    result = stop_server(interval=0.01, **kwargs)
+    assert result["status"] == "OFFLINE"
+    httpserver.check_assertions()
+
+
 def test_app_start_application(httpserver: HTTPServer):
     config = Config(defaults={"server": httpserver.url_for("/")}, auth=None)
     session = Session(config)
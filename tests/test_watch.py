@@ -0,0 +1,97 @@
+from itertools import islice
+from unittest.mock import MagicMock
+
+import pytest
+
+from pytest_httpserver import HTTPServer
+
+from denvr.api.v1.servers import virtual
+from denvr.config import Config
+from denvr.session import Session
+from denvr.watch import ADDED, DELETED, MODIFIED, Event, Watcher, fingerprint, watch_servers
+
+
+def vm(id, status="ONLINE", last_updated="2025-04-09T01:15:35+00:00"):
+    return {
+        "id": id,
+        "namespace": "denvr",
+        "cluster": "Hou1",
+        "status": status,
+        "last_updated": last_updated,
+    }
+
+
+def test_fingerprint():
+    assert fingerprint({"a": 1, "b": 2}) == fingerprint({"b": 2, "a": 1})
+    assert fingerprint({"a": 1}) != fingerprint({"a": 2})
+
+
+def test_watcher():
+    responses = [
+        {"items": [vm("a", "PENDING"), vm("b")]},
+        {"items": [vm("a", "PENDING"), vm("b")]},
+        {"items": [vm("a", "ONLINE", "2025-04-09T01:20:00+00:00"), vm("c")]},
+    ]
+    watcher = Watcher(MagicMock(side_effect=responses), interval=1, max_interval=2, backoff=2)
+
+    assert [(e.type, e.key[2]) for e in watcher.poll()] == [(ADDED, "a"), (ADDED, "b")]
+    assert watcher.interval == 1
+
+    # No changes increases the poll interval
+    assert watcher.poll() == []
+    assert watcher.interval == 2
+
+    events = watcher.poll()
+    assert events == [
+        Event(MODIFIED, ("Hou1", "denvr", "a"), vm("a", "ONLINE", "2025-04-09T01:20:00+00:00")),
+        Event(ADDED, ("Hou1", "denvr", "c"), vm("c")),
+        Event(DELETED, ("Hou1", "denvr", "b"), vm("b")),
+    ]
+    assert watcher.interval == 1
+
+
+def test_watcher_unchanged_last_updated():
+    # Items without a changed `last_updated` are skipped without hashing
+    watcher = Watcher(
+        MagicMock(side_effect=[[vm("a")], [vm("a", "OFFLINE")], [vm("a", None, None)]])
+    )
+    assert len(watcher.poll()) == 1
+    assert watcher.poll() == []
+    assert [e.type for e in watcher.poll()] == [MODIFIED]
+
+
+def test_watcher_failed_stream():
+    # A stream which fails partway doesn't change the watch state, so its events aren't lost
+    def failing():
+        yield vm("a", "OFFLINE", "2025-04-09T01:20:00+00:00")
+        raise ConnectionError("stream dropped")
+
+    offline = [vm("a", "OFFLINE", "2025-04-09T01:20:00+00:00"), vm("b")]
+    watcher = Watcher(MagicMock(side_effect=[[vm("a"), vm("b")], failing(), offline]))
+    assert len(watcher.poll()) == 2
+    with pytest.raises(ConnectionError):
+        watcher.poll()
+    assert watcher.poll() == [Event(MODIFIED, ("Hou1", "denvr", "a"), offline[0])]
+
+
+def test_watcher_checkpoint(tmp_path):
+    checkpoint = str(tmp_path / "servers.json")
+    watcher = Watcher(MagicMock(return_value=[vm("a"), vm("b")]), checkpoint=checkpoint)
+    assert len(watcher.poll()) == 2
+
+    # A new watcher resumes from the saved state
+    watcher = Watcher(MagicMock(return_value=[vm("a"), vm("c")]), checkpoint=checkpoint)
+    events = watcher.poll()
+    assert [(e.type, e.key[2]) for e in events] == [(ADDED, "c"), (DELETED, "b")]
+    assert events[1].item is None
+
+
+def test_watch_servers(httpserver: HTTPServer):
+    config = Config(defaults={"server": httpserver.url_for("/")}, auth=None)
+    client = virtual.Client(Session(config))
+    httpserver.expect_request(
+        "/api/v1/servers/virtual/GetServers", query_string={"Cluster": "Hou1"}
+    ).respond_with_json({"items": [vm("a"), vm("b")]})
+
+    watcher = watch_servers(client, cluster="Hou1", interval=0)
+    assert [e.item["id"] for e in islice(watcher, 2)] == ["a", "b"]